@@ -0,0 +1,240 @@
+"""baseline schema
+
+Tables as they existed when the project was still created with create_all and
+create_session_tables.py. Each table is only created when missing, so databases
+created that way can be brought under Alembic with a plain ``upgrade head``.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 01:37:59.049881
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if 'conversation_daily_rollups' not in existing:
+        op.create_table('conversation_daily_rollups',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('day', sa.Date(), nullable=False),
+            sa.Column('partner_id', sa.String(), nullable=False),
+            sa.Column('project_type', sa.String(), nullable=False),
+            sa.Column('ai_powered', sa.Boolean(), nullable=False),
+            sa.Column('messages', sa.Integer(), nullable=False),
+            sa.Column('responses', sa.Integer(), nullable=False),
+            sa.Column('pricing_hits', sa.Integer(), nullable=False),
+            sa.Column('registrations', sa.Integer(), nullable=False),
+            sa.Column('conversations', sa.Integer(), nullable=False),
+            sa.Column('registered_conversations', sa.Integer(), nullable=False),
+            sa.Column('response_time_sum', sa.Float(), nullable=False),
+            sa.Column('response_time_count', sa.Integer(), nullable=False),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('day', 'partner_id', 'project_type', 'ai_powered', name='uq_conversation_daily_rollup_key')
+        )
+        op.create_index('ix_conversation_daily_rollups_day', 'conversation_daily_rollups', ['day'], unique=False)
+        op.create_index('ix_conversation_daily_rollups_id', 'conversation_daily_rollups', ['id'], unique=False)
+
+    if 'conversation_patterns' not in existing:
+        op.create_table('conversation_patterns',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('pattern_name', sa.String(), nullable=True),
+            sa.Column('user_query_pattern', sa.Text(), nullable=True),
+            sa.Column('project_type', sa.String(), nullable=True),
+            sa.Column('most_successful_followup', sa.Text(), nullable=True),
+            sa.Column('success_rate', sa.Float(), nullable=True),
+            sa.Column('average_response_time', sa.Float(), nullable=True),
+            sa.Column('sample_user_queries', sa.Text(), nullable=True),
+            sa.Column('sample_good_responses', sa.Text(), nullable=True),
+            sa.Column('times_seen', sa.Integer(), nullable=True),
+            sa.Column('last_updated', sa.DateTime(), nullable=True),
+            sa.Column('confidence_score', sa.Float(), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_conversation_patterns_id', 'conversation_patterns', ['id'], unique=False)
+        op.create_index('ix_conversation_patterns_pattern_name', 'conversation_patterns', ['pattern_name'], unique=False)
+        op.create_index('ix_conversation_patterns_project_type', 'conversation_patterns', ['project_type'], unique=False)
+
+    if 'conversation_sessions' not in existing:
+        op.create_table('conversation_sessions',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('session_id', sa.String(), nullable=True),
+            sa.Column('partner_id', sa.String(), nullable=True),
+            sa.Column('agent_used', sa.String(), nullable=True),
+            sa.Column('started_at', sa.DateTime(), nullable=True),
+            sa.Column('ended_at', sa.DateTime(), nullable=True),
+            sa.Column('total_messages', sa.Integer(), nullable=True),
+            sa.Column('led_to_registration', sa.Boolean(), nullable=True),
+            sa.Column('registration_completed', sa.Boolean(), nullable=True),
+            sa.Column('estimated_project_value', sa.Float(), nullable=True),
+            sa.Column('user_satisfaction_score', sa.Float(), nullable=True),
+            sa.Column('ai_success_rate', sa.Float(), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_conversation_sessions_agent_used', 'conversation_sessions', ['agent_used'], unique=False)
+        op.create_index('ix_conversation_sessions_id', 'conversation_sessions', ['id'], unique=False)
+        op.create_index('ix_conversation_sessions_partner_id', 'conversation_sessions', ['partner_id'], unique=False)
+        op.create_index('ix_conversation_sessions_session_id', 'conversation_sessions', ['session_id'], unique=True)
+
+    if 'partners' not in existing:
+        op.create_table('partners',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('partner_id', sa.String(length=50), nullable=False),
+            sa.Column('name', sa.String(length=100), nullable=False),
+            sa.Column('domain', sa.String(length=100), nullable=True),
+            sa.Column('brand_name', sa.String(length=100), nullable=False),
+            sa.Column('brand_color', sa.String(length=7), nullable=True),
+            sa.Column('logo_url', sa.String(length=255), nullable=True),
+            sa.Column('enabled_agents', sa.JSON(), nullable=True),
+            sa.Column('agent_display_name', sa.String(length=100), nullable=True),
+            sa.Column('welcome_message', sa.Text(), nullable=True),
+            sa.Column('widget_position', sa.String(length=20), nullable=True),
+            sa.Column('widget_theme', sa.String(length=20), nullable=True),
+            sa.Column('show_branding', sa.Boolean(), nullable=True),
+            sa.Column('is_active', sa.Boolean(), nullable=True),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_partners_id', 'partners', ['id'], unique=False)
+        op.create_index('ix_partners_partner_id', 'partners', ['partner_id'], unique=True)
+
+    if 'session_memory' not in existing:
+        op.create_table('session_memory',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('session_id', sa.String(), nullable=True),
+            sa.Column('partner_id', sa.String(), nullable=True),
+            sa.Column('property_type', sa.String(), nullable=True),
+            sa.Column('total_area', sa.Float(), nullable=True),
+            sa.Column('rooms_data', sa.Text(), nullable=True),
+            sa.Column('current_project_type', sa.String(), nullable=True),
+            sa.Column('project_preferences', sa.Text(), nullable=True),
+            sa.Column('budget_range', sa.String(), nullable=True),
+            sa.Column('last_question', sa.Text(), nullable=True),
+            sa.Column('needs_followup', sa.Boolean(), nullable=True),
+            sa.Column('followup_context', sa.Text(), nullable=True),
+            sa.Column('preferred_quality_level', sa.String(), nullable=True),
+            sa.Column('preferred_brands', sa.Text(), nullable=True),
+            sa.Column('registration_stage', sa.String(), nullable=True),
+            sa.Column('registration_data', sa.Text(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.Column('last_activity', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_session_memory_id', 'session_memory', ['id'], unique=False)
+        op.create_index('ix_session_memory_partner_id', 'session_memory', ['partner_id'], unique=False)
+        op.create_index('ix_session_memory_session_id', 'session_memory', ['session_id'], unique=True)
+
+    if 'conversation_messages' not in existing:
+        op.create_table('conversation_messages',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('session_id', sa.String(), nullable=True),
+            sa.Column('message_order', sa.Integer(), nullable=True),
+            sa.Column('user_message', sa.Text(), nullable=True),
+            sa.Column('agent_response', sa.Text(), nullable=True),
+            sa.Column('ai_powered', sa.Boolean(), nullable=True),
+            sa.Column('ai_reasoning', sa.Text(), nullable=True),
+            sa.Column('project_type_detected', sa.String(), nullable=True),
+            sa.Column('missing_info_identified', sa.Text(), nullable=True),
+            sa.Column('user_responded', sa.Boolean(), nullable=True),
+            sa.Column('user_response_time_seconds', sa.Float(), nullable=True),
+            sa.Column('led_to_clarification', sa.Boolean(), nullable=True),
+            sa.Column('led_to_pricing', sa.Boolean(), nullable=True),
+            sa.Column('led_to_registration', sa.Boolean(), nullable=True),
+            sa.Column('response_quality_score', sa.Float(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['session_id'], ['conversation_sessions.session_id'], ),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_conversation_messages_id', 'conversation_messages', ['id'], unique=False)
+
+    if 'contractors' not in existing:
+        op.create_table('contractors',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('name', sa.String(length=200), nullable=True),
+            sa.Column('company_type', sa.String(length=100), nullable=True),
+            sa.Column('location', sa.String(length=100), nullable=True),
+            sa.Column('website', sa.String(length=500), nullable=True),
+            sa.Column('phone', sa.String(length=20), nullable=True),
+            sa.Column('specialties', sa.Text(), nullable=True),
+            sa.Column('verified', sa.Boolean(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_contractors_id', 'contractors', ['id'], unique=False)
+        op.create_index('ix_contractors_name', 'contractors', ['name'], unique=False)
+
+    if 'service_types' not in existing:
+        op.create_table('service_types',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('name', sa.String(length=100), nullable=True),
+            sa.Column('description', sa.Text(), nullable=True),
+            sa.Column('unit', sa.String(length=20), nullable=True),
+            sa.Column('category', sa.String(length=50), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_service_types_id', 'service_types', ['id'], unique=False)
+        op.create_index('ix_service_types_name', 'service_types', ['name'], unique=True)
+
+    if 'market_rates' not in existing:
+        op.create_table('market_rates',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('service_type_id', sa.Integer(), nullable=True),
+            sa.Column('market_min', sa.Float(), nullable=True),
+            sa.Column('market_max', sa.Float(), nullable=True),
+            sa.Column('market_avg', sa.Float(), nullable=True),
+            sa.Column('recommended_price', sa.Float(), nullable=True),
+            sa.Column('sample_size', sa.Integer(), nullable=True),
+            sa.Column('confidence_score', sa.Float(), nullable=True),
+            sa.Column('last_calculated', sa.DateTime(), nullable=True),
+            sa.Column('region', sa.String(length=100), nullable=True),
+            sa.ForeignKeyConstraint(['service_type_id'], ['service_types.id'], ),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_market_rates_id', 'market_rates', ['id'], unique=False)
+
+    if 'pricing_data' not in existing:
+        op.create_table('pricing_data',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('service_type_id', sa.Integer(), nullable=True),
+            sa.Column('contractor_id', sa.Integer(), nullable=True),
+            sa.Column('min_price', sa.Float(), nullable=True),
+            sa.Column('max_price', sa.Float(), nullable=True),
+            sa.Column('avg_price', sa.Float(), nullable=True),
+            sa.Column('minimum_charge', sa.Float(), nullable=True),
+            sa.Column('region', sa.String(length=100), nullable=True),
+            sa.Column('source', sa.String(length=200), nullable=True),
+            sa.Column('source_url', sa.String(length=500), nullable=True),
+            sa.Column('confidence', sa.Float(), nullable=True),
+            sa.Column('last_updated', sa.DateTime(), nullable=True),
+            sa.Column('notes', sa.Text(), nullable=True),
+            sa.ForeignKeyConstraint(['contractor_id'], ['contractors.id'], ),
+            sa.ForeignKeyConstraint(['service_type_id'], ['service_types.id'], ),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_pricing_data_id', 'pricing_data', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_table('pricing_data')
+    op.drop_table('market_rates')
+    op.drop_table('service_types')
+    op.drop_table('contractors')
+    op.drop_table('conversation_messages')
+    op.drop_table('session_memory')
+    op.drop_table('partners')
+    op.drop_table('conversation_sessions')
+    op.drop_table('conversation_patterns')
+    op.drop_table('conversation_daily_rollups')
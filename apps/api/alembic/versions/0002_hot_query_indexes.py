@@ -0,0 +1,44 @@
+"""composite indexes for hot query shapes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 02:05:12.412907
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+# (index name, table, columns) - kept in sync with __table_args__ on the models
+INDEXES = [
+    ('ix_market_rates_service_region', 'market_rates', ['service_type_id', 'region']),
+    ('ix_pricing_data_service_region', 'pricing_data', ['service_type_id', 'region']),
+    ('ix_pricing_data_service_contractor', 'pricing_data', ['service_type_id', 'contractor_id']),
+    ('ix_conversation_messages_session_order', 'conversation_messages', ['session_id', 'message_order']),
+    ('ix_conversation_messages_created_at', 'conversation_messages', ['created_at']),
+    ('ix_session_memory_last_activity', 'session_memory', ['last_activity']),
+    ('ix_conversation_patterns_type_confidence_seen', 'conversation_patterns', ['project_type', 'confidence_score', 'times_seen']),
+]
+
+
+def _existing_indexes(table: str) -> set:
+    return {index['name'] for index in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        # create_all on a fresh database already builds these from the models
+        if name not in _existing_indexes(table):
+            op.create_index(name, table, columns, unique=False)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
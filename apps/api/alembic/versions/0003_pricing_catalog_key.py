@@ -0,0 +1,43 @@
+"""unique catalog key on pricing_data
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 03:12:40.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    existing = {index['name'] for index in sa.inspect(op.get_bind()).get_indexes('pricing_data')}
+    if 'uq_pricing_data_catalog_key' in existing:
+        return
+
+    # Older scripts could insert the same market price twice; keep the newest row per key
+    op.execute(
+        "DELETE FROM pricing_data "
+        "WHERE contractor_id IS NULL AND region IS NOT NULL AND source IS NOT NULL "
+        "AND id NOT IN ("
+        "  SELECT MAX(id) FROM pricing_data "
+        "  WHERE contractor_id IS NULL AND region IS NOT NULL AND source IS NOT NULL "
+        "  GROUP BY service_type_id, region, source"
+        ")"
+    )
+    op.create_index(
+        'uq_pricing_data_catalog_key', 'pricing_data', ['service_type_id', 'region', 'source'],
+        unique=True,
+        sqlite_where=sa.text('contractor_id IS NULL'),
+        postgresql_where=sa.text('contractor_id IS NULL'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('uq_pricing_data_catalog_key', table_name='pricing_data')
@@ -0,0 +1,42 @@
+"""unique (service_type_id, region) on market_rates
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 04:02:51.733010
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def _existing_indexes() -> set:
+    return {index['name'] for index in sa.inspect(op.get_bind()).get_indexes('market_rates')}
+
+
+def upgrade() -> None:
+    existing = _existing_indexes()
+
+    if 'uq_market_rates_service_region' not in existing:
+        # Keep the most recently calculated rate per service and region
+        op.execute(
+            "DELETE FROM market_rates WHERE id NOT IN ("
+            "  SELECT MAX(id) FROM market_rates GROUP BY service_type_id, region"
+            ")"
+        )
+        op.create_index('uq_market_rates_service_region', 'market_rates', ['service_type_id', 'region'], unique=True)
+
+    # The unique index serves the same lookups
+    if 'ix_market_rates_service_region' in existing:
+        op.drop_index('ix_market_rates_service_region', table_name='market_rates')
+
+
+def downgrade() -> None:
+    op.create_index('ix_market_rates_service_region', 'market_rates', ['service_type_id', 'region'], unique=False)
+    op.drop_index('uq_market_rates_service_region', table_name='market_rates')
@@ -0,0 +1,38 @@
+"""quantile and robustness columns on market_rates
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 04:48:09.256417
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+COLUMNS = [
+    ('p10_price', sa.Float()),
+    ('p50_price', sa.Float()),
+    ('p90_price', sa.Float()),
+    ('effective_sample_size', sa.Float()),
+    ('outliers_rejected', sa.Integer()),
+]
+
+
+def upgrade() -> None:
+    existing = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('market_rates')}
+    for name, type_ in COLUMNS:
+        if name not in existing:
+            op.add_column('market_rates', sa.Column(name, type_, nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('market_rates', schema=None) as batch_op:
+        for name, _ in reversed(COLUMNS):
+            batch_op.drop_column(name)
@@ -0,0 +1,73 @@
+"""regions, postcode ranges and the price resolution table
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 05:31:12.480133
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if 'regions' not in existing:
+        op.create_table('regions',
+            sa.Column('code', sa.String(length=10), nullable=False),
+            sa.Column('name', sa.String(length=100), nullable=True),
+            sa.Column('level', sa.String(length=20), nullable=True),
+            sa.Column('parent_code', sa.String(length=10), nullable=True),
+            sa.Column('price_index', sa.Float(), nullable=True),
+            sa.Column('aliases', sa.Text(), nullable=True),
+            sa.ForeignKeyConstraint(['parent_code'], ['regions.code'], ),
+            sa.PrimaryKeyConstraint('code')
+        )
+        op.create_index('ix_regions_name', 'regions', ['name'], unique=False)
+
+    if 'postcode_ranges' not in existing:
+        op.create_table('postcode_ranges',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('postcode_from', sa.String(length=4), nullable=True),
+            sa.Column('postcode_to', sa.String(length=4), nullable=True),
+            sa.Column('region_code', sa.String(length=10), nullable=True),
+            sa.ForeignKeyConstraint(['region_code'], ['regions.code'], ),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_postcode_ranges_id', 'postcode_ranges', ['id'], unique=False)
+
+    if 'price_resolutions' not in existing:
+        op.create_table('price_resolutions',
+            sa.Column('service_type_id', sa.Integer(), nullable=False),
+            sa.Column('region_code', sa.String(length=10), nullable=False),
+            sa.Column('source_region_code', sa.String(length=10), nullable=True),
+            sa.Column('price_factor', sa.Float(), nullable=True),
+            sa.Column('market_min', sa.Float(), nullable=True),
+            sa.Column('market_max', sa.Float(), nullable=True),
+            sa.Column('market_avg', sa.Float(), nullable=True),
+            sa.Column('recommended_price', sa.Float(), nullable=True),
+            sa.Column('p10_price', sa.Float(), nullable=True),
+            sa.Column('p50_price', sa.Float(), nullable=True),
+            sa.Column('p90_price', sa.Float(), nullable=True),
+            sa.Column('sample_size', sa.Integer(), nullable=True),
+            sa.Column('confidence_score', sa.Float(), nullable=True),
+            sa.Column('resolved_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['region_code'], ['regions.code'], ),
+            sa.ForeignKeyConstraint(['service_type_id'], ['service_types.id'], ),
+            sa.PrimaryKeyConstraint('service_type_id', 'region_code')
+        )
+
+
+def downgrade() -> None:
+    op.drop_table('price_resolutions')
+    op.drop_index('ix_postcode_ranges_id', table_name='postcode_ranges')
+    op.drop_table('postcode_ranges')
+    op.drop_index('ix_regions_name', table_name='regions')
+    op.drop_table('regions')
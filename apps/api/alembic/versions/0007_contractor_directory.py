@@ -0,0 +1,65 @@
+"""normalised contractor specialties and locations, region centres
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 06:12:40.915377
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    existing = set(inspector.get_table_names())
+
+    region_columns = {column['name'] for column in inspector.get_columns('regions')}
+    for name in ('latitude', 'longitude'):
+        if name not in region_columns:
+            op.add_column('regions', sa.Column(name, sa.Float(), nullable=True))
+
+    if 'contractor_specialties' not in existing:
+        op.create_table('contractor_specialties',
+            sa.Column('contractor_id', sa.Integer(), nullable=False),
+            sa.Column('service_type_id', sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(['contractor_id'], ['contractors.id'], ),
+            sa.ForeignKeyConstraint(['service_type_id'], ['service_types.id'], ),
+            sa.PrimaryKeyConstraint('contractor_id', 'service_type_id')
+        )
+        op.create_index('ix_contractor_specialties_service_type_id', 'contractor_specialties', ['service_type_id'], unique=False)
+
+    if 'contractor_locations' not in existing:
+        op.create_table('contractor_locations',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('contractor_id', sa.Integer(), nullable=True),
+            sa.Column('region_code', sa.String(length=10), nullable=True),
+            sa.Column('postcode', sa.String(length=4), nullable=True),
+            sa.ForeignKeyConstraint(['contractor_id'], ['contractors.id'], ),
+            sa.ForeignKeyConstraint(['region_code'], ['regions.code'], ),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_contractor_locations_contractor_id', 'contractor_locations', ['contractor_id'], unique=False)
+        op.create_index('ix_contractor_locations_id', 'contractor_locations', ['id'], unique=False)
+        op.create_index('ix_contractor_locations_region_code', 'contractor_locations', ['region_code'], unique=False)
+
+    # Rows are backfilled from contractors.specialties/location by the catalog refresh
+    # (ContractorDirectory.sync_legacy_fields), once the regions are loaded
+
+
+def downgrade() -> None:
+    op.drop_index('ix_contractor_locations_region_code', table_name='contractor_locations')
+    op.drop_index('ix_contractor_locations_id', table_name='contractor_locations')
+    op.drop_index('ix_contractor_locations_contractor_id', table_name='contractor_locations')
+    op.drop_table('contractor_locations')
+    op.drop_index('ix_contractor_specialties_service_type_id', table_name='contractor_specialties')
+    op.drop_table('contractor_specialties')
+    with op.batch_alter_table('regions', schema=None) as batch_op:
+        batch_op.drop_column('longitude')
+        batch_op.drop_column('latitude')
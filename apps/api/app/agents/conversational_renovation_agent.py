@@ -5,6 +5,7 @@ from .enhanced_renovation_agent import EnhancedRenovationAgent
 from ..services.project_registration_service import ProjectRegistrationService, RegistrationStage
 from ..services.intelligent_ai_service import IntelligentAIService
 from ..services.conversation_learning_service import ConversationLearningService
+from ..services.tracing import tracer
 
 class ConversationalRenovationAgent(EnhancedRenovationAgent):
     """
@@ -107,11 +108,12 @@ class ConversationalRenovationAgent(EnhancedRenovationAgent):
         # Start conversation logging
         if self.learning_service and session_id != "unknown":
             try:
-                await self.learning_service.log_conversation_start(
-                    session_id=session_id,
-                    partner_id=partner_id,
-                    agent_used=self.agent_name
-                )
+                with tracer.span("learning.log_start"):
+                    await self.learning_service.log_conversation_start(
+                        session_id=session_id,
+                        partner_id=partner_id,
+                        agent_used=self.agent_name
+                    )
             except Exception as e:
                 print(f"Failed to log conversation start: {e}")
         
@@ -119,9 +121,11 @@ class ConversationalRenovationAgent(EnhancedRenovationAgent):
         registration_stage = self._get_registration_stage(session)
         
         if registration_stage and registration_stage != RegistrationStage.COMPLETED:
-            result = await self._handle_registration_flow(query, context, registration_stage)
+            with tracer.span("agent.registration", **{"registration.stage": registration_stage.value}):
+                result = await self._handle_registration_flow(query, context, registration_stage)
         elif self._wants_to_register(query):
-            result = await self._start_registration_flow(query, context)
+            with tracer.span("agent.registration", **{"registration.stage": "start"}):
+                result = await self._start_registration_flow(query, context)
         elif self._is_identity_or_general_question(query):
             # Handle identity and general questions directly
             result = self._create_general_conversational_response(query)
@@ -141,24 +145,26 @@ class ConversationalRenovationAgent(EnhancedRenovationAgent):
                 technical_result = await self._handle_contextual_response(query, context)
             
             # Then wrap it in conversational response
-            result = await self._create_conversational_response(
-                query, technical_result, context
-            )
+            with tracer.span("agent.conversational_response"):
+                result = await self._create_conversational_response(
+                    query, technical_result, context
+                )
         
         # Log the complete message exchange
         if self.learning_service and session_id != "unknown":
             try:
-                await self.learning_service.log_message_exchange(
-                    session_id=session_id,
-                    user_message=query,
-                    agent_response=result.get("response", ""),
-                    ai_powered=result.get("ai_powered", False),
-                    ai_reasoning=result.get("ai_reasoning", ""),
-                    project_type_detected=result.get("calculation_details", {}).get("project_type", ""),
-                    missing_info=result.get("missing_info", []),
-                    led_to_pricing=result.get("total_cost", 0) > 0,
-                    led_to_registration=result.get("registration_stage") is not None
-                )
+                with tracer.span("learning.log_exchange"):
+                    await self.learning_service.log_message_exchange(
+                        session_id=session_id,
+                        user_message=query,
+                        agent_response=result.get("response", ""),
+                        ai_powered=result.get("ai_powered", False),
+                        ai_reasoning=result.get("ai_reasoning", ""),
+                        project_type_detected=result.get("calculation_details", {}).get("project_type", ""),
+                        missing_info=result.get("missing_info", []),
+                        led_to_pricing=result.get("total_cost", 0) > 0,
+                        led_to_registration=result.get("registration_stage") is not None
+                    )
             except Exception as e:
                 print(f"Failed to log message exchange: {e}")
         
@@ -356,6 +362,16 @@ class ConversationalRenovationAgent(EnhancedRenovationAgent):
         else:
             intro = "Det høres ut som et spennende prosjekt!"
         
+        # The fused analysis already wrote the follow-up - no second LLM call
+        if technical_result.get("ai_followup"):
+            return {
+                **technical_result,
+                "response": f"{intro} {technical_result['ai_followup']}",
+                "conversation_stage": "pricing_discussion",
+                "personality_applied": True,
+                "ai_powered": True
+            }
+        
         # Use AI for intelligent follow-up if available
         if self.intelligent_ai:
             try:
@@ -8,7 +8,16 @@ from .base_agent import BaseAgent
 from ..services.pricing_service import PricingService
 from ..services.session_memory_service import SessionMemoryService
 from ..services.ai_query_analyzer import AIQueryAnalyzer
+from ..services.estimate_cache import estimate_cache, catalog_version, area_bucket, freeze, DEFAULT_REGION
+from ..services.tracing import tracer, set_trace_attribute, record_cache_lookup
 from ..database import SessionLocal
+from ..calculators import (
+    PriceSnapshot, calculate_bathroom, BathroomEstimate, BATHROOM_SERVICES, calculate_painting,
+    select_painting_service, PAINTING_SERVICES, RIGG_SERVICE, calculate_kitchen, KITCHEN_SERVICES,
+    calculate_windows, calculate_interior_doors, WINDOW_SERVICE, electrician_hourly_rate,
+    calculate_outlets, calculate_electrical_work, ELECTRICAL_SERVICES
+)
+from ..calculators.bathroom import BATHROOM_COMPONENTS
 
 class EnhancedRenovationAgent(BaseAgent):
     """
@@ -181,6 +190,37 @@ class EnhancedRenovationAgent(BaseAgent):
         
         return response
     
+    async def _cached_estimate(self, key: tuple, compute) -> Dict[str, Any]:
+        """
+        Serve a repeat estimate from the estimate cache. The key holds the normalised
+        inputs; the catalog version is appended so price changes invalidate it.
+        """
+        try:
+            key = (*key, catalog_version(self.db))
+        except Exception as e:
+            print(f"Catalog version unavailable, estimate not cached: {e}")
+            return await compute()
+        
+        cached = estimate_cache.get(key)
+        record_cache_lookup("estimate", cached is not None)
+        if cached is not None:
+            return cached
+        
+        result = await compute()
+        # Fallback constants are not worth caching past a transient database error
+        if result.get("pricing_source") != "fallback" and "error" not in result:
+            estimate_cache.put(key, result)
+        return result
+    
+    def _price_snapshot(self, services) -> PriceSnapshot:
+        """Prices for the calculators in one query; an empty snapshot (calculator fallbacks) if the database fails"""
+        try:
+            return self.pricing_service.price_snapshot(services, DEFAULT_REGION)
+        except Exception as e:
+            print(f"Price snapshot unavailable, using fallback prices: {e}")
+            self.db.rollback()
+            return PriceSnapshot(DEFAULT_REGION)
+
     def _create_clarification_response(self, title: str, question: str, options: list) -> str:
         """Create a standardized clarification question with options"""
         options_html = ""
@@ -237,9 +277,11 @@ class EnhancedRenovationAgent(BaseAgent):
     async def _handle_ai_clarification(self, query: str, analysis: Dict, session_id: str = None, context: str = "") -> Dict[str, Any]:
         """Handle ambiguous queries with AI-generated clarification questions"""
         
-        # Generate intelligent follow-up questions using AI (if available)
+        # The fused analysis already wrote the questions; otherwise ask the AI (if available)
         followup_questions = []
-        if self.ai_analyzer:
+        if analysis.get("fused"):
+            followup_questions = analysis.get("followup_questions") or []
+        elif self.ai_analyzer:
             try:
                 followup_questions = await self.ai_analyzer.generate_followup_questions(query, analysis, context)
             except Exception as e:
@@ -254,10 +296,16 @@ class EnhancedRenovationAgent(BaseAgent):
         
         # If we have specific clarification options (like doors), use those
         if analysis.get("project_type") == "vinduer_dorer" and "door_type" in analysis.get("missing_info", []):
-            return await self._handle_door_clarification(query, analysis)
+            result = await self._handle_door_clarification(query, analysis)
+        else:
+            # Generate AI-powered clarification response
+            result = self._create_ai_clarification_response(query, analysis, followup_questions)
         
-        # Generate AI-powered clarification response
-        return self._create_ai_clarification_response(query, analysis, followup_questions)
+        # Conversational follow-up from the fused analysis, so the wrapper needs no extra call
+        if analysis.get("followup_message"):
+            result["ai_followup"] = analysis["followup_message"]
+            result["ai_reasoning"] = analysis.get("reasoning", "")
+        return result
     
     async def _handle_door_clarification(self, query: str, analysis: Dict) -> Dict[str, Any]:
         """Handle specific door clarification with structured options"""
@@ -458,30 +506,38 @@ class EnhancedRenovationAgent(BaseAgent):
             stored_session = None
             ai_context = ""
             
-            # AI-powered analysis with context (with fallback)
-            if self.ai_analyzer:
-                try:
-                    # First get initial context
-                    if self.session_memory:
-                        try:
-                            ai_context = self.session_memory.get_context_for_ai(session_id)
-                        except Exception as e:
-                            print(f"Session memory error getting context: {e}")
-                            ai_context = ""
+            with tracer.span("agent.analysis") as analysis_span:
+                # AI-powered analysis with context (with fallback)
+                if self.ai_analyzer:
+                    try:
+                        # First get initial context
+                        if self.session_memory:
+                            try:
+                                ai_context = self.session_memory.get_context_for_ai(session_id)
+                            except Exception as e:
+                                print(f"Session memory error getting context: {e}")
+                                ai_context = ""
                     
-                    analysis = await self.ai_analyzer.analyze_query(query, ai_context)
-                except Exception as e:
-                    print(f"AI analysis error: {e}")
-                    # Fallback to old regex analysis
+                        # One completion covers analysis, questions and follow-up message,
+                        # hedged against the local analysis so a slow upstream can't stall the chat
+                        analysis = await self.ai_analyzer.analyze_hedged(query, ai_context)
+                    except Exception as e:
+                        print(f"AI analysis error: {e}")
+                        # Fallback to old regex analysis
+                        analysis = self._analyze_renovation_query(query, ai_context)
+                else:
+                    # Use old regex analysis
                     analysis = self._analyze_renovation_query(query, ai_context)
-            else:
-                # Use old regex analysis
-                analysis = self._analyze_renovation_query(query, ai_context)
+            
+                analysis_span.set_attribute("analysis.type", analysis.get("type", "unknown"))
+                analysis_span.set_attribute("analysis.hedge_outcome", analysis.get("hedge_outcome", "none"))
+            set_trace_attribute("chat.analysis_type", analysis.get("type", "unknown"))
             
             # Now store context with analysis results
             if self.session_memory:
                 try:
-                    stored_session = self.session_memory.extract_and_store_context(session_id, query, analysis)
+                    with tracer.span("agent.session_memory"):
+                        stored_session = self.session_memory.extract_and_store_context(session_id, query, analysis)
                     # Refresh context after storing
                     ai_context = self.session_memory.get_context_for_ai(session_id)
                 except Exception as e:
@@ -489,7 +545,8 @@ class EnhancedRenovationAgent(BaseAgent):
             
             # HYBRID AI: Check for ambiguous queries first
             if analysis.get("is_ambiguous") or analysis.get("needs_clarification"):
-                return await self._handle_ai_clarification(query, analysis, session_id, ai_context)
+                with tracer.span("agent.handler", **{"analysis.type": "clarification"}):
+                    return await self._handle_ai_clarification(query, analysis, session_id, ai_context)
             
             # Pass session context to all handlers
             handler_context = {
@@ -498,48 +555,49 @@ class EnhancedRenovationAgent(BaseAgent):
                 "session_id": session_id
             }
             
-            if analysis["type"] == "full_project_estimate":
-                # Log analysis details for debugging
-                print(f"Full project estimate - Project type: {analysis.get('project_type')}, Area: {analysis.get('area')}")
+            with tracer.span("agent.handler", **{"analysis.type": analysis["type"]}):
+                if analysis["type"] == "full_project_estimate":
+                    # Log analysis details for debugging
+                    print(f"Full project estimate - Project type: {analysis.get('project_type')}, Area: {analysis.get('area')}")
                 
-                if analysis.get("project_type") == "kjøkken_detaljert":
-                    result = await self._provide_kitchen_breakdown(analysis, query, handler_context)
-                elif analysis.get("project_type") == "vinduer_dorer":
+                    if analysis.get("project_type") == "kjøkken_detaljert":
+                        result = await self._provide_kitchen_breakdown(analysis, query, handler_context)
+                    elif analysis.get("project_type") == "vinduer_dorer":
+                        result = await self._handle_windows_doors_work(analysis, query, handler_context)
+                    else:
+                        result = await self._calculate_full_project(analysis, query, handler_context)
+                elif analysis["type"] == "material_and_labor":
+                    result = await self._calculate_material_and_labor(analysis, query, handler_context)
+                elif analysis["type"] == "price_comparison":
+                    result = await self._compare_suppliers(analysis, query, handler_context)
+                elif analysis["type"] == "painting_specific":
+                    result = await self._handle_painting_inquiry(analysis, query, handler_context)
+                elif analysis["type"] == "electrical_work":
+                    result = await self._handle_electrical_work(analysis, query, handler_context)
+                elif analysis["type"] == "groundwork":
+                    result = await self._handle_groundwork(analysis, query, handler_context)
+                elif analysis["type"] == "flooring_work":
+                    result = await self._handle_flooring_work(analysis, query, handler_context)
+                elif analysis["type"] == "carpentry_work":
+                    result = await self._handle_carpentry_work(analysis, query, handler_context)
+                elif analysis["type"] == "roofing_cladding_work":
+                    result = await self._handle_roofing_cladding_work(analysis, query, handler_context)
+                elif analysis["type"] == "insulation_work":
+                    result = await self._handle_insulation_work(analysis, query, handler_context)
+                elif analysis["type"] == "windows_doors_work":
                     result = await self._handle_windows_doors_work(analysis, query, handler_context)
+                elif analysis["type"] == "detailed_breakdown":
+                    result = await self._provide_detailed_breakdown(analysis, query)
+                elif analysis["type"] == "quote_request":
+                    result = await self._handle_quote_request(analysis, query)
+                elif analysis["type"] == "project_registration":
+                    result = await self._handle_project_registration(analysis, query)
+                elif analysis["type"] == "about_househacker":
+                    result = await self._explain_househacker_services(analysis, query)
+                elif analysis["type"] == "needs_clarification" or analysis["needs_clarification"]:
+                    result = await self._ask_clarifying_questions(analysis, query)
                 else:
-                    result = await self._calculate_full_project(analysis, query, handler_context)
-            elif analysis["type"] == "material_and_labor":
-                result = await self._calculate_material_and_labor(analysis, query, handler_context)
-            elif analysis["type"] == "price_comparison":
-                result = await self._compare_suppliers(analysis, query, handler_context)
-            elif analysis["type"] == "painting_specific":
-                result = await self._handle_painting_inquiry(analysis, query, handler_context)
-            elif analysis["type"] == "electrical_work":
-                result = await self._handle_electrical_work(analysis, query, handler_context)
-            elif analysis["type"] == "groundwork":
-                result = await self._handle_groundwork(analysis, query, handler_context)
-            elif analysis["type"] == "flooring_work":
-                result = await self._handle_flooring_work(analysis, query, handler_context)
-            elif analysis["type"] == "carpentry_work":
-                result = await self._handle_carpentry_work(analysis, query, handler_context)
-            elif analysis["type"] == "roofing_cladding_work":
-                result = await self._handle_roofing_cladding_work(analysis, query, handler_context)
-            elif analysis["type"] == "insulation_work":
-                result = await self._handle_insulation_work(analysis, query, handler_context)
-            elif analysis["type"] == "windows_doors_work":
-                result = await self._handle_windows_doors_work(analysis, query, handler_context)
-            elif analysis["type"] == "detailed_breakdown":
-                result = await self._provide_detailed_breakdown(analysis, query)
-            elif analysis["type"] == "quote_request":
-                result = await self._handle_quote_request(analysis, query)
-            elif analysis["type"] == "project_registration":
-                result = await self._handle_project_registration(analysis, query)
-            elif analysis["type"] == "about_househacker":
-                result = await self._explain_househacker_services(analysis, query)
-            elif analysis["type"] == "needs_clarification" or analysis["needs_clarification"]:
-                result = await self._ask_clarifying_questions(analysis, query)
-            else:
-                result = await self._basic_calculation(analysis, query)
+                    result = await self._basic_calculation(analysis, query)
             
             # Lead-generering for alle kalkulasjoner over 10,000 NOK eller hvis brukeren spør om tilbud
             total_cost = result.get("total_cost", 0)
@@ -558,7 +616,7 @@ class EnhancedRenovationAgent(BaseAgent):
     async def _calculate_full_project(self, analysis: Dict, query: str, context: Dict[str, Any] = None) -> Dict[str, Any]:
         """Beregner komplett prosjekt med materialer, arbeid og tillegg"""
         project_type = analysis.get("project_type", "bad_komplett")
-        area = analysis.get("area", 10)
+        area = analysis.get("area") or 10
         
         # Smart detection: If we have area + quality but unclear project type,
         # and session context suggests bathroom, assume bathroom project
@@ -668,52 +726,24 @@ class EnhancedRenovationAgent(BaseAgent):
         }
 
     async def _calculate_bathroom_project(self, analysis: Dict, query: str) -> Dict[str, Any]:
-        """Beregner komplett badprosjekt med database-priser"""
-        area = analysis.get("area", 6)  # Default 6m² bathroom
-        query_lower = query.lower()
+        """Beregner komplett badprosjekt med database-priser (mellomlagret per areal, kvalitet og prisversjon)"""
+        area = area_bucket(analysis.get("area") or 6)  # Default 6m² bathroom
+        quality = (analysis.get("preferences") or {}).get("quality")
+        return await self._cached_estimate(
+            ("bathroom", area, quality, DEFAULT_REGION),
+            lambda: self._compute_bathroom_project(area, query.lower())
+        )
+
+    async def _compute_bathroom_project(self, area: float, query_lower: str) -> Dict[str, Any]:
+        """Pakkepris for nærmeste badstørrelse, skalert med faste og arealavhengige kostnader"""
+        estimate = calculate_bathroom(self._price_snapshot(BATHROOM_SERVICES), area)
+        if estimate.pricing_source != "database_package":
+            return self._render_bathroom_components(estimate)
         
-        try:
-            # Determine calculation approach based on area and query
-            if area <= 4:
-                # Use 4m² package
-                package_service = "bad_totalrenovering_4m2"
-                package_area = 4
-            elif area <= 8:
-                # Use 8m² package
-                package_service = "bad_totalrenovering_8m2"
-                package_area = 8
-            elif area <= 12:
-                # Use 12m² package
-                package_service = "bad_totalrenovering_12m2"
-                package_area = 12
-            else:
-                # Use component-based calculation for larger bathrooms
-                return await self._calculate_large_bathroom_components(area, query_lower)
-            
-            # Get package pricing from database
-            package_result = self.pricing_service.get_service_price(package_service)
-            
-            if "error" in package_result:
-                # Fallback to component-based calculation
-                return await self._calculate_bathroom_components(area, query_lower)
-            
-            # Extract package pricing
-            package_price = package_result.get("unit_price", {}).get("recommended_price", 0)
-            
-            # Bathroom renovation has significant fixed costs that don't scale linearly
-            # Use smart scaling that accounts for fixed costs
-            fixed_cost_percentage = 0.6  # 60% of bathroom cost is fixed (fixtures, plumbing, electrical)
-            variable_cost_percentage = 0.4  # 40% scales with area (tiles, materials)
-            
-            fixed_cost = package_price * fixed_cost_percentage
-            variable_cost = package_price * variable_cost_percentage
-            area_factor = area / package_area
-            scaled_variable_cost = variable_cost * area_factor
-            
-            scaled_price = fixed_cost + scaled_variable_cost
-            
-            # Generate response
-            response = f"""
+        scaled_price = estimate.total_cost
+        package_area = estimate.package_area
+        
+        response = f"""
 <div style="background: #f9fafb; padding: 24px; border-radius: 8px; margin: 16px 0; border-left: 3px solid #1f2937;">
     <h2 style="color: #111827; margin-bottom: 16px; font-size: 20px;">Komplett Badrenovering - {area:.0f} m²</h2>
     
@@ -771,50 +801,49 @@ class EnhancedRenovationAgent(BaseAgent):
         Detaljert kostnadsfordeling
     </button>
 </div>"""
-            
+        
+        return {
+            "response": response,
+            "agent_used": self.agent_name,
+            "total_cost": scaled_price,
+            "area": area,
+            "price_per_m2": estimate.price_per_m2,
+            "package_used": estimate.package_used,
+            "pricing_source": "database_package"
+        }
+
+    async def _calculate_bathroom_components(self, area: float, query_lower: str) -> Dict[str, Any]:
+        """Component-based bathroom calculation (ignores package prices)"""
+        prices = self._price_snapshot(BATHROOM_SERVICES).subset(service for service, _ in BATHROOM_COMPONENTS)
+        return self._render_bathroom_components(calculate_bathroom(prices, area))
+
+    def _render_bathroom_components(self, estimate: BathroomEstimate) -> Dict[str, Any]:
+        """Komponentbasert badestimat (eller gjennomsnittspris når ingen komponenter er priset), som HTML"""
+        area = estimate.area
+        total_cost = estimate.total_cost
+        
+        if estimate.pricing_source == "fallback":
             return {
-                "response": response,
+                "response": f"""
+<div style="background: #f9fafb; padding: 24px; border-radius: 8px; margin: 16px 0;">
+    <h2 style="color: #111827;">Badrenovering - {area:.0f} m²</h2>
+    <div style="background: #1f2937; color: white; padding: 20px; border-radius: 6px; text-align: center; margin: 16px 0;">
+        <div style="font-size: 32px; font-weight: 600;">{total_cost:,.0f} NOK</div>
+    </div>
+    <p>Estimat basert på gjennomsnittspriser for badrenovering.</p>
+</div>""",
                 "agent_used": self.agent_name,
-                "total_cost": scaled_price,
+                "total_cost": total_cost,
                 "area": area,
-                "price_per_m2": scaled_price / area,
-                "package_used": package_service,
-                "pricing_source": "database_package"
+                "pricing_source": "fallback"
             }
-            
-        except Exception as e:
-            # Fallback to component-based calculation
-            return await self._calculate_bathroom_components(area, query_lower)
-
-    async def _calculate_bathroom_components(self, area: float, query_lower: str) -> Dict[str, Any]:
-        """Component-based bathroom calculation as fallback"""
-        try:
-            components = [
-                ("bad_riving_avfall", area),
-                ("bad_membran", area),
-                ("bad_flislegging_arbeid", area),
-                ("bad_fliser_material", area),
-                ("bad_elektriker", area),
-                ("bad_rorlegger", area),
-                ("bad_maler_vatrom", area)
-            ]
-            
-            total_cost = 0
-            component_breakdown = []
-            
-            for service_name, component_area in components:
-                result = self.pricing_service.get_service_price(service_name, area=component_area)
-                if "error" not in result:
-                    cost = result.get("total_cost", {}).get("recommended", 0)
-                    total_cost += cost
-                    
-                    component_breakdown.append({
-                        "service": service_name,
-                        "cost": cost,
-                        "description": result.get("service_description", service_name)
-                    })
-            
-            response = f"""
+        
+        component_breakdown = [
+            {"service": item.service, "cost": item.total, "description": item.description}
+            for item in estimate.line_items
+        ]
+        
+        response = f"""
 <div style="background: #f9fafb; padding: 24px; border-radius: 8px; margin: 16px 0; border-left: 3px solid #1f2937;">
     <h2 style="color: #111827; margin-bottom: 16px; font-size: 20px;">Badrenovering (komponentbasert) - {area:.0f} m²</h2>
     
@@ -827,53 +856,31 @@ class EnhancedRenovationAgent(BaseAgent):
     
     <h3 style="color: #374151; margin-bottom: 12px;">Kostnadsfordeling:</h3>
     <div style="background: #ffffff; padding: 16px; border-radius: 6px; border: 1px solid #e5e7eb;">"""
-            
-            for component in component_breakdown:
-                service_display = component["service"].replace("bad_", "").replace("_", " ").title()
-                response += f"""
+        
+        for component in component_breakdown:
+            service_display = component["service"].replace("bad_", "").replace("_", " ").title()
+            response += f"""
         <div style="display: flex; justify-content: space-between; margin-bottom: 8px; padding: 4px 0; border-bottom: 1px solid #f3f4f6;">
             <span>{service_display}</span>
             <strong>{component['cost']:,.0f} NOK</strong>
         </div>"""
-            
-            response += f"""
+        
+        response += f"""
     </div>
     
     <p style="font-size: 14px; color: #6b7280; margin-top: 16px; line-height: 1.5;">
         Komponentbasert beregning for {area:.0f}m² bad basert på aktuelle markedspriser i Oslo/Viken.
     </p>
 </div>"""
-            
-            return {
-                "response": response,
-                "agent_used": self.agent_name,
-                "total_cost": total_cost,
-                "area": area,
-                "components": component_breakdown,
-                "pricing_source": "database_components"
-            }
-            
-        except Exception as e:
-            # Ultimate fallback
-            fallback_cost = area * 45000  # 45k per m² fallback
-            return {
-                "response": f"""
-<div style="background: #f9fafb; padding: 24px; border-radius: 8px; margin: 16px 0;">
-    <h2 style="color: #111827;">Badrenovering - {area:.0f} m²</h2>
-    <div style="background: #1f2937; color: white; padding: 20px; border-radius: 6px; text-align: center; margin: 16px 0;">
-        <div style="font-size: 32px; font-weight: 600;">{fallback_cost:,.0f} NOK</div>
-    </div>
-    <p>Estimat basert på gjennomsnittspriser for badrenovering.</p>
-</div>""",
-                "agent_used": self.agent_name,
-                "total_cost": fallback_cost,
-                "area": area,
-                "pricing_source": "fallback"
-            }
-
-    async def _calculate_large_bathroom_components(self, area: float, query_lower: str) -> Dict[str, Any]:
-        """Handle large bathrooms (>12m²) with component scaling"""
-        return await self._calculate_bathroom_components(area, query_lower)
+        
+        return {
+            "response": response,
+            "agent_used": self.agent_name,
+            "total_cost": total_cost,
+            "area": area,
+            "components": component_breakdown,
+            "pricing_source": "database_components"
+        }
 
     async def _handle_electrical_work(self, analysis: Dict, query: str, context: Dict[str, Any] = None) -> Dict[str, Any]:
         """Handle electrical work specific queries"""
@@ -910,17 +917,13 @@ class EnhancedRenovationAgent(BaseAgent):
 
     async def _calculate_electrician_hourly_rate(self, query_lower: str) -> Dict[str, Any]:
         """Calculate electrician hourly rates"""
-        try:
-            result = self.pricing_service.get_service_price("elektriker_timepris_montor")
-            
-            if "error" in result:
-                raise Exception("Could not get hourly rate")
-            
-            hourly_rate = result.get("unit_price", {}).get("recommended_price", 900)
-            min_rate = result.get("unit_price", {}).get("min_price", 700)
-            max_rate = result.get("unit_price", {}).get("max_price", 1100)
-            
-            response = f"""
+        rate = electrician_hourly_rate(self._price_snapshot(ELECTRICAL_SERVICES))
+        if rate.pricing_source == "fallback":
+            return await self._electrical_fallback("timepris elektriker", rate.hourly_rate)
+        
+        hourly_rate, min_rate, max_rate = rate.hourly_rate, rate.min_rate, rate.max_rate
+        
+        response = f"""
 <div style="background: #f9fafb; padding: 24px; border-radius: 8px; margin: 16px 0; border-left: 3px solid #1f2937;">
     <h2 style="color: #111827; margin-bottom: 16px; font-size: 20px;">Timepris Elektriker - Oslo</h2>
     
@@ -946,48 +949,31 @@ class EnhancedRenovationAgent(BaseAgent):
         Oppstart/servicebil ofte inkludert i første time.
     </p>
 </div>"""
-            
-            return {
-                "response": response,
-                "agent_used": self.agent_name,
-                "total_cost": hourly_rate,
-                "hourly_rate": hourly_rate,
-                "pricing_source": "database"
-            }
-            
-        except Exception as e:
-            return await self._electrical_fallback("timepris elektriker", 900)
+        
+        return {
+            "response": response,
+            "agent_used": self.agent_name,
+            "total_cost": hourly_rate,
+            "hourly_rate": hourly_rate,
+            "pricing_source": "database"
+        }
 
     async def _calculate_electrical_outlets(self, query_lower: str, area: float) -> Dict[str, Any]:
         """Calculate cost for electrical outlets"""
-        try:
-            # Extract number of outlets from query
-            import re
-            number_match = re.search(r'(\d+)', query_lower)
-            num_outlets = int(number_match.group(1)) if number_match else 5
-            
-            # Use package pricing if 5 or more outlets
-            if num_outlets >= 5:
-                result = self.pricing_service.get_service_price("stikkontakt_pakke_5_stk")
-                if "error" not in result:
-                    package_cost = result.get("unit_price", {}).get("recommended_price", 4400)
-                    # Scale for different quantities
-                    total_cost = package_cost * (num_outlets / 5)
-                else:
-                    raise Exception("Package pricing not available")
-            else:
-                # Individual outlet pricing
-                result = self.pricing_service.get_service_price("ekstra_stikkontakt_dobbel")
-                if "error" not in result:
-                    outlet_cost = result.get("unit_price", {}).get("recommended_price", 950)
-                    total_cost = outlet_cost * num_outlets
-                else:
-                    raise Exception("Individual pricing not available")
-            
-            cost_inc_vat = total_cost * 1.25
-            cost_per_outlet = total_cost / num_outlets
-            
-            response = f"""
+        # Extract number of outlets from query
+        number_match = re.search(r'(\d+)', query_lower)
+        num_outlets = int(number_match.group(1)) if number_match else 5
+        
+        # Package pricing (scaled) from 5 outlets, otherwise per outlet
+        estimate = calculate_outlets(self._price_snapshot(ELECTRICAL_SERVICES), num_outlets)
+        if estimate.pricing_source == "fallback":
+            return await self._electrical_fallback(f"{num_outlets} stikkontakter", estimate.total_cost)
+        
+        total_cost = estimate.total_cost
+        cost_inc_vat = total_cost * 1.25
+        cost_per_outlet = estimate.cost_per_unit
+        
+        response = f"""
 <div style="background: #f9fafb; padding: 24px; border-radius: 8px; margin: 16px 0; border-left: 3px solid #1f2937;">
     <h2 style="color: #111827; margin-bottom: 16px; font-size: 20px;">Stikkontakter - {num_outlets} stk</h2>
     
@@ -1011,18 +997,15 @@ class EnhancedRenovationAgent(BaseAgent):
         Basert på markedspriser Oslo/Viken 2025. {'Pakkeløsning gir lavere pris per kontakt' if num_outlets >= 5 else 'Vurder pakkeløsning ved flere kontakter'}.
     </p>
 </div>"""
-            
-            return {
-                "response": response,
-                "agent_used": self.agent_name,
-                "total_cost": total_cost,
-                "num_outlets": num_outlets,
-                "cost_per_outlet": cost_per_outlet,
-                "pricing_source": "database"
-            }
-            
-        except Exception as e:
-            return await self._electrical_fallback(f"{num_outlets} stikkontakter", num_outlets * 950)
+        
+        return {
+            "response": response,
+            "agent_used": self.agent_name,
+            "total_cost": total_cost,
+            "num_outlets": num_outlets,
+            "cost_per_outlet": cost_per_outlet,
+            "pricing_source": "database"
+        }
 
     async def _electrical_fallback(self, service_name: str, fallback_cost: float) -> Dict[str, Any]:
         """Fallback for electrical calculations"""
@@ -1043,38 +1026,29 @@ class EnhancedRenovationAgent(BaseAgent):
 
     async def _calculate_downlights(self, query_lower: str, area: float) -> Dict[str, Any]:
         """Calculate downlight installation costs"""
-        # Implementation for downlights
-        return await self._electrical_fallback("downlights", 15000)
+        return await self._electrical_fallback("downlights", calculate_electrical_work("downlights").total_cost)
 
     async def _calculate_electrical_panel(self, query_lower: str) -> Dict[str, Any]:
         """Calculate electrical panel costs"""
-        # Implementation for electrical panels
-        return await self._electrical_fallback("sikringsskap", 18000)
+        return await self._electrical_fallback("sikringsskap", calculate_electrical_work("sikringsskap").total_cost)
 
     async def _calculate_floor_heating(self, query_lower: str, area: float) -> Dict[str, Any]:
         """Calculate floor heating costs"""
-        # Implementation for floor heating
-        if area:
-            cost = area * 1075  # Average price from database
-            return await self._electrical_fallback(f"gulvvarme {area}m²", cost)
-        return await self._electrical_fallback("gulvvarme", 10000)
+        estimate = calculate_electrical_work("gulvvarme", area)
+        return await self._electrical_fallback(f"gulvvarme {area}m²" if area else "gulvvarme", estimate.total_cost)
 
     async def _calculate_ev_charger(self, query_lower: str) -> Dict[str, Any]:
         """Calculate EV charger installation costs"""
-        # Implementation for EV charger
-        return await self._electrical_fallback("elbillader", 15000)
+        return await self._electrical_fallback("elbillader", calculate_electrical_work("elbillader").total_cost)
 
     async def _calculate_complete_electrical_system(self, query_lower: str, area: float) -> Dict[str, Any]:
         """Calculate complete electrical system costs"""
-        # Implementation for complete electrical systems
-        if area:
-            cost = area * 1250  # Average price from database
-            return await self._electrical_fallback(f"komplett el-anlegg {area}m²", cost)
-        return await self._electrical_fallback("komplett el-anlegg", 130000)
+        estimate = calculate_electrical_work("komplett el-anlegg", area)
+        return await self._electrical_fallback(f"komplett el-anlegg {area}m²" if area else "komplett el-anlegg", estimate.total_cost)
 
     async def _calculate_general_electrical_work(self, query_lower: str, area: float) -> Dict[str, Any]:
         """General electrical work calculation"""
-        return await self._electrical_fallback("elektrikerarbeid", 8000)
+        return await self._electrical_fallback("elektrikerarbeid", calculate_electrical_work("elektrikerarbeid").total_cost)
 
     async def _handle_groundwork(self, analysis: Dict, query: str, context: Dict[str, Any] = None) -> Dict[str, Any]:
         """Handle groundwork specific queries"""
@@ -1622,13 +1596,17 @@ class EnhancedRenovationAgent(BaseAgent):
     </div>
 </div>"""
         
-        # Beregn estimert totalkostnad (midtsjikt)
-        estimated_total = 30000 + 30000 + 125000 + 10000 + 20000 + 5000  # Ca. 220k for standard renovering
+        # Beregn estimert totalkostnad (midtsjikt med mindre annet er oppgitt)
+        estimate = calculate_kitchen(
+            self._price_snapshot(KITCHEN_SERVICES),
+            (analysis.get("preferences") or {}).get("quality")
+        )
         
         return {
             "response": response,
             "agent_used": self.agent_name,
-            "total_cost": estimated_total,
+            "total_cost": estimate.total_cost,
+            "line_items": [item.to_dict() for item in estimate.line_items],
             "project_type": "kjøkken_detaljert"
         }
 
@@ -1715,209 +1693,10 @@ class EnhancedRenovationAgent(BaseAgent):
             }
     
     def _calculate_advanced_painting(self, area: float, details: Dict, query: str = "") -> Dict[str, Any]:
-        """Avansert malingberegning med database-priser"""
-        
-        # Store query for service selection
-        self._current_query = query
-        
-        # Convert floor area to paintable area (walls + ceiling)
-        # For whole house projects: floor area × 2.8 = total paintable area
-        # For single rooms: use area as-is (already wall area)
-        paintable_area = area
-        if area > 80:  # Assume whole house if > 80m²
-            paintable_area = area * 2.8
-            
-        # Determine which service to use based on query context
-        # For new houses: skjøtesparkling + maling
-        # For renovations: standard innvendig maling or helsparkling
-        service_name = "innvendig_maling_standard"  # Default
-        
-        # Check if it's a new house or mentions sparkling (check both details and query)
-        # Pass the original query to this method
-        original_query = getattr(self, '_current_query', '').lower()
-        query_context = f"{str(details).lower()} {original_query}"
-        
-        if any(word in query_context for word in ["nytt", "ny", "sparkle", "sparkling", "nybygg"]):
-            service_name = "skjotesparkling_inkl_maling"  # Most common for new houses
-        elif any(word in query_context for word in ["helspark", "hele", "total"]):
-            service_name = "helsparkling_inkl_maling"
-        
-        # Get pricing from database
-        pricing_result = self.pricing_service.get_service_price(service_name, area=paintable_area)
-        
-        if "error" in pricing_result:
-            # Fallback calculation
-            return self._legacy_painting_calculation(area, details)
-        
-        # Extract pricing information
-        unit_price = pricing_result.get("unit_price", {}).get("recommended_price", 120)
-        total_cost = pricing_result.get("total_cost", {}).get("recommended", area * unit_price)
-        
-        # Estimate material vs labor split (typically 25% material, 75% labor)
-        material_portion = 0.25
-        labor_portion = 0.75
-        
-        # Calculate components
-        paint_cost = total_cost * material_portion
-        labor_cost = total_cost * labor_portion
-        
-        # Estimate liters needed (8 m² per liter, 2 coats)
-        coverage_per_liter = 8
-        layers = 2
-        liters_needed = (paintable_area * layers) / coverage_per_liter
-        
-        # Estimate work hours
-        hourly_rate = self.LEGACY_HOURLY_RATES.get("maler", 850)
-        work_hours = labor_cost / hourly_rate if hourly_rate > 0 else paintable_area * 0.6
-        
-        # Apply modifiers based on details
-        if details.get("rough_surface"):
-            liters_needed *= 1.25
-            work_hours *= 1.2
-        if details.get("ceiling_painting"):
-            work_hours *= 1.5
-        if details.get("many_windows"):
-            work_hours *= 1.3
-        if details.get("old_wallpaper"):
-            work_hours += area * 0.3
-        
-        # Recalculate costs if modifiers applied (only if there are actual modifications)
-        modifiers_applied = any([
-            details.get("rough_surface"),
-            details.get("ceiling_painting"),
-            details.get("many_windows"),
-            details.get("old_wallpaper")
-        ])
-        
-        if modifiers_applied:
-            modifier = work_hours / (area * 0.6) if area > 0 else 1.2
-            total_cost *= modifier
-            paint_cost = total_cost * material_portion
-            labor_cost = total_cost * labor_portion
-        
-        # Add rigg og drift costs (setup, masking, cleanup, travel, parking, waste disposal)
-        rigg_og_drift = self._calculate_rigg_og_drift_costs(area, details, paintable_area)
-        
-        # Update total cost
-        total_cost_with_rigg = total_cost + rigg_og_drift["total_rigg_cost"]
-        
-        return {
-            "liters_needed": liters_needed,
-            "paint_cost": paint_cost,
-            "work_hours": work_hours,
-            "labor_cost": labor_cost,
-            "rigg_og_drift": rigg_og_drift,
-            "total_cost": total_cost_with_rigg,
-            "base_cost": total_cost,
-            "layers": layers,
-            "unit_price": unit_price,
-            "pricing_source": "database",
-            "floor_area": area,
-            "paintable_area": paintable_area
-        }
-    
-    def _calculate_rigg_og_drift_costs(self, floor_area: float, details: Dict, paintable_area: float = None) -> Dict[str, Any]:
-        """Beregner rigg og drift kostnader (oppsett, masking, rydding, transport, etc.)"""
-        
-        # Use paintable area if provided, otherwise floor area
-        calculation_area = paintable_area if paintable_area else floor_area
-        
-        # Base rigg og drift costs - higher for whole house projects
-        if floor_area > 80:  # Whole house
-            base_rigg_cost = 8000  # Higher base for whole house
-        else:
-            base_rigg_cost = 2500  # Room/smaller projects
-        
-        # Area-based scaling
-        area_factor = max(1.0, calculation_area / 100)  # Scale based on paintable area
-        
-        components = {
-            "transport_parkering": 800 * area_factor,         # Kjøring, parkering Oslo
-            "masking_tildekking": 12 * calculation_area,      # Maskeringstape, plastduk per m² malerflate
-            "oppsett_nedrigging": 1200 * area_factor,         # Stige, utstyr, opprydding
-            "avfallshåndtering": 600 * area_factor            # Kasting av avfall, tomme malingsb⁄kker
-        }
-        
-        # Additional costs based on job complexity
-        if details.get("many_windows"):
-            components["ekstra_masking"] = 500  # Mer masking rundt vinduer
-        
-        if details.get("ceiling_painting"):
-            components["takarbeid_rigg"] = 800  # Ekstra rigg for takarbeid
-        
-        if details.get("old_wallpaper"):
-            components["tapetfjerning_avfall"] = 400  # Mer avfall fra tapet
-        
-        # Get database pricing for rigg og drift if available
-        try:
-            rigg_pricing = self.pricing_service.get_service_price("rigg_og_drift")
-            if "error" not in rigg_pricing:
-                # Use database pricing as baseline
-                db_daily_rate = rigg_pricing.get("unit_price", {}).get("market_avg", 3500)
-                # Estimate days needed (most paint jobs are 1-2 days)
-                estimated_days = max(1, area / 40)  # 40m² per dag
-                base_rigg_cost = db_daily_rate * estimated_days
-        except Exception:
-            pass  # Fall back to fixed costs
-        
-        total_rigg_cost = max(base_rigg_cost, sum(components.values()))
-        
-        return {
-            "components": components,
-            "base_rigg_cost": base_rigg_cost,
-            "total_rigg_cost": total_rigg_cost,
-            "breakdown": {
-                "transport_parkering": components["transport_parkering"],
-                "masking_tildekking": components["masking_tildekking"], 
-                "oppsett_nedrigging": components["oppsett_nedrigging"],
-                "avfallshåndtering": components["avfallshåndtering"]
-            }
-        }
+        """Avansert malingberegning med database-priser (se calculators.painting)"""
+        prices = self._price_snapshot(PAINTING_SERVICES + (RIGG_SERVICE,))
+        return calculate_painting(prices, area, details, query, self.LEGACY_HOURLY_RATES.get("maler", 850)).to_dict()
     
-    def _legacy_painting_calculation(self, area: float, details: Dict) -> Dict[str, Any]:
-        """Fallback painting calculation when database is unavailable"""
-        # Basic calculations with fallback rates
-        coverage_per_liter = 8
-        layers = 2
-        paint_price_per_liter = 550
-        hourly_rate = 850
-        hours_per_m2 = 0.6
-        
-        liters_needed = (area * layers) / coverage_per_liter
-        work_hours = area * hours_per_m2
-        
-        # Apply detail modifiers
-        if details.get("rough_surface"):
-            liters_needed *= 1.25
-            work_hours *= 1.2
-        if details.get("ceiling_painting"):
-            work_hours *= 1.5
-        if details.get("many_windows"):
-            work_hours *= 1.3
-        if details.get("old_wallpaper"):
-            work_hours += area * 0.3
-        
-        paint_cost = liters_needed * paint_price_per_liter
-        labor_cost = work_hours * hourly_rate
-        base_cost = paint_cost + labor_cost
-        
-        # Add rigg og drift costs for fallback calculation too
-        paintable_area = area * 2.8 if area > 80 else area  # Same conversion as main method
-        rigg_og_drift = self._calculate_rigg_og_drift_costs(area, details, paintable_area)
-        total_cost = base_cost + rigg_og_drift["total_rigg_cost"]
-        
-        return {
-            "liters_needed": liters_needed,
-            "paint_cost": paint_cost,
-            "work_hours": work_hours,
-            "labor_cost": labor_cost,
-            "rigg_og_drift": rigg_og_drift,
-            "total_cost": total_cost,
-            "base_cost": base_cost,
-            "layers": layers,
-            "pricing_source": "fallback"
-        }
-
     def _generate_lead_capture(self, calculation_result: Dict) -> Dict[str, Any]:
         """Genererer lead-capture for store prosjekter"""
         total_cost = calculation_result.get("total_cost", 0)
@@ -2271,7 +2050,7 @@ class EnhancedRenovationAgent(BaseAgent):
     async def _calculate_material_and_labor(self, analysis: Dict, query: str, context: Dict[str, Any] = None) -> Dict[str, Any]:
         """Beregner material og arbeidskostnader"""
         materials = analysis.get("materials", ["maling"])
-        area = analysis.get("area", 10)
+        area = analysis.get("area") or 10
         
         total_cost = 0
         breakdown = {}
@@ -2744,8 +2523,18 @@ class EnhancedRenovationAgent(BaseAgent):
         # Final fallback
         if not area:
             area = 20
+        area = area_bucket(area)
         
         details = analysis.get("specific_details", {})
+        quality = (analysis.get("preferences") or {}).get("quality")
+        
+        return await self._cached_estimate(
+            ("painting", area, select_painting_service(details, query), freeze(details), quality, DEFAULT_REGION),
+            lambda: self._render_painting_estimate(area, details, query)
+        )
+
+    async def _render_painting_estimate(self, area: float, details: Dict, query: str) -> Dict[str, Any]:
+        """Malingsestimat med rigg og drift, som HTML"""
         
         # Beregn malingbehov basert på detaljer
         paint_calc = self._calculate_advanced_painting(area, details, query)
@@ -2827,49 +2616,10 @@ class EnhancedRenovationAgent(BaseAgent):
             "calculation_details": paint_calc
         }
 
-    # Old method removed - replaced with database-based version earlier in file
-    
-    def _legacy_painting_calculation(self, area: float, details: Dict) -> Dict[str, Any]:
-        """Fallback painting calculation when database is unavailable"""
-        # Basic calculations with fallback rates
-        coverage_per_liter = 8
-        layers = 2
-        paint_price_per_liter = 550
-        hourly_rate = 850
-        hours_per_m2 = 0.6
-        
-        liters_needed = (area * layers) / coverage_per_liter
-        work_hours = area * hours_per_m2
-        
-        # Apply detail modifiers
-        if details.get("rough_surface"):
-            liters_needed *= 1.25
-            work_hours *= 1.2
-        if details.get("ceiling_painting"):
-            work_hours *= 1.5
-        if details.get("many_windows"):
-            work_hours *= 1.3
-        if details.get("old_wallpaper"):
-            work_hours += area * 0.3
-        
-        paint_cost = liters_needed * paint_price_per_liter
-        labor_cost = work_hours * hourly_rate
-        total_cost = paint_cost + labor_cost
-        
-        return {
-            "liters_needed": liters_needed,
-            "paint_cost": paint_cost,
-            "work_hours": work_hours,
-            "labor_cost": labor_cost,
-            "total_cost": total_cost,
-            "layers": layers,
-            "pricing_source": "fallback"
-        }
-
     async def _basic_calculation(self, analysis: Dict, query: str) -> Dict[str, Any]:
         """Grunnleggende materialberegning"""
         materials = analysis.get("materials", ["maling"])
-        area = analysis.get("area", 10)
+        area = analysis.get("area") or 10
         
         if "maling" in materials:
             return await self._calculate_paint_basic(area)
@@ -2998,7 +2748,7 @@ class EnhancedRenovationAgent(BaseAgent):
         """Handle carpentry and building work queries"""
         try:
             query_lower = query.lower()
-            area = analysis.get("area", 10)  # Default area
+            area = analysis.get("area") or 10  # Default area
             
             # Route to specific carpentry calculations
             if any(word in query_lower for word in ['lettvegg', 'skillevegg']):
@@ -3021,7 +2771,7 @@ class EnhancedRenovationAgent(BaseAgent):
         """Handle roofing and exterior cladding work queries"""
         try:
             query_lower = query.lower()
-            area = analysis.get("area", 100)  # Default roof area
+            area = analysis.get("area") or 100  # Default roof area
             
             # Route to specific roofing/cladding calculations
             if any(word in query_lower for word in ['takomlegging', 'nytt tak']):
@@ -3042,7 +2792,7 @@ class EnhancedRenovationAgent(BaseAgent):
         """Handle insulation and sealing work queries"""
         try:
             query_lower = query.lower()
-            area = analysis.get("area", 80)  # Default insulation area
+            area = analysis.get("area") or 80  # Default insulation area
             
             # Route to specific insulation calculations
             if any(word in query_lower for word in ['blåseisolasjon', 'loft']):
@@ -3225,112 +2975,89 @@ class EnhancedRenovationAgent(BaseAgent):
         
     async def _calculate_window_replacement(self, query_lower: str, num_items: int):
         """Calculate window replacement costs using database pricing"""
-        try:
-            # Use database pricing for windows
-            result = self.pricing_service.get_service_price("vindu_standard_komplett", area=num_items)
-            
-            if "error" not in result:
-                total_cost = result.get("total_cost", {}).get("recommended", 0)
-                unit_price = result.get("unit_price", {}).get("recommended_price", 0)
-            else:
-                # Fallback to reasonable estimates
-                unit_price = 9500
-                total_cost = unit_price * num_items
-            
-            # Use standardized response template
-            title = f"Vindusutskifting - {num_items} {'vindu' if num_items == 1 else 'vinduer'}"
-            cost_details = f'<p style="margin-top: 8px; opacity: 0.9; font-size: 14px;">Per vindu: {unit_price:,.0f} NOK</p>'
-            
-            included_items = [
-                "Nye vinduer (standard kvalitet)",
-                "Demontering av gamle vinduer", 
-                "Montering og tilpasning",
-                "Tetting og isolering",
-                "Opprydding og bortkjøring"
-            ]
-            
-            notes = "Basert på markedspriser Oslo/Viken 2025. Energieffektive vinduer kan redusere oppvarmingskostnadene med 20-30%."
-            
-            response = self._create_standard_response(
-                title=title,
-                total_cost=total_cost,
-                cost_details=cost_details,
-                included_items=included_items,
-                notes=notes
-            )
-            
-            return {
-                "response": response,
-                "agent_used": self.agent_name,
-                "total_cost": total_cost,
-                "num_windows": num_items,
-                "cost_per_window": unit_price,
-                "pricing_source": "database"
-            }
-            
-        except Exception as e:
-            return await self._windows_doors_fallback(f"vinduer {num_items} stk", num_items * 9500)
+        estimate = calculate_windows(self._price_snapshot((WINDOW_SERVICE,)), num_items)
+        total_cost = estimate.total_cost
+        unit_price = estimate.unit_price
+        
+        # Use standardized response template
+        title = f"Vindusutskifting - {num_items} {'vindu' if num_items == 1 else 'vinduer'}"
+        cost_details = f'<p style="margin-top: 8px; opacity: 0.9; font-size: 14px;">Per vindu: {unit_price:,.0f} NOK</p>'
+        
+        included_items = [
+            "Nye vinduer (standard kvalitet)",
+            "Demontering av gamle vinduer", 
+            "Montering og tilpasning",
+            "Tetting og isolering",
+            "Opprydding og bortkjøring"
+        ]
+        
+        notes = "Basert på markedspriser Oslo/Viken 2025. Energieffektive vinduer kan redusere oppvarmingskostnadene med 20-30%."
+        
+        response = self._create_standard_response(
+            title=title,
+            total_cost=total_cost,
+            cost_details=cost_details,
+            included_items=included_items,
+            notes=notes
+        )
+        
+        return {
+            "response": response,
+            "agent_used": self.agent_name,
+            "total_cost": total_cost,
+            "num_windows": num_items,
+            "cost_per_window": unit_price,
+            "pricing_source": estimate.pricing_source
+        }
         
     async def _calculate_exterior_door(self, query_lower: str):
         return await self._windows_doors_fallback("ytterdør", 11000)
         
     async def _calculate_interior_doors(self, query_lower: str, num_items: int):
-        """Calculate interior door costs using database pricing"""
-        try:
-            # Check if it's "komplett med karm" or just "dørblad"
-            if 'komplett' in query_lower and 'karm' in query_lower:
-                # Full door replacement including frame
-                unit_price = 5500  # Average for full door replacement
-                service_name = "innerdør_standard_komplett"
-            else:
-                # Just door leaf replacement
-                unit_price = 3000  # Average for door leaf only
-                service_name = "innerdor_standard_komplett"
-            
-            # Use fallback pricing (database service not available for doors yet)
-            total_cost = unit_price * num_items
-            
-            # Create standardized response
-            title = f"Innerdører - {num_items} {'dør' if num_items == 1 else 'dører'}"
-            cost_details = f'<p style="margin-top: 8px; opacity: 0.9; font-size: 14px;">Per dør: {unit_price:,.0f} NOK</p>'
-            
-            if 'komplett' in query_lower and 'karm' in query_lower:
-                included_items = [
-                    "Nye innerdører (standard kvalitet)",
-                    "Karmer og omramming", 
-                    "Demontering av gamle dører",
-                    "Montering og justering",
-                    "Håndtak og beslag"
-                ]
-                notes = "Komplett utskifting inkludert karm og all montering. Basert på markedspriser Oslo/Viken 2025."
-            else:
-                included_items = [
-                    "Nye dørblad (standard kvalitet)",
-                    "Demontering av gamle dørblad",
-                    "Montering på eksisterende karm", 
-                    "Justering og tilpasning"
-                ]
-                notes = "Kun utskifting av dørblad, eksisterende karm beholdes. Basert på markedspriser Oslo/Viken 2025."
-            
-            response = self._create_standard_response(
-                title=title,
-                total_cost=total_cost,
-                cost_details=cost_details,
-                included_items=included_items,
-                notes=notes
-            )
-            
-            return {
-                "response": response,
-                "agent_used": self.agent_name,
-                "total_cost": total_cost,
-                "num_doors": num_items,
-                "cost_per_door": unit_price,
-                "pricing_source": "fallback"
-            }
-            
-        except Exception as e:
-            return await self._windows_doors_fallback(f"innerdører {num_items} stk", num_items * 3000)
+        """Calculate interior door costs (fixed average prices - doors are not in the price database yet)"""
+        with_frame = 'komplett' in query_lower and 'karm' in query_lower
+        estimate = calculate_interior_doors(num_items, with_frame)
+        total_cost = estimate.total_cost
+        unit_price = estimate.unit_price
+        
+        # Create standardized response
+        title = f"Innerdører - {num_items} {'dør' if num_items == 1 else 'dører'}"
+        cost_details = f'<p style="margin-top: 8px; opacity: 0.9; font-size: 14px;">Per dør: {unit_price:,.0f} NOK</p>'
+        
+        if with_frame:
+            included_items = [
+                "Nye innerdører (standard kvalitet)",
+                "Karmer og omramming", 
+                "Demontering av gamle dører",
+                "Montering og justering",
+                "Håndtak og beslag"
+            ]
+            notes = "Komplett utskifting inkludert karm og all montering. Basert på markedspriser Oslo/Viken 2025."
+        else:
+            included_items = [
+                "Nye dørblad (standard kvalitet)",
+                "Demontering av gamle dørblad",
+                "Montering på eksisterende karm", 
+                "Justering og tilpasning"
+            ]
+            notes = "Kun utskifting av dørblad, eksisterende karm beholdes. Basert på markedspriser Oslo/Viken 2025."
+        
+        response = self._create_standard_response(
+            title=title,
+            total_cost=total_cost,
+            cost_details=cost_details,
+            included_items=included_items,
+            notes=notes
+        )
+        
+        return {
+            "response": response,
+            "agent_used": self.agent_name,
+            "total_cost": total_cost,
+            "num_doors": num_items,
+            "cost_per_door": unit_price,
+            "pricing_source": "fallback"
+        }
         
     async def _calculate_roof_windows(self, query_lower: str):
         return await self._windows_doors_fallback("takvindu", 35000)
@@ -0,0 +1,21 @@
+# Calculators package - pure pricing functions (no DB, no HTML, no shared state).
+# Each takes a PriceSnapshot plus inputs and returns a frozen result.
+from .snapshot import UnitPrice, PriceSnapshot, LineItem, line_item
+from .bathroom import BathroomEstimate, calculate_bathroom, BATHROOM_SERVICES
+from .rigg import RiggOgDrift, calculate_rigg_og_drift, RIGG_SERVICE
+from .painting import PaintingEstimate, calculate_painting, select_painting_service, paintable_area, PAINTING_SERVICES
+from .kitchen import KitchenEstimate, calculate_kitchen, KITCHEN_SERVICES
+from .windows_doors import UnitEstimate, calculate_windows, calculate_interior_doors, WINDOW_SERVICE
+from .electrical import (
+    HourlyRate, ElectricalEstimate, electrician_hourly_rate, calculate_outlets,
+    calculate_electrical_work, ELECTRICAL_SERVICES
+)
+from .estimate import (
+    Estimate, EstimateError, PROJECT_TYPES, calculate_estimate, project_type_for, services_for
+)
+
+# Every service the calculators read - one snapshot of these prices covers any estimate
+CALCULATOR_SERVICES = tuple(dict.fromkeys(
+    BATHROOM_SERVICES + PAINTING_SERVICES + (RIGG_SERVICE,) + KITCHEN_SERVICES
+    + (WINDOW_SERVICE,) + ELECTRICAL_SERVICES
+))
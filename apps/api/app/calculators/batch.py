@@ -0,0 +1,25 @@
+from typing import Dict, Any, List, Optional, Tuple
+
+from .snapshot import PriceSnapshot
+from .estimate import calculate_estimate, EstimateError
+
+# (index, region, project_type, area, quantity, quality, options)
+BatchJob = Tuple[int, str, str, Optional[float], Optional[int], Optional[str], Dict[str, Any]]
+
+def calculate_batch(snapshots: Dict[str, PriceSnapshot], jobs: List[BatchJob]) -> List[Tuple[int, Optional[Dict[str, Any]], Optional[str]]]:
+    """
+    Price a chunk of estimate requests -> (index, estimate dict or None, error or None).
+    Module-level and pure so process pool workers can run it; one failing item never
+    fails the chunk.
+    """
+    results = []
+    for index, region, project_type, area, quantity, quality, options in jobs:
+        try:
+            estimate = calculate_estimate(snapshots[region], project_type, area, quantity, quality, options).to_dict()
+            estimate["region"] = region
+            results.append((index, estimate, None))
+        except EstimateError as e:
+            results.append((index, None, str(e)))
+        except Exception as e:
+            results.append((index, None, f"calculation failed: {e}"))
+    return results
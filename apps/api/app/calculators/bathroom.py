@@ -0,0 +1,83 @@
+from typing import Optional, Tuple
+from dataclasses import dataclass
+
+from .snapshot import PriceSnapshot, LineItem, line_item
+
+# Totalrenoveringspakker (m², tjeneste) - nærmeste pakke som dekker arealet brukes
+BATHROOM_PACKAGES = (
+    (4, "bad_totalrenovering_4m2"),
+    (8, "bad_totalrenovering_8m2"),
+    (12, "bad_totalrenovering_12m2")
+)
+
+# 60% av badkostnaden er fast (utstyr, rør, elektro), 40% skalerer med arealet (fliser, materialer)
+FIXED_COST_SHARE = 0.6
+
+# Komponenter for bad uten pakkepris (eller større enn 12 m²), priset per m²
+BATHROOM_COMPONENTS = (
+    ("bad_riving_avfall", "Riving og avfall"),
+    ("bad_membran", "Membran og tetting"),
+    ("bad_flislegging_arbeid", "Flislegging"),
+    ("bad_fliser_material", "Fliser"),
+    ("bad_elektriker", "Elektriker"),
+    ("bad_rorlegger", "Rørlegger"),
+    ("bad_maler_vatrom", "Maling våtrom")
+)
+
+# Siste utvei når ingen badpriser finnes
+FALLBACK_PRICE_PER_M2 = 45000
+
+BATHROOM_SERVICES = tuple(service for _, service in BATHROOM_PACKAGES) + tuple(service for service, _ in BATHROOM_COMPONENTS)
+
+@dataclass(frozen=True)
+class BathroomEstimate:
+    area: float
+    total_cost: float
+    pricing_source: str  # database_package, database_components or fallback
+    package_used: Optional[str] = None
+    package_area: Optional[float] = None
+    line_items: Tuple[LineItem, ...] = ()
+
+    @property
+    def price_per_m2(self) -> float:
+        return self.total_cost / self.area if self.area else 0.0
+
+def package_for_area(area: float) -> Optional[Tuple[int, str]]:
+    """Smallest package covering the area, or None above 12 m²"""
+    return next((package for package in BATHROOM_PACKAGES if area <= package[0]), None)
+
+def scale_package_price(package_price: float, package_area: float, area: float) -> float:
+    """Faste kostnader beholdes, arealavhengige skaleres lineært"""
+    fixed_cost = package_price * FIXED_COST_SHARE
+    variable_cost = package_price * (1 - FIXED_COST_SHARE)
+    return fixed_cost + variable_cost * (area / package_area)
+
+def calculate_bathroom(prices: PriceSnapshot, area: float) -> BathroomEstimate:
+    """
+    Komplett badrenovering: pakkepris skalert til arealet, ellers summen av
+    komponentprisene, ellers FALLBACK_PRICE_PER_M2
+    """
+    package = package_for_area(area)
+    if package is not None and package[1] in prices:
+        package_area, service = package
+        total = scale_package_price(prices.recommended(service, 0), package_area, area)
+        return BathroomEstimate(
+            area=area,
+            total_cost=total,
+            pricing_source="database_package",
+            package_used=service,
+            package_area=package_area,
+            line_items=(LineItem(service, f"Totalrenovering bad ({package_area} m² pakke skalert til {area:g} m²)",
+                                 1, "pakke", total, total),)
+        )
+
+    items = tuple(item for item in (
+        line_item(prices, service, description, area) for service, description in BATHROOM_COMPONENTS
+    ) if item is not None)
+    if items:
+        return BathroomEstimate(area, sum(item.total for item in items), "database_components", line_items=items)
+
+    total = area * FALLBACK_PRICE_PER_M2
+    return BathroomEstimate(area, total, "fallback", line_items=(
+        LineItem("badrenovering", "Badrenovering (gjennomsnittspris)", area, "m²", FALLBACK_PRICE_PER_M2, total, "fallback"),
+    ))
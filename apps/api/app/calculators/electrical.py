@@ -0,0 +1,82 @@
+from typing import Optional, Tuple
+from dataclasses import dataclass
+
+from .snapshot import PriceSnapshot, LineItem, line_item
+
+HOURLY_RATE_SERVICE = "elektriker_timepris_montor"
+DEFAULT_HOURLY_RATE = 900
+DEFAULT_HOURLY_RANGE = (700, 1100)
+
+OUTLET_PACKAGE_SERVICE = "stikkontakt_pakke_5_stk"
+OUTLET_PACKAGE_SIZE = 5
+DEFAULT_OUTLET_PACKAGE_PRICE = 4400
+OUTLET_SERVICE = "ekstra_stikkontakt_dobbel"
+DEFAULT_OUTLET_PRICE = 950
+
+# Snittpriser for arbeid som ikke er priset i databasen ennå: fast pris, eller per m² når arealet er kjent
+FIXED_PRICES = {
+    "downlights": 15000,
+    "sikringsskap": 18000,
+    "elbillader": 15000,
+    "elektrikerarbeid": 8000
+}
+AREA_PRICES = {
+    "gulvvarme": (1075, 10000),
+    "komplett el-anlegg": (1250, 130000)
+}
+
+ELECTRICAL_SERVICES = (HOURLY_RATE_SERVICE, OUTLET_PACKAGE_SERVICE, OUTLET_SERVICE)
+
+@dataclass(frozen=True)
+class HourlyRate:
+    hourly_rate: float
+    min_rate: float
+    max_rate: float
+    pricing_source: str
+
+@dataclass(frozen=True)
+class ElectricalEstimate:
+    work: str
+    total_cost: float
+    pricing_source: str
+    line_items: Tuple[LineItem, ...] = ()
+    quantity: Optional[float] = None
+
+    @property
+    def cost_per_unit(self) -> Optional[float]:
+        return self.total_cost / self.quantity if self.quantity else None
+
+def electrician_hourly_rate(prices: PriceSnapshot) -> HourlyRate:
+    """Timepris montør med markedsintervall"""
+    price = prices.get(HOURLY_RATE_SERVICE)
+    if price is None or price.recommended is None:
+        return HourlyRate(DEFAULT_HOURLY_RATE, *DEFAULT_HOURLY_RANGE, "fallback")
+    return HourlyRate(
+        price.recommended,
+        price.market_min if price.market_min is not None else DEFAULT_HOURLY_RANGE[0],
+        price.market_max if price.market_max is not None else DEFAULT_HOURLY_RANGE[1],
+        "database"
+    )
+
+def calculate_outlets(prices: PriceSnapshot, count: int) -> ElectricalEstimate:
+    """Doble stikkontakter - pakkepris (skalert) fra 5 stk, ellers stykkpris"""
+    if count >= OUTLET_PACKAGE_SIZE:
+        packages = count / OUTLET_PACKAGE_SIZE
+        item = line_item(prices, OUTLET_PACKAGE_SERVICE, f"Stikkontakter, pakke à {OUTLET_PACKAGE_SIZE}",
+                         packages, DEFAULT_OUTLET_PACKAGE_PRICE, "pakke")
+    else:
+        item = line_item(prices, OUTLET_SERVICE, "Ekstra stikkontakt dobbel", count, DEFAULT_OUTLET_PRICE, "stk")
+    return ElectricalEstimate("stikkontakter", item.total, item.pricing_source, (item,), count)
+
+def calculate_electrical_work(work: str, area: float = None) -> ElectricalEstimate:
+    """Downlights, sikringsskap, gulvvarme, elbillader, komplett el-anlegg eller generelt elektrikerarbeid"""
+    if work in AREA_PRICES:
+        per_m2, fixed = AREA_PRICES[work]
+        if area:
+            item = LineItem(work, work, area, "m²", per_m2, per_m2 * area, "fallback")
+            return ElectricalEstimate(work, item.total, "fallback", (item,), area)
+        item = LineItem(work, work, 1, "job", fixed, fixed, "fallback")
+        return ElectricalEstimate(work, fixed, "fallback", (item,))
+
+    price = FIXED_PRICES.get(work, FIXED_PRICES["elektrikerarbeid"])
+    return ElectricalEstimate(work, price, "fallback", (LineItem(work, work, 1, "job", price, price, "fallback"),))
@@ -0,0 +1,163 @@
+from typing import Dict, Any, Optional, Tuple, Callable, NamedTuple
+from dataclasses import dataclass
+
+from .snapshot import PriceSnapshot, LineItem
+from .bathroom import calculate_bathroom, BATHROOM_SERVICES
+from .painting import calculate_painting, PAINTING_SERVICES
+from .rigg import RIGG_SERVICE
+from .kitchen import calculate_kitchen, KITCHEN_SERVICES, QUALITY_LEVELS, DEFAULT_COUNTERTOP_METERS
+from .windows_doors import calculate_windows, calculate_interior_doors, WINDOW_SERVICE
+from .electrical import (
+    electrician_hourly_rate, calculate_outlets, calculate_electrical_work,
+    HOURLY_RATE_SERVICE, OUTLET_PACKAGE_SERVICE, OUTLET_SERVICE
+)
+
+VAT_RATE = 0.25
+
+# Detail flags the painting calculator understands
+PAINTING_OPTIONS = ("rough_surface", "ceiling_painting", "many_windows", "old_wallpaper")
+
+class EstimateError(ValueError):
+    """A structured estimate request the calculators cannot price"""
+
+@dataclass(frozen=True)
+class Estimate:
+    project_type: str
+    total_cost: float
+    pricing_source: str
+    line_items: Tuple[LineItem, ...]
+    details: Dict[str, Any]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "project_type": self.project_type,
+            "total_cost": self.total_cost,
+            "total_cost_inc_vat": self.total_cost * (1 + VAT_RATE),
+            "pricing_source": self.pricing_source,
+            "line_items": [item.to_dict() for item in self.line_items],
+            "details": dict(self.details)
+        }
+
+class ProjectType(NamedTuple):
+    services: Tuple[str, ...]
+    requires: Optional[str]  # "area", "quantity" or None
+    calculate: Callable[..., Estimate]
+
+def _source(line_items: Tuple[LineItem, ...]) -> str:
+    sources = {item.pricing_source for item in line_items}
+    return sources.pop() if len(sources) == 1 else "mixed"
+
+def _bathroom(prices, area, quantity, quality, options) -> Estimate:
+    result = calculate_bathroom(prices, area)
+    return Estimate("bathroom", result.total_cost, result.pricing_source, result.line_items, {
+        "area": area,
+        "price_per_m2": result.price_per_m2,
+        "package_used": result.package_used,
+        "package_area": result.package_area
+    })
+
+def _painting(prices, area, quantity, quality, options) -> Estimate:
+    service = options.get("service")
+    if service is not None and service not in PAINTING_SERVICES:
+        raise EstimateError(f"Unknown painting service '{service}' (expected one of {', '.join(PAINTING_SERVICES)})")
+    details = {flag: bool(options.get(flag)) for flag in PAINTING_OPTIONS}
+    result = calculate_painting(prices, area, details, service=service)
+    return Estimate("painting", result.total_cost, result.pricing_source, result.line_items, {
+        "floor_area": result.floor_area,
+        "paintable_area": result.paintable_area,
+        "service": result.service,
+        "liters_needed": result.liters_needed,
+        "work_hours": result.work_hours,
+        "rigg_og_drift": result.rigg_og_drift.to_dict()
+    })
+
+def _kitchen(prices, area, quantity, quality, options) -> Estimate:
+    meters = options.get("countertop_meters", DEFAULT_COUNTERTOP_METERS)
+    if isinstance(meters, bool) or not isinstance(meters, (int, float)) or meters <= 0:
+        raise EstimateError("countertop_meters must be a positive number")
+    result = calculate_kitchen(prices, quality, meters)
+    return Estimate("kitchen", result.total_cost, result.pricing_source, result.line_items, {"quality": result.quality})
+
+def _windows(prices, area, quantity, quality, options) -> Estimate:
+    result = calculate_windows(prices, quantity)
+    return Estimate("windows", result.total_cost, result.pricing_source, result.line_items, {"unit_price": result.unit_price})
+
+def _interior_doors(prices, area, quantity, quality, options) -> Estimate:
+    result = calculate_interior_doors(quantity, bool(options.get("with_frame")))
+    return Estimate("interior_doors", result.total_cost, result.pricing_source, result.line_items, {"unit_price": result.unit_price})
+
+def _outlets(prices, area, quantity, quality, options) -> Estimate:
+    result = calculate_outlets(prices, quantity)
+    return Estimate("outlets", result.total_cost, result.pricing_source, result.line_items, {"cost_per_outlet": result.cost_per_unit})
+
+def _electrician_hours(prices, area, quantity, quality, options) -> Estimate:
+    rate = electrician_hourly_rate(prices)
+    hours = quantity or 1
+    item = LineItem(HOURLY_RATE_SERVICE, "Elektriker, timepris montør", hours, "time",
+                    rate.hourly_rate, rate.hourly_rate * hours, rate.pricing_source)
+    return Estimate("electrician_hours", item.total, rate.pricing_source, (item,), {
+        "hourly_rate": rate.hourly_rate, "min_rate": rate.min_rate, "max_rate": rate.max_rate
+    })
+
+def _electrical_work(work: str, project_type: str) -> Callable[..., Estimate]:
+    def calculate(prices, area, quantity, quality, options) -> Estimate:
+        result = calculate_electrical_work(work, area)
+        return Estimate(project_type, result.total_cost, result.pricing_source, result.line_items, {})
+    return calculate
+
+PROJECT_TYPES: Dict[str, ProjectType] = {
+    "bathroom": ProjectType(BATHROOM_SERVICES, "area", _bathroom),
+    "painting": ProjectType(PAINTING_SERVICES + (RIGG_SERVICE,), "area", _painting),
+    "kitchen": ProjectType(KITCHEN_SERVICES, None, _kitchen),
+    "windows": ProjectType((WINDOW_SERVICE,), "quantity", _windows),
+    "interior_doors": ProjectType((), "quantity", _interior_doors),
+    "outlets": ProjectType((OUTLET_PACKAGE_SERVICE, OUTLET_SERVICE), "quantity", _outlets),
+    "electrician_hours": ProjectType((HOURLY_RATE_SERVICE,), None, _electrician_hours),
+    "floor_heating": ProjectType((), None, _electrical_work("gulvvarme", "floor_heating")),
+    "complete_electrical": ProjectType((), None, _electrical_work("komplett el-anlegg", "complete_electrical")),
+    "downlights": ProjectType((), None, _electrical_work("downlights", "downlights")),
+    "electrical_panel": ProjectType((), None, _electrical_work("sikringsskap", "electrical_panel")),
+    "ev_charger": ProjectType((), None, _electrical_work("elbillader", "ev_charger"))
+}
+
+# Norwegian names the chat agent uses for the same projects
+PROJECT_TYPE_ALIASES = {
+    "bad": "bathroom",
+    "maling": "painting",
+    "kjøkken": "kitchen",
+    "kjokken": "kitchen",
+    "vinduer": "windows",
+    "innerdører": "interior_doors",
+    "innerdorer": "interior_doors",
+    "stikkontakter": "outlets",
+    "elektriker": "electrician_hours",
+    "gulvvarme": "floor_heating",
+    "el-anlegg": "complete_electrical",
+    "sikringsskap": "electrical_panel",
+    "elbillader": "ev_charger"
+}
+
+def project_type_for(name: str) -> str:
+    """Canonical project type for a name or Norwegian alias"""
+    key = (name or "").strip().lower()
+    key = PROJECT_TYPE_ALIASES.get(key, key)
+    if key not in PROJECT_TYPES:
+        raise EstimateError(f"Unknown project_type '{name}' (expected one of {', '.join(PROJECT_TYPES)})")
+    return key
+
+def services_for(project_type: str) -> Tuple[str, ...]:
+    """The services an estimate of this type reads from the price snapshot"""
+    return PROJECT_TYPES[project_type_for(project_type)].services
+
+def calculate_estimate(prices: PriceSnapshot, project_type: str, area: float = None, quantity: int = None,
+                       quality: str = None, options: Dict[str, Any] = None) -> Estimate:
+    """Price one structured estimate request with the calculator for its project type"""
+    project_type = project_type_for(project_type)
+    spec = PROJECT_TYPES[project_type]
+    if spec.requires == "area" and not area:
+        raise EstimateError(f"{project_type} estimates need an area (m²)")
+    if spec.requires == "quantity" and not quantity:
+        raise EstimateError(f"{project_type} estimates need a quantity")
+    if quality is not None and quality not in QUALITY_LEVELS:
+        raise EstimateError(f"Unknown quality '{quality}' (expected one of {', '.join(QUALITY_LEVELS)})")
+    return spec.calculate(prices, area, quantity, quality, options or {})
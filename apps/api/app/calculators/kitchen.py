@@ -0,0 +1,64 @@
+from typing import Optional, Tuple
+from dataclasses import dataclass
+
+from .snapshot import PriceSnapshot, LineItem, line_item
+
+QUALITY_LEVELS = ("budget", "mid", "premium")
+DEFAULT_QUALITY = "mid"
+
+# Innredning og hvitevarer per kvalitetsnivå: (tjeneste, beskrivelse, pris når tjenesten ikke er priset)
+KITCHEN_PACKAGES = {
+    "budget": ("kjokken_ikea_komplett", "Kjøkkeninnredning (IKEA/startpakke)", 50000),
+    "mid": ("kjokken_midt_segment", "Kjøkkeninnredning (midtsegment)", 125000),
+    "premium": ("kjokken_skreddersydd_snekker", "Kjøkkeninnredning (skreddersydd/snekker)", 300000)
+}
+
+# Benkeplate per løpemeter
+COUNTERTOPS = {
+    "budget": ("benkeplate_laminat", "Benkeplate laminat", 500),
+    "mid": ("benkeplate_kompaktlaminat", "Benkeplate kompaktlaminat", 2500),
+    "premium": ("benkeplate_stein_kompositt", "Benkeplate stein/kompositt", 3750)
+}
+DEFAULT_COUNTERTOP_METERS = 4.0
+
+# Arbeid som inngår uansett kvalitet
+KITCHEN_WORK = (
+    ("kjokken_riving_demontering", "Riving og avfallshåndtering", 5000),
+    ("kjokken_rorlegger_arbeid", "Nytt røropplegg", 30000),
+    ("kjokken_elektriker_arbeid", "Nytt elektrisk anlegg", 30000),
+    ("kjokken_montering_nytt", "Montering av kjøkken", 20000)
+)
+
+KITCHEN_SERVICES = (
+    tuple(service for service, _, _ in KITCHEN_PACKAGES.values())
+    + tuple(service for service, _, _ in COUNTERTOPS.values())
+    + tuple(service for service, _, _ in KITCHEN_WORK)
+)
+
+@dataclass(frozen=True)
+class KitchenEstimate:
+    quality: str
+    total_cost: float
+    line_items: Tuple[LineItem, ...]
+
+    @property
+    def pricing_source(self) -> str:
+        sources = {item.pricing_source for item in self.line_items}
+        return sources.pop() if len(sources) == 1 else "mixed"
+
+def normalise_quality(quality: Optional[str]) -> str:
+    """budget/mid/premium (as extracted by session memory); anything else is mid"""
+    return quality if quality in QUALITY_LEVELS else DEFAULT_QUALITY
+
+def calculate_kitchen(prices: PriceSnapshot, quality: str = DEFAULT_QUALITY,
+                      countertop_meters: float = DEFAULT_COUNTERTOP_METERS) -> KitchenEstimate:
+    """Kjøkkenrenovering: innredningspakke og benkeplate etter kvalitet, pluss riving, rør, elektro og montering"""
+    quality = normalise_quality(quality)
+    package, package_description, package_default = KITCHEN_PACKAGES[quality]
+    countertop, countertop_description, countertop_default = COUNTERTOPS[quality]
+
+    items = [line_item(prices, service, description, 1, default, "job") for service, description, default in KITCHEN_WORK]
+    items.insert(3, line_item(prices, package, package_description, 1, package_default, "job"))
+    items.insert(4, line_item(prices, countertop, countertop_description, countertop_meters, countertop_default, "lm"))
+
+    return KitchenEstimate(quality, sum(item.total for item in items), tuple(items))
@@ -0,0 +1,156 @@
+from typing import Dict, Any, Optional, Tuple
+from dataclasses import dataclass
+
+from .snapshot import PriceSnapshot, LineItem
+from .rigg import RiggOgDrift, calculate_rigg_og_drift, WHOLE_HOUSE_AREA, RIGG_SERVICE
+
+PAINTING_SERVICES = ("skjotesparkling_inkl_maling", "helsparkling_inkl_maling", "innvendig_maling_standard")
+
+# Hele hus: gulvflate x 2.8 = malerflate (vegger + tak). Enkeltrom oppgis allerede som veggflate.
+WALL_AND_CEILING_FACTOR = 2.8
+
+MATERIAL_SHARE = 0.25  # 25% materiell, 75% arbeid
+COVERAGE_PER_LITER = 8  # m² per liter
+LAYERS = 2
+DEFAULT_HOURLY_RATE = 850
+HOURS_PER_M2 = 0.6
+
+# Brukes når ingen malingstjeneste er priset
+FALLBACK_PRICE_PER_LITER = 550
+
+@dataclass(frozen=True)
+class PaintingEstimate:
+    floor_area: float
+    paintable_area: float
+    service: Optional[str]
+    liters_needed: float
+    paint_cost: float
+    work_hours: float
+    labor_cost: float
+    base_cost: float
+    rigg_og_drift: RiggOgDrift
+    total_cost: float
+    unit_price: Optional[float]
+    pricing_source: str
+    layers: int = LAYERS
+
+    @property
+    def line_items(self) -> Tuple[LineItem, ...]:
+        """Maling, arbeid og rigg og drift"""
+        rigg = self.rigg_og_drift.total_rigg_cost
+        return (
+            LineItem("maling_materiell", "Maling og materiell", self.liters_needed, "liter",
+                     self.paint_cost / self.liters_needed if self.liters_needed else 0.0, self.paint_cost, self.pricing_source),
+            LineItem(self.service or "malerarbeid", "Malerarbeid", self.work_hours, "time",
+                     self.labor_cost / self.work_hours if self.work_hours else 0.0, self.labor_cost, self.pricing_source),
+            LineItem(RIGG_SERVICE, "Rigg og drift", 1, "job", rigg, rigg, self.rigg_og_drift.pricing_source)
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The dict shape the renovation agent has always returned"""
+        return {
+            "liters_needed": self.liters_needed,
+            "paint_cost": self.paint_cost,
+            "work_hours": self.work_hours,
+            "labor_cost": self.labor_cost,
+            "rigg_og_drift": self.rigg_og_drift.to_dict(),
+            "total_cost": self.total_cost,
+            "base_cost": self.base_cost,
+            "layers": self.layers,
+            "unit_price": self.unit_price,
+            "service": self.service,
+            "pricing_source": self.pricing_source,
+            "floor_area": self.floor_area,
+            "paintable_area": self.paintable_area
+        }
+
+def paintable_area(floor_area: float) -> float:
+    """Malerflate: hele hus (> 80 m²) regnes om fra gulvflate, ellers brukes arealet som det er"""
+    return floor_area * WALL_AND_CEILING_FACTOR if floor_area > WHOLE_HOUSE_AREA else floor_area
+
+def select_painting_service(details: Dict = None, query: str = "") -> str:
+    """
+    Velger malingstjeneste ut fra detaljer og spørring.
+    Nybygg: skjøtesparkling + maling. Oppussing: standard innvendig maling eller helsparkling.
+    """
+    query_context = f"{str(details or {}).lower()} {(query or '').lower()}"
+
+    if any(word in query_context for word in ["nytt", "ny", "sparkle", "sparkling", "nybygg"]):
+        return "skjotesparkling_inkl_maling"  # Most common for new houses
+    if any(word in query_context for word in ["helspark", "hele", "total"]):
+        return "helsparkling_inkl_maling"
+    return "innvendig_maling_standard"
+
+def apply_modifiers(liters: float, hours: float, floor_area: float, details: Dict) -> Tuple[float, float, bool]:
+    """Ru overflate, tak, mange vinduer og gammel tapet -> (liter, timer, om noe ble justert)"""
+    if details.get("rough_surface"):
+        liters *= 1.25
+        hours *= 1.2
+    if details.get("ceiling_painting"):
+        hours *= 1.5
+    if details.get("many_windows"):
+        hours *= 1.3
+    if details.get("old_wallpaper"):
+        hours += floor_area * 0.3
+    applied = any(details.get(key) for key in ("rough_surface", "ceiling_painting", "many_windows", "old_wallpaper"))
+    return liters, hours, applied
+
+def calculate_painting(prices: PriceSnapshot, area: float, details: Dict = None, query: str = "",
+                       hourly_rate: float = DEFAULT_HOURLY_RATE, service: str = None) -> PaintingEstimate:
+    """
+    Maling med database-pris for tjenesten (oppgitt, eller valgt ut fra detaljer og
+    spørring), detaljjusteringer og rigg og drift
+    """
+    details = details or {}
+    surface = paintable_area(area)
+    service = service or select_painting_service(details, query)
+    rigg_og_drift = calculate_rigg_og_drift(prices, area, details, surface)
+
+    unit_price = prices.recommended(service)
+    if unit_price is None:
+        return _fallback_painting(area, surface, details, rigg_og_drift)
+
+    total_cost = unit_price * surface
+    liters_needed = surface * LAYERS / COVERAGE_PER_LITER
+    work_hours = total_cost * (1 - MATERIAL_SHARE) / hourly_rate if hourly_rate > 0 else surface * HOURS_PER_M2
+
+    liters_needed, work_hours, applied = apply_modifiers(liters_needed, work_hours, area, details)
+    if applied:
+        total_cost *= work_hours / (area * HOURS_PER_M2) if area > 0 else 1.2
+
+    return PaintingEstimate(
+        floor_area=area,
+        paintable_area=surface,
+        service=service,
+        liters_needed=liters_needed,
+        paint_cost=total_cost * MATERIAL_SHARE,
+        work_hours=work_hours,
+        labor_cost=total_cost * (1 - MATERIAL_SHARE),
+        base_cost=total_cost,
+        rigg_og_drift=rigg_og_drift,
+        total_cost=total_cost + rigg_og_drift.total_rigg_cost,
+        unit_price=unit_price,
+        pricing_source="database"
+    )
+
+def _fallback_painting(area: float, surface: float, details: Dict, rigg_og_drift: RiggOgDrift) -> PaintingEstimate:
+    """Faste satser (550 kr/liter, 850 kr/time, 0.6 t/m²) når tjenesten ikke er priset"""
+    liters_needed, work_hours, _ = apply_modifiers(area * LAYERS / COVERAGE_PER_LITER, area * HOURS_PER_M2, area, details)
+    paint_cost = liters_needed * FALLBACK_PRICE_PER_LITER
+    labor_cost = work_hours * DEFAULT_HOURLY_RATE
+    base_cost = paint_cost + labor_cost
+
+    return PaintingEstimate(
+        floor_area=area,
+        paintable_area=surface,
+        service=None,
+        liters_needed=liters_needed,
+        paint_cost=paint_cost,
+        work_hours=work_hours,
+        labor_cost=labor_cost,
+        base_cost=base_cost,
+        rigg_og_drift=rigg_og_drift,
+        total_cost=base_cost + rigg_og_drift.total_rigg_cost,
+        unit_price=None,
+        pricing_source="fallback"
+    )
@@ -0,0 +1,71 @@
+from typing import Dict, Any, Optional, Mapping
+from dataclasses import dataclass
+
+from .snapshot import PriceSnapshot
+
+RIGG_SERVICE = "rigg_og_drift"
+
+# Grunnkostnad når rigg_og_drift ikke er priset: hele hus (> 80 m² gulv) og enkeltrom
+WHOLE_HOUSE_BASE_COST = 8000
+ROOM_BASE_COST = 2500
+WHOLE_HOUSE_AREA = 80
+
+DEFAULT_DAILY_RATE = 3500
+M2_PER_DAY = 40
+
+@dataclass(frozen=True)
+class RiggOgDrift:
+    components: Mapping[str, float]
+    base_rigg_cost: float
+    total_rigg_cost: float
+    pricing_source: str = "database"
+
+    @property
+    def breakdown(self) -> Dict[str, float]:
+        """The four standard components (the extras are only in components)"""
+        return {name: self.components[name] for name in
+                ("transport_parkering", "masking_tildekking", "oppsett_nedrigging", "avfallshåndtering")}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "components": dict(self.components),
+            "base_rigg_cost": self.base_rigg_cost,
+            "total_rigg_cost": self.total_rigg_cost,
+            "breakdown": self.breakdown
+        }
+
+def calculate_rigg_og_drift(prices: PriceSnapshot, floor_area: float, details: Dict = None,
+                            paintable_area: float = None) -> RiggOgDrift:
+    """
+    Rigg og drift (oppsett, masking, rydding, transport, avfall): det største av
+    dagsatsen for rigg_og_drift (40 m² per dag) og summen av komponentene
+    """
+    details = details or {}
+
+    # Use paintable area if provided, otherwise floor area
+    calculation_area = paintable_area if paintable_area else floor_area
+    area_factor = max(1.0, calculation_area / 100)
+
+    components = {
+        "transport_parkering": 800 * area_factor,         # Kjøring, parkering Oslo
+        "masking_tildekking": 12 * calculation_area,      # Maskeringstape, plastduk per m² malerflate
+        "oppsett_nedrigging": 1200 * area_factor,         # Stige, utstyr, opprydding
+        "avfallshåndtering": 600 * area_factor            # Kasting av avfall, tomme malingsbøtter
+    }
+    if details.get("many_windows"):
+        components["ekstra_masking"] = 500  # Mer masking rundt vinduer
+    if details.get("ceiling_painting"):
+        components["takarbeid_rigg"] = 800  # Ekstra rigg for takarbeid
+    if details.get("old_wallpaper"):
+        components["tapetfjerning_avfall"] = 400  # Mer avfall fra tapet
+
+    rigg_price = prices.get(RIGG_SERVICE)
+    if rigg_price is not None:
+        daily_rate = rigg_price.market_avg if rigg_price.market_avg is not None else DEFAULT_DAILY_RATE
+        base_rigg_cost = daily_rate * max(1, floor_area / M2_PER_DAY)
+        source = "database"
+    else:
+        base_rigg_cost = WHOLE_HOUSE_BASE_COST if floor_area > WHOLE_HOUSE_AREA else ROOM_BASE_COST
+        source = "fallback"
+
+    return RiggOgDrift(components, base_rigg_cost, max(base_rigg_cost, sum(components.values())), source)
@@ -0,0 +1,100 @@
+from typing import Dict, Any, Optional, Mapping, Iterable
+from dataclasses import dataclass, field
+from types import MappingProxyType
+
+@dataclass(frozen=True)
+class UnitPrice:
+    """Markedspris per enhet for én tjeneste i én region"""
+    service: str
+    unit: Optional[str]
+    market_min: Optional[float]
+    market_max: Optional[float]
+    market_avg: Optional[float]
+    recommended_price: Optional[float] = None
+    p10_price: Optional[float] = None
+    p50_price: Optional[float] = None
+    p90_price: Optional[float] = None
+    sample_size: Optional[int] = None
+    confidence: Optional[float] = None
+
+    @property
+    def recommended(self) -> Optional[float]:
+        """Anbefalt pris, ellers markedssnittet (samme regel som get_service_price)"""
+        return self.recommended_price if self.recommended_price is not None else self.market_avg
+
+@dataclass(frozen=True)
+class PriceSnapshot:
+    """
+    Read-only prices for a set of services in one region, loaded once
+    (PricingService.price_snapshot) and shared by every calculator call
+    """
+    region: str
+    prices: Mapping[str, UnitPrice] = field(default_factory=dict)
+    version: Optional[str] = None
+
+    def __post_init__(self):
+        object.__setattr__(self, "prices", MappingProxyType(dict(self.prices)))
+
+    def __reduce__(self):
+        # mappingproxy can't be pickled; rebuild from a plain dict (process pools)
+        return (PriceSnapshot, (self.region, dict(self.prices), self.version))
+
+    @classmethod
+    def from_prices(cls, prices: Mapping[str, float], region: str = "Oslo", unit: str = None) -> "PriceSnapshot":
+        """Snapshot with one flat price per service (tests, benchmarks, what-if estimates)"""
+        return cls(region, {
+            service: UnitPrice(service, unit, price, price, price, price)
+            for service, price in prices.items()
+        })
+
+    def __contains__(self, service: str) -> bool:
+        return service in self.prices
+
+    def get(self, service: str) -> Optional[UnitPrice]:
+        return self.prices.get(service)
+
+    def recommended(self, service: str, default: float = None) -> Optional[float]:
+        """Recommended unit price for a service, or default when it is not priced"""
+        price = self.prices.get(service)
+        if price is None or price.recommended is None:
+            return default
+        return price.recommended
+
+    def subset(self, services: Iterable[str]) -> "PriceSnapshot":
+        return PriceSnapshot(self.region, {s: self.prices[s] for s in services if s in self.prices}, self.version)
+
+@dataclass(frozen=True)
+class LineItem:
+    """One priced line of an estimate"""
+    service: str
+    description: str
+    quantity: float
+    unit: Optional[str]
+    unit_price: float
+    total: float
+    pricing_source: str = "database"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "service": self.service,
+            "description": self.description,
+            "quantity": self.quantity,
+            "unit": self.unit,
+            "unit_price": self.unit_price,
+            "total": self.total,
+            "pricing_source": self.pricing_source
+        }
+
+def line_item(prices: PriceSnapshot, service: str, description: str, quantity: float,
+              default_unit_price: float = None, unit: str = None) -> Optional[LineItem]:
+    """
+    Line item priced from the snapshot, or from default_unit_price when the service is
+    not priced (marked "fallback"). None when neither is available.
+    """
+    price = prices.get(service)
+    unit_price = price.recommended if price is not None else None
+    if unit_price is not None:
+        return LineItem(service, description, quantity, price.unit or unit, unit_price, unit_price * quantity)
+    if default_unit_price is None:
+        return None
+    return LineItem(service, description, quantity, unit, default_unit_price, default_unit_price * quantity, "fallback")
@@ -0,0 +1,39 @@
+from typing import Tuple
+from dataclasses import dataclass
+
+from .snapshot import PriceSnapshot, LineItem, line_item
+
+WINDOW_SERVICE = "vindu_standard_komplett"
+DEFAULT_WINDOW_PRICE = 9500
+
+# Innerdører er ikke i prisdatabasen ennå - faste snittpriser
+DOOR_WITH_FRAME_SERVICE = "innerdør_standard_komplett"
+DOOR_LEAF_SERVICE = "innerdor_standard_komplett"
+DOOR_WITH_FRAME_PRICE = 5500
+DOOR_LEAF_PRICE = 3000
+
+@dataclass(frozen=True)
+class UnitEstimate:
+    """Estimate for a number of identical units (windows, doors)"""
+    count: int
+    unit_price: float
+    total_cost: float
+    pricing_source: str
+    line_items: Tuple[LineItem, ...]
+
+def _units(item: LineItem) -> UnitEstimate:
+    return UnitEstimate(int(item.quantity), item.unit_price, item.total, item.pricing_source, (item,))
+
+def calculate_windows(prices: PriceSnapshot, count: int) -> UnitEstimate:
+    """Utskifting av standard vinduer, komplett med montering"""
+    return _units(line_item(prices, WINDOW_SERVICE, "Vindu standard komplett", count, DEFAULT_WINDOW_PRICE, "stk"))
+
+def calculate_interior_doors(count: int, with_frame: bool = False) -> UnitEstimate:
+    """Innerdører - komplett med karm, eller kun dørblad på eksisterende karm"""
+    if with_frame:
+        item = LineItem(DOOR_WITH_FRAME_SERVICE, "Innerdør komplett med karm", count, "stk",
+                        DOOR_WITH_FRAME_PRICE, DOOR_WITH_FRAME_PRICE * count, "fallback")
+    else:
+        item = LineItem(DOOR_LEAF_SERVICE, "Innerdør (dørblad)", count, "stk",
+                        DOOR_LEAF_PRICE, DOOR_LEAF_PRICE * count, "fallback")
+    return _units(item)
@@ -1,19 +1,83 @@
-from sqlalchemy import create_engine
+from contextlib import contextmanager
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from .models.partner import Base
 from .models.session import SessionMemory  # Import to ensure table creation
+from .models.analytics import ConversationDailyRollup  # Import to ensure table creation
 import os
 
 # Database URL - PostgreSQL for production, SQLite for development
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./beregne.db")
 
-engine = create_engine(
-    DATABASE_URL, 
-    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {}
-)
+# SQLite only: WAL lets a write proceed while other connections hold read transactions
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+
+# SQLite only: how long a connection waits on a locked database before failing
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
+def _sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.close()
+
+def _create_engine(url: str):
+    created = create_engine(
+        url, 
+        connect_args={"check_same_thread": False} if "sqlite" in url else {}
+    )
+    if created.dialect.name == "sqlite":
+        event.listen(created, "connect", _sqlite_pragmas)
+    return created
+
+engine = _create_engine(DATABASE_URL)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+def _async_url(url: str) -> str:
+    """Map a sync DATABASE_URL to its async driver (aiosqlite / asyncpg)"""
+    if url.startswith("sqlite:"):
+        return "sqlite+aiosqlite:" + url[len("sqlite:"):]
+    for prefix in ("postgres://", "postgresql://", "postgresql+psycopg2://"):
+        if url.startswith(prefix):
+            return "postgresql+asyncpg://" + url[len(prefix):]
+    return url
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", _async_url(DATABASE_URL))
+
+# Created on first use so scripts that only need the sync engine don't require the async drivers
+_async_engine = None
+
+def get_async_engine():
+    """Async engine for the API routes"""
+    global _async_engine
+    if _async_engine is None:
+        _async_engine = create_async_engine(ASYNC_DATABASE_URL)
+        if _async_engine.dialect.name == "sqlite":
+            event.listen(_async_engine.sync_engine, "connect", _sqlite_pragmas)
+    return _async_engine
+
+AsyncSessionLocal = async_sessionmaker(class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+@contextmanager
+def using_database(url: str):
+    """
+    Point engine, SessionLocal and the async engine at another database for the block
+    (in-process tests and tools; DATABASE_URL is otherwise read once, at import).
+    Sessions opened before the block keep the database they were bound to.
+    """
+    global engine, ASYNC_DATABASE_URL, _async_engine
+    previous = engine, ASYNC_DATABASE_URL, _async_engine
+    engine, ASYNC_DATABASE_URL, _async_engine = _create_engine(url), _async_url(url), None
+    SessionLocal.configure(bind=engine)
+    try:
+        yield engine
+    finally:
+        engine.dispose()
+        engine, ASYNC_DATABASE_URL, _async_engine = previous
+        SessionLocal.configure(bind=engine)
+
 def create_tables():
     """Create all tables"""
     Base.metadata.create_all(bind=engine)
@@ -24,4 +88,13 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    """
+    Async database dependency. The session (and its transaction) stays open until the
+    response is sent, so routes that go on to slow work should use a short
+    `async with AsyncSessionLocal(bind=get_async_engine())` block instead.
+    """
+    async with AsyncSessionLocal(bind=get_async_engine()) as db:
+        yield db
@@ -0,0 +1 @@
+# Devtools package - local stand-ins for load and integration testing (never mounted by the API)
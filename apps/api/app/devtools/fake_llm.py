@@ -0,0 +1,325 @@
+"""
+OpenAI-compatible fake chat-completions server for offline, reproducible load tests.
+
+    FAKE_LLM_LATENCY=lognormal:0.6:0.4 FAKE_LLM_ERROR_RATE=0.02 \\
+    FAKE_LLM_CASSETTE=cassettes/chat.json python -m app.devtools.fake_llm 8900
+
+then run the API with OPENAI_BASE_URL=http://127.0.0.1:8900/v1 and any
+OPENAI_API_KEY_RENOVATION value. Responses are replayed from the cassette by prompt
+hash; misses are synthesized from the request's JSON schema, filled in from the app's
+local analysis of the query (or FAKE_LLM_DEFAULT_REPLY).
+With FAKE_LLM_RECORD=1 misses are forwarded to FAKE_LLM_UPSTREAM and recorded instead.
+"""
+
+from typing import Dict, Any, Optional, Callable, List, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+import asyncio
+import json
+import math
+import os
+import random
+import re
+import sys
+import threading
+import time
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from ..services.prompt_builder import count_tokens
+from ..services.single_flight import prompt_key
+
+# Prompt lines that change on every call and would make recorded prompts unreplayable
+VOLATILE_LINES = re.compile(r"^Tidspunkt: .*$", re.MULTILINE)
+
+# The context and query blocks the analyzer prompts end with
+QUERY_BLOCK = re.compile(r'(?:^Context:\n(.*?)\n\n)?^Query: "(.*)"\Z', re.MULTILINE | re.DOTALL)
+
+# Synthesized analyses that can't be priced ask for the missing details instead
+CLARIFICATION_HINTS = {
+    "type": "needs_clarification",
+    "is_ambiguous": True,
+    "followup_questions": ["Hvor mange kvadratmeter gjelder det?", "Hvilken standard ønsker du?"],
+    "followup_message": "Hvor stort er området, og hvilken standard ser du for deg?"
+}
+
+CASSETTE_VERSION = 1
+
+def latency_sampler(spec: str, rng: random.Random) -> Callable[[], float]:
+    """
+    Seconds-per-request sampler from a spec: "none", "fixed:S", "uniform:LOW:HIGH" or
+    "lognormal:MEDIAN:SIGMA" (a long right tail, like real completions)
+    """
+    kind, _, args = spec.partition(":")
+    values = [float(value) for value in args.split(":")] if args else []
+    if kind == "none":
+        return lambda: 0.0
+    if kind == "fixed" and len(values) == 1:
+        return lambda: values[0]
+    if kind == "uniform" and len(values) == 2:
+        return lambda: rng.uniform(values[0], values[1])
+    if kind == "lognormal" and len(values) == 2:
+        return lambda: rng.lognormvariate(math.log(values[0]), values[1])
+    raise ValueError(f"Unknown latency spec '{spec}'")
+
+@dataclass(frozen=True)
+class FakeLLMConfig:
+    latency: str = "none"
+    # Delay between streamed chunks (the latency above is time to first token)
+    chunk_delay: float = 0.0
+    error_rate: float = 0.0
+    error_statuses: tuple = (429, 500, 503)
+    retry_after: Optional[float] = 1.0
+    cassette: Optional[str] = None
+    record: bool = False
+    upstream: str = "https://api.openai.com/v1"
+    default_reply: str = "{}"
+    seed: int = 0
+
+    @classmethod
+    def from_env(cls) -> "FakeLLMConfig":
+        retry_after = os.getenv("FAKE_LLM_RETRY_AFTER", "1")
+        return cls(
+            latency=os.getenv("FAKE_LLM_LATENCY", "none"),
+            chunk_delay=float(os.getenv("FAKE_LLM_CHUNK_DELAY", "0")),
+            error_rate=float(os.getenv("FAKE_LLM_ERROR_RATE", "0")),
+            error_statuses=tuple(int(status) for status in os.getenv("FAKE_LLM_ERROR_STATUSES", "429,500,503").split(",")),
+            retry_after=float(retry_after) if retry_after else None,
+            cassette=os.getenv("FAKE_LLM_CASSETTE") or None,
+            record=os.getenv("FAKE_LLM_RECORD", "0") == "1",
+            upstream=os.getenv("FAKE_LLM_UPSTREAM", "https://api.openai.com/v1"),
+            default_reply=os.getenv("FAKE_LLM_DEFAULT_REPLY", "{}"),
+            seed=int(os.getenv("FAKE_LLM_SEED", "0"))
+        )
+
+def cassette_key(request: Dict[str, Any]) -> str:
+    """Prompt hash a response is recorded under (volatile lines blanked)"""
+    messages = [{**message, "content": VOLATILE_LINES.sub("", message.get("content") or "")}
+                for message in request.get("messages", [])]
+    return prompt_key(
+        model=request.get("model"), messages=messages, temperature=request.get("temperature"),
+        max_tokens=request.get("max_tokens"), response_format=request.get("response_format")
+    )
+
+class Cassette:
+    """Recorded completions by prompt hash, kept in one JSON file"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = Path(path) if path else None
+        self.responses: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        if self.path and self.path.exists():
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            if data.get("version") != CASSETTE_VERSION:
+                raise ValueError(f"{self.path}: unsupported cassette version {data.get('version')}")
+            self.responses = data["responses"]
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self.responses.get(key)
+        return entry["content"] if entry else None
+
+    def put(self, key: str, request: Dict[str, Any], content: str):
+        messages = request.get("messages") or [{}]
+        with self._lock:
+            self.responses[key] = {
+                # Only there to make the file reviewable
+                "prompt": (messages[-1].get("content") or "")[-200:],
+                "content": content
+            }
+            if self.path:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self.path.write_text(json.dumps(
+                    {"version": CASSETTE_VERSION, "responses": self.responses},
+                    ensure_ascii=False, indent=2, sort_keys=True
+                ), encoding="utf-8")
+
+_JSON_TYPES = {"array": list, "string": str, "number": (int, float), "integer": int, "boolean": bool,
+               "null": type(None), "object": dict}
+
+def _fits(value: Any, schema: Dict[str, Any]) -> bool:
+    if "enum" in schema:
+        return value in schema["enum"]
+    types = schema.get("type")
+    types = types if isinstance(types, list) else [types]
+    # bool is an int in Python, but not a JSON number
+    return any(isinstance(value, _JSON_TYPES.get(kind, ())) and not (isinstance(value, bool) and kind != "boolean")
+               for kind in types)
+
+def synthesize(schema: Dict[str, Any], hints: Any = None) -> Any:
+    """
+    Instance of a (strict structured-output) JSON schema: the hinted value where it fits
+    the schema, else the smallest valid one
+    """
+    types = schema.get("type")
+    if types == "object":
+        hints = hints if isinstance(hints, dict) else {}
+        return {name: synthesize(prop, hints.get(name)) for name, prop in schema.get("properties", {}).items()}
+    if hints is not None and _fits(hints, schema):
+        return hints
+    if "enum" in schema:
+        return schema["enum"][0]
+    if isinstance(types, list):
+        if "null" in types:
+            return None
+        types = types[0]
+    return {"array": [], "string": "", "number": 0, "integer": 0, "boolean": False}.get(types)
+
+def analysis_hints(request: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    What a model would plausibly answer for an analysis prompt: the app's local regex
+    analysis of the query, turned into a clarification when it found nothing to price
+    """
+    messages = request.get("messages") or [{}]
+    match = QUERY_BLOCK.search((messages[-1].get("content") or "").rstrip())
+    if not match:
+        return {}
+
+    from ..services.ai_query_analyzer import AIQueryAnalyzer, AREA_PRICED
+    hints = AIQueryAnalyzer()._fallback_regex_analysis(match.group(2), match.group(1) or "")
+    hints.setdefault("reasoning", "Synthesized by the fake LLM")
+    hints.setdefault("followup_questions", [])
+    hints.setdefault("followup_message", "")
+    unpriceable = hints.get("area") is None and (
+        hints.get("type") in AREA_PRICED or hints.get("project_type") in AREA_PRICED
+        or (hints.get("type") == "full_project_estimate" and hints.get("quantity") is None)
+    )
+    if unpriceable or hints.get("type") == "needs_clarification":
+        hints.update(CLARIFICATION_HINTS)
+    return hints
+
+def _reply_for(request: Dict[str, Any], default_reply: str) -> str:
+    response_format = request.get("response_format") or {}
+    if response_format.get("type") == "json_schema":
+        return json.dumps(synthesize(response_format["json_schema"]["schema"], analysis_hints(request)), ensure_ascii=False)
+    return default_reply
+
+def _completion(request: Dict[str, Any], content: str, number: int) -> Dict[str, Any]:
+    prompt_tokens = sum(count_tokens(message.get("content") or "") for message in request.get("messages", []))
+    completion_tokens = count_tokens(content)
+    return {
+        "id": f"chatcmpl-fake-{number}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": request.get("model", "fake"),
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop"
+        }],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens
+        }
+    }
+
+def _chunks(content: str) -> List[str]:
+    # Roughly token-sized pieces
+    return re.findall(r"\s*\S{1,8}|\s+$", content) or [""]
+
+def create_fake_llm_app(config: FakeLLMConfig = None) -> FastAPI:
+    config = config or FakeLLMConfig.from_env()
+    rng = random.Random(config.seed)
+    sample_latency = latency_sampler(config.latency, rng)
+    cassette = Cassette(config.cassette)
+    stats = {"requests": 0, "replayed": 0, "recorded": 0, "synthesized": 0, "errors": 0}
+    app = FastAPI(title="Fake LLM")
+
+    async def recorded(request: Dict[str, Any], authorization: Optional[str]) -> str:
+        if not authorization and os.getenv("OPENAI_API_KEY"):
+            authorization = f"Bearer {os.getenv('OPENAI_API_KEY')}"
+        async with httpx.AsyncClient(timeout=60) as client:
+            response = await client.post(
+                f"{config.upstream.rstrip('/')}/chat/completions",
+                headers={"Authorization": authorization} if authorization else {},
+                json={**request, "stream": False}
+            )
+        response.raise_for_status()
+        return response.json()["choices"][0]["message"]["content"]
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(http_request: Request):
+        request = await http_request.json()
+        stats["requests"] += 1
+        number = stats["requests"]
+        # Draw from the seeded RNG in arrival order so a run replays the same way
+        latency = sample_latency()
+        failed = config.error_rate > 0 and rng.random() < config.error_rate
+        status = rng.choice(config.error_statuses) if failed else None
+
+        await asyncio.sleep(latency)
+        if status:
+            stats["errors"] += 1
+            headers = {"retry-after": f"{config.retry_after:g}"} if status == 429 and config.retry_after is not None else {}
+            return JSONResponse(status_code=status, headers=headers, content={
+                "error": {"message": f"Injected {status}", "type": "fake_llm_error", "code": status}
+            })
+
+        key = cassette_key(request)
+        content = cassette.get(key)
+        if content is not None:
+            stats["replayed"] += 1
+        elif config.record:
+            content = await recorded(request, http_request.headers.get("authorization"))
+            cassette.put(key, request, content)
+            stats["recorded"] += 1
+        else:
+            content = _reply_for(request, config.default_reply)
+            stats["synthesized"] += 1
+
+        completion = _completion(request, content, number)
+        if not request.get("stream"):
+            return completion
+
+        async def stream():
+            base = {field: completion[field] for field in ("id", "created", "model")}
+            pieces = [{"role": "assistant", "content": ""}] + [{"content": piece} for piece in _chunks(content)]
+            for delta in pieces:
+                chunk = {**base, "object": "chat.completion.chunk",
+                         "choices": [{"index": 0, "delta": delta, "finish_reason": None}]}
+                yield f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"
+                if config.chunk_delay:
+                    await asyncio.sleep(config.chunk_delay)
+            final = {**base, "object": "chat.completion.chunk",
+                     "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+            yield f"data: {json.dumps(final)}\n\n"
+            yield "data: [DONE]\n\n"
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    @app.get("/stats")
+    async def get_stats():
+        return {**stats, "cassette_entries": len(cassette.responses)}
+
+    return app
+
+@contextmanager
+def running_fake_llm(config: FakeLLMConfig = None, port: int = 0) -> Iterator[str]:
+    """Serve the fake from a background thread; yields its base URL (for OPENAI_BASE_URL)"""
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(
+        create_fake_llm_app(config), host="127.0.0.1", port=port, ws="none", log_level="warning"
+    ))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not server.started:
+        if not thread.is_alive() or time.monotonic() > deadline:
+            raise RuntimeError("fake LLM server did not start")
+        time.sleep(0.01)
+    bound_port = server.servers[0].sockets[0].getsockname()[1]
+    try:
+        yield f"http://127.0.0.1:{bound_port}/v1"
+    finally:
+        server.should_exit = True
+        thread.join(timeout=10)
+
+if __name__ == "__main__":
+    import uvicorn
+
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8900
+    uvicorn.run(create_fake_llm_app(), host="127.0.0.1", port=port, ws="none", log_level="warning")
@@ -1,16 +1,22 @@
 from fastapi import FastAPI, HTTPException, Depends
+from fastapi.responses import Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 from typing import Optional, Dict, Any
 import logging
 import uvicorn
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from .orchestrator import AgentOrchestrator
-from .routers import partners, widget, dashboard, leads, analytics
-from .database import create_tables, get_db, SessionLocal
+from .routers import partners, widget, dashboard, leads, analytics, admin, estimate
+from .database import create_tables, get_db, SessionLocal, AsyncSessionLocal, get_async_engine
 from .models.partner import Partner
+from .services.upstream_guard import upstream_status
+from .services.sql_profiler import sql_profiler, SQLProfilerMiddleware, SQL_PROFILING
+from .services.tracing import tracer, CHAT_SPAN
+from .services import metrics
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -38,8 +44,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-SQL-Queries", "X-SQL-Time-Ms", "X-SQL-N-Plus-One"],
 )
 
+# SQL statement counts and time per request, route and code path (/api/admin/perf)
+if SQL_PROFILING:
+    sql_profiler.install()
+app.add_middleware(SQLProfilerMiddleware)
+
 # Initialize orchestrator
 orchestrator = AgentOrchestrator()
 
@@ -49,6 +61,8 @@ app.include_router(widget.router)
 app.include_router(dashboard.router)
 app.include_router(leads.router)
 app.include_router(analytics.router)
+app.include_router(admin.router)
+app.include_router(estimate.router)
 
 # Request/Response models
 class ChatRequest(BaseModel):
@@ -187,6 +201,13 @@ async def startup_event():
     agents = orchestrator.get_available_agents()
     for agent in agents:
         logger.info(f"  - {agent['name']} agent loaded")
+    
+    # Load the local intent classifier now rather than on the first chat turn
+    from .services.intent_classifier import get_intent_classifier, INTENT_MODEL_PATH
+    if get_intent_classifier():
+        logger.info(f"🧠 Intent classifier loaded from {INTENT_MODEL_PATH}")
+    else:
+        logger.info("🧠 No intent classifier artefact, every analysis goes to the LLM")
 
 @app.get("/")
 async def root():
@@ -201,63 +222,79 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Detailed health check"""
+    upstream = upstream_status()
     return {
-        "status": "healthy",
+        # An open LLM breaker means answers come from the local fallbacks
+        "status": "degraded" if any(guard["breaker"] != "closed" for guard in upstream.values()) else "healthy",
         "agents": orchestrator.get_available_agents(),
-        "agent_count": orchestrator.get_agent_count()
+        "agent_count": orchestrator.get_agent_count(),
+        "upstream": upstream
     }
 
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Prometheus scrape endpoint: chat turn and stage latency histograms, LLM tokens, cache lookups"""
+    return Response(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
 @app.post("/api/chat", response_model=ChatResponse)
-async def chat(request: ChatRequest, db: Session = Depends(get_db)):
+async def chat(request: ChatRequest):
     """
     Main chat endpoint for processing user queries.
     Routes queries to appropriate AI agents.
     """
-    try:
-        if not request.message or not request.message.strip():
-            raise HTTPException(status_code=400, detail="Message cannot be empty")
+    with tracer.span(CHAT_SPAN, **{"chat.partner": "none", "chat.session_id": request.session_id or ""}) as span:
+        try:
+            if not request.message or not request.message.strip():
+                raise HTTPException(status_code=400, detail="Message cannot be empty")
         
-        logger.info(f"Processing query: {request.message[:100]}...")
+            logger.info(f"Processing query: {request.message[:100]}...")
         
-        # Get partner configuration if partner_id is provided
-        partner_config = None
-        if request.partner_id:
-            partner = db.query(Partner).filter(
-                Partner.partner_id == request.partner_id,
-                Partner.is_active == True
-            ).first()
-            if partner:
-                partner_config = {
-                    "enabled_agents": partner.enabled_agents or ["renovation"],
-                    "brand_name": partner.brand_name
-                }
+            # Get partner configuration if partner_id is provided
+            partner_config = None
+            if request.partner_id:
+                # Own short session: a read transaction held through route_query would
+                # block the agents' commits on SQLite
+                async with AsyncSessionLocal(bind=get_async_engine()) as db:
+                    partner = await db.scalar(select(Partner).where(
+                        Partner.partner_id == request.partner_id,
+                        Partner.is_active == True
+                    ))
+                if partner:
+                    # Only registered partners become a metrics label
+                    span.set_attribute("chat.partner", request.partner_id)
+                    partner_config = {
+                        "enabled_agents": partner.enabled_agents or ["renovation"],
+                        "brand_name": partner.brand_name
+                    }
         
-        # Route query to appropriate agent
-        result = await orchestrator.route_query(
-            query=request.message,
-            context=request.context,
-            partner_config=partner_config
-        )
+            # Route query to appropriate agent
+            result = await orchestrator.route_query(
+                query=request.message,
+                context=request.context,
+                partner_config=partner_config
+            )
         
-        # Create response
-        response = ChatResponse(
-            response=result.get("response", "Ingen respons fra agent"),
-            session_id=request.session_id,
-            agent_used=result.get("agent_used", "unknown"),
-            routing=result.get("routing"),
-            calculation_details=result.get("calculation_details"),
-            materials_list=result.get("materials_list"),
-            estimated_cost=result.get("estimated_cost")
-        )
+            span.set_attribute("chat.agent", result.get("agent_used", "unknown"))
+            
+            # Create response
+            response = ChatResponse(
+                response=result.get("response", "Ingen respons fra agent"),
+                session_id=request.session_id,
+                agent_used=result.get("agent_used", "unknown"),
+                routing=result.get("routing"),
+                calculation_details=result.get("calculation_details"),
+                materials_list=result.get("materials_list"),
+                estimated_cost=result.get("estimated_cost")
+            )
         
-        logger.info(f"Response from {result.get('agent_used', 'unknown')} agent")
-        return response
+            logger.info(f"Response from {result.get('agent_used', 'unknown')} agent")
+            return response
         
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error processing chat request: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error processing chat request: {str(e)}")
+            raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 @app.get("/api/agents")
 async def get_agents():
@@ -0,0 +1,45 @@
+from sqlalchemy import Column, Integer, String, Date, DateTime, Boolean, Float, UniqueConstraint
+from datetime import datetime
+
+from .partner import Base
+
+class ConversationDailyRollup(Base):
+    """
+    Pre-aggregated conversation counters per day, partner, project type and AI flag.
+    Analytics dashboards read these rows instead of scanning conversation_messages.
+    """
+    __tablename__ = "conversation_daily_rollups"
+    __table_args__ = (
+        UniqueConstraint("day", "partner_id", "project_type", "ai_powered", name="uq_conversation_daily_rollup_key"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # Rollup key
+    day = Column(Date, nullable=False, index=True)
+    partner_id = Column(String, nullable=False, default="unknown")
+    project_type = Column(String, nullable=False, default="unknown")
+    ai_powered = Column(Boolean, nullable=False, default=False)
+
+    # Message counters
+    messages = Column(Integer, nullable=False, default=0)
+    responses = Column(Integer, nullable=False, default=0)  # Messages the user replied to
+    pricing_hits = Column(Integer, nullable=False, default=0)
+    registrations = Column(Integer, nullable=False, default=0)  # Messages that led to registration
+
+    # Conversation counters (attributed to the day/key of the first message)
+    conversations = Column(Integer, nullable=False, default=0)
+    registered_conversations = Column(Integer, nullable=False, default=0)
+
+    # Response time (stored as sum + count so averages stay additive)
+    response_time_sum = Column(Float, nullable=False, default=0.0)
+    response_time_count = Column(Integer, nullable=False, default=0)
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    @property
+    def avg_response_time(self) -> float:
+        """Average user response time in seconds for this rollup row"""
+        if not self.response_time_count:
+            return 0.0
+        return self.response_time_sum / self.response_time_count
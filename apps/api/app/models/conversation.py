@@ -1,6 +1,6 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, Float, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, Float, ForeignKey, Index
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, query_expression
 from datetime import datetime
 import json
 from typing import Dict, Any, List
@@ -33,13 +33,17 @@ class ConversationSession(Base):
     ai_success_rate = Column(Float, default=0.0)  # % of AI responses that led to useful follow-up
     
     # Relationships
-    messages = relationship("ConversationMessage", back_populates="session")
+    messages = relationship("ConversationMessage", back_populates="session", order_by="ConversationMessage.message_order")
 
 class ConversationMessage(Base):
     """
     Individual messages in conversations for pattern analysis
     """
     __tablename__ = "conversation_messages"
+    __table_args__ = (
+        Index("ix_conversation_messages_session_order", "session_id", "message_order"),
+        Index("ix_conversation_messages_created_at", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     session_id = Column(String, ForeignKey("conversation_sessions.session_id"))
@@ -68,6 +72,9 @@ class ConversationMessage(Base):
     # Metadata
     created_at = Column(DateTime, default=datetime.utcnow)
     
+    # Truncated agent_response, populated only by queries that use with_expression()
+    agent_response_preview = query_expression()
+    
     # Relationships
     session = relationship("ConversationSession", back_populates="messages")
     
@@ -89,6 +96,9 @@ class ConversationPattern(Base):
     Learned patterns from conversation analysis for AI improvement
     """
     __tablename__ = "conversation_patterns"
+    __table_args__ = (
+        Index("ix_conversation_patterns_type_confidence_seen", "project_type", "confidence_score", "times_seen"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, Boolean
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, Boolean, Index, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -29,16 +29,41 @@ class Contractor(Base):
     location = Column(String(100))  # Oslo, Bærum, etc.
     website = Column(String(500))
     phone = Column(String(20))
-    specialties = Column(Text)  # JSON array av service_types
+    specialties = Column(Text)  # JSON array av service_types (legacy - se contractor_specialties)
     verified = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
     pricing_data = relationship("PricingData", back_populates="contractor")
+    specialty_links = relationship("ContractorSpecialty", cascade="all, delete-orphan")
+    locations = relationship("ContractorLocation", cascade="all, delete-orphan")
+
+class ContractorSpecialty(Base):
+    """Hvilke tjenester en kontraktør tilbyr (normalisert fra Contractor.specialties)"""
+    __tablename__ = "contractor_specialties"
+    
+    contractor_id = Column(Integer, ForeignKey("contractors.id"), primary_key=True)
+    service_type_id = Column(Integer, ForeignKey("service_types.id"), primary_key=True, index=True)
+
+class ContractorLocation(Base):
+    """Hvor en kontraktør holder til (normalisert fra Contractor.location)"""
+    __tablename__ = "contractor_locations"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    contractor_id = Column(Integer, ForeignKey("contractors.id"), index=True)
+    region_code = Column(String(10), ForeignKey("regions.code"), index=True)
+    postcode = Column(String(4))  # Valgfritt - brukes til finere avstandsrangering
 
 class PricingData(Base):
     """Faktiske priser fra markedet"""
     __tablename__ = "pricing_data"
+    __table_args__ = (
+        Index("ix_pricing_data_service_region", "service_type_id", "region"),
+        Index("ix_pricing_data_service_contractor", "service_type_id", "contractor_id"),
+        # Upsert key for catalog sheets - one market price per service, region and source
+        Index("uq_pricing_data_catalog_key", "service_type_id", "region", "source", unique=True,
+              sqlite_where=text("contractor_id IS NULL"), postgresql_where=text("contractor_id IS NULL")),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     service_type_id = Column(Integer, ForeignKey("service_types.id"))
@@ -65,6 +90,10 @@ class PricingData(Base):
 class MarketRate(Base):
     """Beregnede markedsrater basert på alle kilder"""
     __tablename__ = "market_rates"
+    __table_args__ = (
+        # One computed rate per service and region (upsert key for recalculation)
+        Index("uq_market_rates_service_region", "service_type_id", "region", unique=True),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     service_type_id = Column(Integer, ForeignKey("service_types.id"))
@@ -75,13 +104,67 @@ class MarketRate(Base):
     market_avg = Column(Float)
     recommended_price = Column(Float)  # Vår anbefaling til kunder
     
+    # Vektede kvantiler (confidence x aktualitet), etter fjerning av uteliggere
+    p10_price = Column(Float)
+    p50_price = Column(Float)
+    p90_price = Column(Float)
+    
     # Kvalitet
     sample_size = Column(Integer)  # Antall datapunkter
     confidence_score = Column(Float)  # 0-1
+    effective_sample_size = Column(Float)  # Kish effektiv utvalgsstørrelse (vektet)
+    outliers_rejected = Column(Integer)  # Observasjoner forkastet av MAD-filteret
     last_calculated = Column(DateTime, default=datetime.utcnow)
     
     # Metadata
     region = Column(String(100))
     
     # Relationships
-    service_type = relationship("ServiceType")
\ No newline at end of file
+    service_type = relationship("ServiceType")
+
+class Region(Base):
+    """Regionhierarki (nasjonalt -> fylke -> kommune) med regional prisindeks"""
+    __tablename__ = "regions"
+    
+    code = Column(String(10), primary_key=True)  # NO, fylkesnummer, kommunenummer
+    name = Column(String(100), index=True)
+    level = Column(String(20))  # national, county, municipality
+    parent_code = Column(String(10), ForeignKey("regions.code"), nullable=True)
+    price_index = Column(Float, default=1.0)  # Relativt til nasjonalt nivå
+    aliases = Column(Text)  # JSON array av alternative navn
+    latitude = Column(Float)  # Omtrentlig sentrum, for avstandsrangering
+    longitude = Column(Float)
+    
+    # Relationships
+    parent = relationship("Region", remote_side=[code])
+
+class PostcodeRange(Base):
+    """Postnummerintervall -> mest spesifikke region vi priser"""
+    __tablename__ = "postcode_ranges"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    postcode_from = Column(String(4))
+    postcode_to = Column(String(4))
+    region_code = Column(String(10), ForeignKey("regions.code"))
+
+class PriceResolution(Base):
+    """Forhåndsberegnet pris per tjeneste og region (mest spesifikke tilgjengelige rate)"""
+    __tablename__ = "price_resolutions"
+    
+    service_type_id = Column(Integer, ForeignKey("service_types.id"), primary_key=True)
+    region_code = Column(String(10), ForeignKey("regions.code"), primary_key=True)
+    
+    # Hvor raten kommer fra: regionen selv, nærmeste overordnede region eller nasjonalt nivå
+    source_region_code = Column(String(10))  # None = avledet nasjonalt snitt
+    price_factor = Column(Float)  # price_index(region) / price_index(kilde)
+    
+    market_min = Column(Float)
+    market_max = Column(Float)
+    market_avg = Column(Float)
+    recommended_price = Column(Float)
+    p10_price = Column(Float)
+    p50_price = Column(Float)
+    p90_price = Column(Float)
+    sample_size = Column(Integer)
+    confidence_score = Column(Float)
+    resolved_at = Column(DateTime, default=datetime.utcnow)
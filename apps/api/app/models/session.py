@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, Float
+from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, Float, Index
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
 import json
@@ -12,6 +12,9 @@ class SessionMemory(Base):
     Stores structured context data instead of full conversation history
     """
     __tablename__ = "session_memory"
+    __table_args__ = (
+        Index("ix_session_memory_last_activity", "last_activity"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     session_id = Column(String, unique=True, index=True)
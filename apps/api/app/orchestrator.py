@@ -2,6 +2,8 @@ from typing import Dict, Any, List, Optional
 import logging
 from .agents.base_agent import BaseAgent
 from .agents.conversational_renovation_agent import ConversationalRenovationAgent
+from .services.llm_budget import llm_call_budget
+from .services.tracing import tracer
 
 logger = logging.getLogger(__name__)
 
@@ -56,8 +58,11 @@ class AgentOrchestrator:
                     }
                 }
             
-            # Process the query with the selected agent
-            result = await best_agent.process(query, context)
+            # Process the query with the selected agent; every LLM call it makes
+            # counts against this turn's budget (one round-trip by default)
+            with llm_call_budget() as budget, tracer.span("agent.process", **{"agent.name": best_agent.get_agent_name()}):
+                result = await best_agent.process(query, context)
+            result["llm_calls"] = budget.used
             
             # Add routing information
             result["routing"] = {
@@ -0,0 +1,65 @@
+from fastapi import APIRouter, HTTPException
+from starlette.concurrency import run_in_threadpool
+from typing import Dict, Any, Optional
+
+from ..services.price_catalog_service import refresh_catalog, CatalogError
+from ..services.estimate_cache import estimate_cache
+from ..services.hedged_analysis import hedge_stats
+from ..services.single_flight import llm_single_flight
+from ..services.sql_profiler import sql_profiler
+
+router = APIRouter(prefix="/api/admin", tags=["admin"])
+
+@router.post("/catalog/refresh")
+async def refresh_price_catalog(
+    sheets: Optional[str] = None,
+    workers: Optional[int] = None
+) -> Dict[str, Any]:
+    """Reload price sheets concurrently and recompute market rates (sheets: comma-separated trade names)"""
+    
+    try:
+        sheet_names = [name.strip() for name in sheets.split(",") if name.strip()] if sheets else None
+        # Blocking DB work runs off the event loop
+        result = await run_in_threadpool(refresh_catalog, sheets=sheet_names, max_workers=workers)
+        return {
+            "status": "success" if not result["failed"] else "partial",
+            **result
+        }
+        
+    except CatalogError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/estimate-cache")
+async def get_estimate_cache_stats() -> Dict[str, Any]:
+    """Hit rate and size of the in-process estimate cache"""
+    return {"status": "success", **estimate_cache.stats()}
+
+@router.delete("/estimate-cache")
+async def clear_estimate_cache() -> Dict[str, Any]:
+    """Drop every cached estimate in this process"""
+    estimate_cache.clear()
+    return {"status": "success", **estimate_cache.stats()}
+
+@router.get("/analysis-hedge")
+async def get_analysis_hedge_stats() -> Dict[str, Any]:
+    """Win rates and latency percentiles of the local vs LLM query analysis"""
+    return {"status": "success", **hedge_stats.stats()}
+
+@router.get("/llm-single-flight")
+async def get_llm_single_flight_stats() -> Dict[str, Any]:
+    """Upstream LLM calls made vs identical concurrent requests that shared one"""
+    return {"status": "success", **llm_single_flight.stats()}
+
+@router.get("/perf")
+async def get_sql_profile(top: int = 10) -> Dict[str, Any]:
+    """SQL statements and time per route, the busiest code paths and statements, and flagged N+1 patterns"""
+    return {"status": "success", **sql_profiler.stats(top=top)}
+
+@router.delete("/perf")
+async def clear_sql_profile() -> Dict[str, Any]:
+    """Reset the SQL profile of this process"""
+    sql_profiler.clear()
+    return {"status": "success", **sql_profiler.stats()}
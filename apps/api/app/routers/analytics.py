@@ -1,10 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import Dict, Any
+from sqlalchemy.orm import selectinload, load_only, with_expression
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, or_, and_
+from typing import Dict, Any, Optional, Tuple
+from datetime import datetime
+import base64
 import json
 
-from ..database import get_db
+from ..database import get_async_db
+from ..services.async_compat import AsyncService
 from ..services.conversation_learning_service import ConversationLearningService
+from ..services.analytics_rollup_service import AnalyticsRollupService
 from ..models.conversation import ConversationSession, ConversationMessage, ConversationPattern
 
 router = APIRouter(prefix="/api/analytics", tags=["analytics"])
@@ -12,40 +18,39 @@ router = APIRouter(prefix="/api/analytics", tags=["analytics"])
 @router.get("/conversations")
 async def get_conversation_analytics(
     days: int = 30,
-    db: Session = Depends(get_db)
+    partner_id: str = None,
+    db: AsyncSession = Depends(get_async_db)
 ) -> Dict[str, Any]:
     """Get conversation analytics for learning insights"""
     
-    learning_service = ConversationLearningService(db)
+    learning_service = AsyncService(db, ConversationLearningService)
     
     try:
-        analytics = await learning_service.get_conversation_analytics(days=days)
+        analytics = await learning_service.get_conversation_analytics(days=days, partner_id=partner_id)
         return {
             "status": "success",
             "data": analytics
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        learning_service.close()
 
 @router.get("/patterns")
 async def get_learned_patterns(
     project_type: str = None,
     min_confidence: float = 0.5,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Dict[str, Any]:
     """Get learned conversation patterns"""
     
     try:
-        query = db.query(ConversationPattern).filter(
+        query = select(ConversationPattern).where(
             ConversationPattern.confidence_score >= min_confidence
         )
         
         if project_type:
-            query = query.filter(ConversationPattern.project_type == project_type)
+            query = query.where(ConversationPattern.project_type == project_type)
         
-        patterns = query.order_by(ConversationPattern.success_rate.desc()).limit(50).all()
+        patterns = (await db.scalars(query.order_by(ConversationPattern.success_rate.desc()).limit(50))).all()
         
         pattern_data = []
         for pattern in patterns:
@@ -70,24 +75,68 @@ async def get_learned_patterns(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def _encode_cursor(session: ConversationSession) -> str:
+    """Opaque keyset cursor for a conversation session (started_at, id)"""
+    raw = f"{session.started_at.isoformat()}|{session.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a keyset cursor created by _encode_cursor"""
+    try:
+        started_at, session_pk = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(started_at), int(session_pk)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
 @router.get("/conversations/recent")
 async def get_recent_conversations(
     limit: int = 20,
-    db: Session = Depends(get_db)
+    after: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
 ) -> Dict[str, Any]:
-    """Get recent conversations for review"""
+    """Get recent conversations for review (keyset-paginated, newest first)"""
+    
+    limit = max(1, min(limit, 100))
     
     try:
-        sessions = db.query(ConversationSession).order_by(
-            ConversationSession.started_at.desc()
-        ).limit(limit).all()
+        # Messages come in one extra SELECT ... WHERE session_id IN (...) for the whole page;
+        # the large text columns are never loaded, only a 101-char preview of agent_response.
+        messages_loader = selectinload(ConversationSession.messages).options(
+            load_only(
+                ConversationMessage.session_id,
+                ConversationMessage.message_order,
+                ConversationMessage.user_message,
+                ConversationMessage.ai_powered,
+                ConversationMessage.project_type_detected,
+                ConversationMessage.led_to_pricing,
+                ConversationMessage.led_to_registration,
+                ConversationMessage.user_responded
+            ),
+            with_expression(
+                ConversationMessage.agent_response_preview,
+                func.substr(ConversationMessage.agent_response, 1, 101)
+            )
+        )
+        
+        query = select(ConversationSession).options(messages_loader)
+        
+        if after:
+            cursor_started_at, cursor_id = _decode_cursor(after)
+            query = query.where(or_(
+                ConversationSession.started_at < cursor_started_at,
+                and_(
+                    ConversationSession.started_at == cursor_started_at,
+                    ConversationSession.id < cursor_id
+                )
+            ))
+        
+        sessions = (await db.scalars(query.order_by(
+            ConversationSession.started_at.desc(),
+            ConversationSession.id.desc()
+        ).limit(limit))).all()
         
         conversations = []
         for session in sessions:
-            messages = db.query(ConversationMessage).filter(
-                ConversationMessage.session_id == session.session_id
-            ).order_by(ConversationMessage.message_order).all()
-            
             conversation_data = {
                 "session_id": session.session_id,
                 "partner_id": session.partner_id,
@@ -98,11 +147,12 @@ async def get_recent_conversations(
                 "messages": []
             }
             
-            for msg in messages:
+            for msg in session.messages:
+                preview = msg.agent_response_preview or ""
                 conversation_data["messages"].append({
                     "order": msg.message_order,
                     "user_message": msg.user_message,
-                    "agent_response": msg.agent_response[:100] + "..." if len(msg.agent_response) > 100 else msg.agent_response,
+                    "agent_response": preview[:100] + "..." if len(preview) > 100 else preview,
                     "ai_powered": msg.ai_powered,
                     "project_type_detected": msg.project_type_detected,
                     "led_to_pricing": msg.led_to_pricing,
@@ -114,59 +164,53 @@ async def get_recent_conversations(
         
         return {
             "status": "success", 
-            "conversations": conversations
+            "conversations": conversations,
+            "next_cursor": _encode_cursor(sessions[-1]) if len(sessions) == limit else None
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/ai-performance")
 async def get_ai_performance_metrics(
     days: int = 7,
-    db: Session = Depends(get_db)
+    partner_id: str = None,
+    db: AsyncSession = Depends(get_async_db)
 ) -> Dict[str, Any]:
     """Get AI performance metrics"""
     
-    from datetime import datetime, timedelta
-    
     try:
-        cutoff_date = datetime.utcnow() - timedelta(days=days)
-        
-        # Get AI vs non-AI message performance
-        messages = db.query(ConversationMessage).filter(
-            ConversationMessage.created_at >= cutoff_date
-        ).all()
-        
-        ai_messages = [m for m in messages if m.ai_powered]
-        non_ai_messages = [m for m in messages if not m.ai_powered]
+        # Served from the daily rollups - a few rows per day instead of every message
+        summary = await AsyncService(db, AnalyticsRollupService).get_summary(days=days, partner_id=partner_id)
+        ai = summary["ai"]
+        non_ai = summary["non_ai"]
         
         # Calculate success rates
-        ai_success_rate = len([m for m in ai_messages if m.user_responded]) / len(ai_messages) if ai_messages else 0
-        non_ai_success_rate = len([m for m in non_ai_messages if m.user_responded]) / len(non_ai_messages) if non_ai_messages else 0
+        ai_success_rate = ai["responses"] / ai["messages"] if ai["messages"] else 0
+        non_ai_success_rate = non_ai["responses"] / non_ai["messages"] if non_ai["messages"] else 0
         
         # Average response times
-        ai_response_times = [m.user_response_time_seconds for m in ai_messages if m.user_response_time_seconds]
-        non_ai_response_times = [m.user_response_time_seconds for m in non_ai_messages if m.user_response_time_seconds]
-        
-        avg_ai_response_time = sum(ai_response_times) / len(ai_response_times) if ai_response_times else 0
-        avg_non_ai_response_time = sum(non_ai_response_times) / len(non_ai_response_times) if non_ai_response_times else 0
+        avg_ai_response_time = ai["response_time_sum"] / ai["response_time_count"] if ai["response_time_count"] else 0
+        avg_non_ai_response_time = non_ai["response_time_sum"] / non_ai["response_time_count"] if non_ai["response_time_count"] else 0
         
         return {
             "status": "success",
             "period_days": days,
             "ai_metrics": {
-                "total_messages": len(ai_messages),
+                "total_messages": ai["messages"],
                 "user_response_rate": ai_success_rate * 100,
                 "avg_response_time_seconds": avg_ai_response_time,
-                "led_to_pricing": len([m for m in ai_messages if m.led_to_pricing]),
-                "led_to_registration": len([m for m in ai_messages if m.led_to_registration])
+                "led_to_pricing": ai["pricing_hits"],
+                "led_to_registration": ai["registrations"]
             },
             "non_ai_metrics": {
-                "total_messages": len(non_ai_messages),
+                "total_messages": non_ai["messages"],
                 "user_response_rate": non_ai_success_rate * 100,
                 "avg_response_time_seconds": avg_non_ai_response_time,
-                "led_to_pricing": len([m for m in non_ai_messages if m.led_to_pricing]),
-                "led_to_registration": len([m for m in non_ai_messages if m.led_to_registration])
+                "led_to_pricing": non_ai["pricing_hits"],
+                "led_to_registration": non_ai["registrations"]
             },
             "improvement": {
                 "response_rate_improvement": (ai_success_rate - non_ai_success_rate) * 100,
@@ -177,25 +221,45 @@ async def get_ai_performance_metrics(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/rollups/backfill")
+async def backfill_rollups(
+    days: int = None,
+    db: AsyncSession = Depends(get_async_db)
+) -> Dict[str, Any]:
+    """Rebuild daily rollups from the raw conversation log (all history if days is omitted)"""
+    
+    from datetime import datetime, timedelta
+    
+    try:
+        start_day = (datetime.utcnow() - timedelta(days=days)).date() if days else None
+        result = await AsyncService(db, AnalyticsRollupService).backfill(start_day=start_day)
+        return {
+            "status": "success",
+            **result
+        }
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.post("/feedback")
 async def submit_conversation_feedback(
     session_id: str,
     rating: int,  # 1-5 stars
     feedback: str = "",
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Dict[str, Any]:
     """Submit feedback for a conversation (for future use)"""
     
     try:
-        session = db.query(ConversationSession).filter(
+        session = await db.scalar(select(ConversationSession).where(
             ConversationSession.session_id == session_id
-        ).first()
+        ))
         
         if not session:
             raise HTTPException(status_code=404, detail="Session not found")
         
         session.user_satisfaction_score = rating
-        db.commit()
+        await db.commit()
         
         return {
             "status": "success",
@@ -0,0 +1,43 @@
+from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, Any, List
+import json
+
+from ..database import get_async_db
+from ..calculators import EstimateError
+from ..services.estimate_service import EstimateService, EstimateRequest, MAX_BATCH_ITEMS
+from ..services.async_compat import AsyncService
+
+router = APIRouter(prefix="/api/estimate", tags=["estimate"])
+
+class EstimateBatchRequest(BaseModel):
+    # Items are validated one by one so a bad item fails alone, not the whole batch
+    items: List[Dict[str, Any]] = Field(..., min_length=1, max_length=MAX_BATCH_ITEMS)
+
+@router.post("")
+async def create_estimate(request: EstimateRequest, db: AsyncSession = Depends(get_async_db)) -> Dict[str, Any]:
+    """
+    Priced line items for a structured request, straight from the calculators
+    (no chat routing, LLM analysis or session state). Cached per request and price version.
+    """
+    try:
+        return await AsyncService(db, EstimateService).estimate(**request.model_dump())
+    except EstimateError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/batch")
+async def create_estimate_batch(request: EstimateBatchRequest, db: AsyncSession = Depends(get_async_db)) -> StreamingResponse:
+    """
+    Many structured estimates at once, streamed back as NDJSON: one line per item in
+    input order ({"index", "status": "ok", "estimate"} or {"index", "status": "error",
+    "error"}) followed by a {"done": true, ...} summary line. All prices are loaded in
+    one catalog query before streaming starts.
+    """
+    try:
+        batch = await AsyncService(db, EstimateService).prepare_batch(request.items)
+    except EstimateError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    lines = (json.dumps(line, ensure_ascii=False) + "\n" for line in batch.run())
+    return StreamingResponse(lines, media_type="application/x-ndjson")
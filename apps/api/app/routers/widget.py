@@ -1,20 +1,21 @@
 from fastapi import APIRouter, HTTPException, Depends, Request
 from fastapi.responses import HTMLResponse, Response
-from sqlalchemy.orm import Session
-from ..database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..database import get_async_db
 from ..models.partner import Partner
 
 router = APIRouter(prefix="/widget", tags=["widget"])
 
 @router.get("/{partner_id}", response_class=HTMLResponse)
-async def get_widget_html(partner_id: str, db: Session = Depends(get_db)):
+async def get_widget_html(partner_id: str, db: AsyncSession = Depends(get_async_db)):
     """Generer HTML for embeddbar widget for spesifikk partner"""
     
     # Hent partner konfigurasjon
-    partner = db.query(Partner).filter(
+    partner = await db.scalar(select(Partner).where(
         Partner.partner_id == partner_id,
         Partner.is_active == True
-    ).first()
+    ))
     
     if not partner:
         raise HTTPException(status_code=404, detail="Partner not found")
@@ -352,13 +353,13 @@ async def get_widget_html(partner_id: str, db: Session = Depends(get_db)):
     return HTMLResponse(content=widget_html)
 
 @router.get("/{partner_id}/embed.js")
-async def get_widget_js(partner_id: str, request: Request, db: Session = Depends(get_db)):
+async def get_widget_js(partner_id: str, request: Request, db: AsyncSession = Depends(get_async_db)):
     """JavaScript for embedding widget in iframe"""
     
-    partner = db.query(Partner).filter(
+    partner = await db.scalar(select(Partner).where(
         Partner.partner_id == partner_id,
         Partner.is_active == True
-    ).first()
+    ))
     
     if not partner:
         raise HTTPException(status_code=404, detail="Partner not found")
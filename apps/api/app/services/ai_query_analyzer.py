@@ -3,24 +3,160 @@ import httpx
 import json
 import re
 import os
+import time
+import asyncio
 from dotenv import load_dotenv
 
+from .llm_budget import spend_llm_call, LLMBudgetExceeded
+from .hedged_analysis import hedge_stats, HEDGE_CONFIDENCE, ANALYSIS_DEADLINE
+from .intent_classifier import get_intent_classifier, INTENT_CONFIDENCE
+from .single_flight import llm_single_flight, prompt_key
+from .upstream_guard import (
+    upstream_guard, estimate_tokens, parse_retry_after, UpstreamError, UpstreamUnavailable, OPENAI_BASE_URL,
+    OPENAI_TIMEOUT
+)
+from .prompt_builder import PromptBuilder, PromptSection
+from .tracing import tracer, record_llm_usage
+
 # Load environment variables
 load_dotenv()
 
+ANALYSIS_TYPES = [
+    "full_project_estimate", "material_and_labor", "price_comparison", "painting_specific",
+    "electrical_work", "groundwork", "flooring_work", "carpentry_work", "roofing_cladding_work",
+    "insulation_work", "windows_doors_work", "detailed_breakdown", "quote_request",
+    "project_registration", "about_househacker", "needs_clarification"
+]
+PROJECT_TYPES = [
+    "bad_komplett", "kjøkken_detaljert", "maling", "elektriker_arbeid", "gulvarbeider", "vinduer_dorer",
+    "tomrer_bygg", "tak_ytterkledning", "isolasjon_tetting", "grunnarbeider", "needs_clarification"
+]
+
+# Analyses that can't be priced without an area, whatever the classifier says
+AREA_PRICED = {"painting_specific", "flooring_work", "bad_komplett"}
+
+# Session context parts naming the project under discussion; the contextual follow-up
+# depends on them, so they lead the context and are the last to be cut from the prompt
+CONTEXT_PROJECT = re.compile(r"(?:Current project|Project):", re.IGNORECASE)
+
+# Structured-output schema for the fused call: the analysis plus everything a
+# clarification turn needs, so the turn costs one completion instead of three
+FUSED_ANALYSIS_SCHEMA = {
+    "name": "renovation_turn",
+    "strict": True,
+    "schema": {
+        "type": "object",
+        "additionalProperties": False,
+        "required": [
+            "type", "project_type", "area", "quantity", "room_type", "requirements", "preferences",
+            "missing_info", "is_ambiguous", "confidence", "reasoning", "followup_questions", "followup_message"
+        ],
+        "properties": {
+            "type": {"type": "string", "enum": ANALYSIS_TYPES},
+            "project_type": {"type": "string", "enum": PROJECT_TYPES},
+            "area": {"type": ["number", "null"]},
+            "quantity": {"type": ["integer", "null"]},
+            "room_type": {"type": ["string", "null"]},
+            "requirements": {"type": "array", "items": {"type": "string"}},
+            "preferences": {
+                "type": "object",
+                "additionalProperties": False,
+                "required": ["quality", "brands"],
+                "properties": {
+                    "quality": {"type": ["string", "null"], "enum": ["budget", "mid", "premium", None]},
+                    "brands": {"type": "array", "items": {"type": "string"}}
+                }
+            },
+            "missing_info": {"type": "array", "items": {"type": "string"}},
+            "is_ambiguous": {"type": "boolean"},
+            "confidence": {"type": "number"},
+            "reasoning": {"type": "string"},
+            "followup_questions": {"type": "array", "items": {"type": "string"}},
+            "followup_message": {"type": "string"}
+        }
+    }
+}
+
+# Prompt text is constant so every request starts with the same prefix; only the
+# context and query blocks at the end vary
+ANALYSIS_INSTRUCTIONS = """Analyze the Norwegian renovation query at the end and respond with JSON only.
+
+IMPORTANT: If context shows we're discussing a specific project type (e.g., Project: bad), and the query contains size/quality details (e.g., "5 kvm", "standard", "normal"), treat this as a response about that project type.
+
+Determine:
+1. Project type (bad_komplett, kjøkken_detaljert, maling, elektriker_arbeid, gulvarbeider, vinduer_dorer, tomrer_bygg, tak_ytterkledning, isolasjon_tetting, grunnarbeider)
+2. Analysis type (full_project_estimate, material_and_labor, price_comparison, painting_specific, electrical_work, groundwork, flooring_work, carpentry_work, roofing_cladding_work, insulation_work, windows_doors_work, detailed_breakdown, quote_request, project_registration, about_househacker, needs_clarification)
+3. Area/quantity if mentioned
+4. Specific requirements or preferences
+5. Missing information needed for accurate estimate
+6. Whether query is ambiguous and needs clarification
+
+Respond with this exact JSON structure:
+{
+    "type": "analysis_type_here",
+    "project_type": "project_type_here", 
+    "area": number_or_null,
+    "quantity": number_or_null,
+    "room_type": "room_name_or_null",
+    "requirements": ["list", "of", "requirements"],
+    "preferences": {"quality": "budget/mid/premium", "brands": []},
+    "missing_info": ["what", "info", "is", "needed"],
+    "is_ambiguous": true_or_false,
+    "confidence": 0.0_to_1.0,
+    "reasoning": "brief explanation"
+}
+
+Examples:
+- "male stue og gang 45 kvm" → type: "painting_specific", project_type: "maling", area: 45, room_type: "stue_gang"
+- "bytte 5 dører" → type: "needs_clarification", is_ambiguous: true, missing_info: ["door_type", "interior_or_exterior"]
+- "pusse opp bad 6 kvm" → type: "full_project_estimate", project_type: "bad_komplett", area: 6, room_type: "bad"
+- "parkett hele leiligheten" → type: "flooring_work", project_type: "gulvarbeider", missing_info: ["total_area"]
+- With context "Project: bad" and query "Normal standard og 5 kvm" → type: "full_project_estimate", project_type: "bad_komplett", area: 5, preferences: {"quality": "mid"}"""
+
+FUSED_FOLLOWUP_INSTRUCTIONS = """If the query is ambiguous or information is missing, also fill in:
+- "followup_questions": 2-3 short, specific questions in Norwegian that ask for the missing information
+- "followup_message": one friendly, down-to-earth reply in Norwegian to the customer that asks the single most important question
+Otherwise return an empty list and an empty string for these two fields."""
+
+FOLLOWUP_QUESTIONS_INSTRUCTIONS = """Generate 2-3 intelligent follow-up questions in Norwegian for the renovation query at the end.
+
+Generate practical, specific questions that help us provide accurate pricing. 
+Questions should be:
+- Short and clear
+- Focused on missing information
+- Professional tone
+- In Norwegian
+
+Respond with JSON array of questions:
+["question 1", "question 2", "question 3"]"""
+
+ANALYSIS_PROMPT = PromptBuilder(
+    "You are an expert renovation consultant analyzing Norwegian customer queries. Respond only with valid JSON.",
+    ANALYSIS_INSTRUCTIONS
+)
+FUSED_ANALYSIS_PROMPT = PromptBuilder(
+    "You are an expert renovation consultant for househacker analyzing Norwegian customer queries.",
+    ANALYSIS_INSTRUCTIONS + "\n\n" + FUSED_FOLLOWUP_INSTRUCTIONS
+)
+FOLLOWUP_QUESTIONS_PROMPT = PromptBuilder(
+    "You are a Norwegian renovation expert. Respond only with valid JSON array.",
+    FOLLOWUP_QUESTIONS_INSTRUCTIONS
+)
+
 class AIQueryAnalyzer:
     """
     AI-powered query analysis for renovation queries
     Replaces regex-based analysis with intelligent understanding
     """
     
-    def __init__(self, agent_name: str = "renovation"):
+    def __init__(self, agent_name: str = "renovation", base_url: str = None):
         # Load agent-specific API key and strip any whitespace/newlines
         api_key_env = f"OPENAI_API_KEY_{agent_name.upper()}"
         self.api_key = os.getenv(api_key_env)
         if self.api_key:
             self.api_key = self.api_key.strip()
         self.agent_name = agent_name
+        self.chat_url = f"{(base_url or OPENAI_BASE_URL).rstrip('/')}/chat/completions"
         # Don't require API key at init - allow fallback to regex analysis
     
     async def analyze_query(self, query: str, context: str = "") -> Dict[str, Any]:
@@ -34,50 +170,28 @@ class AIQueryAnalyzer:
             print("OpenAI API key not available, using fallback regex analysis")
             return self._fallback_regex_analysis(query)
         
-        # Build the AI prompt for query analysis
-        analysis_prompt = self._build_analysis_prompt(query, context)
-        
         try:
-            # Call OpenAI API for analysis
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    "https://api.openai.com/v1/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "model": "gpt-4o-mini",  # Fast and cost-effective
-                        "messages": [
-                            {
-                                "role": "system", 
-                                "content": "You are an expert renovation consultant analyzing Norwegian customer queries. Respond only with valid JSON."
-                            },
-                            {
-                                "role": "user", 
-                                "content": analysis_prompt
-                            }
-                        ],
-                        "temperature": 0.1,  # Low temperature for consistent analysis
-                        "max_tokens": 500
-                    }
-                )
-                
-                if response.status_code == 200:
-                    ai_response = response.json()
-                    analysis_text = ai_response["choices"][0]["message"]["content"]
-                    
-                    # Parse JSON response
-                    try:
-                        analysis = json.loads(analysis_text)
-                        return self._validate_and_enhance_analysis(analysis, query)
-                    except json.JSONDecodeError:
-                        # Fallback to regex if AI response is invalid
-                        return self._fallback_regex_analysis(query, context)
-                else:
-                    # Fallback to regex if API fails
-                    return self._fallback_regex_analysis(query, context)
+            analysis_text = await self._chat_completion(
+                "analysis",
+                self._analysis_messages(ANALYSIS_PROMPT, query, context),
+                temperature=0.1,  # Low temperature for consistent analysis
+                max_tokens=500
+            )
+            if analysis_text is None:
+                # Fallback to regex if API fails
+                return self._fallback_regex_analysis(query, context)
+            
+            # Parse JSON response
+            try:
+                analysis = json.loads(analysis_text)
+                return self._validate_and_enhance_analysis(analysis, query)
+            except json.JSONDecodeError:
+                # Fallback to regex if AI response is invalid
+                return self._fallback_regex_analysis(query, context)
                     
+        except (LLMBudgetExceeded, UpstreamUnavailable) as e:
+            print(f"AI analysis skipped: {e}")
+            return self._fallback_regex_analysis(query, context)
         except Exception as e:
             print(f"AI analysis failed: {e}")
             print(f"Query: {query}")
@@ -87,48 +201,163 @@ class AIQueryAnalyzer:
             # Fallback to regex analysis
             return self._fallback_regex_analysis(query, context)
     
-    def _build_analysis_prompt(self, query: str, context: str) -> str:
-        """Build prompt for AI analysis"""
+    async def analyze_with_followup(self, query: str, context: str = "") -> Dict[str, Any]:
+        """
+        Fused analysis: the structured analysis, follow-up questions and a conversational
+        follow-up message from ONE schema-constrained completion. The follow-up fields
+        ("followup_questions", "followup_message") are empty when nothing is missing.
+        """
+        if not self.api_key:
+            print("OpenAI API key not available, using fallback regex analysis")
+            return self._fallback_regex_analysis(query, context)
         
-        prompt = f"""Analyze this Norwegian renovation query and respond with JSON only:
-
-Query: "{query}"
-{f"Context: {context}" if context else ""}
-
-IMPORTANT: If context shows we're discussing a specific project type (e.g., Project: bad), and the query contains size/quality details (e.g., "5 kvm", "standard", "normal"), treat this as a response about that project type.
-
-Determine:
-1. Project type (bad_komplett, kjøkken_detaljert, maling, elektriker_arbeid, gulvarbeider, vinduer_dorer, tomrer_bygg, tak_ytterkledning, isolasjon_tetting, grunnarbeider)
-2. Analysis type (full_project_estimate, material_and_labor, price_comparison, painting_specific, electrical_work, groundwork, flooring_work, carpentry_work, roofing_cladding_work, insulation_work, windows_doors_work, detailed_breakdown, quote_request, project_registration, about_househacker, needs_clarification)
-3. Area/quantity if mentioned
-4. Specific requirements or preferences
-5. Missing information needed for accurate estimate
-6. Whether query is ambiguous and needs clarification
-
-Respond with this exact JSON structure:
-{{
-    "type": "analysis_type_here",
-    "project_type": "project_type_here", 
-    "area": number_or_null,
-    "quantity": number_or_null,
-    "room_type": "room_name_or_null",
-    "requirements": ["list", "of", "requirements"],
-    "preferences": {{"quality": "budget/mid/premium", "brands": []}},
-    "missing_info": ["what", "info", "is", "needed"],
-    "is_ambiguous": true_or_false,
-    "confidence": 0.0_to_1.0,
-    "reasoning": "brief explanation"
-}}
-
-Examples:
-- "male stue og gang 45 kvm" → type: "painting_specific", project_type: "maling", area: 45, room_type: "stue_gang"
-- "bytte 5 dører" → type: "needs_clarification", is_ambiguous: true, missing_info: ["door_type", "interior_or_exterior"]
-- "pusse opp bad 6 kvm" → type: "full_project_estimate", project_type: "bad_komplett", area: 6, room_type: "bad"
-- "parkett hele leiligheten" → type: "flooring_work", project_type: "gulvarbeider", missing_info: ["total_area"]
-- With context "Project: bad" and query "Normal standard og 5 kvm" → type: "full_project_estimate", project_type: "bad_komplett", area: 5, preferences: {{"quality": "mid"}}
-"""
+        try:
+            analysis_text = await self._chat_completion(
+                "fused_analysis",
+                self._analysis_messages(FUSED_ANALYSIS_PROMPT, query, context),
+                temperature=0.1,
+                max_tokens=700,
+                response_format={"type": "json_schema", "json_schema": FUSED_ANALYSIS_SCHEMA}
+            )
+            if analysis_text is None:
+                return self._fallback_regex_analysis(query, context)
+            analysis = self._validate_and_enhance_analysis(json.loads(analysis_text), query)
+            analysis["fused"] = True
+            return analysis
+        except (LLMBudgetExceeded, UpstreamUnavailable) as e:
+            print(f"AI analysis skipped: {e}")
+        except Exception as e:
+            print(f"Fused AI analysis failed: {e}")
+        return self._fallback_regex_analysis(query, context)
+    
+    async def analyze_hedged(self, query: str, context: str = "", threshold: float = None,
+                             deadline: float = None) -> Dict[str, Any]:
+        """
+        Hedged analysis with bounded latency. The fused LLM analysis and the local analysis
+        start together; a local result the intent classifier accepted with calibrated
+        confidence is returned at once (the LLM request is cancelled), otherwise the LLM
+        gets until the deadline before the local result is used. The regex analysis'
+        own confidence is never trusted for an early answer. Outcomes and latencies go
+        to hedge_stats.
+        """
+        if not self.api_key:
+            return self._fallback_regex_analysis(query, context)
+        
+        threshold = HEDGE_CONFIDENCE if threshold is None else threshold
+        deadline = ANALYSIS_DEADLINE if deadline is None else deadline
+        started = time.perf_counter()
+        llm_task = asyncio.create_task(self.analyze_with_followup(query, context))
+        
+        # Runs before the task gets to send its request, so a local win costs no LLM call
+        local = self._local_analysis(query, context)
+        classifier = local.get("classifier") or {}
+        if classifier.get("accepted") and classifier["confidence"] >= threshold and not local.get("needs_clarification"):
+            llm_task.cancel()
+            return self._hedge_result(local, "local", started)
         
-        return prompt
+        try:
+            analysis = await asyncio.wait_for(llm_task, timeout=deadline)
+        except asyncio.TimeoutError:
+            print(f"AI analysis missed the {deadline}s deadline, using local analysis")
+            return self._hedge_result(local, "deadline", started)
+        return self._hedge_result(analysis, "llm" if analysis.get("fused") else "llm_fallback", started)
+    
+    def _local_analysis(self, query: str, context: str = "") -> Dict[str, Any]:
+        """
+        Regex analysis, upgraded by the local intent classifier when it is confident
+        about both type and project type and the query carries the measurements the
+        estimate needs. Takes well under a millisecond.
+        """
+        analysis = self._fallback_regex_analysis(query, context)
+        classifier = get_intent_classifier()
+        if classifier is None:
+            return analysis
+        
+        prediction = classifier.predict(query)
+        (analysis_type, type_confidence), (project_type, project_confidence) = prediction["type"], prediction["project_type"]
+        confidence = min(type_confidence, project_confidence)
+        analysis["classifier"] = {"type": analysis_type, "project_type": project_type, "confidence": round(confidence, 3)}
+        if confidence < INTENT_CONFIDENCE or analysis_type == "needs_clarification":
+            return analysis
+        
+        classified = self._validate_and_enhance_analysis({
+            **analysis,
+            "type": analysis_type,
+            "project_type": project_type,
+            "missing_info": [],
+            "is_ambiguous": False,
+            "confidence": confidence,
+            "reasoning": "Local intent classifier"
+        }, query)
+        if not classified.get("area") and (analysis_type in AREA_PRICED or project_type in AREA_PRICED):
+            return analysis
+        classified["classifier"] = {**analysis["classifier"], "accepted": True}
+        return classified
+    
+    def _hedge_result(self, analysis: Dict[str, Any], outcome: str, started: float) -> Dict[str, Any]:
+        hedge_stats.record(outcome, time.perf_counter() - started)
+        analysis["hedge_outcome"] = outcome
+        return analysis
+    
+    async def _chat_completion(self, purpose: str, messages: List[Dict[str, str]], temperature: float,
+                               max_tokens: int, response_format: Dict[str, Any] = None) -> Optional[str]:
+        """
+        One gpt-4o-mini chat completion, counted against the turn's LLM call budget.
+        Identical requests already in flight share one upstream call, which goes through
+        the model's upstream guard. Returns the message content, or None when the API
+        rejects the request; raises UpstreamUnavailable when the upstream can't be used.
+        """
+        spend_llm_call(purpose)
+        payload = {
+            "model": "gpt-4o-mini",  # Fast and cost-effective
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens
+        }
+        if response_format:
+            payload["response_format"] = response_format
+        guard = upstream_guard(payload["model"])
+        with tracer.span("llm.chat_completion", **{
+            "gen_ai.system": "openai", "gen_ai.request.model": payload["model"], "llm.purpose": purpose
+        }):
+            return await llm_single_flight.do(
+                prompt_key(**payload),
+                lambda: guard.call(lambda: self._post_chat(payload), estimate_tokens(messages, max_tokens))
+            )
+    
+    async def _post_chat(self, payload: Dict[str, Any]) -> Optional[str]:
+        try:
+            async with httpx.AsyncClient(timeout=OPENAI_TIMEOUT) as client:
+                response = await client.post(
+                    self.chat_url,
+                    headers={
+                        "Authorization": f"Bearer {self.api_key}",
+                        "Content-Type": "application/json"
+                    },
+                    json=payload
+                )
+        except httpx.TransportError as e:
+            raise UpstreamError(f"OpenAI request failed: {e}")
+        if response.status_code != 200:
+            error = UpstreamError(f"OpenAI returned {response.status_code}", response.status_code,
+                                  parse_retry_after(response.headers.get("retry-after")))
+            if error.retryable:
+                raise error
+            return None
+        body = response.json()
+        usage = body.get("usage") or {}
+        record_llm_usage(payload["model"], usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0))
+        return body["choices"][0]["message"]["content"]
+    
+    def _analysis_messages(self, prompt: PromptBuilder, query: str, context: str) -> List[Dict[str, str]]:
+        """Constant analysis prefix, then the session context (within budget) and the query"""
+        return prompt.messages(f'Query: "{query}"', self._context_section(context))
+    
+    def _context_section(self, context: str) -> PromptSection:
+        """The session context, project first, cut (not dropped) to what the budget leaves"""
+        parts = context.split(" | ") if context else []
+        parts.sort(key=lambda part: not CONTEXT_PROJECT.match(part))
+        return PromptSection("Context:", [" | ".join(parts)] if parts else [], truncate=True)
     
     def _validate_and_enhance_analysis(self, analysis: Dict[str, Any], query: str) -> Dict[str, Any]:
         """Validate and enhance AI analysis with fallback logic"""
@@ -224,11 +453,13 @@ Examples:
         }
         
         # Special handling for contextual responses
-        # If we have quality + small area (likely bathroom), assume bathroom project even without context
+        # If we have quality + small area (likely bathroom), assume bathroom project even without context,
+        # but only when neither the query nor the context names another kind of project
         has_quality = any(word in query_lower for word in ['standard', 'kvalitet', 'høy', 'enkel', 'normal'])
         has_small_area = bool(re.search(r'[1-9](?:[0-9])?(?:\.\d+)?\s*(?:m²|m2|kvadratmeter|kvm)', query_lower))  # 1-99 m²
+        other_project = analysis["project_type"] not in ("needs_clarification", "bad_komplett")
         
-        if has_quality and has_small_area:
+        if has_quality and has_small_area and not other_project:
             area_match = re.search(r'([1-9](?:[0-9])?(?:\.\d+)?)\s*(?:m²|m2|kvadratmeter|kvm)', query_lower)
             if area_match:
                 area_value = float(area_match.group(1))
@@ -340,7 +571,9 @@ Examples:
         
         if area_value:
             analysis["area"] = area_value
-            analysis["type"] = "full_project_estimate"
+            # Keep a specific type (painting, flooring, ...) found above
+            if analysis["type"] == "needs_clarification":
+                analysis["type"] = "full_project_estimate"
             analysis["confidence"] = 0.8
             
             # If we also detect quality level, this is a complete response
@@ -348,7 +581,6 @@ Examples:
                 analysis["quality_level"] = self._extract_quality_level(query_lower)
                 analysis["needs_clarification"] = False
                 analysis["is_ambiguous"] = False
-                analysis["type"] = "full_project_estimate"
                 analysis["confidence"] = 0.9
         
         # Extract quantity
@@ -371,48 +603,25 @@ Examples:
         if not self.api_key:
             return self._generate_fallback_questions(analysis)
         
-        prompt = f"""Generate 2-3 intelligent follow-up questions in Norwegian for this renovation query:
-
-Query: "{query}"
-Context: {context}
-Missing info: {analysis.get('missing_info', [])}
-Project type: {analysis.get('project_type', 'unknown')}
-
-Generate practical, specific questions that help us provide accurate pricing. 
-Questions should be:
-- Short and clear
-- Focused on missing information
-- Professional tone
-- In Norwegian
-
-Respond with JSON array of questions:
-["question 1", "question 2", "question 3"]
-"""
+        messages = FOLLOWUP_QUESTIONS_PROMPT.messages(
+            f"Missing info: {analysis.get('missing_info', [])}\n"
+            f"Project type: {analysis.get('project_type', 'unknown')}\n"
+            f'Query: "{query}"',
+            self._context_section(context)
+        )
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    "https://api.openai.com/v1/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "model": "gpt-4o-mini",
-                        "messages": [
-                            {"role": "system", "content": "You are a Norwegian renovation expert. Respond only with valid JSON array."},
-                            {"role": "user", "content": prompt}
-                        ],
-                        "temperature": 0.3,
-                        "max_tokens": 200
-                    }
-                )
-                
-                if response.status_code == 200:
-                    ai_response = response.json()
-                    questions_text = ai_response["choices"][0]["message"]["content"]
-                    return json.loads(questions_text)
+            questions_text = await self._chat_completion(
+                "followup_questions",
+                messages,
+                temperature=0.3,
+                max_tokens=200
+            )
+            if questions_text is not None:
+                return json.loads(questions_text)
                     
+        except (LLMBudgetExceeded, UpstreamUnavailable) as e:
+            print(f"AI follow-up questions skipped: {e}")
         except Exception as e:
             print(f"Failed to generate follow-up questions: {e}")
         
@@ -0,0 +1,236 @@
+from typing import Dict, Any, List, Optional
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy import func, case
+from datetime import datetime, date, timedelta
+
+from ..models.analytics import ConversationDailyRollup
+from ..models.conversation import ConversationSession, ConversationMessage
+from ..database import SessionLocal
+
+class AnalyticsRollupService:
+    """
+    Maintains per-day, per-partner and per-project_type conversation counters
+    so analytics endpoints never have to scan the raw message tables
+    """
+
+    COUNTERS = [
+        "messages", "responses", "pricing_hits", "registrations",
+        "conversations", "registered_conversations",
+        "response_time_sum", "response_time_count"
+    ]
+
+    def __init__(self, db: Session = None):
+        self.db = db or SessionLocal()
+
+    @staticmethod
+    def _normalize_key(day: date, partner_id: Optional[str], project_type: Optional[str], ai_powered: bool) -> Dict[str, Any]:
+        """Build the rollup key with the same fallbacks used by backfill"""
+        return {
+            "day": day,
+            "partner_id": partner_id or "unknown",
+            "project_type": project_type or "unknown",
+            "ai_powered": bool(ai_powered)
+        }
+
+    def _get_or_create_row(self, key: Dict[str, Any]) -> ConversationDailyRollup:
+        """Find the rollup row for a key, creating it if needed"""
+        row = self.db.query(ConversationDailyRollup).filter_by(**key).first()
+        if row:
+            return row
+
+        try:
+            # Savepoint so a concurrent insert of the same key doesn't abort the caller's transaction
+            with self.db.begin_nested():
+                row = ConversationDailyRollup(**key, **{counter: 0 for counter in self.COUNTERS})
+                self.db.add(row)
+            return row
+        except IntegrityError:
+            return self.db.query(ConversationDailyRollup).filter_by(**key).one()
+
+    def _increment(self, key: Dict[str, Any], **deltas):
+        """Atomically add deltas to the counters of a rollup row (no commit)"""
+        row = self._get_or_create_row(key)
+        for counter, delta in deltas.items():
+            if delta:
+                # SQL-side increment keeps concurrent writers from losing updates
+                setattr(row, counter, getattr(ConversationDailyRollup, counter) + delta)
+        row.updated_at = datetime.utcnow()
+
+    def record_exchange(
+        self,
+        session: ConversationSession,
+        message: ConversationMessage,
+        first_message: bool = False,
+        newly_registered: bool = False
+    ):
+        """Add a freshly logged message exchange to the rollups (caller commits)"""
+        created_at = message.created_at or datetime.utcnow()
+        key = self._normalize_key(
+            created_at.date(),
+            session.partner_id if session else None,
+            message.project_type_detected,
+            message.ai_powered
+        )
+
+        self._increment(
+            key,
+            messages=1,
+            pricing_hits=1 if message.led_to_pricing else 0,
+            registrations=1 if message.led_to_registration else 0,
+            conversations=1 if first_message else 0,
+            registered_conversations=1 if newly_registered and first_message else 0
+        )
+
+        if newly_registered and not first_message:
+            # Conversations are attributed to the key of their opening message (as in backfill)
+            opening = self.db.query(ConversationMessage).filter(
+                ConversationMessage.session_id == message.session_id,
+                ConversationMessage.message_order == 1
+            ).first()
+            if opening:
+                opening_key = self._normalize_key(
+                    (opening.created_at or created_at).date(),
+                    session.partner_id if session else None,
+                    opening.project_type_detected,
+                    opening.ai_powered
+                )
+                self._increment(opening_key, registered_conversations=1)
+
+    def record_user_response(
+        self,
+        session: Optional[ConversationSession],
+        message: ConversationMessage,
+        response_time_seconds: float = None
+    ):
+        """Count a user reply to a previously logged message (caller commits)"""
+        created_at = message.created_at or datetime.utcnow()
+        key = self._normalize_key(
+            created_at.date(),
+            session.partner_id if session else None,
+            message.project_type_detected,
+            message.ai_powered
+        )
+
+        self._increment(
+            key,
+            responses=1,
+            response_time_sum=response_time_seconds or 0.0,
+            response_time_count=1 if response_time_seconds else 0
+        )
+
+    def backfill(self, start_day: date = None, end_day: date = None) -> Dict[str, Any]:
+        """
+        Rebuild rollups from the raw message history.
+        Existing rollup rows in the range are replaced.
+        """
+        day_expr = func.date(ConversationMessage.created_at)
+        is_first = ConversationMessage.message_order == 1
+
+        query = self.db.query(
+            day_expr.label("day"),
+            func.coalesce(ConversationSession.partner_id, "unknown").label("partner_id"),
+            func.coalesce(func.nullif(ConversationMessage.project_type_detected, ""), "unknown").label("project_type"),
+            func.coalesce(ConversationMessage.ai_powered, False).label("ai_powered"),
+            func.count(ConversationMessage.id).label("messages"),
+            func.sum(case((ConversationMessage.user_responded == True, 1), else_=0)).label("responses"),
+            func.sum(case((ConversationMessage.led_to_pricing == True, 1), else_=0)).label("pricing_hits"),
+            func.sum(case((ConversationMessage.led_to_registration == True, 1), else_=0)).label("registrations"),
+            func.sum(case((is_first, 1), else_=0)).label("conversations"),
+            func.sum(case(((is_first) & (ConversationSession.led_to_registration == True), 1), else_=0)).label("registered_conversations"),
+            func.coalesce(func.sum(ConversationMessage.user_response_time_seconds), 0.0).label("response_time_sum"),
+            func.count(ConversationMessage.user_response_time_seconds).label("response_time_count")
+        ).outerjoin(
+            ConversationSession, ConversationSession.session_id == ConversationMessage.session_id
+        )
+
+        delete_query = self.db.query(ConversationDailyRollup)
+        if start_day:
+            query = query.filter(ConversationMessage.created_at >= datetime.combine(start_day, datetime.min.time()))
+            delete_query = delete_query.filter(ConversationDailyRollup.day >= start_day)
+        if end_day:
+            query = query.filter(ConversationMessage.created_at < datetime.combine(end_day + timedelta(days=1), datetime.min.time()))
+            delete_query = delete_query.filter(ConversationDailyRollup.day <= end_day)
+
+        rows = query.group_by("day", "partner_id", "project_type", "ai_powered").all()
+
+        deleted = delete_query.delete(synchronize_session=False)
+
+        merged: Dict[tuple, Dict[str, Any]] = {}
+        for row in rows:
+            day_value = row.day
+            if isinstance(day_value, str):  # SQLite returns date() as text
+                day_value = date.fromisoformat(day_value)
+            key = (day_value, row.partner_id, row.project_type, bool(row.ai_powered))
+
+            # NULL and False ai_powered collapse into the same key
+            counters = merged.setdefault(key, {counter: 0 for counter in self.COUNTERS})
+            for counter in self.COUNTERS:
+                counters[counter] += getattr(row, counter) or 0
+
+        self.db.bulk_insert_mappings(ConversationDailyRollup, [
+            {
+                "day": key[0],
+                "partner_id": key[1],
+                "project_type": key[2],
+                "ai_powered": key[3],
+                "updated_at": datetime.utcnow(),
+                **counters
+            }
+            for key, counters in merged.items()
+        ])
+        self.db.commit()
+
+        return {
+            "rows_deleted": deleted,
+            "rows_written": len(merged),
+            "start_day": start_day.isoformat() if start_day else None,
+            "end_day": end_day.isoformat() if end_day else None
+        }
+
+    def _summary_rows(self, days: int, partner_id: str = None) -> List[Any]:
+        """Aggregate rollups for the period grouped by AI flag and project type"""
+        cutoff_day = (datetime.utcnow() - timedelta(days=days)).date()
+
+        query = self.db.query(
+            ConversationDailyRollup.ai_powered,
+            ConversationDailyRollup.project_type,
+            *[func.sum(getattr(ConversationDailyRollup, counter)).label(counter) for counter in self.COUNTERS]
+        ).filter(ConversationDailyRollup.day >= cutoff_day)
+
+        if partner_id:
+            query = query.filter(ConversationDailyRollup.partner_id == partner_id)
+
+        return query.group_by(
+            ConversationDailyRollup.ai_powered,
+            ConversationDailyRollup.project_type
+        ).all()
+
+    def get_summary(self, days: int = 30, partner_id: str = None) -> Dict[str, Any]:
+        """Totals for the period, split by AI flag and project type"""
+        rows = self._summary_rows(days, partner_id)
+
+        totals = {counter: 0 for counter in self.COUNTERS}
+        by_ai = {True: dict(totals), False: dict(totals)}
+        project_types: Dict[str, int] = {}
+
+        for row in rows:
+            bucket = by_ai[bool(row.ai_powered)]
+            for counter in self.COUNTERS:
+                value = getattr(row, counter) or 0
+                totals[counter] += value
+                bucket[counter] += value
+            if row.project_type != "unknown":
+                project_types[row.project_type] = project_types.get(row.project_type, 0) + (row.messages or 0)
+
+        return {
+            "totals": totals,
+            "ai": by_ai[True],
+            "non_ai": by_ai[False],
+            "project_types": project_types
+        }
+
+    def close(self):
+        """Close database connection"""
+        if self.db:
+            self.db.close()
@@ -0,0 +1,37 @@
+from typing import Any, Callable, Type
+from sqlalchemy.ext.asyncio import AsyncSession
+import inspect
+
+def _run_inline(coro) -> Any:
+    """Run a coroutine that never suspends (sync DB work behind async def) to completion"""
+    try:
+        coro.send(None)
+    except StopIteration as stop:
+        return stop.value
+    coro.close()
+    raise RuntimeError("Service coroutine suspended - it can't be run through AsyncService")
+
+class AsyncService:
+    """
+    Compatibility shim that lets routes holding an AsyncSession call the existing
+    Session-based services. Every method call becomes awaitable and runs on the
+    AsyncSession's connection via run_sync, so the driver I/O stays non-blocking.
+
+        analytics = await AsyncService(db, ConversationLearningService).get_conversation_analytics(days=7)
+    """
+
+    def __init__(self, db: AsyncSession, service_cls: Type, **service_kwargs):
+        self.db = db
+        self.service_cls = service_cls
+        self.service_kwargs = service_kwargs
+
+    def __getattr__(self, name: str) -> Callable:
+        async def call(*args, **kwargs):
+            def invoke(sync_db):
+                service = self.service_cls(sync_db, **self.service_kwargs)
+                result = getattr(service, name)(*args, **kwargs)
+                if inspect.iscoroutine(result):
+                    result = _run_inline(result)
+                return result
+            return await self.db.run_sync(invoke)
+        return call
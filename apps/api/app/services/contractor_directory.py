@@ -0,0 +1,264 @@
+from typing import Dict, Any, List, Optional, Iterable, Tuple
+import json
+import re
+import time
+import weakref
+
+from sqlalchemy.orm import Session
+from sqlalchemy import event, select, and_
+
+from ..models.pricing import ServiceType, PricingData, Contractor, ContractorSpecialty, ContractorLocation
+from ..database import SessionLocal
+from .region_service import RegionService, RegionResolver
+
+# Contractors further away than this are not offered for a lead
+DEFAULT_MAX_DISTANCE_KM = 100.0
+
+# One index per engine, dropped whenever a commit touches the directory
+_indexes = weakref.WeakKeyDictionary()
+
+_CHANGED = "contractor_directory_changed"
+_POSTCODE = re.compile(r"(?<!\d)(\d{4})(?!\d)")
+
+class ContractorIndex:
+    """
+    In-memory inverted index: service -> region -> contractors, plus each contractor's
+    price range per service. Built from a single joined query.
+    """
+
+    def __init__(self, rows: Iterable[Any]):
+        self.services: Dict[str, Tuple[int, str]] = {}
+        self.contractors: Dict[int, Dict[str, Any]] = {}
+        self.by_service: Dict[int, Dict[str, Dict[int, Optional[int]]]] = {}
+        self.prices: Dict[Tuple[int, int], Tuple[Optional[float], Optional[float]]] = {}
+
+        for row in rows:
+            self.services[row.service_name] = (row.service_type_id, row.unit)
+            self.contractors.setdefault(row.id, {
+                "name": row.name,
+                "company_type": row.company_type,
+                "location": row.location,
+                "website": row.website,
+                "phone": row.phone,
+                "verified": bool(row.verified)
+            })
+
+            postcode = int(row.postcode) if row.postcode and row.postcode.isdigit() else None
+            self.by_service.setdefault(row.service_type_id, {}).setdefault(row.region_code, {})[row.id] = postcode
+
+            # Several price rows for the same contractor and service widen the range
+            key = (row.id, row.service_type_id)
+            low, high = self.prices.get(key, (None, None))
+            if row.min_price is not None:
+                low = row.min_price if low is None else min(low, row.min_price)
+            if row.max_price is not None:
+                high = row.max_price if high is None else max(high, row.max_price)
+            self.prices[key] = (low, high)
+
+    def match(self, service_type_id: int, resolver: RegionResolver, target: str,
+              max_distance_km: Optional[float] = DEFAULT_MAX_DISTANCE_KM,
+              limit: int = None) -> List[Dict[str, Any]]:
+        """
+        Contractors offering a service, nearest first: region-centre distance, then
+        postcode distance within the region, then verified before unverified
+        """
+        target_code = resolver.resolve(target)
+        if target_code is None:
+            return []
+        postcode_match = _POSTCODE.search(str(target))
+        target_postcode = int(postcode_match.group(1)) if postcode_match else None
+
+        best: Dict[int, Tuple] = {}
+        for region_code, contractors in self.by_service.get(service_type_id, {}).items():
+            # One distance per region bucket, not per contractor
+            distance = 0.0 if region_code == target_code else resolver.distance_km(target_code, region_code)
+            if max_distance_km is not None and (distance is None or distance > max_distance_km):
+                continue
+
+            for contractor_id, postcode in contractors.items():
+                postcode_gap = abs(postcode - target_postcode) if postcode is not None and target_postcode is not None else 10000
+                rank = (distance if distance is not None else float("inf"), postcode_gap,
+                        not self.contractors[contractor_id]["verified"], contractor_id)
+                if contractor_id not in best or rank < best[contractor_id][0]:
+                    best[contractor_id] = (rank, region_code, postcode, distance)
+
+        ranked = sorted(best.values())[:limit] if limit else sorted(best.values())
+        return [
+            {
+                "id": rank[-1],
+                "region_code": region_code,
+                "postcode": f"{postcode:04d}" if postcode is not None else None,
+                "distance_km": round(distance, 1) if distance is not None else None,
+                "price_range": self.prices.get((rank[-1], service_type_id), (None, None))
+            }
+            for rank, region_code, postcode, distance in ranked
+        ]
+
+class ContractorDirectory:
+    """Contractor lookup for leads, served from the cached ContractorIndex"""
+
+    def __init__(self, db: Session = None):
+        self.db = db or SessionLocal()
+
+    def _load(self) -> ContractorIndex:
+        """The one joined query behind the index"""
+        return ContractorIndex(self.db.execute(
+            select(
+                Contractor.id, Contractor.name, Contractor.company_type, Contractor.location,
+                Contractor.website, Contractor.phone, Contractor.verified,
+                ServiceType.id.label("service_type_id"), ServiceType.name.label("service_name"), ServiceType.unit,
+                ContractorLocation.region_code, ContractorLocation.postcode,
+                PricingData.min_price, PricingData.max_price
+            )
+            .join(ContractorSpecialty, ContractorSpecialty.contractor_id == Contractor.id)
+            .join(ServiceType, ServiceType.id == ContractorSpecialty.service_type_id)
+            .join(ContractorLocation, ContractorLocation.contractor_id == Contractor.id)
+            .outerjoin(PricingData, and_(
+                PricingData.contractor_id == Contractor.id,
+                PricingData.service_type_id == ContractorSpecialty.service_type_id
+            ))
+        ))
+
+    def index(self) -> ContractorIndex:
+        """The cached index for this session's engine"""
+        bind = self.db.get_bind()
+        index = _indexes.get(bind)
+        if index is None:
+            index = _indexes[bind] = self._load()
+        return index
+
+    def invalidate(self):
+        """Drop the cached index (needed after bulk/Core writes, which the session hooks don't see)"""
+        _indexes.pop(self.db.get_bind(), None)
+
+    def find(self, service_name: str, target: str, max_distance_km: Optional[float] = DEFAULT_MAX_DISTANCE_KM,
+             limit: int = None) -> List[Dict[str, Any]]:
+        """Contractors for a service near a region, postcode or address, nearest first"""
+        index = self.index()
+        service = index.services.get(service_name)
+        if service is None:
+            return []
+        service_type_id, unit = service
+        resolver = RegionService(self.db).resolver()
+
+        results = []
+        for match in index.match(service_type_id, resolver, target, max_distance_km, limit):
+            low, high = match.pop("price_range")
+            contractor = index.contractors[match["id"]]
+            results.append({
+                **contractor,
+                **match,
+                "region": resolver.names.get(match["region_code"]),
+                "price_range": f"{low}-{high} kr/{unit}" if low is not None and high is not None else "Kontakt for pris"
+            })
+        return results
+
+    def link_price(self, contractor: Contractor, service_type_id: int, region: str = None) -> bool:
+        """
+        Add the specialty (and, if the contractor has none, the location) a new price row
+        for the contractor implies, so it is matched at once instead of after the next
+        sync_legacy_fields. The location comes from Contractor.location, else the price's
+        region. Doesn't commit; True if a row was added.
+        """
+        added = False
+        if self.db.get(ContractorSpecialty, (contractor.id, service_type_id)) is None:
+            self.db.add(ContractorSpecialty(contractor_id=contractor.id, service_type_id=service_type_id))
+            added = True
+
+        located = self.db.execute(
+            select(ContractorLocation.id).where(ContractorLocation.contractor_id == contractor.id).limit(1)
+        ).first()
+        if located is None:
+            resolver = RegionService(self.db).resolver()
+            place = contractor.location if contractor.location and resolver.resolve(contractor.location) else region
+            region_code = resolver.resolve(place) if place else None
+            if region_code:
+                postcode = _POSTCODE.search(place)
+                self.db.add(ContractorLocation(contractor_id=contractor.id, region_code=region_code,
+                                               postcode=postcode.group(1) if postcode else None))
+                added = True
+        return added
+
+    def sync_legacy_fields(self) -> Dict[str, Any]:
+        """
+        Fill contractor_specialties and contractor_locations from the legacy text columns
+        (Contractor.specialties as JSON or comma-separated names, Contractor.location as a
+        region name or address). Existing normalised rows are kept.
+        """
+        started = time.perf_counter()
+        resolver = RegionService(self.db).resolver()
+        service_ids = dict(self.db.execute(select(ServiceType.name, ServiceType.id)).all())
+        specialties = set(self.db.execute(select(ContractorSpecialty.contractor_id, ContractorSpecialty.service_type_id)).all())
+        located = set(self.db.execute(select(ContractorLocation.contractor_id)).scalars())
+
+        # Services a contractor already has prices for count as specialties too
+        priced = {}
+        for contractor_id, service_type_id in self.db.execute(
+            select(PricingData.contractor_id, PricingData.service_type_id).distinct().where(
+                PricingData.contractor_id.isnot(None), PricingData.service_type_id.isnot(None)
+            )
+        ):
+            priced.setdefault(contractor_id, set()).add(service_type_id)
+
+        added_specialties = added_locations = 0
+        for contractor in self.db.execute(select(Contractor)).scalars():
+            names = _specialty_names(contractor.specialties)
+            for service_type_id in {service_ids[name] for name in names if name in service_ids} | priced.get(contractor.id, set()):
+                if (contractor.id, service_type_id) not in specialties:
+                    self.db.add(ContractorSpecialty(contractor_id=contractor.id, service_type_id=service_type_id))
+                    specialties.add((contractor.id, service_type_id))
+                    added_specialties += 1
+
+            region_code = resolver.resolve(contractor.location)
+            if contractor.id not in located and region_code:
+                postcode = _POSTCODE.search(contractor.location)
+                self.db.add(ContractorLocation(contractor_id=contractor.id, region_code=region_code,
+                                               postcode=postcode.group(1) if postcode else None))
+                added_locations += 1
+
+        self.db.commit()
+        return {
+            "specialties": added_specialties,
+            "locations": added_locations,
+            "seconds": round(time.perf_counter() - started, 4)
+        }
+
+    def close(self):
+        """Close database connection"""
+        if self.db:
+            self.db.close()
+
+def _specialty_names(specialties: Optional[str]) -> List[str]:
+    """Service names from the legacy specialties column"""
+    if not specialties:
+        return []
+    try:
+        names = json.loads(specialties)
+    except ValueError:
+        names = specialties.split(",")
+    return [str(name).strip() for name in names if str(name).strip()]
+
+@event.listens_for(Session, "before_flush")
+def _track_directory_changes(session, flush_context, instances):
+    """Remember that this transaction changes something the contractor index is built from"""
+    if session.info.get(_CHANGED):
+        return
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, (Contractor, ContractorSpecialty, ContractorLocation, ServiceType)) or (
+            isinstance(obj, PricingData) and obj.contractor_id is not None
+        ):
+            session.info[_CHANGED] = True
+            return
+
+@event.listens_for(Session, "after_commit")
+def _refresh_on_change(session):
+    if session.info.pop(_CHANGED, False):
+        try:
+            _indexes.pop(session.get_bind(), None)
+        except Exception:
+            # Session without a single bind - drop every index
+            _indexes.clear()
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changes(session):
+    session.info.pop(_CHANGED, False)
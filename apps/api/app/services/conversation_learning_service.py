@@ -1,5 +1,6 @@
 from typing import Dict, Any, List, Optional
 from sqlalchemy.orm import Session
+from sqlalchemy import update, select, func
 from datetime import datetime, timedelta
 import json
 import re
@@ -7,6 +8,7 @@ from collections import Counter, defaultdict
 
 from ..models.conversation import ConversationSession, ConversationMessage, ConversationPattern
 from ..database import SessionLocal
+from .analytics_rollup_service import AnalyticsRollupService
 
 class ConversationLearningService:
     """
@@ -15,6 +17,7 @@ class ConversationLearningService:
     
     def __init__(self, db: Session = None):
         self.db = db or SessionLocal()
+        self.rollups = AnalyticsRollupService(self.db)
     
     async def log_conversation_start(
         self, 
@@ -65,15 +68,13 @@ class ConversationLearningService:
         if not session:
             session = await self.log_conversation_start(session_id, "unknown", "unknown")
         
-        # Get message order
-        message_count = self.db.query(ConversationMessage).filter(
-            ConversationMessage.session_id == session_id
-        ).count()
+        # Claim the next message order from the session counter
+        message_order = self._next_message_order(session_id)
         
         # Create message record
         message = ConversationMessage(
             session_id=session_id,
-            message_order=message_count + 1,
+            message_order=message_order,
             user_message=user_message,
             agent_response=agent_response,
             ai_powered=ai_powered,
@@ -89,10 +90,25 @@ class ConversationLearningService:
         self.db.add(message)
         
         # Update session stats
-        session.total_messages = message_count + 1
+        newly_registered = bool(led_to_registration and not session.led_to_registration)
         if led_to_registration:
             session.led_to_registration = True
         
+        # Keep the daily rollups in step with the raw log (same transaction). The savepoint
+        # limits a rollup failure to the rollup: on PostgreSQL a failed statement would
+        # otherwise abort the transaction and lose the exchange at commit
+        self.db.flush()
+        try:
+            with self.db.begin_nested():
+                self.rollups.record_exchange(
+                    session,
+                    message,
+                    first_message=message.message_order == 1,
+                    newly_registered=newly_registered
+                )
+        except Exception as e:
+            print(f"Rollup update failed: {e}")
+        
         self.db.commit()
         
         # Async pattern learning (don't block the response)
@@ -103,6 +119,26 @@ class ConversationLearningService:
         
         return message
     
+    def _next_message_order(self, session_id: str) -> int:
+        """
+        Atomically increment total_messages for the session and return the new value.
+        The row stays locked until the caller commits, so overlapping turns get distinct orders.
+        """
+        stmt = update(ConversationSession).where(
+            ConversationSession.session_id == session_id
+        ).values(
+            total_messages=func.coalesce(ConversationSession.total_messages, 0) + 1
+        )
+        
+        if self.db.get_bind().dialect.update_returning:
+            return self.db.execute(stmt.returning(ConversationSession.total_messages)).scalar_one()
+        
+        # No UPDATE ... RETURNING (e.g. MySQL): read back inside the same transaction
+        self.db.execute(stmt)
+        return self.db.execute(
+            select(ConversationSession.total_messages).where(ConversationSession.session_id == session_id)
+        ).scalar_one()
+    
     async def mark_user_responded(
         self, 
         session_id: str, 
@@ -115,9 +151,21 @@ class ConversationLearningService:
         ).order_by(ConversationMessage.message_order.desc()).first()
         
         if last_message:
+            already_counted = last_message.user_responded
             last_message.user_responded = True
             if response_time_seconds:
                 last_message.user_response_time_seconds = response_time_seconds
+            
+            if not already_counted:
+                self.db.flush()
+                try:
+                    with self.db.begin_nested():
+                        self.rollups.record_user_response(
+                            last_message.session, last_message, response_time_seconds
+                        )
+                except Exception as e:
+                    print(f"Rollup update failed: {e}")
+            
             self.db.commit()
     
     async def _analyze_and_learn_patterns(self, message: ConversationMessage):
@@ -266,6 +314,16 @@ class ConversationLearningService:
     async def get_improved_ai_prompt(self, project_type: str) -> str:
         """Generate improved AI prompt based on learned patterns"""
         
+        examples = await self.get_learned_pattern_examples(project_type)
+        if not examples:
+            return ""
+        
+        # Build improved prompt section
+        return "\n".join([f"\nLEARNED PATTERNS FOR {project_type.upper()}:", *(f"\n{example}" for example in examples)])
+    
+    async def get_learned_pattern_examples(self, project_type: str) -> List[str]:
+        """Prompt examples from learned patterns, most successful first (one string per pattern)"""
+        
         # Get patterns for this project type
         patterns = self.db.query(ConversationPattern).filter(
             ConversationPattern.project_type == project_type,
@@ -273,49 +331,47 @@ class ConversationLearningService:
             ConversationPattern.times_seen >= 3  # Only use patterns seen multiple times
         ).order_by(ConversationPattern.success_rate.desc()).limit(5).all()
         
-        if not patterns:
-            return ""
-        
-        # Build improved prompt section
-        prompt_additions = [f"\nLEARNED PATTERNS FOR {project_type.upper()}:"]
-        
+        examples = []
         for pattern in patterns:
             sample_queries = pattern.get_sample_queries()
             sample_responses = pattern.get_sample_responses()
             
             if sample_queries and sample_responses:
-                prompt_additions.append(f"\nWhen user says something like: {', '.join(sample_queries[:3])}")
-                prompt_additions.append(f"Good follow-up questions: {', '.join(sample_responses[:2])}")
-                prompt_additions.append(f"Success rate: {pattern.success_rate:.1%} ({pattern.times_seen} times)")
+                examples.append("\n".join([
+                    f"When user says something like: {', '.join(sample_queries[:3])}",
+                    f"Good follow-up questions: {', '.join(sample_responses[:2])}",
+                    f"Success rate: {pattern.success_rate:.1%} ({pattern.times_seen} times)"
+                ]))
         
-        return "\n".join(prompt_additions)
+        return examples
     
-    async def get_conversation_analytics(self, days: int = 30) -> Dict[str, Any]:
-        """Get conversation analytics for the last N days"""
+    async def get_conversation_analytics(self, days: int = 30, partner_id: str = None) -> Dict[str, Any]:
+        """Get conversation analytics for the last N days (served from daily rollups)"""
         
         cutoff_date = datetime.utcnow() - timedelta(days=days)
         
-        # Get sessions
-        sessions = self.db.query(ConversationSession).filter(
-            ConversationSession.started_at >= cutoff_date
-        ).all()
-        
-        # Get messages
-        messages = self.db.query(ConversationMessage).filter(
-            ConversationMessage.created_at >= cutoff_date
-        ).all()
+        summary = self.rollups.get_summary(days=days, partner_id=partner_id)
+        totals = summary["totals"]
         
         # Calculate metrics
-        total_conversations = len(sessions)
-        total_messages = len(messages)
-        ai_powered_messages = len([m for m in messages if m.ai_powered])
-        registrations = len([s for s in sessions if s.led_to_registration])
+        total_conversations = totals["conversations"]
+        total_messages = totals["messages"]
+        ai_powered_messages = summary["ai"]["messages"]
+        registrations = totals["registered_conversations"]
         
         # Project type distribution
-        project_types = Counter([m.project_type_detected for m in messages if m.project_type_detected])
+        project_types = Counter(summary["project_types"])
         
-        # Most common user queries
-        user_queries = [m.user_message for m in messages if m.user_message]
+        # Sample of user queries (bounded read of a single column)
+        sample_query = self.db.query(ConversationMessage.user_message).filter(
+            ConversationMessage.created_at >= cutoff_date,
+            ConversationMessage.user_message.isnot(None)
+        )
+        if partner_id:
+            sample_query = sample_query.join(
+                ConversationSession, ConversationSession.session_id == ConversationMessage.session_id
+            ).filter(ConversationSession.partner_id == partner_id)
+        user_queries = [row.user_message for row in sample_query.limit(10).all()]
         
         return {
             "period_days": days,
@@ -0,0 +1,120 @@
+from typing import Dict, Any, Optional, Hashable
+from collections import OrderedDict
+import copy
+import os
+import threading
+import time
+import weakref
+
+from sqlalchemy.orm import Session
+from sqlalchemy import select, func
+
+from ..models.pricing import PricingData, MarketRate, PriceResolution, Region, PostcodeRange
+
+# Entries kept before the least recently used estimate is evicted
+DEFAULT_MAX_ENTRIES = int(os.getenv("ESTIMATE_CACHE_SIZE", "2048"))
+
+# How long a process trusts its catalog version before re-reading it. Price changes
+# made in this process invalidate immediately; other workers see them within this window.
+CATALOG_VERSION_TTL = float(os.getenv("CATALOG_VERSION_TTL", "30"))
+
+# The renovation agent prices everything in Oslo
+DEFAULT_REGION = "Oslo"
+
+# engine -> (version, read at)
+_versions = weakref.WeakKeyDictionary()
+
+class EstimateCache:
+    """Bounded, thread-safe LRU cache of finished estimates (stored and returned as copies)"""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return copy.deepcopy(value)
+
+    def put(self, key: Hashable, value: Dict[str, Any]):
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every entry and start the statistics over"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+            }
+
+def area_bucket(area: Optional[float]) -> Optional[float]:
+    """Round an area to the precision estimates are computed at (0.5 m² < 20 m², 1 m² < 100 m², else 5 m²)"""
+    if area is None:
+        return None
+    area = float(area)
+    step = 0.5 if area < 20 else 1.0 if area < 100 else 5.0
+    return round(area / step) * step
+
+def freeze(value: Any) -> Hashable:
+    """Hashable, order-independent form of analysis inputs (dicts, lists, sets)"""
+    if isinstance(value, dict):
+        return tuple(sorted((str(key), freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    if isinstance(value, set):
+        return tuple(sorted(freeze(item) for item in value))
+    return value
+
+def catalog_version(db: Session) -> str:
+    """
+    Changes whenever prices change: latest market-rate calculation, rate count, latest
+    price resolution, latest pricing_data update and the region/postcode range counts.
+    Re-read at most every CATALOG_VERSION_TTL.
+    """
+    bind = db.get_bind()
+    cached = _versions.get(bind)
+    if cached and time.monotonic() - cached[1] < CATALOG_VERSION_TTL:
+        return cached[0]
+
+    row = db.execute(select(
+        select(func.max(MarketRate.last_calculated)).scalar_subquery(),
+        select(func.count(MarketRate.id)).scalar_subquery(),
+        select(func.max(PriceResolution.resolved_at)).scalar_subquery(),
+        select(func.max(PricingData.last_updated)).scalar_subquery(),
+        select(func.count(Region.code)).scalar_subquery(),
+        select(func.count(PostcodeRange.id)).scalar_subquery()
+    )).one()
+    version = "|".join(str(value) for value in row)
+    _versions[bind] = (version, time.monotonic())
+    return version
+
+def invalidate_catalog_version():
+    """Force the next catalog_version() to re-read (called after prices are written)"""
+    _versions.clear()
+
+estimate_cache = EstimateCache()
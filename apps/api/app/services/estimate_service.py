@@ -0,0 +1,184 @@
+from typing import Dict, Any, Optional, List, Iterator
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import threading
+import time
+import os
+
+from pydantic import BaseModel, Field, ValidationError
+from sqlalchemy.orm import Session
+
+from ..database import SessionLocal
+from ..calculators import calculate_estimate, project_type_for, services_for, EstimateError
+from ..calculators.batch import calculate_batch
+from .pricing_service import PricingService
+from .region_service import RegionService
+from .estimate_cache import estimate_cache, catalog_version, freeze, DEFAULT_REGION
+
+MAX_BATCH_ITEMS = int(os.getenv("ESTIMATE_BATCH_MAX_ITEMS", "1000"))
+# Below this many uncached items the calculators run inline - spawning work onto
+# other processes costs more than pricing a few hundred estimates
+BATCH_PARALLEL_THRESHOLD = int(os.getenv("ESTIMATE_BATCH_PARALLEL_THRESHOLD", "256"))
+BATCH_WORKERS = int(os.getenv("ESTIMATE_BATCH_WORKERS", str(os.cpu_count() or 1)))
+
+class EstimateRequest(BaseModel):
+    project_type: str
+    area: Optional[float] = Field(None, gt=0)
+    quantity: Optional[int] = Field(None, gt=0)
+    quality: Optional[str] = None  # budget, mid or premium
+    region: str = DEFAULT_REGION  # region name, county, postcode or address
+    options: Dict[str, Any] = Field(default_factory=dict)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def _batch_pool() -> ProcessPoolExecutor:
+    """Shared worker processes for large batches (the calculators are CPU-bound Python)"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=BATCH_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(part) for part in e['loc']) or 'item'}: {e['msg']}" for e in error.errors())
+
+class EstimateBatch:
+    """
+    A batch whose prices are already loaded (EstimateService.prepare_batch). run() needs
+    no database: it prices the uncached items and yields one result per item in input order.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.results: Dict[int, Dict[str, Any]] = {}  # cached hits and rejected items
+        self.jobs: List[tuple] = []
+        self.keys: Dict[int, tuple] = {}
+        self.snapshots = {}
+
+    def _compute(self, workers: int) -> Iterator[list]:
+        if workers <= 1 or len(self.jobs) < BATCH_PARALLEL_THRESHOLD:
+            yield calculate_batch(self.snapshots, self.jobs)
+            return
+        chunk_size = -(-len(self.jobs) // (workers * 4))
+        chunks = [self.jobs[i:i + chunk_size] for i in range(0, len(self.jobs), chunk_size)]
+        # Chunks are contiguous and map() returns them in order, so results can stream
+        yield from _batch_pool().map(calculate_batch, [self.snapshots] * len(chunks), chunks)
+
+    def run(self, workers: int = None) -> Iterator[Dict[str, Any]]:
+        started = time.perf_counter()
+        done = dict(self.results)
+        errors = sum(1 for line in done.values() if line["status"] == "error")
+        next_index = 0
+
+        def ready():
+            nonlocal next_index
+            while next_index in done:
+                yield done.pop(next_index)
+                next_index += 1
+
+        yield from ready()
+        for chunk in self._compute(BATCH_WORKERS if workers is None else workers):
+            for index, estimate, error in chunk:
+                if error is not None:
+                    errors += 1
+                    done[index] = {"index": index, "status": "error", "error": error}
+                    continue
+                estimate_cache.put(self.keys[index], estimate)
+                done[index] = {"index": index, "status": "ok", "estimate": {**estimate, "cached": False}}
+            yield from ready()
+
+        yield {"done": True, "items": self.size, "errors": errors,
+               "seconds": round(time.perf_counter() - started, 4)}
+
+class EstimateService:
+    """
+    Structured estimates straight from the calculators - no LLM, no session state.
+    Results are cached per normalised request and catalog version.
+    """
+
+    def __init__(self, db: Session = None):
+        self.db = db or SessionLocal()
+        self.pricing_service = PricingService(self.db)
+
+    def _check_region(self, region: str, resolver=None):
+        resolver = resolver or RegionService(self.db).resolver()
+        # Without a region table every region falls back to its own market rates
+        if resolver.parents and resolver.resolve(region) is None:
+            raise EstimateError(f"Unknown region '{region}'")
+
+    def estimate(self, project_type: str, area: float = None, quantity: int = None, quality: str = None,
+                 region: str = DEFAULT_REGION, options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Priced line items for one request; raises EstimateError for requests that can't be priced"""
+        project_type = project_type_for(project_type)
+        region = region or DEFAULT_REGION
+        options = options or {}
+
+        key = ("api", project_type, area, quantity, quality, region, freeze(options), catalog_version(self.db))
+        cached = estimate_cache.get(key)
+        if cached is not None:
+            return {**cached, "cached": True}
+
+        self._check_region(region)
+        prices = self.pricing_service.price_snapshot(services_for(project_type), region)
+        result = calculate_estimate(prices, project_type, area, quantity, quality, options).to_dict()
+        result["region"] = region
+
+        estimate_cache.put(key, result)
+        return {**result, "cached": False}
+
+    def prepare_batch(self, items: List[Dict[str, Any]]) -> EstimateBatch:
+        """
+        Database half of a batch: validates every item, serves cache hits and loads the
+        prices of all remaining items in one catalog pass. Invalid items become error
+        results instead of failing the batch.
+        """
+        if len(items) > MAX_BATCH_ITEMS:
+            raise EstimateError(f"A batch can hold at most {MAX_BATCH_ITEMS} items")
+
+        batch = EstimateBatch(len(items))
+        version = catalog_version(self.db)
+        resolver = RegionService(self.db).resolver()
+        checked_regions: Dict[str, Optional[str]] = {}
+        services = set()
+
+        for index, item in enumerate(items):
+            try:
+                request = EstimateRequest.model_validate(item)
+                project_type = project_type_for(request.project_type)
+                region = request.region or DEFAULT_REGION
+                if region not in checked_regions:
+                    try:
+                        self._check_region(region, resolver)
+                        checked_regions[region] = None
+                    except EstimateError as e:
+                        checked_regions[region] = str(e)
+                if checked_regions[region]:
+                    raise EstimateError(checked_regions[region])
+            except ValidationError as e:
+                batch.results[index] = {"index": index, "status": "error", "error": _validation_message(e)}
+                continue
+            except EstimateError as e:
+                batch.results[index] = {"index": index, "status": "error", "error": str(e)}
+                continue
+
+            key = ("api", project_type, request.area, request.quantity, request.quality, region,
+                   freeze(request.options), version)
+            cached = estimate_cache.get(key)
+            if cached is not None:
+                batch.results[index] = {"index": index, "status": "ok", "estimate": {**cached, "cached": True}}
+                continue
+
+            batch.keys[index] = key
+            batch.jobs.append((index, region, project_type, request.area, request.quantity,
+                               request.quality, request.options))
+            services.update(services_for(project_type))
+
+        if batch.jobs:
+            batch.snapshots = self.pricing_service.price_snapshots(services, {job[1] for job in batch.jobs})
+        return batch
+
+    def close(self):
+        """Close database connection"""
+        if self.db:
+            self.db.close()
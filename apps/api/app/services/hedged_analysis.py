@@ -0,0 +1,73 @@
+from typing import Dict, Any, List
+from collections import deque
+import math
+import os
+import threading
+
+# A local analysis the intent classifier accepted at least this confidently (its calibrated
+# confidence, not the regex's own) is answered without waiting for the LLM
+HEDGE_CONFIDENCE = float(os.getenv("ANALYSIS_HEDGE_CONFIDENCE", "0.85"))
+
+# Longest a chat turn waits for the LLM analysis before answering with the local one
+ANALYSIS_DEADLINE = float(os.getenv("ANALYSIS_DEADLINE_SECONDS", "2.5"))
+
+# Latency samples kept per outcome for the percentiles
+HEDGE_WINDOW = int(os.getenv("ANALYSIS_HEDGE_WINDOW", "1024"))
+
+# local: confident local analysis returned at once; llm: LLM answered within the deadline;
+# llm_fallback: the LLM call failed and the analyzer fell back; deadline: LLM too slow
+HEDGE_OUTCOMES = ("local", "llm", "llm_fallback", "deadline")
+
+def percentile(samples: List[float], q: float) -> float:
+    """Nearest-rank percentile of a list of samples (q in 0-100)"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(math.ceil(q / 100 * len(ordered)), 1)
+    return ordered[min(rank, len(ordered)) - 1]
+
+class HedgeStats:
+    """Thread-safe win counts and recent latencies for each hedged analysis outcome"""
+
+    def __init__(self, window: int = HEDGE_WINDOW):
+        self.window = window
+        self._lock = threading.Lock()
+        self.clear()
+
+    def record(self, outcome: str, seconds: float):
+        with self._lock:
+            self._wins[outcome] += 1
+            self._latencies[outcome].append(seconds)
+            self._all.append(seconds)
+
+    def clear(self):
+        with self._lock:
+            self._wins = {outcome: 0 for outcome in HEDGE_OUTCOMES}
+            self._latencies = {outcome: deque(maxlen=self.window) for outcome in HEDGE_OUTCOMES}
+            self._all = deque(maxlen=self.window)
+
+    @staticmethod
+    def _summary(samples: List[float]) -> Dict[str, float]:
+        return {
+            f"p{q}_ms": round(percentile(samples, q) * 1000, 2) for q in (50, 90, 99)
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = sum(self._wins.values())
+            return {
+                "analyses": total,
+                "confidence_threshold": HEDGE_CONFIDENCE,
+                "deadline_seconds": ANALYSIS_DEADLINE,
+                "latency": self._summary(list(self._all)),
+                "outcomes": {
+                    outcome: {
+                        "wins": self._wins[outcome],
+                        "win_rate": round(self._wins[outcome] / total, 3) if total else 0.0,
+                        "latency": self._summary(list(self._latencies[outcome]))
+                    }
+                    for outcome in HEDGE_OUTCOMES
+                }
+            }
+
+hedge_stats = HedgeStats()
@@ -1,20 +1,85 @@
 from typing import Dict, Any, List, Optional
 import openai
+import asyncio
 import os
 import json
 from datetime import datetime
 from dotenv import load_dotenv
 
+from .llm_budget import spend_llm_call
+from .single_flight import llm_single_flight, prompt_key
+from .upstream_guard import (
+    upstream_guard, estimate_tokens, parse_retry_after, UpstreamError, OPENAI_BASE_URL, OPENAI_TIMEOUT
+)
+from .prompt_builder import PromptBuilder, PromptSection
+from .tracing import tracer, record_llm_usage
+
 # Load environment variables
 load_dotenv()
 
+# Share of the prompt token budget learned patterns may take, leaving room for history
+LEARNED_PATTERN_TOKENS = int(os.getenv("PROMPT_LEARNED_PATTERN_TOKENS", "250"))
+
+# System prompts are filled in once per agent, so every request for the same agent and
+# kind of call starts with the same prefix (upstream prompt caching matches on prefixes)
+FOLLOWUP_SYSTEM_PROMPT = """Du er en ekspert innen {expertise_area} og jobber som rådgiver for househacker.
+        
+Din oppgave er å stille intelligente oppfølgingsspørsmål som hjelper med å:
+1. Forstå prosjektets omfang og kompleksitet
+2. Samle inn nødvendig informasjon for nøyaktig prisestimering
+3. Identifisere potensielle utfordringer eller spesielle behov
+
+VIKTIGE RETNINGSLINJER:
+- Still kun 1-2 spesifikke spørsmål om gangen
+- Spørsmålene skal være relevante for prisberegning
+- Bruk norsk språk, vær vennlig og jordnær
+- Forstå at detaljer varierer drastisk mellom prosjekttyper
+
+For MALING spesielt, må du forstå:
+- Innvendig vs utvendig (helt forskjellige prosjekter)
+- Innvendig: vegg/tak, sparkling (skjøter/hel/små sår), gulvflate vs faktiske flater, vinduer/dører (reduserer areal), lister/karmer
+- Utvendig: etasjer, stillas/lift behov, ny farge (kan kreve flere strøk)
+
+Returner alltid JSON med følgende struktur:
+{{
+  "follow_up_question": "Det konkrete spørsmålet du vil stille",
+  "reasoning": "Hvorfor dette spørsmålet er viktig for prisestimering", 
+  "information_needed": ["liste", "av", "informasjon", "som", "trengs"],
+  "complexity": "low/medium/high",
+  "next_steps": ["hva", "som", "skjer", "etter", "dette", "spørsmålet"]
+}}"""
+
+PAINTING_FOLLOWUP_NOTES = """
+
+SPESIELT FOR MALING:
+- Første spørsmål bør alltid være innvendig vs utvendig
+- Følg opp basert på svar med relevante detaljer
+- Husk at maling er komplekst og krever mange spesifikasjoner"""
+
+COMPLEXITY_SYSTEM_PROMPT = """Du er en ekspert innen {expertise_area}.
+            
+Analyser prosjektkompleksiteten basert på brukerens beskrivelse og eventuelle innsamlede informasjon.
+
+Returner JSON med:
+{{
+  "complexity": "low/medium/high",
+  "estimated_timeline": "tidsestimat", 
+  "key_challenges": ["utfordring1", "utfordring2"],
+  "specialist_needed": ["type håndverker som trengs"],
+  "rough_price_range": "prisklasse i norske kroner"
+}}"""
+
+def openai_client(api_key: str, base_url: str = None, timeout: float = OPENAI_TIMEOUT) -> openai.OpenAI:
+    """SDK client without its own retries (the upstream guard retries) and with a short timeout"""
+    return openai.OpenAI(api_key=api_key, base_url=base_url or OPENAI_BASE_URL, max_retries=0, timeout=timeout)
+
 class IntelligentAIService:
     """
     Intelligent AI service that provides contextual follow-up questions
     and understands complex renovation projects using OpenAI GPT-4o-mini
     """
     
-    def __init__(self, agent_name: str = "renovation"):
+    def __init__(self, agent_name: str = "renovation", base_url: str = None):
         self.agent_name = agent_name
         
         # Load agent-specific API key and strip any whitespace/newlines
@@ -29,7 +94,7 @@ class IntelligentAIService:
         
         # Initialize OpenAI client only if API key is available
         if self.api_key:
-            self.client = openai.OpenAI(api_key=self.api_key)
+            self.client = openai_client(self.api_key, base_url)
         else:
             self.client = None
         
@@ -39,6 +104,15 @@ class IntelligentAIService:
             "expertise_area": self._get_expertise_area(agent_name),
             "current_session": None
         }
+        
+        followup_system_prompt = FOLLOWUP_SYSTEM_PROMPT.format(expertise_area=self.context["expertise_area"])
+        self._followup_prompts = {
+            None: PromptBuilder(followup_system_prompt),
+            "maling": PromptBuilder(followup_system_prompt + PAINTING_FOLLOWUP_NOTES)
+        }
+        self._complexity_prompt = PromptBuilder(
+            COMPLEXITY_SYSTEM_PROMPT.format(expertise_area=self.context["expertise_area"])
+        )
     
     def _get_expertise_area(self, agent_name: str) -> str:
         """Get expertise area for different agents"""
@@ -70,34 +144,33 @@ class IntelligentAIService:
             }
         
         try:
-            # Build context for the AI
-            system_prompt = self._build_system_prompt(project_type)
+            # Counts against the turn's LLM call budget; over budget falls back below
+            spend_llm_call("conversational_followup")
             
-            # Add learned patterns if learning service available
+            # Learned patterns, most successful first, if learning service available
+            learned = None
             if learning_service and project_type:
                 try:
-                    learned_prompt = await learning_service.get_improved_ai_prompt(project_type)
-                    if learned_prompt:
-                        system_prompt += learned_prompt
+                    learned = PromptSection(
+                        f"LEARNED PATTERNS FOR {project_type.upper()}:",
+                        await learning_service.get_learned_pattern_examples(project_type),
+                        max_tokens=LEARNED_PATTERN_TOKENS
+                    )
                 except Exception as e:
                     print(f"Failed to get learned patterns: {e}")
             
-            user_context = self._build_user_context(user_query, conversation_history, missing_info)
+            messages = self._build_followup_messages(
+                user_query, project_type, conversation_history, missing_info, learned
+            )
             
             # Call OpenAI
-            response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_context}
-                ],
+            response_content = (await self._chat_completion(
+                messages=messages,
                 temperature=0.3,  # Lower temperature for more consistent responses
-                max_tokens=400,
-                response_format={"type": "json_object"}
-            )
+                max_tokens=400
+            )).strip()
             
             # Parse response
-            response_content = response.choices[0].message.content.strip()
             if not response_content:
                 raise ValueError("Empty response from AI")
             ai_response = json.loads(response_content)
@@ -118,73 +191,69 @@ class IntelligentAIService:
                 "fallback_question": self._get_fallback_question(project_type, user_query)
             }
     
-    def _build_system_prompt(self, project_type: str = None) -> str:
-        """Build system prompt for the AI"""
+    async def _chat_completion(self, messages: List[Dict[str, str]], temperature: float, max_tokens: int) -> str:
+        """
+        JSON-mode gpt-4o-mini completion. The blocking client runs in a worker thread,
+        identical requests already in flight share one upstream call, and the call goes
+        through the model's upstream guard (raises UpstreamUnavailable when it can't).
+        """
+        request = {
+            "model": "gpt-4o-mini",
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "response_format": {"type": "json_object"}
+        }
         
-        base_prompt = f"""Du er en ekspert innen {self.context['expertise_area']} og jobber som rådgiver for househacker.
+        async def send() -> str:
+            try:
+                response = await asyncio.to_thread(self.client.chat.completions.create, **request)
+            except openai.APIStatusError as e:
+                raise UpstreamError(f"OpenAI returned {e.status_code}", e.status_code,
+                                    parse_retry_after(e.response.headers.get("retry-after")))
+            except openai.APIConnectionError as e:
+                raise UpstreamError(f"OpenAI request failed: {e}")
+            if response.usage:
+                record_llm_usage(request["model"], response.usage.prompt_tokens, response.usage.completion_tokens)
+            return response.choices[0].message.content
         
-Din oppgave er å stille intelligente oppfølgingsspørsmål som hjelper med å:
-1. Forstå prosjektets omfang og kompleksitet
-2. Samle inn nødvendig informasjon for nøyaktig prisestimering
-3. Identifisere potensielle utfordringer eller spesielle behov
-
-VIKTIGE RETNINGSLINJER:
-- Still kun 1-2 spesifikke spørsmål om gangen
-- Spørsmålene skal være relevante for prisberegning
-- Bruk norsk språk, vær vennlig og jordnær
-- Forstå at detaljer varierer drastisk mellom prosjekttyper
-
-For MALING spesielt, må du forstå:
-- Innvendig vs utvendig (helt forskjellige prosjekter)
-- Innvendig: vegg/tak, sparkling (skjøter/hel/små sår), gulvflate vs faktiske flater, vinduer/dører (reduserer areal), lister/karmer
-- Utvendig: etasjer, stillas/lift behov, ny farge (kan kreve flere strøk)
-
-Returner alltid JSON med følgende struktur:
-{{
-  "follow_up_question": "Det konkrete spørsmålet du vil stille",
-  "reasoning": "Hvorfor dette spørsmålet er viktig for prisestimering", 
-  "information_needed": ["liste", "av", "informasjon", "som", "trengs"],
-  "complexity": "low/medium/high",
-  "next_steps": ["hva", "som", "skjer", "etter", "dette", "spørsmålet"]
-}}"""
-
-        # Add project-specific context
-        if project_type == "maling":
-            base_prompt += """
-
-SPESIELT FOR MALING:
-- Første spørsmål bør alltid være innvendig vs utvendig
-- Følg opp basert på svar med relevante detaljer
-- Husk at maling er komplekst og krever mange spesifikasjoner"""
-
-        return base_prompt
+        guard = upstream_guard(request["model"])
+        with tracer.span("llm.chat_completion", **{"gen_ai.system": "openai", "gen_ai.request.model": request["model"]}):
+            return await llm_single_flight.do(
+                prompt_key(**request), lambda: guard.call(send, estimate_tokens(messages, max_tokens))
+            )
     
-    def _build_user_context(
+    def _build_followup_messages(
         self, 
         user_query: str, 
+        project_type: str = None,
         conversation_history: List[Dict] = None,
-        missing_info: List[str] = None
-    ) -> str:
-        """Build user context for the AI"""
+        missing_info: List[str] = None,
+        learned: PromptSection = None
+    ) -> List[Dict[str, str]]:
+        """
+        Constant system prompt for the agent (and project type), then learned patterns and
+        the newest conversation history that fit the prompt token budget, then the query
+        """
         
-        context_parts = [
-            f"Brukerens spørsmål: '{user_query}'",
-            f"Tidspunkt: {datetime.now().strftime('%Y-%m-%d %H:%M')}"
-        ]
+        prompt = self._followup_prompts.get(project_type) or self._followup_prompts[None]
         
+        history = None
         if conversation_history:
-            context_parts.append("Samtalehistorikk:")
-            for msg in conversation_history[-3:]:  # Only last 3 messages for context
-                role = msg.get("role", "unknown")
-                content = msg.get("content", "")
-                context_parts.append(f"- {role}: {content}")
+            history = PromptSection("Samtalehistorikk:", [
+                f"- {msg.get('role', 'unknown')}: {msg.get('content', '')}" for msg in conversation_history
+            ], keep_latest=True)
         
+        query_parts = []
         if missing_info:
-            context_parts.append(f"Manglende informasjon identifisert: {', '.join(missing_info)}")
-        
-        context_parts.append("\nHva er det beste oppfølgingsspørsmålet for å hjelpe med prisestimering?")
+            query_parts.append(f"Manglende informasjon identifisert: {', '.join(missing_info)}")
+        query_parts.extend([
+            f"Brukerens spørsmål: '{user_query}'",
+            f"Tidspunkt: {datetime.now().strftime('%Y-%m-%d %H:%M')}",
+            "\nHva er det beste oppfølgingsspørsmålet for å hjelpe med prisestimering?"
+        ])
         
-        return "\n".join(context_parts)
+        return prompt.messages("\n".join(query_parts), learned, history)
     
     def _get_fallback_question(self, project_type: str, user_query: str) -> str:
         """Fallback question if AI fails"""
@@ -208,35 +277,16 @@ SPESIELT FOR MALING:
         """
         
         try:
-            system_prompt = f"""Du er en ekspert innen {self.context['expertise_area']}.
-            
-Analyser prosjektkompleksiteten basert på brukerens beskrivelse og eventuelle innsamlede informasjon.
-
-Returner JSON med:
-{{
-  "complexity": "low/medium/high",
-  "estimated_timeline": "tidsestimat", 
-  "key_challenges": ["utfordring1", "utfordring2"],
-  "specialist_needed": ["type håndverker som trengs"],
-  "rough_price_range": "prisklasse i norske kroner"
-}}"""
-
+            spend_llm_call("project_complexity")
             user_context = f"Prosjektbeskrivelse: {user_query}"
             if collected_info:
                 user_context += f"\nInnsamlet informasjon: {json.dumps(collected_info, ensure_ascii=False)}"
             
-            response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_context}
-                ],
+            return json.loads(await self._chat_completion(
+                messages=self._complexity_prompt.messages(user_context),
                 temperature=0.2,
-                max_tokens=300,
-                response_format={"type": "json_object"}
-            )
-            
-            return json.loads(response.choices[0].message.content)
+                max_tokens=300
+            ))
             
         except Exception as e:
             return {
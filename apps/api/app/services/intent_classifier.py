@@ -0,0 +1,291 @@
+from typing import Dict, List, Optional, Tuple, Iterable
+from pathlib import Path
+import json
+import os
+import re
+import threading
+import zlib
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from ..models.conversation import ConversationMessage, ConversationPattern
+
+# Trained artefact shipped with the API (rebuild with train_intent_classifier.py)
+INTENT_MODEL_PATH = Path(os.getenv(
+    "INTENT_MODEL_PATH", Path(__file__).resolve().parents[2] / "artifacts" / "intent_classifier.npz"
+))
+
+# Predictions at least this confident (both heads) are used without asking the LLM
+INTENT_CONFIDENCE = float(os.getenv("INTENT_CONFIDENCE", "0.9"))
+
+# Hashed feature space; 2^14 keeps the artefact small and collisions rare for chat-sized text
+HASH_DIM = 1 << 14
+
+# Analysis type a clear request for each project type is routed as
+PROJECT_ANALYSIS_TYPES = {
+    "bad_komplett": "full_project_estimate",
+    "kjøkken_detaljert": "full_project_estimate",
+    "maling": "painting_specific",
+    "elektriker_arbeid": "electrical_work",
+    "gulvarbeider": "flooring_work",
+    "vinduer_dorer": "windows_doors_work",
+    "tomrer_bygg": "carpentry_work",
+    "tak_ytterkledning": "roofing_cladding_work",
+    "isolasjon_tetting": "insulation_work",
+    "grunnarbeider": "groundwork"
+}
+
+# Hand-labelled queries that bootstrap the model before there is much logged history:
+# (query, project_type, type)
+SEED_EXAMPLES = [
+    ("pusse opp bad 6 kvm", "bad_komplett", "full_project_estimate"),
+    ("totalrenovering av bad 4 m2", "bad_komplett", "full_project_estimate"),
+    ("hva koster det å pusse opp et bad på 8 kvm", "bad_komplett", "full_project_estimate"),
+    ("nytt baderom 5 kvm normal standard", "bad_komplett", "full_project_estimate"),
+    ("renovere badet, 7 kvadratmeter", "bad_komplett", "full_project_estimate"),
+    ("pris på oppussing av bad 10 m²", "bad_komplett", "full_project_estimate"),
+    ("hva koster et nytt bad", "bad_komplett", "needs_clarification"),
+    ("jeg vil pusse opp badet", "bad_komplett", "needs_clarification"),
+    ("nytt kjøkken midt-segment komplett", "kjøkken_detaljert", "full_project_estimate"),
+    ("kjøkken ikea nivå komplett", "kjøkken_detaljert", "full_project_estimate"),
+    ("skreddersydd kjøkken med montering", "kjøkken_detaljert", "full_project_estimate"),
+    ("hva koster nytt kjøkken", "kjøkken_detaljert", "needs_clarification"),
+    ("vi vurderer å bytte kjøkken", "kjøkken_detaljert", "needs_clarification"),
+    ("male stue 45 kvm", "maling", "painting_specific"),
+    ("male stue og gang 45 kvm", "maling", "painting_specific"),
+    ("maling av soverom 12 kvm", "maling", "painting_specific"),
+    ("male vegger og tak i leilighet 70 kvm", "maling", "painting_specific"),
+    ("sparkle og male 30 m2 vegg", "maling", "painting_specific"),
+    ("male hele leiligheten 60 kvm", "maling", "painting_specific"),
+    ("hva koster det å male", "maling", "needs_clarification"),
+    ("jeg vil male huset", "maling", "needs_clarification"),
+    ("timepris elektriker", "elektriker_arbeid", "electrical_work"),
+    ("hva koster en elektriker per time", "elektriker_arbeid", "electrical_work"),
+    ("installere 8 stikkontakter", "elektriker_arbeid", "electrical_work"),
+    ("nytt sikringsskap", "elektriker_arbeid", "electrical_work"),
+    ("varmekabler på bad 5 kvm", "elektriker_arbeid", "electrical_work"),
+    ("elbillader i garasjen", "elektriker_arbeid", "electrical_work"),
+    ("montere 10 downlights", "elektriker_arbeid", "electrical_work"),
+    ("legge parkett 40 kvm", "gulvarbeider", "flooring_work"),
+    ("nytt laminat i stua 25 kvm", "gulvarbeider", "flooring_work"),
+    ("slipe og lakke gulv 30 m2", "gulvarbeider", "flooring_work"),
+    ("vinylgulv på kjøkkenet 12 kvm", "gulvarbeider", "flooring_work"),
+    ("parkett hele leiligheten", "gulvarbeider", "flooring_work"),
+    ("bytte 5 innerdører", "vinduer_dorer", "windows_doors_work"),
+    ("skifte 3 innerdører komplett med karm", "vinduer_dorer", "windows_doors_work"),
+    ("ny ytterdør", "vinduer_dorer", "windows_doors_work"),
+    ("bytte 6 vinduer", "vinduer_dorer", "windows_doors_work"),
+    ("skifte 4 vinduer i stua", "vinduer_dorer", "windows_doors_work"),
+    ("bytte 5 dører", "vinduer_dorer", "needs_clarification"),
+    ("skifte dører i huset", "vinduer_dorer", "needs_clarification"),
+    ("sette opp lettvegg 10 m2", "tomrer_bygg", "carpentry_work"),
+    ("bygge skillevegg på soverommet", "tomrer_bygg", "carpentry_work"),
+    ("ny himling i stua 20 kvm", "tomrer_bygg", "carpentry_work"),
+    ("tømrer til å bygge terrasse 25 kvm", "tomrer_bygg", "carpentry_work"),
+    ("takomlegging 120 kvm", "tak_ytterkledning", "roofing_cladding_work"),
+    ("nytt tak på eneboligen", "tak_ytterkledning", "roofing_cladding_work"),
+    ("skifte ytterkledning 150 m2", "tak_ytterkledning", "roofing_cladding_work"),
+    ("etterisolere loftet 50 kvm", "isolasjon_tetting", "insulation_work"),
+    ("isolering av yttervegger", "isolasjon_tetting", "insulation_work"),
+    ("energioppgradering av huset", "isolasjon_tetting", "insulation_work"),
+    ("graving for drenering rundt huset", "grunnarbeider", "groundwork"),
+    ("støpe grunnmur til garasje", "grunnarbeider", "groundwork"),
+    ("fundamentering og graving 40 kvm", "grunnarbeider", "groundwork"),
+    ("sprenging av fjell på tomta", "grunnarbeider", "groundwork"),
+]
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+def tokens(text: str) -> List[str]:
+    """Word, word bigram and character 3-5-gram features; digits collapse to 0"""
+    words = TOKEN_RE.findall(re.sub(r"\d+(?:[.,]\d+)?", "0", (text or "").lower()))
+    features = ["<bias>"] + [f"w:{w}" for w in words] + [f"b:{a}_{b}" for a, b in zip(words, words[1:])]
+    for word in words:
+        padded = f"<{word}>"
+        for n in (3, 4, 5):
+            features.extend(f"c:{padded[i:i + n]}" for i in range(len(padded) - n + 1))
+    return features
+
+def featurize(text: str, dim: int = HASH_DIM) -> Tuple[np.ndarray, np.ndarray]:
+    """Signed hashing trick -> (indices, L2-normalised values) of one text"""
+    counts: Dict[int, float] = {}
+    for feature in tokens(text):
+        h = zlib.crc32(feature.encode("utf-8"))
+        index = h % dim
+        counts[index] = counts.get(index, 0.0) + (1.0 if h & 0x80000000 else -1.0)
+    indices = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+    values = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+    norm = np.linalg.norm(values)
+    return indices, values / norm if norm else values
+
+class SparseRows:
+    """CSR-style batch of featurized texts"""
+
+    def __init__(self, texts: Iterable[str], dim: int = HASH_DIM):
+        rows = [featurize(text, dim) for text in texts]
+        self.indptr = np.cumsum([0] + [len(indices) for indices, _ in rows])
+        self.indices = np.concatenate([indices for indices, _ in rows]) if rows else np.zeros(0, np.int64)
+        self.values = np.concatenate([values for _, values in rows]) if rows else np.zeros(0, np.float32)
+        self.row_of = np.repeat(np.arange(len(rows)), np.diff(self.indptr))
+
+    def __len__(self) -> int:
+        return len(self.indptr) - 1
+
+    def dot(self, weights: np.ndarray) -> np.ndarray:
+        # Every row has the bias feature, so reduceat never sees an empty segment
+        return np.add.reduceat(weights[self.indices] * self.values[:, None], self.indptr[:-1], axis=0)
+
+    def gradient(self, errors: np.ndarray, dim: int) -> np.ndarray:
+        grad = np.zeros((dim, errors.shape[1]), dtype=np.float64)
+        np.add.at(grad, self.indices, self.values[:, None] * errors[self.row_of])
+        return grad
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    shifted = np.exp(logits - logits.max(axis=1, keepdims=True))
+    return shifted / shifted.sum(axis=1, keepdims=True)
+
+def _fit_softmax(rows: SparseRows, targets: np.ndarray, classes: int, dim: int,
+                 epochs: int = 300, learning_rate: float = 0.1, l2: float = 1e-4) -> Tuple[np.ndarray, np.ndarray]:
+    """Multinomial logistic regression, full batch Adam"""
+    weights = np.zeros((dim, classes))
+    bias = np.zeros(classes)
+    one_hot = np.eye(classes)[targets]
+    moments = [np.zeros_like(weights), np.zeros_like(weights), np.zeros_like(bias), np.zeros_like(bias)]
+    for step in range(1, epochs + 1):
+        errors = (_softmax(rows.dot(weights) + bias) - one_hot) / len(rows)
+        grads = (rows.gradient(errors, dim) + l2 * weights, errors.sum(axis=0))
+        for param, grad, m, v in ((weights, grads[0], moments[0], moments[1]), (bias, grads[1], moments[2], moments[3])):
+            m *= 0.9
+            m += 0.1 * grad
+            v *= 0.999
+            v += 0.001 * grad ** 2
+            param -= learning_rate * (m / (1 - 0.9 ** step)) / (np.sqrt(v / (1 - 0.999 ** step)) + 1e-8)
+    return weights.astype(np.float32), bias.astype(np.float32)
+
+def _fit_temperature(logits: np.ndarray, targets: np.ndarray) -> float:
+    """Temperature minimising the negative log-likelihood of out-of-fold logits"""
+    best, best_nll = 1.0, float("inf")
+    for temperature in np.exp(np.linspace(np.log(0.25), np.log(8.0), 60)):
+        probabilities = _softmax(logits / temperature)
+        nll = -np.mean(np.log(probabilities[np.arange(len(targets)), targets] + 1e-12))
+        if nll < best_nll:
+            best, best_nll = float(temperature), nll
+    return best
+
+class IntentClassifier:
+    """
+    Hashed n-gram logistic model predicting the analysis `type` and `project_type` of a
+    query with temperature-calibrated confidence. CPU only; trained offline.
+    """
+
+    HEADS = ("type", "project_type")
+
+    def __init__(self, heads: Dict[str, Tuple[List[str], np.ndarray, np.ndarray, float]], dim: int = HASH_DIM):
+        self.heads = heads
+        self.dim = dim
+
+    @classmethod
+    def train(cls, examples: List[Tuple[str, str, str]], dim: int = HASH_DIM, folds: int = 5,
+              epochs: int = 300) -> "IntentClassifier":
+        """Train both heads from (query, project_type, type) examples"""
+        texts = [text for text, _, _ in examples]
+        rows = SparseRows(texts, dim)
+        heads = {}
+        for head, column in (("project_type", 1), ("type", 2)):
+            labels = sorted({example[column] for example in examples})
+            targets = np.array([labels.index(example[column]) for example in examples])
+            temperature = 1.0
+            if len(examples) >= folds * 10 and len(labels) > 1:
+                # Calibrate on out-of-fold predictions so confidence means held-out accuracy
+                fold_of = np.arange(len(examples)) % folds
+                oof = np.zeros((len(examples), len(labels)))
+                for fold in range(folds):
+                    train = np.flatnonzero(fold_of != fold)
+                    held_out = np.flatnonzero(fold_of == fold)
+                    weights, bias = _fit_softmax(SparseRows([texts[i] for i in train], dim), targets[train],
+                                                 len(labels), dim, epochs)
+                    oof[held_out] = SparseRows([texts[i] for i in held_out], dim).dot(weights) + bias
+                temperature = _fit_temperature(oof, targets)
+            weights, bias = _fit_softmax(rows, targets, len(labels), dim, epochs)
+            heads[head] = (labels, weights, bias, temperature)
+        return cls(heads, dim)
+
+    def predict(self, text: str) -> Dict[str, Tuple[str, float]]:
+        """head -> (label, calibrated probability)"""
+        indices, values = featurize(text, self.dim)
+        prediction = {}
+        for head, (labels, weights, bias, temperature) in self.heads.items():
+            probabilities = _softmax(((values @ weights[indices]) + bias)[None, :] / temperature)[0]
+            best = int(probabilities.argmax())
+            prediction[head] = (labels[best], float(probabilities[best]))
+        return prediction
+
+    def save(self, path: Path = INTENT_MODEL_PATH):
+        arrays = {"dim": np.array(self.dim)}
+        for head, (labels, weights, bias, temperature) in self.heads.items():
+            arrays[f"{head}_labels"] = np.array(labels)
+            arrays[f"{head}_weights"] = weights.astype(np.float16)
+            arrays[f"{head}_bias"] = bias
+            arrays[f"{head}_temperature"] = np.array(temperature)
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(path, **arrays)
+
+    @classmethod
+    def load(cls, path: Path = INTENT_MODEL_PATH) -> "IntentClassifier":
+        with np.load(path, allow_pickle=False) as data:
+            heads = {
+                head: (
+                    [str(label) for label in data[f"{head}_labels"]],
+                    data[f"{head}_weights"].astype(np.float32),
+                    data[f"{head}_bias"],
+                    float(data[f"{head}_temperature"])
+                )
+                for head in cls.HEADS
+            }
+            return cls(heads, int(data["dim"]))
+
+def training_examples(db: Session) -> List[Tuple[str, str, str]]:
+    """
+    Labelled (query, project_type, type) examples from the conversation log: messages
+    with a detected project type, labelled needs_clarification when they led to a
+    clarification, plus the sample queries of learned conversation patterns
+    """
+    examples = []
+    messages = db.query(
+        ConversationMessage.user_message, ConversationMessage.project_type_detected,
+        ConversationMessage.led_to_clarification
+    ).filter(ConversationMessage.project_type_detected.in_(list(PROJECT_ANALYSIS_TYPES)))
+    for text, project_type, clarification in messages:
+        if text:
+            examples.append((text, project_type, "needs_clarification" if clarification else PROJECT_ANALYSIS_TYPES[project_type]))
+
+    patterns = db.query(ConversationPattern.project_type, ConversationPattern.sample_user_queries).filter(
+        ConversationPattern.project_type.in_(list(PROJECT_ANALYSIS_TYPES))
+    )
+    for project_type, samples in patterns:
+        try:
+            queries = json.loads(samples) if samples else []
+        except (TypeError, ValueError):
+            continue
+        examples.extend((query, project_type, PROJECT_ANALYSIS_TYPES[project_type])
+                        for query in queries if isinstance(query, str) and query)
+    return examples
+
+_classifier: Optional[IntentClassifier] = None
+_loaded = False
+_load_lock = threading.Lock()
+
+def get_intent_classifier() -> Optional[IntentClassifier]:
+    """The shipped classifier, loaded once per process; None when no artefact exists"""
+    global _classifier, _loaded
+    if not _loaded:
+        with _load_lock:
+            if not _loaded:
+                try:
+                    _classifier = IntentClassifier.load(INTENT_MODEL_PATH) if INTENT_MODEL_PATH.exists() else None
+                except Exception as e:
+                    print(f"Intent classifier could not be loaded: {e}")
+                    _classifier = None
+                _loaded = True
+    return _classifier
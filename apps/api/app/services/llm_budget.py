@@ -0,0 +1,57 @@
+from typing import Optional, List
+from contextlib import contextmanager
+from contextvars import ContextVar
+import os
+
+# OpenAI round-trips one chat turn may make. The fused analysis covers an ambiguous
+# turn (analysis, questions and conversational follow-up) in a single call.
+DEFAULT_LLM_CALLS_PER_TURN = int(os.getenv("LLM_CALLS_PER_TURN", "1"))
+
+class LLMBudgetExceeded(RuntimeError):
+    """Raised when a turn has used all of its LLM calls"""
+
+class LLMCallBudget:
+    """LLM calls allowed and made during one turn"""
+
+    def __init__(self, limit: int = DEFAULT_LLM_CALLS_PER_TURN):
+        self.limit = limit
+        self.calls: List[str] = []
+
+    @property
+    def used(self) -> int:
+        return len(self.calls)
+
+    @property
+    def remaining(self) -> int:
+        return max(self.limit - self.used, 0)
+
+    def spend(self, purpose: str):
+        if self.used >= self.limit:
+            raise LLMBudgetExceeded(f"LLM call budget of {self.limit} per turn used up (wanted: {purpose})")
+        self.calls.append(purpose)
+
+_current_budget: ContextVar[Optional[LLMCallBudget]] = ContextVar("llm_call_budget", default=None)
+
+@contextmanager
+def llm_call_budget(limit: int = None):
+    """Budget for the LLM calls made inside the block (one orchestrated turn)"""
+    budget = LLMCallBudget(DEFAULT_LLM_CALLS_PER_TURN if limit is None else limit)
+    token = _current_budget.set(budget)
+    try:
+        yield budget
+    finally:
+        _current_budget.reset(token)
+
+def spend_llm_call(purpose: str):
+    """
+    Record one LLM call against the current turn's budget; raises LLMBudgetExceeded
+    when it is used up. Calls outside a budgeted turn (scripts, tests) are not limited.
+    """
+    budget = _current_budget.get()
+    if budget is not None:
+        budget.spend(purpose)
+
+def llm_calls_remaining() -> Optional[int]:
+    """Calls left in the current turn, or None when no budget is set"""
+    budget = _current_budget.get()
+    return budget.remaining if budget is not None else None
@@ -0,0 +1,179 @@
+from typing import Dict, Any, List, Optional
+from datetime import datetime
+import numpy as np
+
+# Observations older than this count half as much
+DEFAULT_HALF_LIFE_DAYS = 365.0
+
+# Robust z-score (0.6745 * |x - median| / MAD) above which an observation is rejected
+DEFAULT_MAD_THRESHOLD = 3.5
+
+# When MAD is 0 (most observations identical), the scale falls back to the mean absolute
+# deviation, but never below this share of the median, so small deviations are kept
+ZERO_MAD_SCALE_FLOOR = 0.1
+
+# Weight for rows without a confidence value
+DEFAULT_CONFIDENCE = 0.5
+
+QUANTILES = (0.1, 0.5, 0.9)
+
+def _group_quantiles(group: np.ndarray, values: np.ndarray, weights: np.ndarray,
+                     n_groups: int, q: float) -> np.ndarray:
+    """
+    Weighted quantile per group with linear interpolation between weighted midpoints.
+    Vectorised: one lexsort, then a searchsorted over (group id + cumulative weight share).
+    """
+    result = np.full(n_groups, np.nan)
+    if len(values) == 0:
+        return result
+
+    order = np.lexsort((values, group))
+    g, v, w = group[order], values[order], weights[order]
+
+    totals = np.bincount(g, weights=w, minlength=n_groups)
+    cumulative = np.cumsum(w)
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(g)) + 1))
+    offsets = np.repeat(cumulative[starts] - w[starts], np.diff(np.append(starts, len(g))))
+
+    # Position of each observation's weight midpoint within its group, in (0, 1)
+    position = (cumulative - offsets - w / 2) / totals[g]
+    keys = g + position
+
+    group_ids = np.unique(g)
+    targets = group_ids + q
+    right = np.searchsorted(keys, targets)
+    left = right - 1
+
+    first = starts
+    last = np.append(starts[1:], len(g)) - 1
+    right = np.minimum(right, last)
+    left = np.maximum(left, first)
+
+    span = keys[right] - keys[left]
+    fraction = np.where(span > 0, (targets - keys[left]) / np.where(span > 0, span, 1), 0.0)
+    fraction = np.clip(fraction, 0.0, 1.0)
+
+    result[group_ids] = v[left] + (v[right] - v[left]) * fraction
+    return result
+
+def compute_rates(
+    service_type_ids: np.ndarray,
+    regions: np.ndarray,
+    min_prices: np.ndarray,
+    max_prices: np.ndarray,
+    confidences: np.ndarray,
+    ages_days: np.ndarray,
+    half_life_days: float = DEFAULT_HALF_LIFE_DAYS,
+    mad_threshold: float = DEFAULT_MAD_THRESHOLD
+) -> List[Dict[str, Any]]:
+    """
+    Market rates for every (service, region) in one vectorised pass over a pricing_data snapshot.
+
+    Every non-zero min_price and max_price is an observation weighted by the row's
+    confidence times a recency decay. Observations more than mad_threshold robust
+    z-scores from the group's weighted median are rejected (with a mean absolute
+    deviation scale where the MAD is 0). If that would reject every min_price or every
+    max_price of a pair, that side is kept whole, so the pair still gets a fresh rate.
+    market_min/max/avg and the P10/P50/P90 quantiles are computed on the remaining
+    observations.
+    """
+    rows = len(service_type_ids)
+    if rows == 0:
+        return []
+
+    pair_keys = np.rec.fromarrays([np.asarray(service_type_ids), np.asarray(regions, dtype=object).astype(str)])
+    unique_pairs, row_group = np.unique(pair_keys, return_inverse=True)
+    n_groups = len(unique_pairs)
+
+    confidences = np.asarray(confidences, dtype=float)
+    confidences = np.where(np.isnan(confidences), DEFAULT_CONFIDENCE, confidences)
+    decay = 0.5 ** (np.maximum(np.asarray(ages_days, dtype=float), 0.0) / half_life_days)
+    row_weights = np.maximum(confidences, 1e-6) * decay
+
+    # Two observations per row: its min_price and its max_price (0/NULL ignored, as before)
+    values = np.concatenate((np.asarray(min_prices, dtype=float), np.asarray(max_prices, dtype=float)))
+    is_min = np.concatenate((np.ones(rows, dtype=bool), np.zeros(rows, dtype=bool)))
+    group = np.concatenate((row_group, row_group))
+    weights = np.concatenate((row_weights, row_weights))
+
+    valid = ~np.isnan(values) & (values != 0)
+    values, is_min, group, weights = values[valid], is_min[valid], group[valid], weights[valid]
+
+    # MAD outlier rejection around the weighted median
+    median = _group_quantiles(group, values, weights, n_groups, 0.5)
+    deviation = np.abs(values - median[group])
+    mad = _group_quantiles(group, deviation, weights, n_groups, 0.5)
+    # A few identical rows plus one bad scrape give MAD 0; use the weighted mean absolute
+    # deviation there (1.2533 * MeanAD estimates the standard deviation, as MAD / 0.6745 does)
+    deviation_sum = np.bincount(group, weights=weights * deviation, minlength=n_groups)
+    mean_ad = deviation_sum / np.maximum(np.bincount(group, weights=weights, minlength=n_groups), 1e-12)
+    scale = np.where(mad > 0, mad / 0.6745, np.maximum(1.2533 * mean_ad, ZERO_MAD_SCALE_FLOOR * np.abs(median)))
+    group_scale = scale[group]
+    robust_z = np.where(group_scale > 0, deviation / np.where(group_scale > 0, group_scale, 1), 0.0)
+    inlier = robust_z <= mad_threshold
+
+    # Rejection never empties a side: a pair whose min (or max) prices are all rejected keeps them all
+    for side in (is_min, ~is_min):
+        kept = np.bincount(group[side & inlier], minlength=n_groups) > 0
+        inlier |= side & ~kept[group]
+
+    outliers = np.bincount(group[~inlier], minlength=n_groups)
+    values, is_min, group, weights = values[inlier], is_min[inlier], group[inlier], weights[inlier]
+
+    market_min = np.full(n_groups, np.inf)
+    np.minimum.at(market_min, group[is_min], values[is_min])
+    market_max = np.full(n_groups, -np.inf)
+    np.maximum.at(market_max, group[~is_min], values[~is_min])
+
+    weight_sum = np.bincount(group, weights=weights, minlength=n_groups)
+    weighted_avg = np.bincount(group, weights=weights * values, minlength=n_groups) / np.where(weight_sum > 0, weight_sum, 1)
+    # Kish effective sample size, in rows (each row contributes two observations)
+    effective_size = weight_sum ** 2 / np.where(weight_sum > 0, np.bincount(group, weights=weights ** 2, minlength=n_groups), 1) / 2
+
+    p10, p50, p90 = (_group_quantiles(group, values, weights, n_groups, q) for q in QUANTILES)
+    sample_size = np.bincount(row_group, minlength=n_groups)
+
+    rates = []
+    for i, (service_type_id, region) in enumerate(unique_pairs.tolist()):
+        # Same rule as before: a rate needs at least one min and one max price
+        if not np.isfinite(market_min[i]) or not np.isfinite(market_max[i]):
+            continue
+        rates.append({
+            "service_type_id": int(service_type_id),
+            "region": region,
+            "market_min": float(market_min[i]),
+            "market_max": float(market_max[i]),
+            "market_avg": float(weighted_avg[i]),
+            "recommended_price": float(p50[i]) * 1.1,  # Anbefalt pris litt over medianen
+            "p10_price": float(p10[i]),
+            "p50_price": float(p50[i]),
+            "p90_price": float(p90[i]),
+            "sample_size": int(sample_size[i]),
+            "effective_sample_size": float(effective_size[i]),
+            "outliers_rejected": int(outliers[i]),
+            "confidence_score": min(0.9, float(effective_size[i]) / 10)  # Mer (og nyere) data = høyere confidence
+        })
+    return rates
+
+def compute_rates_from_rows(rows: List[Any], now: Optional[datetime] = None, **options) -> List[Dict[str, Any]]:
+    """compute_rates() for (service_type_id, region, min_price, max_price, confidence, last_updated) rows"""
+    now = now or datetime.utcnow()
+    if not rows:
+        return []
+
+    service_type_ids, regions, min_prices, max_prices, confidences, last_updated = zip(*rows)
+    ages_days = [
+        (now - updated).total_seconds() / 86400 if updated else 0.0
+        for updated in last_updated
+    ]
+    as_float = lambda column: np.array([np.nan if value is None else value for value in column], dtype=float)
+
+    return compute_rates(
+        np.array(service_type_ids),
+        np.array(regions, dtype=object),
+        as_float(min_prices),
+        as_float(max_prices),
+        as_float(confidences),
+        np.array(ages_days, dtype=float),
+        **options
+    )
@@ -0,0 +1,155 @@
+from typing import Dict, Any, List, Sequence, Tuple
+import bisect
+import os
+import threading
+
+# Label combinations kept per metric; later ones are folded into a single "other" series
+METRICS_MAX_SERIES = int(os.getenv("METRICS_MAX_SERIES", "200"))
+
+# Seconds; chat turns range from a cached estimate (ms) to a slow LLM round-trip
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 max_series: int = METRICS_MAX_SERIES):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.max_series = max_series
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, ...], Any] = {}
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        # Called with the lock held
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        if key not in self._series and len(self._series) >= self.max_series:
+            key = ("other",) * len(self.labelnames)
+        return key
+
+    def _labels(self, key: Tuple[str, ...], extra: Sequence[Tuple[str, str]] = ()) -> str:
+        pairs = list(zip(self.labelnames, key)) + list(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            lines.extend(self._samples())
+        return lines
+
+    def clear(self):
+        with self._lock:
+            self._series = {}
+
+class Counter(_Metric):
+    """Monotonic total per label combination"""
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: Any):
+        with self._lock:
+            key = self._key(labels)
+            self._series[key] = self._series.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        with self._lock:
+            return self._series.get(tuple(str(labels.get(name, "")) for name in self.labelnames), 0.0)
+
+    def _samples(self) -> List[str]:
+        return [f"{self.name}{self._labels(key)} {_number(value)}" for key, value in sorted(self._series.items())]
+
+class Histogram(_Metric):
+    """Bucketed observations (cumulative in the exposition, as Prometheus expects)"""
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS, max_series: int = METRICS_MAX_SERIES):
+        super().__init__(name, documentation, labelnames, max_series)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels: Any):
+        with self._lock:
+            key = self._key(labels)
+            series = self._series.get(key)
+            if series is None:
+                # [per-bucket counts (last one is +Inf), sum]
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][bisect.bisect_left(self.buckets, value)] += 1
+            series[1] += value
+
+    def count(self, **labels: Any) -> int:
+        with self._lock:
+            series = self._series.get(tuple(str(labels.get(name, "")) for name in self.labelnames))
+            return sum(series[0]) if series else 0
+
+    def _samples(self) -> List[str]:
+        lines = []
+        for key, (counts, total) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{self._labels(key, [('le', _number(bound))])} {cumulative}")
+            lines.append(f"{self.name}_sum{self._labels(key)} {_number(round(total, 6))}")
+            lines.append(f"{self.name}_count{self._labels(key)} {cumulative}")
+        return lines
+
+class MetricsRegistry:
+    """The metrics served on /metrics, in the Prometheus text format"""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def _register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def clear(self):
+        for metric in self._metrics:
+            metric.clear()
+
+registry = MetricsRegistry()
+
+chat_turn_seconds = registry.histogram(
+    "chat_turn_duration_seconds", "Chat turn latency by agent, analysis type and partner",
+    ("agent", "analysis_type", "partner")
+)
+stage_seconds = registry.histogram(
+    "chat_stage_duration_seconds", "Duration of each traced stage of a chat turn", ("stage",)
+)
+chat_db_seconds = registry.histogram(
+    "chat_db_duration_seconds", "SQL time spent in one chat turn", ("agent",)
+)
+llm_tokens = registry.counter(
+    "llm_tokens_total", "LLM tokens reported by the upstream, by model and direction", ("model", "direction")
+)
+cache_lookups = registry.counter(
+    "cache_lookups_total", "Lookups in the estimate cache and LLM single-flight, by result", ("cache", "result")
+)
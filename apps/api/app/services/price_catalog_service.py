@@ -0,0 +1,330 @@
+from typing import Dict, Any, List, Optional, Tuple, Callable
+from pathlib import Path
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+import csv
+import time
+
+import yaml
+from pydantic import BaseModel, ValidationError, field_validator, model_validator
+from sqlalchemy.orm import Session
+from sqlalchemy import select, func
+from sqlalchemy.dialects import postgresql, sqlite
+
+from ..models.pricing import ServiceType, PricingData
+from ..database import SessionLocal
+from .pricing_service import PricingService
+from .region_service import RegionService
+from .contractor_directory import ContractorDirectory
+from .estimate_cache import invalidate_catalog_version
+
+# Declarative price sheets (one file per trade) shipped with the API
+CATALOG_DIR = Path(__file__).resolve().parents[2] / "catalog"
+
+SHEET_SUFFIXES = (".yaml", ".yml", ".csv", ".parquet")
+
+# Rows per INSERT statement (keeps SQLite well below its bound-parameter limit)
+CHUNK_SIZE = 500
+
+class CatalogError(ValueError):
+    """A price sheet could not be read or failed validation"""
+
+    def __init__(self, sheet: str, errors: List[str]):
+        self.sheet = sheet
+        self.errors = errors
+        super().__init__(f"{sheet}: " + "; ".join(errors))
+
+class PriceRow(BaseModel):
+    """One validated line of a price sheet"""
+    service: str
+    description: Optional[str] = None
+    unit: str
+    category: Optional[str] = None
+    min_price: float
+    max_price: float
+    notes: Optional[str] = None
+    region: str
+    source: str
+    confidence: float
+
+    @field_validator("service", "unit", "region", "source")
+    @classmethod
+    def _not_blank(cls, value: str) -> str:
+        value = value.strip()
+        if not value:
+            raise ValueError("must not be empty")
+        return value
+
+    @field_validator("confidence")
+    @classmethod
+    def _confidence_range(cls, value: float) -> float:
+        if not 0 <= value <= 1:
+            raise ValueError("must be between 0 and 1")
+        return value
+
+    @model_validator(mode="after")
+    def _price_range(self) -> "PriceRow":
+        if self.min_price < 0:
+            raise ValueError("min_price must not be negative")
+        if self.max_price < self.min_price:
+            raise ValueError("max_price must be >= min_price")
+        return self
+
+class PriceCatalogService:
+    """
+    Loads declarative price sheets (YAML, CSV or Parquet) into service_types and
+    pricing_data with set-based upserts - one transaction per sheet
+    """
+
+    def __init__(self, db: Session = None):
+        self.db = db or SessionLocal()
+
+    def read_sheet(self, path: Path) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """Read a sheet into (sheet defaults, raw rows)"""
+        path = Path(path)
+        suffix = path.suffix.lower()
+
+        try:
+            if suffix in (".yaml", ".yml"):
+                with open(path, encoding="utf-8") as f:
+                    content = yaml.safe_load(f) or {}
+                if isinstance(content, list):
+                    return {}, content
+                defaults = {key: value for key, value in content.items() if key != "services"}
+                return defaults, content.get("services") or []
+
+            if suffix == ".csv":
+                with open(path, encoding="utf-8", newline="") as f:
+                    # Empty cells fall back to the sheet defaults
+                    return {}, [{key: value for key, value in row.items() if value not in ("", None)}
+                                for row in csv.DictReader(f)]
+
+            if suffix == ".parquet":
+                try:
+                    import pyarrow.parquet as pq
+                except ImportError:
+                    raise CatalogError(path.name, ["Parquet sheets need pyarrow installed"])
+                rows = pq.read_table(path).to_pylist()
+                return {}, [{key: value for key, value in row.items() if value is not None} for row in rows]
+
+        except CatalogError:
+            raise
+        except Exception as e:
+            raise CatalogError(path.name, [f"could not read sheet: {e}"])
+
+        raise CatalogError(path.name, [f"unsupported sheet type '{suffix}'"])
+
+    def validate_rows(self, sheet: str, rows: List[Dict[str, Any]], defaults: Dict[str, Any] = None) -> List[PriceRow]:
+        """Validate every row (row values override sheet defaults); all errors are reported at once"""
+        defaults = defaults or {}
+        validated = []
+        errors = []
+        seen = set()
+
+        if not rows:
+            raise CatalogError(sheet, ["sheet has no services"])
+
+        for number, row in enumerate(rows, start=1):
+            try:
+                price_row = PriceRow(**{**defaults, **row})
+            except ValidationError as e:
+                details = ", ".join(f"{'.'.join(str(part) for part in error['loc']) or 'row'}: {error['msg']}"
+                                    for error in e.errors())
+                errors.append(f"row {number} ({row.get('service', '?')}): {details}")
+                continue
+
+            key = (price_row.service, price_row.region, price_row.source)
+            if key in seen:
+                errors.append(f"row {number} ({price_row.service}): duplicate of an earlier row for {price_row.region}/{price_row.source}")
+                continue
+
+            seen.add(key)
+            validated.append(price_row)
+
+        if errors:
+            raise CatalogError(sheet, errors)
+        return validated
+
+    def _insert(self):
+        """Dialect-specific INSERT construct that supports ON CONFLICT"""
+        dialect = self.db.get_bind().dialect.name
+        if dialect == "postgresql":
+            return postgresql.insert
+        if dialect == "sqlite":
+            return sqlite.insert
+        raise CatalogError("catalog", [f"upserts are not supported on {dialect}"])
+
+    def _upsert(self, rows: List[PriceRow]):
+        """Upsert service types, then prices, as a handful of multi-row statements (no commit)"""
+        insert = self._insert()
+        now = datetime.utcnow()
+
+        services = {}
+        for row in rows:
+            services.setdefault(row.service, {
+                "name": row.service,
+                "description": row.description,
+                "unit": row.unit,
+                "category": row.category,
+                "created_at": now
+            })
+
+        # Sorted so concurrent sheet loads take row locks in the same order
+        service_values = sorted(services.values(), key=lambda service: service["name"])
+        for start in range(0, len(service_values), CHUNK_SIZE):
+            stmt = insert(ServiceType).values(service_values[start:start + CHUNK_SIZE])
+            self.db.execute(stmt.on_conflict_do_update(
+                index_elements=[ServiceType.name],
+                set_={
+                    "description": func.coalesce(stmt.excluded.description, ServiceType.description),
+                    "unit": stmt.excluded.unit,
+                    "category": func.coalesce(stmt.excluded.category, ServiceType.category)
+                }
+            ))
+
+        service_ids = dict(self.db.execute(
+            select(ServiceType.name, ServiceType.id).where(ServiceType.name.in_(list(services)))
+        ).all())
+
+        price_values = [
+            {
+                "service_type_id": service_ids[row.service],
+                "min_price": row.min_price,
+                "max_price": row.max_price,
+                "avg_price": (row.min_price + row.max_price) / 2,
+                "region": row.region,
+                "source": row.source,
+                "confidence": row.confidence,
+                "notes": row.notes,
+                "last_updated": now
+            }
+            for row in rows
+        ]
+        price_values.sort(key=lambda price: (price["service_type_id"], price["region"], price["source"]))
+        for start in range(0, len(price_values), CHUNK_SIZE):
+            stmt = insert(PricingData).values(price_values[start:start + CHUNK_SIZE])
+            self.db.execute(stmt.on_conflict_do_update(
+                index_elements=[PricingData.service_type_id, PricingData.region, PricingData.source],
+                index_where=PricingData.contractor_id.is_(None),
+                set_={
+                    "min_price": stmt.excluded.min_price,
+                    "max_price": stmt.excluded.max_price,
+                    "avg_price": stmt.excluded.avg_price,
+                    "confidence": stmt.excluded.confidence,
+                    "notes": stmt.excluded.notes,
+                    "last_updated": stmt.excluded.last_updated
+                }
+            ))
+
+    def load_file(self, path: Path, defaults: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Validate and load one price sheet in a single transaction"""
+        started = time.perf_counter()
+        path = Path(path)
+
+        sheet_defaults, raw_rows = self.read_sheet(path)
+        rows = self.validate_rows(path.name, raw_rows, {**(defaults or {}), **sheet_defaults})
+
+        try:
+            self._upsert(rows)
+            self.db.commit()
+            invalidate_catalog_version()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        return {
+            "sheet": path.name,
+            "services": len({row.service for row in rows}),
+            "prices": len(rows),
+            "regions": sorted({row.region for row in rows}),
+            "seconds": round(time.perf_counter() - started, 4)
+        }
+
+    def load_catalog(self, directory: Path = CATALOG_DIR) -> List[Dict[str, Any]]:
+        """Load every sheet in a catalog directory (sorted by file name)"""
+        return [self.load_file(path) for path in catalog_sheets(directory)]
+
+    def close(self):
+        """Close database connection"""
+        if self.db:
+            self.db.close()
+
+def catalog_sheets(directory: Path = CATALOG_DIR) -> List[Path]:
+    """Price sheet files in a catalog directory"""
+    return sorted(path for path in Path(directory).iterdir() if path.suffix.lower() in SHEET_SUFFIXES)
+
+def resolve_sheets(names: List[str], directory: Path = CATALOG_DIR) -> List[Path]:
+    """Map trade names (e.g. "kjokken") or file names to sheet paths"""
+    available = {path.stem: path for path in catalog_sheets(directory)}
+    available.update({path.name: path for path in catalog_sheets(directory)})
+
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        raise CatalogError("catalog", [f"unknown sheet '{name}'" for name in unknown])
+    return [available[name] for name in names]
+
+def _load_sheet(path: Path, session_factory: Callable[[], Session]) -> Dict[str, Any]:
+    """Load one sheet on its own session; failures are reported, not raised"""
+    started = time.perf_counter()
+    catalog = PriceCatalogService(session_factory())
+    try:
+        return catalog.load_file(path)
+    except Exception as e:
+        return {
+            "sheet": path.name,
+            "error": str(e),
+            "seconds": round(time.perf_counter() - started, 4)
+        }
+    finally:
+        catalog.close()
+
+def refresh_catalog(
+    sheets: List[str] = None,
+    directory: Path = CATALOG_DIR,
+    max_workers: int = None,
+    session_factory: Callable[[], Session] = SessionLocal,
+    recalculate_market_rates: bool = True
+) -> Dict[str, Any]:
+    """
+    Load price sheets concurrently in-process (one session per sheet from the shared
+    connection pool), then recompute market rates once for every region touched
+    (which also rebuilds the regional price resolutions)
+    """
+    started = time.perf_counter()
+    paths = resolve_sheets(sheets, directory) if sheets else catalog_sheets(directory)
+
+    region_service = RegionService(session_factory())
+    try:
+        region_table = region_service.load_regions()
+        # Contractors registered through the legacy text columns join the directory
+        region_table["contractors"] = ContractorDirectory(region_service.db).sync_legacy_fields()
+    finally:
+        region_service.close()
+
+    workers = max_workers or min(8, len(paths)) or 1
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="catalog") as pool:
+        results = list(pool.map(lambda path: _load_sheet(path, session_factory), paths))
+
+    loaded = [result for result in results if "error" not in result]
+    regions = sorted({region for result in loaded for region in result["regions"]})
+
+    market_rates = {"regions": regions, "resolutions": 0, "seconds": 0.0}
+    if recalculate_market_rates and loaded:
+        rates_started = time.perf_counter()
+        pricing_service = PricingService(session_factory())
+        try:
+            market_rates["resolutions"] = pricing_service.recalculate_market_rates(regions=regions)["resolutions"]
+        finally:
+            pricing_service.db.close()
+        market_rates["seconds"] = round(time.perf_counter() - rates_started, 4)
+
+    return {
+        "sheets": results,
+        "loaded": len(loaded),
+        "failed": len(results) - len(loaded),
+        "prices": sum(result["prices"] for result in loaded),
+        "workers": workers,
+        "region_table": region_table,
+        "market_rates": market_rates,
+        "seconds": round(time.perf_counter() - started, 4)
+    }
@@ -1,8 +1,20 @@
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Iterable
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from ..models.pricing import ServiceType, PricingData, MarketRate, Contractor
+from sqlalchemy import func, select, and_, or_, tuple_, literal
+from sqlalchemy.dialects import postgresql, sqlite
+from datetime import datetime
+import time
+from ..models.pricing import ServiceType, PricingData, MarketRate, Contractor, PriceResolution
 from ..database import get_db
+from .market_rate_engine import compute_rates_from_rows
+from .region_service import RegionService
+from .contractor_directory import ContractorDirectory, DEFAULT_MAX_DISTANCE_KM
+from .estimate_cache import invalidate_catalog_version, catalog_version
+from ..calculators import PriceSnapshot, UnitPrice
+
+# Kolonnene et PriceSnapshot bygges fra (finnes i både market_rates og price_resolutions)
+SNAPSHOT_FIELDS = ("market_min", "market_max", "market_avg", "recommended_price", "p10_price",
+                   "p50_price", "p90_price", "sample_size", "confidence_score")
 
 class PricingService:
     """Service for håndtering av markedspriser og kostnadsestimater"""
@@ -11,18 +23,26 @@ class PricingService:
         self.db = db
     
     def get_service_price(self, service_name: str, area: float = None, region: str = "Oslo") -> Dict:
-        """Henter markedspris for en tjeneste"""
+        """
+        Henter markedspris for en tjeneste. region kan være et regionnavn, fylke,
+        postnummer eller en adresse med postnummer - slås opp i price_resolutions
+        (mest spesifikke tilgjengelige rate) med ett oppslag.
+        """
         
-        # Finn service type
-        service = self.db.query(ServiceType).filter(
-            ServiceType.name == service_name
-        ).first()
+        # Finn service type og forhåndsberegnet pris for regionen i samme spørring
+        region_code = RegionService(self.db).resolver().resolve(region)
+        service, resolution = self.db.execute(
+            select(ServiceType, PriceResolution).outerjoin(PriceResolution, and_(
+                PriceResolution.service_type_id == ServiceType.id,
+                PriceResolution.region_code == region_code
+            )).where(ServiceType.name == service_name)
+        ).first() or (None, None)
         
         if not service:
             return {"error": f"Service '{service_name}' not found"}
         
         # Hent markedsrate
-        market_rate = self.db.query(MarketRate).filter(
+        market_rate = resolution or self.db.query(MarketRate).filter(
             MarketRate.service_type_id == service.id,
             MarketRate.region == region
         ).first()
@@ -52,9 +72,16 @@ class PricingService:
                 "market_max": market_rate.market_max,
                 "market_avg": market_rate.market_avg,
                 "recommended_price": market_rate.recommended_price,
+                "p10_price": market_rate.p10_price,
+                "p50_price": market_rate.p50_price,
+                "p90_price": market_rate.p90_price,
                 "sample_size": market_rate.sample_size,
                 "confidence": market_rate.confidence_score
             }
+            if resolution:
+                market_rate["region_code"] = resolution.region_code
+                market_rate["resolved_from"] = resolution.source_region_code or "national_estimate"
+                market_rate["price_factor"] = resolution.price_factor
         
         # Beregn totalkostnad hvis area er oppgitt
         if area and market_rate:
@@ -83,6 +110,63 @@ class PricingService:
             "region": region
         }
     
+    def price_snapshot(self, service_names: Iterable[str] = None, region: str = "Oslo") -> PriceSnapshot:
+        """
+        Markedspriser for flere tjenester i én region, hentet med én spørring, som et
+        uforanderlig PriceSnapshot for kalkulatorene. Forhåndsberegnet price_resolution
+        brukes først, ellers markedsraten for regionen. Tjenester uten rate utelates.
+        """
+        return self.price_snapshots(service_names, [region])[region]
+    
+    def price_snapshots(self, service_names: Iterable[str] = None, regions: Iterable[str] = ("Oslo",)) -> Dict[str, PriceSnapshot]:
+        """
+        PriceSnapshot per region for mange regioner med én spørring (price_resolutions
+        for regionkodene UNION ALL market_rates for regionnavnene)
+        """
+        regions = list(dict.fromkeys(regions))
+        resolver = RegionService(self.db).resolver()
+        codes = {region: resolver.resolve(region) for region in regions}
+        names = list(service_names) if service_names is not None else None
+        
+        def rates(table, region_column, region_values, kind):
+            query = select(
+                literal(kind).label("kind"), ServiceType.name, ServiceType.unit, region_column.label("region"),
+                *(getattr(table, field) for field in SNAPSHOT_FIELDS)
+            ).join(table, table.service_type_id == ServiceType.id).where(region_column.in_(region_values))
+            return query.where(ServiceType.name.in_(names)) if names is not None else query
+        
+        query = rates(PriceResolution, PriceResolution.region_code, [code for code in codes.values() if code], 0).union_all(
+            rates(MarketRate, MarketRate.region, regions, 1)
+        )
+        
+        # kind 0: price_resolutions per regionkode, kind 1: market_rates per regionnavn
+        found = ({}, {})
+        for row in self.db.execute(query):
+            found[row.kind].setdefault(row.region, {})[row.name] = row
+        
+        version = catalog_version(self.db)
+        snapshots = {}
+        for region in regions:
+            # Forhåndsberegnet regionpris går foran markedsraten
+            prices = {**found[1].get(region, {}), **found[0].get(codes[region], {})}
+            snapshots[region] = PriceSnapshot(region, {
+                name: UnitPrice(
+                    service=name,
+                    unit=row.unit,
+                    market_min=row.market_min,
+                    market_max=row.market_max,
+                    market_avg=row.market_avg,
+                    recommended_price=row.recommended_price,
+                    p10_price=row.p10_price,
+                    p50_price=row.p50_price,
+                    p90_price=row.p90_price,
+                    sample_size=row.sample_size,
+                    confidence=row.confidence_score
+                )
+                for name, row in prices.items()
+            }, version)
+        return snapshots
+
     def add_pricing_data(self, service_name: str, contractor_name: str = None, 
                         min_price: float = None, max_price: float = None,
                         region: str = "Oslo", source: str = "manual") -> bool:
@@ -116,95 +200,103 @@ class PricingService:
         )
         
         self.db.add(pricing)
+        if contractor:
+            # Kontraktørkatalogen matcher på spesialitet og lokasjon, ikke på prisradene
+            ContractorDirectory(self.db).link_price(contractor, service.id, region)
         self.db.commit()
+        invalidate_catalog_version()
         return True
     
     def update_market_rates(self, region: str = "Oslo"):
         """Oppdaterer beregnede markedsrater basert på alle tilgjengelige data"""
+        return self.recalculate_market_rates(regions=[region])
+    
+    def recalculate_market_rates(self, regions: List[str] = None, incremental: bool = False,
+                                 rebuild_resolutions: bool = True, **engine_options) -> Dict:
+        """
+        Beregner markedsrater for alle tjenester og regioner: ett snapshot av pricing_data,
+        én vektorisert beregning (market_rate_engine) og én upsert av market_rates.
+        Incremental: kun (tjeneste, region) med nyere pricing_data enn siste beregning.
+        Bygger deretter price_resolutions på nytt (regionhierarki med prisindekser).
+        """
+        started = time.perf_counter()
+        now = datetime.utcnow()
         
-        services = self.db.query(ServiceType).all()
+        snapshot = select(
+            PricingData.service_type_id,
+            PricingData.region,
+            PricingData.min_price,
+            PricingData.max_price,
+            PricingData.confidence,
+            PricingData.last_updated
+        ).where(
+            PricingData.service_type_id.isnot(None),
+            PricingData.region.isnot(None)
+        )
         
-        for service in services:
-            # Hent all pricing data for denne tjenesten
-            pricing_data = self.db.query(PricingData).filter(
-                PricingData.service_type_id == service.id,
-                PricingData.region == region
-            ).all()
-            
-            if not pricing_data:
-                continue
-            
-            # Beregn markedsrater
-            min_prices = [p.min_price for p in pricing_data if p.min_price]
-            max_prices = [p.max_price for p in pricing_data if p.max_price]
-            
-            if not min_prices or not max_prices:
-                continue
-            
-            market_min = min(min_prices)
-            market_max = max(max_prices)
-            market_avg = (sum(min_prices) + sum(max_prices)) / (len(min_prices) + len(max_prices))
-            
-            # Beregn anbefalt pris (litt over gjennomsnittet)
-            recommended = market_avg * 1.1
-            
-            # Sjekk om market rate allerede eksisterer
-            existing = self.db.query(MarketRate).filter(
-                MarketRate.service_type_id == service.id,
-                MarketRate.region == region
-            ).first()
-            
-            if existing:
-                existing.market_min = market_min
-                existing.market_max = market_max
-                existing.market_avg = market_avg
-                existing.recommended_price = recommended
-                existing.sample_size = len(pricing_data)
-                existing.confidence_score = min(0.9, len(pricing_data) / 10)  # Mer data = høyere confidence
-            else:
-                market_rate = MarketRate(
-                    service_type_id=service.id,
-                    market_min=market_min,
-                    market_max=market_max,
-                    market_avg=market_avg,
-                    recommended_price=recommended,
-                    sample_size=len(pricing_data),
-                    confidence_score=min(0.9, len(pricing_data) / 10),
-                    region=region
-                )
-                self.db.add(market_rate)
+        if regions:
+            snapshot = snapshot.where(PricingData.region.in_(regions))
         
-        self.db.commit()
-    
-    def get_contractors_by_service(self, service_name: str, region: str = "Oslo") -> List[Dict]:
-        """Henter kontraktører som tilbyr en spesifikk tjeneste"""
+        if incremental:
+            # Par uten rate, eller med prisdata endret etter siste beregning
+            changed = select(PricingData.service_type_id, PricingData.region).outerjoin(
+                MarketRate,
+                and_(MarketRate.service_type_id == PricingData.service_type_id, MarketRate.region == PricingData.region)
+            ).where(or_(
+                MarketRate.id.is_(None),
+                MarketRate.last_calculated.is_(None),
+                PricingData.last_updated > MarketRate.last_calculated
+            ))
+            snapshot = snapshot.where(tuple_(PricingData.service_type_id, PricingData.region).in_(changed))
         
-        service = self.db.query(ServiceType).filter(
-            ServiceType.name == service_name
-        ).first()
+        rows = self.db.execute(snapshot).all()
+        computed = time.perf_counter()
+        rates = compute_rates_from_rows(rows, now=now, **engine_options)
+        computed = time.perf_counter() - computed
         
-        if not service:
-            return []
+        if rates:
+            insert = self._insert()
+            for rate in rates:
+                rate["last_calculated"] = now
+            columns = [column for column in rates[0] if column not in ("service_type_id", "region")]
+            
+            for start in range(0, len(rates), 500):
+                stmt = insert(MarketRate).values(rates[start:start + 500])
+                self.db.execute(stmt.on_conflict_do_update(
+                    index_elements=[MarketRate.service_type_id, MarketRate.region],
+                    set_={column: getattr(stmt.excluded, column) for column in columns}
+                ))
         
-        contractors = self.db.query(Contractor).join(PricingData).filter(
-            PricingData.service_type_id == service.id,
-            Contractor.location.like(f"%{region}%")
-        ).all()
+        self.db.commit()
+        invalidate_catalog_version()
         
-        result = []
-        for contractor in contractors:
-            pricing = self.db.query(PricingData).filter(
-                PricingData.service_type_id == service.id,
-                PricingData.contractor_id == contractor.id
-            ).first()
-            
-            result.append({
-                "name": contractor.name,
-                "company_type": contractor.company_type,
-                "location": contractor.location,
-                "website": contractor.website,
-                "phone": contractor.phone,
-                "price_range": f"{pricing.min_price}-{pricing.max_price} kr/{service.unit}" if pricing else "Kontakt for pris"
-            })
-        
-        return result
\ No newline at end of file
+        resolutions = RegionService(self.db).rebuild_price_resolutions()["resolutions"] if rebuild_resolutions else 0
+        
+        return {
+            "rates_updated": len(rates),
+            "resolutions": resolutions,
+            "outliers_rejected": sum(rate["outliers_rejected"] for rate in rates),
+            "regions": regions or "all",
+            "incremental": incremental,
+            "compute_seconds": round(computed, 4),
+            "seconds": round(time.perf_counter() - started, 4)
+        }
+    
+    def _insert(self):
+        """Dialektspesifikk INSERT som støtter ON CONFLICT (PostgreSQL og SQLite)"""
+        dialect = self.db.get_bind().dialect.name
+        if dialect == "postgresql":
+            return postgresql.insert
+        if dialect == "sqlite":
+            return sqlite.insert
+        raise ValueError(f"Upsert av markedsrater støttes ikke på {dialect}")
+    
+    def get_contractors_by_service(self, service_name: str, region: str = "Oslo",
+                                   max_distance_km: Optional[float] = DEFAULT_MAX_DISTANCE_KM,
+                                   limit: int = None) -> List[Dict]:
+        """
+        Henter kontraktører som tilbyr en spesifikk tjeneste, nærmeste først.
+        region kan være regionnavn, postnummer eller adresse. Slås opp i en indeks i
+        minnet (tjeneste -> region -> kontraktører) som bygges på nytt ved endringer.
+        """
+        return ContractorDirectory(self.db).find(service_name, region, max_distance_km=max_distance_km, limit=limit)
\ No newline at end of file
@@ -0,0 +1,115 @@
+from typing import Dict, List, NamedTuple, Optional
+from functools import lru_cache
+import os
+
+# Tokens the per-turn sections of a prompt (context, history, learned patterns) may use
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "600"))
+# tiktoken encoding for local counts; without tiktoken installed (it's optional) a
+# ~4 characters per token estimate is used instead
+PROMPT_ENCODING = os.getenv("PROMPT_ENCODING", "o200k_base")
+
+@lru_cache(maxsize=1)
+def _encoding():
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        return tiktoken.get_encoding(PROMPT_ENCODING)
+    except Exception as e:
+        # The BPE file is downloaded on first use
+        print(f"tiktoken encoding {PROMPT_ENCODING} unavailable, estimating tokens: {e}")
+        return None
+
+@lru_cache(maxsize=4096)
+def count_tokens(text: str) -> int:
+    """Tokens in `text` (cached: the static prompt blocks are counted once)"""
+    if not text:
+        return 0
+    encoding = _encoding()
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text))
+
+def truncate_tokens(text: str, budget: int) -> str:
+    """The start of `text` that fits in `budget` tokens"""
+    if count_tokens(text) <= budget:
+        return text
+    if budget <= 0:
+        return ""
+    encoding = _encoding()
+    if encoding is None:
+        return text[:budget * 4]
+    return encoding.decode(encoding.encode(text)[:budget])
+
+class PromptSection(NamedTuple):
+    """
+    A per-turn block of the prompt. Items are whole lines/examples and are dropped to fit
+    the budget: from the end (items in priority order) or, with keep_latest, from the
+    start (oldest history first). With truncate, the first item that doesn't fit is cut
+    to the space left instead (for one long item, like the session context).
+    `max_tokens` caps the section so it can't crowd out the ones after it.
+    """
+    heading: str
+    items: List[str]
+    keep_latest: bool = False
+    max_tokens: Optional[int] = None
+    truncate: bool = False
+
+class PromptBuilder:
+    """
+    Chat messages as a constant prefix (system prompt + instruction block) followed by
+    the per-turn sections and the query. Identical leading bytes on every request is
+    what upstream prompt caching matches on, so everything that varies per turn comes
+    after the prefix, capped at `budget` tokens.
+    """
+
+    def __init__(self, system: str, instructions: str = "", budget: int = PROMPT_TOKEN_BUDGET):
+        self.system = system
+        self.instructions = instructions
+        self.budget = budget
+
+    @property
+    def prefix_tokens(self) -> int:
+        return count_tokens(self.system) + count_tokens(self.instructions)
+
+    def messages(self, query: str, *sections: Optional[PromptSection]) -> List[Dict[str, str]]:
+        """
+        [system, user] messages. The query block always goes in (cut to the budget
+        if it alone exceeds it); sections fill what is left in the order given.
+        """
+        query = truncate_tokens(query, self.budget)
+        remaining = self.budget - count_tokens(query)
+        blocks = [self.instructions] if self.instructions else []
+        for section in sections:
+            if not section or not section.items:
+                continue
+            heading_tokens = count_tokens(section.heading) + 1
+            available = remaining if section.max_tokens is None else min(remaining, section.max_tokens)
+            kept = fit_items(section.items, available - heading_tokens, section.keep_latest, section.truncate)
+            if kept:
+                blocks.append("\n".join([section.heading, *kept]))
+                remaining -= heading_tokens + sum(count_tokens(item) + 1 for item in kept)
+        blocks.append(query)
+        return [
+            {"role": "system", "content": self.system},
+            {"role": "user", "content": "\n\n".join(blocks)}
+        ]
+
+def fit_items(items: List[str], budget: int, keep_latest: bool = False, truncate: bool = False) -> List[str]:
+    """
+    Whole items, in order, that fit in `budget` tokens (one extra token per newline);
+    with truncate, followed by the start of the first one that doesn't
+    """
+    ordered = list(reversed(items)) if keep_latest else list(items)
+    kept = []
+    for item in ordered:
+        cost = count_tokens(item) + 1
+        if cost > budget:
+            cut = truncate_tokens(item, budget - 1) if truncate else ""
+            if cut:
+                kept.append(cut)
+            break
+        kept.append(item)
+        budget -= cost
+    return list(reversed(kept)) if keep_latest else kept
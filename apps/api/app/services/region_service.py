@@ -0,0 +1,272 @@
+from typing import Dict, Any, List, Optional, Iterable, Tuple
+from pathlib import Path
+from datetime import datetime
+import json
+import math
+import re
+import time
+import weakref
+
+import yaml
+from sqlalchemy.orm import Session
+from sqlalchemy import select, delete
+
+from ..models.pricing import Region, PostcodeRange, MarketRate, PriceResolution
+from ..database import SessionLocal
+from .estimate_cache import catalog_version, invalidate_catalog_version
+
+# Region hierarchy and postcode ranges shipped with the price catalog
+REGIONS_FILE = Path(__file__).resolve().parents[2] / "catalog" / "regions" / "norge.yaml"
+
+NATIONAL = "NO"
+
+PRICE_FIELDS = ("market_min", "market_max", "market_avg", "recommended_price", "p10_price", "p50_price", "p90_price")
+
+# Confidence multiplier for a rate borrowed from a parent region or the national estimate
+BORROWED_CONFIDENCE = 0.8
+
+# Rows per INSERT statement
+CHUNK_SIZE = 500
+
+# engine -> (catalog version, resolver); rebuilt when the version moves, so a region
+# reload by refresh_price_catalog.py in another process is picked up here too
+_resolvers = weakref.WeakKeyDictionary()
+
+_POSTCODE = re.compile(r"(?<!\d)(\d{4})(?!\d)")
+_WORD = re.compile(r"[^\W\d_]+(?:-[^\W\d_]+)*")
+
+class RegionResolver:
+    """
+    In-memory region lookup. Postcodes resolve through a dense 10 000-slot table and
+    names/aliases/codes through a dict, so every lookup is O(1).
+    """
+
+    def __init__(self, regions: Iterable[Dict[str, Any]], postcode_ranges: Iterable[Tuple[str, str, str]]):
+        self.parents: Dict[str, Optional[str]] = {}
+        self.price_index: Dict[str, float] = {}
+        self.names: Dict[str, str] = {}
+        self.coordinates: Dict[str, Tuple[float, float]] = {}
+        self._by_name: Dict[str, str] = {}
+        self._postcodes: List[Optional[str]] = [None] * 10000
+        self._max_words = 1
+
+        for region in regions:
+            code = region["code"]
+            self.parents[code] = region.get("parent_code")
+            self.price_index[code] = region.get("price_index") or 1.0
+            self.names[code] = region["name"]
+            if region.get("latitude") is not None and region.get("longitude") is not None:
+                self.coordinates[code] = (region["latitude"], region["longitude"])
+            for name in [code, region["name"], *(region.get("aliases") or [])]:
+                self._by_name.setdefault(name.strip().lower(), code)
+                self._max_words = max(self._max_words, len(name.split()))
+
+        for postcode_from, postcode_to, code in postcode_ranges:
+            for postcode in range(int(postcode_from), int(postcode_to) + 1):
+                self._postcodes[postcode] = code
+
+    def resolve(self, value: Optional[str]) -> Optional[str]:
+        """
+        Region code for a region name, alias, code, postcode or address. A region named in
+        the text wins over a postcode in it ("Oslo 2025" is Oslo); a bare 4-digit value is a
+        postcode, and only a municipality code when no postcode range covers it.
+        """
+        if value is None:
+            return None
+        text = str(value).strip()
+        key = text.lower()
+        postcode = _POSTCODE.search(text)
+
+        if not (postcode and postcode.group(1) == text) and key in self._by_name:
+            return self._by_name[key]
+
+        # Names and aliases within the text, longest first ("Møre og Romsdal" before "Romsdal")
+        words = [word.lower() for word in _WORD.findall(text)]
+        for size in range(min(self._max_words, len(words)), 0, -1):
+            for start in range(len(words) - size + 1):
+                code = self._by_name.get(" ".join(words[start:start + size]))
+                if code is not None:
+                    return code
+
+        if postcode:
+            code = self._postcodes[int(postcode.group(1))]
+            if code is not None:
+                return code
+
+        return self._by_name.get(key)
+
+    def chain(self, code: str) -> List[str]:
+        """The region and its ancestors, most specific first"""
+        chain = []
+        while code is not None and code not in chain:
+            chain.append(code)
+            code = self.parents.get(code)
+        return chain
+
+    def centre(self, code: str) -> Optional[Tuple[float, float]]:
+        """Coordinates of the region, or of its nearest ancestor that has them"""
+        return next((self.coordinates[ancestor] for ancestor in self.chain(code) if ancestor in self.coordinates), None)
+
+    def distance_km(self, from_code: str, to_code: str) -> Optional[float]:
+        """Great-circle distance between two region centres (None when either has no coordinates)"""
+        a, b = self.centre(from_code), self.centre(to_code)
+        if a is None or b is None:
+            return None
+        lat1, lon1, lat2, lon2 = map(math.radians, (*a, *b))
+        h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+        return 2 * 6371.0 * math.asin(math.sqrt(h))
+
+class RegionService:
+    """Region hierarchy, postcode lookup and the precomputed service x region price table"""
+
+    def __init__(self, db: Session = None):
+        self.db = db or SessionLocal()
+
+    def load_regions(self, path: Path = REGIONS_FILE) -> Dict[str, Any]:
+        """Load (or update) the region hierarchy and replace the postcode ranges"""
+        with open(path, encoding="utf-8") as f:
+            regions = (yaml.safe_load(f) or {}).get("regions") or []
+
+        try:
+            # Parents are listed before their children
+            for region in regions:
+                self.db.merge(Region(
+                    code=str(region["code"]),
+                    name=region["name"],
+                    level=region["level"],
+                    parent_code=region.get("parent"),
+                    price_index=region.get("price_index", 1.0),
+                    aliases=json.dumps(region.get("aliases") or [], ensure_ascii=False),
+                    latitude=region.get("lat"),
+                    longitude=region.get("lon")
+                ))
+            self.db.flush()
+
+            self.db.execute(delete(PostcodeRange))
+            ranges = [
+                {"postcode_from": postcode_from, "postcode_to": postcode_to, "region_code": str(region["code"])}
+                for region in regions
+                for postcode_from, postcode_to in region.get("postcodes") or []
+            ]
+            if ranges:
+                self.db.execute(PostcodeRange.__table__.insert(), ranges)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        _resolvers.pop(self.db.get_bind(), None)
+        invalidate_catalog_version()
+        return {"regions": len(regions), "postcode_ranges": len(ranges)}
+
+    def resolver(self) -> RegionResolver:
+        """The cached resolver for this session's engine, rebuilt when the catalog version changes"""
+        bind = self.db.get_bind()
+        version = catalog_version(self.db)
+        cached = _resolvers.get(bind)
+        resolver = cached[1] if cached and cached[0] == version else None
+        if resolver is None:
+            regions = [
+                {
+                    "code": region.code,
+                    "name": region.name,
+                    "parent_code": region.parent_code,
+                    "price_index": region.price_index,
+                    "aliases": json.loads(region.aliases) if region.aliases else [],
+                    "latitude": region.latitude,
+                    "longitude": region.longitude
+                }
+                for region in self.db.execute(select(Region)).scalars()
+            ]
+            ranges = self.db.execute(
+                select(PostcodeRange.postcode_from, PostcodeRange.postcode_to, PostcodeRange.region_code)
+            ).all()
+            resolver = RegionResolver(regions, ranges)
+            _resolvers[bind] = (version, resolver)
+        return resolver
+
+    def _national_estimate(self, direct: Dict[str, Dict[str, Any]], resolver: RegionResolver) -> Dict[str, Any]:
+        """National rate derived from regional rates, deflated by their price index and weighted by sample size"""
+        estimate = {}
+        for field in PRICE_FIELDS + ("confidence_score",):
+            total = weight_sum = 0.0
+            for code, rate in direct.items():
+                if rate[field] is None:
+                    continue
+                weight = rate["sample_size"] or 1
+                index = 1.0 if field == "confidence_score" else resolver.price_index[code]
+                total += rate[field] / index * weight
+                weight_sum += weight
+            estimate[field] = total / weight_sum if weight_sum else None
+        estimate["sample_size"] = sum(rate["sample_size"] or 0 for rate in direct.values())
+        return estimate
+
+    def rebuild_price_resolutions(self) -> Dict[str, Any]:
+        """
+        Precompute the price for every service and region: the region's own market rate,
+        else the nearest ancestor's, else a national estimate - scaled by the ratio of the
+        regions' price indices. Replaces price_resolutions in one transaction.
+        """
+        started = time.perf_counter()
+        resolver = self.resolver()
+        if not resolver.parents:
+            return {"resolutions": 0, "seconds": round(time.perf_counter() - started, 4)}
+
+        direct_rates: Dict[int, Dict[str, Dict[str, Any]]] = {}
+        columns = [getattr(MarketRate, field) for field in PRICE_FIELDS]
+        for row in self.db.execute(select(
+            MarketRate.service_type_id, MarketRate.region, *columns,
+            MarketRate.sample_size, MarketRate.confidence_score
+        )):
+            code = resolver.resolve(row.region)
+            if code is not None:
+                direct_rates.setdefault(row.service_type_id, {})[code] = row._asdict()
+
+        now = datetime.utcnow()
+        resolutions = []
+        for service_type_id, direct in direct_rates.items():
+            national = None
+            for code in resolver.parents:
+                source = next((ancestor for ancestor in resolver.chain(code) if ancestor in direct), None)
+                if source is not None:
+                    rate, source_index = direct[source], resolver.price_index[source]
+                else:
+                    national = national or self._national_estimate(direct, resolver)
+                    rate, source_index = national, 1.0
+
+                factor = resolver.price_index[code] / source_index
+                resolution = {
+                    "service_type_id": service_type_id,
+                    "region_code": code,
+                    "source_region_code": source,
+                    "price_factor": factor,
+                    "sample_size": rate["sample_size"],
+                    "confidence_score": rate["confidence_score"],
+                    "resolved_at": now
+                }
+                for field in PRICE_FIELDS:
+                    resolution[field] = rate[field] * factor if rate[field] is not None else None
+                if source != code and resolution["confidence_score"] is not None:
+                    resolution["confidence_score"] *= BORROWED_CONFIDENCE
+                resolutions.append(resolution)
+
+        try:
+            self.db.execute(delete(PriceResolution))
+            for start in range(0, len(resolutions), CHUNK_SIZE):
+                self.db.execute(PriceResolution.__table__.insert(), resolutions[start:start + CHUNK_SIZE])
+            self.db.commit()
+            invalidate_catalog_version()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        return {
+            "resolutions": len(resolutions),
+            "services": len(direct_rates),
+            "seconds": round(time.perf_counter() - started, 4)
+        }
+
+    def close(self):
+        """Close database connection"""
+        if self.db:
+            self.db.close()
@@ -0,0 +1,84 @@
+from typing import Dict, Any, Hashable, Callable, Awaitable, TypeVar
+import asyncio
+import hashlib
+import json
+import re
+import threading
+
+from .tracing import record_cache_lookup
+
+T = TypeVar("T")
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical async calls: the first caller for a key starts the
+    work, everyone arriving while it is in flight awaits the same result (or exception).
+    Nothing is kept once the call finishes, so a response cache can sit in front of it.
+    """
+
+    def __init__(self, name: str = "single_flight"):
+        self.name = name
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.shared = 0
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[T]]) -> T:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            task = self._calls.get(key)
+            shared = task is not None and task.get_loop() is loop and not task.done()
+            if shared:
+                self.shared += 1
+            else:
+                # The shared work runs as its own task, so one waiter being cancelled
+                # (e.g. a hedged analysis hitting its deadline) doesn't fail the others
+                task = loop.create_task(call())
+                self._calls[key] = task
+                self.leaders += 1
+                task.add_done_callback(lambda done, key=key: self._forget(key, done))
+        # A shared call is a hit: the caller didn't go upstream
+        record_cache_lookup(self.name, shared)
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task):
+        with self._lock:
+            if self._calls.get(key) is task:
+                del self._calls[key]
+        if not task.cancelled():
+            task.exception()  # retrieved here so an unawaited failure isn't logged as lost
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            calls = self.leaders + self.shared
+            return {
+                "in_flight": len(self._calls),
+                "upstream_calls": self.leaders,
+                "coalesced_calls": self.shared,
+                "coalesced_rate": round(self.shared / calls, 3) if calls else 0.0
+            }
+
+    def clear_stats(self):
+        with self._lock:
+            self.leaders = self.shared = 0
+
+def _normalise(value: Any) -> Any:
+    if isinstance(value, str):
+        return re.sub(r"\s+", " ", value).strip().casefold()
+    if isinstance(value, dict):
+        return {key: _normalise(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalise(item) for item in value]
+    return value
+
+def prompt_key(**request: Any) -> str:
+    """Key of an LLM request with whitespace and case in the prompt text normalised"""
+    encoded = json.dumps(_normalise(request), sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+# Shared by every OpenAI call site in the process
+llm_single_flight = SingleFlight("llm_single_flight")
@@ -0,0 +1,275 @@
+from typing import Dict, Any, List, Optional, Tuple
+from collections import deque
+from contextvars import ContextVar
+from functools import lru_cache
+import os
+import re
+import sys
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+try:
+    from greenlet import getcurrent
+except ImportError:  # only the async engine needs it
+    getcurrent = None
+
+# Count and time every SQL statement per request and per code path (GET /api/admin/perf)
+SQL_PROFILING = os.getenv("SQL_PROFILING", "1") == "1"
+
+# Debug mode: add X-SQL-Queries / X-SQL-Time-Ms / X-SQL-N-Plus-One headers to every response
+SQL_PROFILE_HEADERS = os.getenv("SQL_PROFILE_HEADERS", "0") == "1"
+
+# The same statement from the same code path this many times in one request is flagged as N+1
+N_PLUS_ONE_THRESHOLD = int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", "5"))
+
+# Flagged N+1 patterns kept for the admin endpoint
+N_PLUS_ONE_WINDOW = int(os.getenv("SQL_N_PLUS_ONE_WINDOW", "100"))
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Literals, IN-lists and multi-row VALUES, so statements differing only in values group together
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = r"(?:\?|%s|%\(\w+\)s|:\w+)"
+_LIST = rf"\(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})*\s*\)"
+_IN_LIST = re.compile(rf"\bIN\s*{_LIST}", re.IGNORECASE)
+_VALUES_ROWS = re.compile(rf"\bVALUES\s*{_LIST}(?:\s*,\s*{_LIST})*", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+_app_files: Dict[str, bool] = {}
+
+# Statements are parameterized, so the same few hundred texts repeat
+@lru_cache(maxsize=1024)
+def normalize_statement(statement: str) -> str:
+    """Statement text with literals, IN-lists and VALUES rows collapsed and whitespace squeezed"""
+    statement = _LITERALS.sub("?", statement)
+    statement = _IN_LIST.sub("IN (...)", statement)
+    statement = _VALUES_ROWS.sub("VALUES (...)", statement)
+    return _WHITESPACE.sub(" ", statement).strip()
+
+def _is_app_frame(filename: str) -> bool:
+    known = _app_files.get(filename)
+    if known is None:
+        path = os.path.abspath(filename)
+        known = path.startswith(APP_DIR) and path != os.path.abspath(__file__)
+        _app_files[filename] = known
+    return known
+
+def call_site() -> str:
+    """Innermost app function on the stack, as "services/module.py:function"
+
+    Async engine statements execute in a greenlet whose stack ends at the driver call, so
+    the walk continues in the parent greenlet, where the awaiting coroutines are.
+    """
+    frame = sys._getframe(1)
+    current = getcurrent() if getcurrent else None
+    while frame is not None or current is not None:
+        while frame is not None:
+            if _is_app_frame(frame.f_code.co_filename):
+                path = os.path.relpath(frame.f_code.co_filename, APP_DIR).replace(os.sep, "/")
+                return f"{path}:{frame.f_code.co_name}"
+            frame = frame.f_back
+        current = current.parent if current is not None else None
+        frame = current.gr_frame if current is not None else None
+    return "(outside app)"
+
+class RequestProfile:
+    """SQL issued while handling one request, filled in by the engine events"""
+
+    def __init__(self, profiler: "SQLProfiler" = None):
+        # Only the profiler that started the request counts into it, if several are installed
+        self.profiler = profiler
+        self.statements = 0
+        self.seconds = 0.0
+        # (call site, normalized statement) -> [count, seconds]
+        self.by_site: Dict[Tuple[str, str], List[float]] = {}
+
+    def add(self, site: str, statement: str, seconds: float):
+        self.statements += 1
+        self.seconds += seconds
+        entry = self.by_site.setdefault((site, statement), [0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+
+    def n_plus_one(self, threshold: int = None) -> List[Dict[str, Any]]:
+        """Statements repeated at least `threshold` times from one code path"""
+        threshold = threshold or N_PLUS_ONE_THRESHOLD
+        return [
+            {"call_site": site, "statement": statement, "count": count, "sql_ms": round(seconds * 1000, 2)}
+            for (site, statement), (count, seconds) in self.by_site.items() if count >= threshold
+        ]
+
+_current_profile: ContextVar[Optional[RequestProfile]] = ContextVar("sql_request_profile", default=None)
+
+def current_request_profile() -> Optional[RequestProfile]:
+    """Profile of the request being served in this context, if any"""
+    return _current_profile.get()
+
+class SQLProfiler:
+    """Thread-safe SQL totals per route, code path and statement, with flagged N+1 patterns"""
+
+    def __init__(self, n_plus_one_window: int = N_PLUS_ONE_WINDOW):
+        self.n_plus_one_window = n_plus_one_window
+        self._lock = threading.Lock()
+        self._installed = False
+        self.clear()
+
+    @property
+    def enabled(self) -> bool:
+        return self._installed
+
+    def install(self):
+        """Listen on every Engine (sync and the lazily created async one)"""
+        with self._lock:
+            if self._installed:
+                return
+            event.listen(Engine, "before_cursor_execute", self._before_execute)
+            event.listen(Engine, "after_cursor_execute", self._after_execute)
+            event.listen(Engine, "handle_error", self._on_error)
+            self._installed = True
+
+    def uninstall(self):
+        with self._lock:
+            if not self._installed:
+                return
+            event.remove(Engine, "before_cursor_execute", self._before_execute)
+            event.remove(Engine, "after_cursor_execute", self._after_execute)
+            event.remove(Engine, "handle_error", self._on_error)
+            self._installed = False
+
+    @staticmethod
+    def _before_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("sql_profiler_started", []).append(time.perf_counter())
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get("sql_profiler_started")
+        if not started:
+            return
+        self.record_statement(statement, time.perf_counter() - started.pop())
+
+    @staticmethod
+    def _on_error(exception_context):
+        # after_cursor_execute doesn't fire for a failed statement
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("sql_profiler_started"):
+            conn.info["sql_profiler_started"].pop()
+
+    def record_statement(self, statement: str, seconds: float):
+        site = call_site()
+        normalized = normalize_statement(statement)
+        profile = _current_profile.get()
+        if profile is not None and profile.profiler is self:
+            profile.add(site, normalized, seconds)
+        with self._lock:
+            for totals, key in ((self._sites, site), (self._statements, normalized)):
+                entry = totals.setdefault(key, [0, 0.0])
+                entry[0] += 1
+                entry[1] += seconds
+            if profile is None:
+                self._background[0] += 1
+                self._background[1] += seconds
+
+    def start_request(self) -> Tuple[RequestProfile, Any]:
+        """A fresh profile for the current context; pass the token to finish_request"""
+        profile = RequestProfile(self)
+        return profile, _current_profile.set(profile)
+
+    def finish_request(self, route: str, profile: RequestProfile, token: Any) -> List[Dict[str, Any]]:
+        """Fold a finished request into the totals; returns its N+1 patterns"""
+        _current_profile.reset(token)
+        flagged = profile.n_plus_one()
+        with self._lock:
+            entry = self._routes.setdefault(route, {
+                "requests": 0, "statements": 0, "seconds": 0.0, "max_statements": 0, "n_plus_one": 0
+            })
+            entry["requests"] += 1
+            entry["statements"] += profile.statements
+            entry["seconds"] += profile.seconds
+            entry["max_statements"] = max(entry["max_statements"], profile.statements)
+            entry["n_plus_one"] += len(flagged)
+            self._n_plus_one.extend({"route": route, **pattern} for pattern in flagged)
+        return flagged
+
+    def clear(self):
+        with self._lock:
+            self._routes: Dict[str, Dict[str, Any]] = {}
+            self._sites: Dict[str, List[float]] = {}
+            self._statements: Dict[str, List[float]] = {}
+            self._background = [0, 0.0]
+            self._n_plus_one = deque(maxlen=self.n_plus_one_window)
+
+    @staticmethod
+    def _top(totals: Dict[str, List[float]], key_name: str, top: int) -> List[Dict[str, Any]]:
+        ranked = sorted(totals.items(), key=lambda item: item[1][1], reverse=True)[:top]
+        return [
+            {key_name: key, "statements": count, "sql_ms": round(seconds * 1000, 2)}
+            for key, (count, seconds) in ranked
+        ]
+
+    def stats(self, top: int = 10) -> Dict[str, Any]:
+        with self._lock:
+            requests = sum(entry["requests"] for entry in self._routes.values())
+            statements = sum(entry["statements"] for entry in self._routes.values())
+            return {
+                "enabled": self.enabled,
+                "requests": requests,
+                "statements_per_request": round(statements / requests, 2) if requests else 0.0,
+                "background": {"statements": self._background[0], "sql_ms": round(self._background[1] * 1000, 2)},
+                "n_plus_one_threshold": N_PLUS_ONE_THRESHOLD,
+                "routes": {
+                    route: {
+                        "requests": entry["requests"],
+                        "statements_per_request": round(entry["statements"] / entry["requests"], 2),
+                        "max_statements": entry["max_statements"],
+                        "sql_ms_per_request": round(entry["seconds"] * 1000 / entry["requests"], 2),
+                        "n_plus_one": entry["n_plus_one"]
+                    }
+                    for route, entry in sorted(self._routes.items(), key=lambda item: item[1]["seconds"], reverse=True)
+                },
+                "call_sites": self._top(self._sites, "call_site", top),
+                "statements": self._top(self._statements, "statement", top),
+                "n_plus_one": list(self._n_plus_one)[-top:]
+            }
+
+sql_profiler = SQLProfiler()
+
+def _route_name(scope: Dict[str, Any]) -> str:
+    # The route template, not the raw path, so path parameters don't split the totals
+    route = scope.get("route")
+    if route is not None:
+        return f"{scope['method']} {route.path}"
+    endpoint = scope.get("endpoint")
+    if endpoint is not None:
+        return f"{scope['method']} {getattr(endpoint, '__name__', type(endpoint).__name__)}"
+    return f"{scope['method']} (unmatched)"
+
+class SQLProfilerMiddleware:
+    """ASGI middleware attributing SQL to the request (and its route) being served"""
+
+    def __init__(self, app, profiler: SQLProfiler = None, headers: bool = None):
+        self.app = app
+        self.profiler = profiler or sql_profiler
+        self.headers = SQL_PROFILE_HEADERS if headers is None else headers
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.profiler.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        profile, token = self.profiler.start_request()
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start" and self.headers:
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-sql-queries", str(profile.statements).encode()),
+                    (b"x-sql-time-ms", f"{profile.seconds * 1000:.2f}".encode()),
+                    (b"x-sql-n-plus-one", str(len(profile.n_plus_one())).encode())
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            self.profiler.finish_request(_route_name(scope), profile, token)
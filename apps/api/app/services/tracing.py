@@ -0,0 +1,202 @@
+from typing import Dict, Any, List, Optional, Callable, Iterator
+from contextlib import contextmanager, ExitStack
+from contextvars import ContextVar
+import logging
+import random
+import threading
+import time
+
+from . import metrics
+from .sql_profiler import current_request_profile
+
+try:
+    from opentelemetry import trace as otel_trace
+except ImportError:  # the built-in spans and /metrics work without it
+    otel_trace = None
+
+logger = logging.getLogger(__name__)
+
+# Root span of a chat turn; its end feeds the per-agent/analysis type/partner histogram
+CHAT_SPAN = "chat"
+
+class Span:
+    """
+    One timed stage, with OpenTelemetry-style ids and attributes. The SQL issued by the
+    request while the span was open is added as db.statement_count / db.duration_ms.
+    """
+
+    def __init__(self, name: str, parent: Optional["Span"] = None, attributes: Dict[str, Any] = None):
+        self.name = name
+        self.parent = parent
+        self.root = parent.root if parent else self
+        # Random ids as the OpenTelemetry SDK draws them (not for anything secret)
+        self.trace_id = parent.trace_id if parent else f"{random.getrandbits(128):032x}"
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.status = "UNSET"
+        self.start_time_unix_nano = time.time_ns()
+        self.end_time_unix_nano: Optional[int] = None
+        self.duration: Optional[float] = None
+        self._started = time.perf_counter()
+        self._profile = current_request_profile()
+        self._db_started = (self._profile.statements, self._profile.seconds) if self._profile else None
+        self._otel = None
+
+    @property
+    def parent_span_id(self) -> Optional[str]:
+        return self.parent.span_id if self.parent else None
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+        if self._otel is not None:
+            self._otel.set_attribute(key, value)
+
+    def add(self, key: str, amount: float = 1):
+        """Increment a numeric attribute"""
+        self.set_attribute(key, self.attributes.get(key, 0) + amount)
+
+    def _bind_otel(self, otel_span):
+        self._otel = otel_span
+        context = otel_span.get_span_context()
+        if context.is_valid:
+            # An SDK is configured: use its ids so our spans and the exported ones match
+            self.trace_id = format(context.trace_id, "032x")
+            self.span_id = format(context.span_id, "016x")
+
+    def end(self):
+        self.duration = time.perf_counter() - self._started
+        self.end_time_unix_nano = self.start_time_unix_nano + int(self.duration * 1e9)
+        if self._db_started is not None:
+            statements, seconds = self._db_started
+            self.set_attribute("db.statement_count", self._profile.statements - statements)
+            self.set_attribute("db.duration_ms", round((self._profile.seconds - seconds) * 1000, 3))
+        if self.status == "UNSET":
+            self.status = "OK"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """OTLP/JSON-shaped span"""
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_span_id or "",
+            "name": self.name,
+            "startTimeUnixNano": self.start_time_unix_nano,
+            "endTimeUnixNano": self.end_time_unix_nano,
+            "attributes": dict(self.attributes),
+            "status": {"code": self.status}
+        }
+
+class InMemorySpanExporter:
+    """Keeps finished spans in memory, for tests (as the OpenTelemetry SDK exporter does)"""
+
+    def __init__(self):
+        self._spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def export(self, spans: List[Span]):
+        with self._lock:
+            self._spans.extend(spans)
+
+    def get_finished_spans(self) -> List[Span]:
+        with self._lock:
+            return list(self._spans)
+
+    def clear(self):
+        with self._lock:
+            self._spans = []
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+class Tracer:
+    """
+    Context-local span tree for the chat pipeline. Finished spans go through the
+    processors (metrics) and then to the exporters; with opentelemetry-api installed every
+    span is mirrored as an OpenTelemetry span, so a configured SDK exports the same tree.
+    """
+
+    def __init__(self, name: str = "beregne"):
+        self._otel = otel_trace.get_tracer(name) if otel_trace else None
+        self.processors: List[Callable[[Span], None]] = []
+        self.exporters: List[Any] = []
+
+    def add_exporter(self, exporter):
+        self.exporters.append(exporter)
+
+    def remove_exporter(self, exporter):
+        self.exporters.remove(exporter)
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Span]:
+        span = Span(name, _current_span.get(), attributes)
+        with ExitStack() as stack:
+            if self._otel is not None:
+                span._bind_otel(stack.enter_context(self._otel.start_as_current_span(name, attributes=attributes)))
+            token = _current_span.set(span)
+            try:
+                yield span
+            except BaseException as e:
+                span.status = "ERROR"
+                span.set_attribute("exception.type", type(e).__name__)
+                raise
+            finally:
+                _current_span.reset(token)
+                span.end()
+                self._finish(span)
+
+    def _finish(self, span: Span):
+        for processor in self.processors:
+            try:
+                processor(span)
+            except Exception as e:
+                logger.warning(f"Span processor failed for {span.name}: {e}")
+        for exporter in self.exporters:
+            try:
+                exporter.export([span])
+            except Exception as e:
+                logger.warning(f"Span export failed for {span.name}: {e}")
+
+tracer = Tracer()
+
+def set_trace_attribute(key: str, value: Any):
+    """Set an attribute on the root span of the current trace (e.g. the turn's analysis type)"""
+    span = current_span()
+    if span is not None:
+        span.root.set_attribute(key, value)
+
+def record_llm_usage(model: str, input_tokens: int, output_tokens: int):
+    """Token counts the upstream reported for the current LLM call"""
+    metrics.llm_tokens.inc(input_tokens, model=model, direction="input")
+    metrics.llm_tokens.inc(output_tokens, model=model, direction="output")
+    span = current_span()
+    if span is not None:
+        span.set_attribute("gen_ai.usage.input_tokens", input_tokens)
+        span.set_attribute("gen_ai.usage.output_tokens", output_tokens)
+        span.root.add("chat.llm.input_tokens", input_tokens)
+        span.root.add("chat.llm.output_tokens", output_tokens)
+
+def record_cache_lookup(cache: str, hit: bool):
+    """A hit or miss in one of the in-process caches, on the current span and its root"""
+    result = "hit" if hit else "miss"
+    metrics.cache_lookups.inc(cache=cache, result=result)
+    span = current_span()
+    if span is not None:
+        span.add(f"cache.{cache}.{result}")
+        if span.root is not span:
+            span.root.add(f"cache.{cache}.{result}")
+
+def _record_metrics(span: Span):
+    metrics.stage_seconds.observe(span.duration, stage=span.name)
+    if span.name == CHAT_SPAN:
+        agent = span.attributes.get("chat.agent", "unknown")
+        metrics.chat_turn_seconds.observe(
+            span.duration, agent=agent,
+            analysis_type=span.attributes.get("chat.analysis_type", "none"),
+            partner=span.attributes.get("chat.partner", "none")
+        )
+        if "db.duration_ms" in span.attributes:
+            metrics.chat_db_seconds.observe(span.attributes["db.duration_ms"] / 1000, agent=agent)
+
+tracer.processors.append(_record_metrics)
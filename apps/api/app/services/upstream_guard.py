@@ -0,0 +1,281 @@
+from typing import Dict, Any, Optional, Callable, Awaitable, TypeVar, List
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+import asyncio
+import os
+import random
+import threading
+import time
+import weakref
+
+from .prompt_builder import count_tokens
+
+T = TypeVar("T")
+
+# OpenAI-compatible API the LLM calls go to (app.devtools.fake_llm for offline load tests)
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1").rstrip("/")
+# Account limits for each model (requests and tokens per minute)
+OPENAI_RPM = float(os.getenv("OPENAI_RPM", "500"))
+OPENAI_TPM = float(os.getenv("OPENAI_TPM", "200000"))
+# Requests in flight per model
+OPENAI_MAX_CONCURRENCY = int(os.getenv("OPENAI_MAX_CONCURRENCY", "8"))
+# Longest a request waits for rate-limit capacity before taking the local fallback
+OPENAI_MAX_QUEUE_WAIT = float(os.getenv("OPENAI_MAX_QUEUE_WAIT", "2.0"))
+# Consecutive upstream failures that open the breaker, and how long it stays open
+OPENAI_BREAKER_FAILURES = int(os.getenv("OPENAI_BREAKER_FAILURES", "5"))
+OPENAI_BREAKER_RESET = float(os.getenv("OPENAI_BREAKER_RESET_SECONDS", "30"))
+# Retries of 429/5xx/connection errors, and the longest backoff (or Retry-After) worth waiting for
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "2"))
+OPENAI_MAX_RETRY_WAIT = float(os.getenv("OPENAI_MAX_RETRY_WAIT", "2.0"))
+# Per-attempt HTTP timeout; a stalled upstream fails into the retries and the breaker instead
+# of holding a concurrency slot (the SDK's default is 10 minutes)
+OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT_SECONDS", "20"))
+
+RETRYABLE_STATUSES = {408, 409, 429, 500, 502, 503, 504}
+
+class UpstreamUnavailable(RuntimeError):
+    """The LLM can't be used right now; callers take their local fallback"""
+
+class CircuitOpenError(UpstreamUnavailable):
+    """The breaker is open after repeated upstream failures"""
+
+class RateLimited(UpstreamUnavailable):
+    """Our own RPM/TPM budget would make the request wait too long"""
+
+class UpstreamError(UpstreamUnavailable):
+    """A failed upstream call: HTTP status (None for connection errors) and Retry-After"""
+
+    def __init__(self, message: str, status: int = None, retry_after: float = None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+    @property
+    def retryable(self) -> bool:
+        return self.status is None or self.status in RETRYABLE_STATUSES
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds from a Retry-After header (delta seconds or HTTP date)"""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max((parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+def estimate_tokens(messages: List[Dict[str, str]], max_tokens: int = 0) -> int:
+    """Prompt + completion tokens for the TPM bucket"""
+    return sum(count_tokens(message.get("content") or "") for message in messages) + max_tokens
+
+class TokenBucket:
+    """Refills `rate_per_minute` units per minute up to one minute's worth"""
+
+    def __init__(self, rate_per_minute: float):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = rate_per_minute
+        self.available = rate_per_minute
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float, max_wait: float) -> Optional[float]:
+        """
+        Take `amount` units, going into debt if needed; returns how long the caller must
+        wait for them, or None (nothing taken) when that would exceed max_wait
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.available = min(self.capacity, self.available + (now - self.updated) * self.rate)
+            self.updated = now
+            amount = min(amount, self.capacity)
+            wait = max(amount - self.available, 0.0) / self.rate
+            if wait > max_wait:
+                return None
+            self.available -= amount
+            return wait
+
+    def refund(self, amount: float):
+        with self._lock:
+            self.available = min(self.capacity, self.available + amount)
+
+class CircuitBreaker:
+    """
+    closed -> open after `failure_threshold` consecutive failures (or a long Retry-After),
+    open -> half_open once the reset timeout passes, half_open lets one probe through
+    """
+
+    def __init__(self, failure_threshold: int = OPENAI_BREAKER_FAILURES, reset_timeout: float = OPENAI_BREAKER_RESET):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened = 0
+        self.open_until = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self.open_until == 0.0:
+            return "closed"
+        return "open" if time.monotonic() < self.open_until else "half_open"
+
+    def before_call(self) -> bool:
+        """Raise while open (or while a half-open probe is out); True if this call is the probe"""
+        with self._lock:
+            state = self._state()
+            if state == "open" or (state == "half_open" and self._probing):
+                raise CircuitOpenError(f"LLM circuit open for another {max(self.open_until - time.monotonic(), 0):.1f}s")
+            if state == "half_open":
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.open_until = 0.0
+            self._probing = False
+
+    def release_probe(self):
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self, retry_after: float = None):
+        with self._lock:
+            self.failures += 1
+            probe_failed = self._probing
+            self._probing = False
+            if probe_failed or self.failures >= self.failure_threshold or retry_after:
+                self.open_until = time.monotonic() + (retry_after or self.reset_timeout)
+                self.opened += 1
+
+class UpstreamGuard:
+    """Rate limits, concurrency cap, retries and circuit breaker for one model"""
+
+    def __init__(self, model: str, rpm: float = OPENAI_RPM, tpm: float = OPENAI_TPM,
+                 max_concurrency: int = OPENAI_MAX_CONCURRENCY, max_queue_wait: float = OPENAI_MAX_QUEUE_WAIT,
+                 max_retries: int = OPENAI_MAX_RETRIES, max_retry_wait: float = OPENAI_MAX_RETRY_WAIT,
+                 breaker: CircuitBreaker = None):
+        self.model = model
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.max_concurrency = max_concurrency
+        self.max_queue_wait = max_queue_wait
+        self.max_retries = max_retries
+        self.max_retry_wait = max_retry_wait
+        self.breaker = breaker or CircuitBreaker()
+        # asyncio semaphores belong to one event loop
+        self._semaphores = weakref.WeakKeyDictionary()
+        self.in_flight = 0
+        self.calls = 0
+        self.failures = 0
+        self.retries = 0
+        self.rejected = 0
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+
+    async def _acquire_rate(self, estimated_tokens: int):
+        wait = self.requests.reserve(1, self.max_queue_wait)
+        if wait is None:
+            raise RateLimited(f"{self.model}: request rate limit reached")
+        token_wait = self.tokens.reserve(estimated_tokens, self.max_queue_wait)
+        if token_wait is None:
+            self.requests.refund(1)
+            raise RateLimited(f"{self.model}: token rate limit reached")
+        if max(wait, token_wait) > 0:
+            await asyncio.sleep(max(wait, token_wait))
+
+    async def call(self, send: Callable[[], Awaitable[T]], estimated_tokens: int = 0) -> T:
+        """
+        Run one upstream request. `send` raises UpstreamError for failed calls. Raises
+        UpstreamUnavailable (fail fast) when the breaker is open, our rate budget is
+        exhausted, or retries run out.
+        """
+        try:
+            probe = self.breaker.before_call()
+        except UpstreamUnavailable:
+            self.rejected += 1
+            raise
+        try:
+            try:
+                await self._acquire_rate(estimated_tokens)
+            except UpstreamUnavailable:
+                self.rejected += 1
+                raise
+            async with self._semaphore():
+                return await self._send_with_retries(send)
+        finally:
+            # A half-open probe that ended without a verdict (rate limited, cancelled);
+            # calls let through while closed never hold the probe slot
+            if probe:
+                self.breaker.release_probe()
+
+    async def _send_with_retries(self, send: Callable[[], Awaitable[T]]) -> T:
+        self.in_flight += 1
+        try:
+            for attempt in range(self.max_retries + 1):
+                self.calls += 1
+                try:
+                    result = await send()
+                except UpstreamError as e:
+                    self.failures += 1
+                    if not e.retryable:
+                        # The upstream answered; the request itself was bad
+                        self.breaker.record_success()
+                        raise
+                    delay = e.retry_after if e.retry_after is not None else min(0.25 * 2 ** attempt, 4.0) * random.uniform(0.5, 1.0)
+                    if attempt < self.max_retries and delay <= self.max_retry_wait:
+                        self.retries += 1
+                        await asyncio.sleep(delay)
+                        continue
+                    # A Retry-After longer than we are willing to wait pauses the model
+                    self.breaker.record_failure(e.retry_after if e.retry_after and e.retry_after > self.max_retry_wait else None)
+                    raise
+                self.breaker.record_success()
+                return result
+        finally:
+            self.in_flight -= 1
+
+    def state(self) -> Dict[str, Any]:
+        breaker = self.breaker
+        return {
+            "breaker": breaker.state,
+            "consecutive_failures": breaker.failures,
+            "times_opened": breaker.opened,
+            "open_for_seconds": round(max(breaker.open_until - time.monotonic(), 0.0), 1),
+            "in_flight": self.in_flight,
+            "max_concurrency": self.max_concurrency,
+            "calls": self.calls,
+            "failures": self.failures,
+            "retries": self.retries,
+            "rejected": self.rejected
+        }
+
+_guards: Dict[str, UpstreamGuard] = {}
+_guards_lock = threading.Lock()
+
+def upstream_guard(model: str) -> UpstreamGuard:
+    """The process-wide guard for a model"""
+    with _guards_lock:
+        guard = _guards.get(model)
+        if guard is None:
+            guard = _guards[model] = UpstreamGuard(model)
+        return guard
+
+def upstream_status() -> Dict[str, Dict[str, Any]]:
+    """Guard state per model (for /health)"""
+    with _guards_lock:
+        guards = list(_guards.values())
+    return {guard.model: guard.state() for guard in guards}
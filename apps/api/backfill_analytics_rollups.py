@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Rebuild the conversation daily rollups from the raw conversation log
+Run once after deploying the rollup tables, or to repair counters
+"""
+
+import sys
+from datetime import datetime, timedelta
+
+def backfill_analytics_rollups(days: int = None):
+    """Backfill rollups for the last N days (all history if omitted)"""
+    try:
+        from app.database import SessionLocal, create_tables
+        from app.services.analytics_rollup_service import AnalyticsRollupService
+        
+        create_tables()
+        db = SessionLocal()
+        
+        start_day = (datetime.utcnow() - timedelta(days=days)).date() if days else None
+        print(f"📊 Backfilling conversation rollups {'from ' + start_day.isoformat() if start_day else '(full history)'}...")
+        
+        result = AnalyticsRollupService(db).backfill(start_day=start_day)
+        db.close()
+        
+        print(f"✅ Wrote {result['rows_written']} rollup rows (replaced {result['rows_deleted']})")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Backfill failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+if __name__ == "__main__":
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    sys.exit(0 if backfill_analytics_rollups(days) else 1)
@@ -0,0 +1 @@
+# Benchmarks package - end-to-end chat load tests with JSON baselines (python -m benchmarks.chat_load)
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+End-to-end /api/chat load test with JSON baselines
+
+    python -m benchmarks.chat_load                                   # realistic mix, in-process
+    python -m benchmarks.chat_load --workload sessions --concurrency 32
+    python -m benchmarks.chat_load --url http://127.0.0.1:8000       # a running server, over HTTP
+    python -m benchmarks.chat_load --save-baseline                   # record the baseline
+
+In-process runs drive the ASGI app against a fresh SQLite database loaded from catalog/,
+with the LLM served by app.devtools.fake_llm (--llm real/none to change that). Each run
+is compared to benchmarks/baselines/<mode>-<workload>.json and exits 1 on a regression.
+"""
+
+from typing import Dict, Any, List, Optional, Tuple
+from contextlib import asynccontextmanager, redirect_stdout, ExitStack
+from datetime import datetime, timezone
+from pathlib import Path
+import argparse
+import asyncio
+import io
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import time
+import uuid
+
+import httpx
+
+# Only modules that don't read the environment at import; the app itself is imported
+# once in_process_app has configured it
+from app.services.hedged_analysis import percentile
+from .workloads import Step, build_sessions, WORKLOADS
+
+logger = logging.getLogger(__name__)
+
+BASELINE_DIR = Path(__file__).resolve().parent / "baselines"
+
+# How far a run may drift from its baseline before it counts as a regression
+TOLERANCES = {
+    "throughput_rps": 0.25,           # relative drop
+    "latency_ms": 0.30,               # relative rise of mean/p95/p99
+    "db_queries_per_turn": 0.10,      # relative rise of the mean
+    "upstream_calls_per_turn": 0.10,  # relative rise
+}
+# Moves smaller than these are noise, whatever the percentage (coalescing varies with timing)
+LATENCY_FLOOR_MS = 5.0
+UPSTREAM_CALLS_FLOOR = 0.05
+
+# (label, seconds, status, db queries or None) per request
+Sample = Tuple[str, float, int, Optional[int]]
+
+
+@asynccontextmanager
+async def in_process_app(llm: str, llm_latency: str, llm_error_rate: float, seed: int, database_url: str = None):
+    """
+    The started ASGI app on a fresh database with the catalog loaded. The environment has
+    to be set before app.* is imported (engines and the LLM base URL are read at import).
+    """
+    with ExitStack() as stack:
+        if not database_url:
+            tmp = stack.enter_context(tempfile.TemporaryDirectory(prefix="chat-bench-"))
+            database_url = f"sqlite:///{tmp}/bench.db"
+        os.environ["DATABASE_URL"] = database_url
+        # DB queries per request come back in the X-SQL-Queries header
+        os.environ["SQL_PROFILE_HEADERS"] = "1"
+        if llm == "fake":
+            from app.devtools.fake_llm import FakeLLMConfig, running_fake_llm
+            os.environ["OPENAI_BASE_URL"] = stack.enter_context(running_fake_llm(FakeLLMConfig(
+                latency=llm_latency, error_rate=llm_error_rate, seed=seed
+            )))
+            os.environ["OPENAI_API_KEY_RENOVATION"] = "fake-key"
+        elif llm == "none":
+            # Empty (not unset) so a key in .env isn't loaded either
+            os.environ["OPENAI_API_KEY_RENOVATION"] = ""
+
+        from app.main import app
+        from app.database import engine
+        from app.services.price_catalog_service import refresh_catalog
+
+        if engine.url.render_as_string(hide_password=False) != database_url:
+            raise RuntimeError("app.database was imported before the benchmark configured DATABASE_URL")
+        # Startup creates the tables and the widget partner
+        await app.router.startup()
+        refresh_catalog()
+        try:
+            yield app
+        finally:
+            await app.router.shutdown()
+
+def _upstream_calls() -> Dict[str, int]:
+    from app.services.upstream_guard import upstream_status
+    from app.services.single_flight import llm_single_flight
+    return {
+        "upstream_calls": sum(guard["calls"] for guard in upstream_status().values()),
+        "coalesced_calls": llm_single_flight.stats()["coalesced_calls"]
+    }
+
+async def run_sessions(client: httpx.AsyncClient, sessions: List[List[Step]], concurrency: int) -> Tuple[List[Sample], float]:
+    """Sessions run turn by turn, `concurrency` sessions at a time; returns samples and wall time"""
+    queue = asyncio.Queue()
+    for session in sessions:
+        queue.put_nowait(session)
+    samples: List[Sample] = []
+
+    async def worker():
+        while not queue.empty():
+            for step in queue.get_nowait():
+                queries = None
+                started = time.perf_counter()
+                try:
+                    response = await client.request(step.method, step.path, json=step.body)
+                    status = response.status_code
+                    if "x-sql-queries" in response.headers:
+                        queries = int(response.headers["x-sql-queries"])
+                except Exception as e:
+                    # In-process, an exception the app doesn't handle comes through the ASGI
+                    # transport; it's a failed request, not the end of the run
+                    if not isinstance(e, httpx.HTTPError):
+                        logger.warning(f"{step.method} {step.path} raised {type(e).__name__}: {e}")
+                    status = 0
+                samples.append((step.label, time.perf_counter() - started, status, queries))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return samples, time.perf_counter() - started
+
+def _latency(seconds: List[float]) -> Dict[str, float]:
+    milliseconds = [value * 1000 for value in seconds]
+    return {
+        "p50": round(percentile(milliseconds, 50), 2),
+        "p95": round(percentile(milliseconds, 95), 2),
+        "p99": round(percentile(milliseconds, 99), 2),
+        "mean": round(sum(milliseconds) / len(milliseconds), 2) if milliseconds else 0.0,
+        "max": round(max(milliseconds, default=0.0), 2)
+    }
+
+def summarize(samples: List[Sample], duration: float, upstream: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+    """Throughput, latency percentiles (overall and per label), DB queries and LLM calls per turn"""
+    turns = [sample for sample in samples if sample[0] == "chat"]
+    # Only when the server sends X-SQL-Queries (SQL_PROFILE_HEADERS=1)
+    queries = [sample[3] for sample in turns if sample[3] is not None]
+    endpoints = {}
+    for label in sorted({sample[0] for sample in samples}):
+        labelled = [sample for sample in samples if sample[0] == label]
+        endpoints[label] = {"requests": len(labelled), **_latency([sample[1] for sample in labelled])}
+    statuses: Dict[str, int] = {}
+    for sample in samples:
+        statuses[str(sample[2])] = statuses.get(str(sample[2]), 0) + 1
+    return {
+        "requests": len(samples),
+        "turns": len(turns),
+        "errors": sum(1 for sample in samples if not 200 <= sample[2] < 400),
+        "status_codes": statuses,
+        "duration_seconds": round(duration, 3),
+        "throughput_rps": round(len(samples) / duration, 2) if duration else 0.0,
+        "latency_ms": _latency([sample[1] for sample in samples]),
+        "endpoints": endpoints,
+        "db_queries_per_turn": {
+            "mean": round(sum(queries) / len(queries), 2),
+            "p95": percentile(queries, 95),
+            "max": max(queries)
+        } if queries else None,
+        "upstream_calls": upstream["upstream_calls"] if upstream else None,
+        "upstream_calls_per_turn": round(upstream["upstream_calls"] / len(turns), 3) if upstream and turns else None,
+        "coalesced_calls": upstream["coalesced_calls"] if upstream else None
+    }
+
+def compare(result: Dict[str, Any], baseline: Dict[str, Any], tolerances: Dict[str, float] = None) -> List[str]:
+    """Regressions of `result` against `baseline`, as readable lines (empty when none)"""
+    tolerances = {**TOLERANCES, **(tolerances or {})}
+    regressions = []
+
+    before, after = baseline["throughput_rps"], result["throughput_rps"]
+    if before and after < before * (1 - tolerances["throughput_rps"]):
+        regressions.append(f"throughput {after:.1f} req/s vs {before:.1f} baseline")
+
+    # Not p50: with local-only and LLM turns mixed the median jumps between the two modes
+    for key in ("mean", "p95", "p99"):
+        before, after = baseline["latency_ms"][key], result["latency_ms"][key]
+        if after > before * (1 + tolerances["latency_ms"]) and after - before > LATENCY_FLOOR_MS:
+            regressions.append(f"{key} latency {after:.1f} ms vs {before:.1f} ms baseline")
+
+    if result.get("db_queries_per_turn") and baseline.get("db_queries_per_turn"):
+        before, after = baseline["db_queries_per_turn"]["mean"], result["db_queries_per_turn"]["mean"]
+        if after > before * (1 + tolerances["db_queries_per_turn"]):
+            regressions.append(f"{after:.2f} DB queries per turn vs {before:.2f} baseline")
+
+    before, after = baseline.get("upstream_calls_per_turn"), result.get("upstream_calls_per_turn")
+    if (before is not None and after is not None and after > before * (1 + tolerances["upstream_calls_per_turn"])
+            and after - before > UPSTREAM_CALLS_FLOOR):
+        regressions.append(f"{after:.3f} LLM calls per turn vs {before:.3f} baseline")
+
+    if result["errors"] > baseline["errors"]:
+        regressions.append(f"{result['errors']} failed requests vs {baseline['errors']} baseline")
+    return regressions
+
+def baseline_path(mode: str, workload: str) -> Path:
+    return BASELINE_DIR / f"{mode}-{workload}.json"
+
+async def _benchmark(args, client: httpx.AsyncClient, in_process: bool) -> Dict[str, Any]:
+    prefix = "bench" if in_process else f"bench-{uuid.uuid4().hex[:8]}"
+    if args.warmup:
+        await run_sessions(client, build_sessions(args.workload, args.warmup, args.seed + 1, prefix + "-warmup"), args.concurrency)
+    before = _upstream_calls() if in_process else None
+    samples, duration = await run_sessions(
+        client, build_sessions(args.workload, args.sessions, args.seed, prefix), args.concurrency
+    )
+    upstream = None
+    if in_process:
+        after = _upstream_calls()
+        upstream = {key: after[key] - before[key] for key in after}
+    return summarize(samples, duration, upstream)
+
+async def run_benchmark(args) -> Dict[str, Any]:
+    """One benchmark run as configured by the CLI arguments"""
+    mode = "http" if args.url else "asgi"
+    result = {
+        "workload": args.workload,
+        "mode": mode,
+        "sessions": args.sessions,
+        "concurrency": args.concurrency,
+        "seed": args.seed,
+        "llm": "external" if args.url else (f"fake {args.llm_latency}" if args.llm == "fake" else args.llm)
+    }
+
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url, timeout=60) as client:
+            result.update(await _benchmark(args, client, in_process=False))
+    else:
+        quiet = ExitStack()
+        if not args.verbose:
+            # The agents print per turn; keep the report readable
+            quiet.enter_context(redirect_stdout(io.StringIO()))
+            logging.disable(logging.INFO)
+        try:
+            with quiet:
+                async with in_process_app(args.llm, args.llm_latency, args.llm_error_rate, args.seed, args.database_url) as app:
+                    transport = httpx.ASGITransport(app=app)
+                    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+                        result.update(await _benchmark(args, client, in_process=True))
+        finally:
+            logging.disable(logging.NOTSET)
+
+    result["created"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    result["python"] = platform.python_version()
+    return result
+
+def print_report(result: Dict[str, Any]):
+    latency = result["latency_ms"]
+    print(f"📊 {result['workload']} ({result['mode']}, {result['concurrency']} concurrent, LLM: {result['llm']})")
+    print(f"   {result['requests']} requests / {result['turns']} chat turns in {result['duration_seconds']:.2f}s "
+          f"-> {result['throughput_rps']:.1f} req/s, {result['errors']} errors")
+    print(f"   latency p50 {latency['p50']:.1f} ms  p95 {latency['p95']:.1f} ms  p99 {latency['p99']:.1f} ms  max {latency['max']:.1f} ms")
+    for label, stats in result["endpoints"].items():
+        print(f"   {label:<10} {stats['requests']:>5} req  p50 {stats['p50']:.1f} ms  p95 {stats['p95']:.1f} ms")
+    if result["db_queries_per_turn"]:
+        queries = result["db_queries_per_turn"]
+        print(f"   DB queries per turn: mean {queries['mean']:.2f}, p95 {queries['p95']}, max {queries['max']}")
+    if result["upstream_calls"] is not None:
+        print(f"   LLM upstream calls: {result['upstream_calls']} ({result['upstream_calls_per_turn']:.3f} per turn), "
+              f"{result['coalesced_calls']} coalesced")
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Load-test /api/chat and compare against a JSON baseline")
+    parser.add_argument("--workload", default="realistic", choices=sorted(WORKLOADS))
+    parser.add_argument("--sessions", type=int, default=120, help="Sessions to run (each is one or more turns)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Sessions in flight at once")
+    parser.add_argument("--warmup", type=int, default=8, help="Untimed sessions run first")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--url", help="Benchmark a running server over HTTP instead of the in-process app")
+    parser.add_argument("--llm", default="fake", choices=["fake", "real", "none"],
+                        help="In-process LLM: the fake server, the configured OpenAI account, or no key")
+    # Fixed by default so runs compare cleanly; lognormal:MEDIAN:SIGMA to study the tail
+    parser.add_argument("--llm-latency", default="fixed:0.25", help="Fake LLM latency spec")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0, help="Fake LLM injected error rate")
+    parser.add_argument("--database-url", help="In-process database (default: a fresh temporary SQLite file)")
+    parser.add_argument("--baseline", help="Baseline JSON (default: benchmarks/baselines/<mode>-<workload>.json)")
+    parser.add_argument("--save-baseline", action="store_true", help="Write this run as the baseline")
+    parser.add_argument("--output", help="Also write the result JSON here")
+    parser.add_argument("--verbose", action="store_true", help="Keep the app's logging and prints")
+    args = parser.parse_args()
+
+    result = asyncio.run(run_benchmark(args))
+    print_report(result)
+
+    encoded = json.dumps(result, indent=2, ensure_ascii=False) + "\n"
+    if args.output:
+        Path(args.output).write_text(encoded, encoding="utf-8")
+    path = Path(args.baseline) if args.baseline else baseline_path(result["mode"], result["workload"])
+    if args.save_baseline:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(encoded, encoding="utf-8")
+        print(f"✅ Baseline saved to {path}")
+        return 0
+    if not path.exists():
+        print(f"⚠️ No baseline at {path} (record one with --save-baseline)")
+        return 0
+
+    regressions = compare(result, json.loads(path.read_text(encoding="utf-8")))
+    if regressions:
+        print(f"❌ Regressions against {path.name}:")
+        for regression in regressions:
+            print(f"   - {regression}")
+        return 1
+    print(f"✅ Within tolerance of {path.name}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
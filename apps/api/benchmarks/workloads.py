@@ -0,0 +1,102 @@
+"""
+Chat workloads for the load harness: sessions of ordered requests, generated
+deterministically from a seed so every run (and its baseline) sends the same traffic
+"""
+
+from typing import Dict, Any, List, NamedTuple, Optional
+import random
+
+WIDGET_PARTNER = "househacker"
+
+class Step(NamedTuple):
+    """One request in a session; `label` groups latencies in the report"""
+    label: str
+    method: str
+    path: str
+    body: Optional[Dict[str, Any]] = None
+
+# Single-turn queries across the project types the calculators price
+PROJECT_QUERIES = [
+    "male stue og gang 45 kvm",
+    "pusse opp bad 6 kvm",
+    "hva koster det å pusse opp et bad på 8 kvm",
+    "nytt kjøkken midt-segment komplett",
+    "bytte 5 innerdører",
+    "legge eikeparkett 30 kvm",
+    "elektriker for 10 nye stikkontakter",
+    "etterisolering 80 m² vegg",
+    "takomlegging 100 m²",
+    "drenering rundt huset 40 meter",
+    "lettvegg 10 m² med dør",
+    "vinduer 8 stk standard",
+    "male huset utvendig 150 kvm",
+    "sparkle og male soverommet 12 kvm",
+    "ny kledning 60 m²",
+    "blåseisolasjon loft 90 m²",
+]
+
+# Clarification dialogues: a vague opener, then the details the agent asks for
+DIALOGUES = [
+    ["jeg vil pusse opp badet", "ca 6 kvm, normal standard", "hva med varmekabler i gulvet?"],
+    ["hva koster det å male?", "innvendig, stue og gang", "45 kvm, vegger og tak"],
+    ["vi skal ha nytt kjøkken", "rundt 10 kvm, premium", "hva koster montering?"],
+    ["bytte dører", "5 innerdører, standard", "og en ny ytterdør"],
+    ["nytt gulv i stua", "30 kvm parkett", "med fjerning av gammelt teppe"],
+]
+
+# Registration flows: a priced project, then the customer asks to be put in touch
+REGISTRATIONS = [
+    ["pusse opp bad 5 kvm", "jeg vil registrere prosjekt", "Ola Nordmann, ola@example.no, 0150 Oslo"],
+    ["male huset utvendig 150 kvm", "få tilbud fra entreprenører", "Kari Nordmann, 91234567, Bergen"],
+    ["nytt kjøkken midt-segment komplett", "jeg vil ha befaring", "Per Hansen, per@example.no, 7010 Trondheim"],
+]
+
+def _chat(session_id: str, message: str, partner_id: str = None) -> Step:
+    body = {"message": message, "session_id": session_id, "context": {"session_id": session_id}}
+    if partner_id:
+        body["partner_id"] = partner_id
+    return Step("chat", "POST", "/api/chat", body)
+
+def _mixed(rng: random.Random, session_id: str) -> List[Step]:
+    return [_chat(session_id, rng.choice(PROJECT_QUERIES))]
+
+def _sessions(rng: random.Random, session_id: str) -> List[Step]:
+    return [_chat(session_id, message) for message in rng.choice(DIALOGUES)]
+
+def _registration(rng: random.Random, session_id: str) -> List[Step]:
+    return [_chat(session_id, message) for message in rng.choice(REGISTRATIONS)]
+
+def _widget(rng: random.Random, session_id: str) -> List[Step]:
+    # The partner page loads the embed script, then the visitor chats through it
+    turns = rng.choice([[rng.choice(PROJECT_QUERIES)], rng.choice(DIALOGUES)[:2]])
+    return [Step("widget_js", "GET", f"/widget/{WIDGET_PARTNER}/embed.js")] + [
+        _chat(session_id, message, WIDGET_PARTNER) for message in turns
+    ]
+
+SESSION_KINDS = {
+    "mixed": _mixed,
+    "sessions": _sessions,
+    "registration": _registration,
+    "widget": _widget,
+}
+
+# Named workloads: weights of each session kind ("realistic" is the production-like blend)
+WORKLOADS = {
+    "mixed": {"mixed": 1},
+    "sessions": {"sessions": 1},
+    "registration": {"registration": 1},
+    "widget": {"widget": 1},
+    "realistic": {"mixed": 4, "sessions": 3, "widget": 2, "registration": 1},
+}
+
+def build_sessions(workload: str, count: int, seed: int = 0, prefix: str = "bench") -> List[List[Step]]:
+    """`count` sessions of the workload, identical for the same seed (session ids use `prefix`)"""
+    if workload not in WORKLOADS:
+        raise ValueError(f"Unknown workload '{workload}' (choose from {', '.join(WORKLOADS)})")
+    rng = random.Random(seed)
+    kinds, weights = zip(*WORKLOADS[workload].items())
+    sessions = []
+    for number in range(count):
+        kind = rng.choices(kinds, weights)[0]
+        sessions.append(SESSION_KINDS[kind](rng, f"{prefix}-{seed}-{number}"))
+    return sessions
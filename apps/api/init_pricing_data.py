@@ -7,6 +7,8 @@ Basert på research fra Oslo-markedet.
 from app.database import SessionLocal, engine
 from app.models.pricing import ServiceType, Contractor, PricingData, MarketRate, Base
 from app.services.pricing_service import PricingService
+from app.services.region_service import RegionService
+from app.services.contractor_directory import ContractorDirectory
 
 def create_tables():
     """Opprett database-tabeller"""
@@ -161,9 +163,11 @@ def main():
     
     try:
         # Legg til grunndata
+        RegionService(db).load_regions()
         init_service_types(db)
         init_contractors(db)
         init_pricing_data(db)
+        ContractorDirectory(db).sync_legacy_fields()
         
         # Beregn markedsrater
         pricing_service = PricingService(db)
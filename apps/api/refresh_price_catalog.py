@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Refresh the price catalog: load all price sheets in catalog/ concurrently and
+recompute market rates once
+
+    python refresh_price_catalog.py                     # all trades
+    python refresh_price_catalog.py kjokken elektriker  # selected trades
+"""
+
+import argparse
+import sys
+
+from app.services.price_catalog_service import refresh_catalog, CatalogError
+
+def print_summary(result):
+    """Per-sheet timing and row counts"""
+    print(f"{'Sheet':<28} {'Services':>8} {'Prices':>7} {'Seconds':>8}")
+    print("-" * 54)
+    for sheet in result["sheets"]:
+        if "error" in sheet:
+            print(f"❌ {sheet['sheet']:<25} {sheet['error']}")
+        else:
+            print(f"{sheet['sheet']:<28} {sheet['services']:>8} {sheet['prices']:>7} {sheet['seconds']:>8.3f}")
+    print("-" * 54)
+    
+    market_rates = result["market_rates"]
+    print(f"📈 Market rates: {', '.join(market_rates['regions']) or '-'} ({market_rates['seconds']:.3f}s)")
+    print(f"🗺️  Regions: {result['region_table']['regions']} regions, "
+          f"{market_rates['resolutions']} service x region prices")
+    print(f"✅ Loaded {result['loaded']}/{result['loaded'] + result['failed']} sheets, "
+          f"{result['prices']} prices with {result['workers']} workers in {result['seconds']:.3f}s")
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh the price catalog")
+    parser.add_argument("sheets", nargs="*", help="Trade names to load (default: all sheets)")
+    parser.add_argument("--workers", type=int, default=None, help="Concurrent sheet loads")
+    parser.add_argument("--skip-market-rates", action="store_true", help="Don't recompute market rates")
+    args = parser.parse_args()
+    
+    try:
+        result = refresh_catalog(
+            sheets=args.sheets or None,
+            max_workers=args.workers,
+            recalculate_market_rates=not args.skip_market_rates
+        )
+    except CatalogError as e:
+        print(f"❌ {e}")
+        return False
+    
+    print_summary(result)
+    return result["failed"] == 0
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Test that incremental conversation rollups match a backfill from raw history
+"""
+
+import asyncio
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models.partner import Base
+from app.models.analytics import ConversationDailyRollup
+from app.models.conversation import ConversationSession, ConversationMessage
+from app.services.conversation_learning_service import ConversationLearningService
+from app.services.analytics_rollup_service import AnalyticsRollupService
+
+def _memory_session():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)()
+
+async def _log_sample_traffic(learning_service: ConversationLearningService):
+    await learning_service.log_conversation_start("s1", "househacker", "conversational_renovation")
+    await learning_service.log_message_exchange("s1", "pusse opp bad 6 kvm", "Et slikt prosjekt koster...",
+                                                ai_powered=True, project_type_detected="bad_komplett", led_to_pricing=True)
+    await learning_service.mark_user_responded("s1", response_time_seconds=12.0)
+    await learning_service.log_message_exchange("s1", "ja, jeg vil ha tilbud", "Perfekt!",
+                                                project_type_detected="bad_komplett", led_to_registration=True)
+
+    await learning_service.log_conversation_start("s2", "annen_partner", "conversational_renovation")
+    await learning_service.log_message_exchange("s2", "male stue 45 kvm", "Maling...",
+                                                ai_powered=False, project_type_detected="maling", led_to_pricing=True)
+
+def test_rollups_match_backfill():
+    """Incremental counters and a full backfill should agree"""
+    
+    print("🧪 Testing conversation daily rollups")
+    print("=" * 40)
+    
+    db = _memory_session()
+    learning_service = ConversationLearningService(db)
+    asyncio.run(_log_sample_traffic(learning_service))
+    
+    rollups = AnalyticsRollupService(db)
+    incremental = rollups.get_summary(days=1)
+    print(f"Incremental totals: {incremental['totals']}")
+    
+    assert incremental["totals"]["messages"] == 3
+    assert incremental["totals"]["conversations"] == 2
+    assert incremental["totals"]["registered_conversations"] == 1
+    assert incremental["totals"]["pricing_hits"] == 2
+    assert incremental["ai"]["responses"] == 1
+    assert incremental["ai"]["response_time_sum"] == 12.0
+    assert incremental["project_types"] == {"bad_komplett": 2, "maling": 1}
+    
+    partner_only = rollups.get_summary(days=1, partner_id="househacker")
+    assert partner_only["totals"]["messages"] == 2
+    
+    result = rollups.backfill()
+    backfilled = rollups.get_summary(days=1)
+    print(f"Backfilled totals:  {backfilled['totals']} ({result['rows_written']} rows)")
+    
+    assert backfilled == incremental
+    assert db.query(ConversationDailyRollup).count() == result["rows_written"]
+    
+    analytics = asyncio.run(learning_service.get_conversation_analytics(days=1))
+    assert analytics["total_messages"] == 3
+    assert analytics["registration_conversion_rate"] == 50.0
+    print("✅ Rollups match backfill")
+    
+    db.close()
+
+def test_rollup_failure_keeps_the_exchange():
+    """A failing rollup update is rolled back to its savepoint; the exchange is still saved"""
+
+    db = _memory_session()
+    learning_service = ConversationLearningService(db)
+    record_exchange = learning_service.rollups.record_exchange
+
+    def failing_record_exchange(*args, **kwargs):
+        record_exchange(*args, **kwargs)
+        db.flush()
+        raise RuntimeError("rollup table unavailable")
+    learning_service.rollups.record_exchange = failing_record_exchange
+    learning_service.rollups.record_user_response = lambda *args: 1 / 0
+
+    asyncio.run(_log_sample_traffic(learning_service))
+    assert db.query(ConversationMessage).count() == 3
+    assert db.query(ConversationMessage).filter_by(user_responded=True).count() == 1
+    assert db.query(ConversationDailyRollup).count() == 0
+    print("✅ Rollup failures don't lose message exchanges")
+
+    db.close()
+
+if __name__ == "__main__":
+    test_rollups_match_backfill()
+    test_rollup_failure_keeps_the_exchange()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Test the pure calculators: same results as the agent's old inline math, safe to run
+in parallel, and fast enough to benchmark in isolation
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models.pricing import Base
+from app.services.pricing_service import PricingService
+from app.services.price_catalog_service import PriceCatalogService, CATALOG_DIR
+from app.services.region_service import RegionService
+from app.calculators import (
+    PriceSnapshot, CALCULATOR_SERVICES, calculate_bathroom, calculate_painting, calculate_rigg_og_drift,
+    calculate_kitchen, calculate_windows, calculate_interior_doors, calculate_outlets,
+    electrician_hourly_rate, calculate_electrical_work, select_painting_service
+)
+
+PRICES = PriceSnapshot.from_prices({
+    "bad_totalrenovering_8m2": 400000,
+    "bad_riving_avfall": 1000,
+    "bad_membran": 2000,
+    "innvendig_maling_standard": 200,
+    "skjotesparkling_inkl_maling": 300,
+    "rigg_og_drift": 3500,
+    "vindu_standard_komplett": 10000,
+    "stikkontakt_pakke_5_stk": 5000,
+    "elektriker_timepris_montor": 1000
+})
+
+def test_bathroom():
+    """Package scaling, component sum and the per-m² fallback"""
+
+    print("🧪 Testing bathroom calculator")
+    print("=" * 40)
+
+    package = calculate_bathroom(PRICES, 6)
+    assert package.pricing_source == "database_package" and package.package_used == "bad_totalrenovering_8m2"
+    assert package.total_cost == 400000 * 0.6 + 400000 * 0.4 * 6 / 8
+
+    # No 4 m² package priced -> components
+    components = calculate_bathroom(PRICES, 3)
+    assert components.pricing_source == "database_components"
+    assert components.total_cost == 3 * (1000 + 2000) and len(components.line_items) == 2
+
+    fallback = calculate_bathroom(PriceSnapshot("Oslo"), 10)
+    assert fallback.pricing_source == "fallback" and fallback.total_cost == 450000
+    print("✅ Package, components and fallback")
+
+def test_painting_and_rigg():
+    """Paintable area, service selection, detail modifiers and rigg og drift"""
+
+    plain = calculate_painting(PRICES, 20, {}, "male stue")
+    assert plain.service == "innvendig_maling_standard" and plain.paintable_area == 20
+    assert plain.base_cost == 20 * 200 and plain.liters_needed == 5
+    assert plain.total_cost == plain.base_cost + plain.rigg_og_drift.total_rigg_cost
+
+    house = calculate_painting(PRICES, 100, {}, "nybygg")
+    assert house.service == "skjotesparkling_inkl_maling" and house.paintable_area == 280
+
+    rough = calculate_painting(PRICES, 20, {"rough_surface": True}, "")
+    hours = 20 * 200 * 0.75 / 850 * 1.2
+    assert abs(rough.work_hours - hours) < 1e-9
+    assert abs(rough.base_cost - 20 * 200 * hours / (20 * 0.6)) < 1e-6
+
+    rigg = calculate_rigg_og_drift(PRICES, 20, {"ceiling_painting": True})
+    assert rigg.base_rigg_cost == 3500 and rigg.components["takarbeid_rigg"] == 800
+    assert calculate_rigg_og_drift(PriceSnapshot("Oslo"), 100).base_rigg_cost == 8000
+
+    fallback = calculate_painting(PriceSnapshot("Oslo"), 20, {})
+    assert fallback.pricing_source == "fallback" and fallback.paint_cost == 5 * 550
+    assert "breakdown" in fallback.to_dict()["rigg_og_drift"]
+
+    assert select_painting_service({}, "nybygg 120 kvm") == "skjotesparkling_inkl_maling"
+    assert select_painting_service({}, "total oppussing") == "helsparkling_inkl_maling"
+    print("✅ Painting and rigg og drift")
+
+def test_kitchen_windows_electrical():
+    """Kitchen packages by quality, windows/doors and electrical work"""
+
+    # Without catalog prices the mid-range kitchen is the agent's old 220k estimate
+    assert calculate_kitchen(PriceSnapshot("Oslo")).total_cost == 220000
+    assert calculate_kitchen(PriceSnapshot("Oslo"), "premium").total_cost > calculate_kitchen(PriceSnapshot("Oslo"), "budget").total_cost
+    assert calculate_kitchen(PriceSnapshot("Oslo"), "unknown").quality == "mid"
+
+    windows = calculate_windows(PRICES, 3)
+    assert windows.total_cost == 30000 and windows.pricing_source == "database"
+    assert calculate_windows(PriceSnapshot("Oslo"), 2).total_cost == 19000
+    assert calculate_interior_doors(2, with_frame=True).total_cost == 11000
+
+    outlets = calculate_outlets(PRICES, 10)
+    assert outlets.total_cost == 10000 and outlets.cost_per_unit == 1000
+    assert calculate_outlets(PRICES, 2).total_cost == 1900  # ekstra_stikkontakt_dobbel not priced
+    assert electrician_hourly_rate(PRICES).hourly_rate == 1000
+    assert calculate_electrical_work("gulvvarme", 10).total_cost == 10750
+    assert calculate_electrical_work("gulvvarme").total_cost == 10000
+    print("✅ Kitchen, windows/doors and electrical")
+
+def test_snapshot_is_one_query():
+    """PricingService.price_snapshot loads every calculator price with one statement"""
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    RegionService(db).load_regions()
+    for sheet in ("bathroom.yaml", "market.yaml", "elektriker.yaml", "kjokken.yaml"):
+        PriceCatalogService(db).load_file(CATALOG_DIR / sheet)
+    pricing = PricingService(db)
+    pricing.recalculate_market_rates()
+    pricing.price_snapshot(CALCULATOR_SERVICES)  # warms the region resolver and catalog version
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, stmt, *args: statements.append(stmt))
+    snapshot = pricing.price_snapshot(CALCULATOR_SERVICES)
+    print(f"Snapshot: {len(snapshot.prices)} services, {len(statements)} statement(s)")
+    assert len(statements) == 1
+
+    unit_price = pricing.get_service_price("bad_totalrenovering_8m2")["unit_price"]
+    assert snapshot.recommended("bad_totalrenovering_8m2") == unit_price["recommended_price"]
+    assert calculate_kitchen(snapshot).pricing_source in ("database", "mixed")
+    db.close()
+
+def test_parallel_and_benchmark():
+    """Calculators share nothing mutable: parallel results equal sequential ones"""
+
+    inputs = [(area, details, query) for area in range(5, 150, 7)
+              for details, query in (({}, "male"), ({"many_windows": True}, "nybygg"), ({"old_wallpaper": True}, "total"))]
+    run = lambda args: calculate_painting(PRICES, *args).to_dict()
+
+    sequential = [run(args) for args in inputs]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        parallel = list(pool.map(run, inputs))
+    assert parallel == sequential
+
+    started = time.perf_counter()
+    for _ in range(200):
+        for area in (4, 8, 15, 40, 120):
+            calculate_bathroom(PRICES, area)
+            calculate_painting(PRICES, area, {"rough_surface": True})
+            calculate_kitchen(PRICES, "mid")
+    elapsed = time.perf_counter() - started
+    print(f"3000 estimates in {elapsed * 1000:.1f} ms")
+    assert elapsed < 1.0
+    print("✅ Parallel-safe and fast")
+
+if __name__ == "__main__":
+    test_bathroom()
+    test_painting_and_rigg()
+    test_kitchen_windows_electrical()
+    test_snapshot_is_one_query()
+    test_parallel_and_benchmark()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Test the in-process, concurrent price catalog refresh
+"""
+
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models.pricing import Base, PricingData, MarketRate
+from app.services.price_catalog_service import refresh_catalog, CATALOG_DIR
+
+def test_refresh_loads_all_sheets_concurrently():
+    """Every sheet loads on its own session, failures are isolated, rates are computed once"""
+
+    print("🧪 Testing concurrent catalog refresh")
+    print("=" * 40)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        catalog_dir = Path(tmp) / "catalog"
+        shutil.copytree(CATALOG_DIR, catalog_dir)
+        (catalog_dir / "broken.yaml").write_text(
+            "source: broken\nregion: Oslo\nconfidence: 0.5\nservices:\n- {service: x, unit: m², min_price: 5, max_price: 1}\n",
+            encoding="utf-8"
+        )
+
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'catalog.db')}",
+                               connect_args={"check_same_thread": False, "timeout": 30})
+        Base.metadata.create_all(bind=engine)
+        SessionFactory = sessionmaker(bind=engine)
+
+        result = refresh_catalog(directory=catalog_dir, max_workers=4, session_factory=SessionFactory)
+        print(f"Loaded {result['loaded']} sheets, {result['prices']} prices in {result['seconds']:.3f}s")
+
+        db = SessionFactory()
+        price_rows = db.query(PricingData).count()
+        market_rates = db.query(MarketRate).filter_by(region="Oslo").count()
+        db.close()
+
+        partial = refresh_catalog(sheets=["kjokken"], directory=catalog_dir, session_factory=SessionFactory,
+                                  recalculate_market_rates=False)
+        engine.dispose()
+
+    assert result["loaded"] == 11 and result["failed"] == 1
+    failed = [sheet for sheet in result["sheets"] if "error" in sheet]
+    assert failed[0]["sheet"] == "broken.yaml" and "max_price" in failed[0]["error"]
+    assert all("seconds" in sheet for sheet in result["sheets"])
+
+    assert price_rows == result["prices"] == 152
+    assert result["market_rates"]["regions"] == ["Oslo"]
+    assert market_rates > 0
+    assert result["region_table"]["regions"] == 25 and result["market_rates"]["resolutions"] > 0
+
+    assert [sheet["sheet"] for sheet in partial["sheets"]] == ["kjokken.yaml"]
+    assert partial["market_rates"]["seconds"] == 0.0
+    print("✅ Catalog refresh is concurrent, isolated and recomputes rates once")
+
+if __name__ == "__main__":
+    test_refresh_loads_all_sheets_concurrently()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Test the chat load harness: deterministic workloads and the baseline comparison
+"""
+
+from benchmarks.workloads import build_sessions, WORKLOADS
+from benchmarks.chat_load import summarize, compare
+
+def test_workloads_are_deterministic():
+    """The same seed sends the same traffic; every workload builds"""
+
+    print("🧪 Testing workload generation")
+    print("=" * 40)
+    assert build_sessions("realistic", 20, seed=3) == build_sessions("realistic", 20, seed=3)
+    assert build_sessions("realistic", 20, seed=3) != build_sessions("realistic", 20, seed=4)
+    for workload in WORKLOADS:
+        sessions = build_sessions(workload, 5)
+        assert len(sessions) == 5 and all(steps for steps in sessions)
+    widget = build_sessions("widget", 1)[0]
+    assert widget[0].label == "widget_js" and widget[1].body["partner_id"] == "househacker"
+    try:
+        build_sessions("nope", 1)
+        assert False, "unknown workload accepted"
+    except ValueError:
+        pass
+    print("✅ Workloads replay by seed")
+
+def test_compare_flags_regressions():
+    """Slower, chattier or failing runs regress; small noise does not"""
+
+    print("🧪 Testing baseline comparison")
+    print("=" * 40)
+    samples = [("chat", 0.1, 200, 4)] * 10 + [("widget_js", 0.01, 200, 0)] * 2
+    baseline = summarize(samples, 1.0, {"upstream_calls": 5, "coalesced_calls": 0})
+    assert baseline["turns"] == 10 and baseline["db_queries_per_turn"]["mean"] == 4
+    assert compare(baseline, baseline) == []
+
+    noisy = summarize([("chat", 0.102, 200, 4)] * 10 + [("widget_js", 0.01, 200, 0)] * 2, 1.05,
+                      {"upstream_calls": 5, "coalesced_calls": 0})
+    assert compare(noisy, baseline) == []
+
+    slower = summarize([("chat", 0.3, 200, 6)] * 10 + [("widget_js", 0.01, 500, 0)] * 2, 3.0,
+                       {"upstream_calls": 10, "coalesced_calls": 0})
+    regressions = " | ".join(compare(slower, baseline))
+    for expected in ("throughput", "p95 latency", "DB queries", "LLM calls", "failed requests"):
+        assert expected in regressions, expected
+    print("✅ Regressions are reported")
+
+if __name__ == "__main__":
+    test_workloads_are_deterministic()
+    test_compare_flags_regressions()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Test the contractor directory: normalised specialties/locations, one-query index,
+distance ranking and refresh on change
+"""
+
+import random
+import time
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models.pricing import Base, ServiceType, Contractor, PricingData, ContractorSpecialty, ContractorLocation
+from app.services.pricing_service import PricingService
+from app.services.region_service import RegionService
+from app.services.contractor_directory import ContractorDirectory
+
+def _memory_session():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    RegionService(db).load_regions()
+    return engine, db
+
+def _seed(db):
+    painting = ServiceType(name="maling", unit="m²")
+    tiling = ServiceType(name="flislegging_gulv", unit="m²")
+    db.add_all([painting, tiling])
+    db.flush()
+    db.add_all([
+        Contractor(name="Oslo Malerfirma AS", location="Oslo", specialties="maling,sparkling", verified=True),
+        Contractor(name="Bærum Maler", location="1340 Bærum", specialties='["maling"]', verified=False),
+        Contractor(name="Bergen Maling", location="Bergen", specialties="maling", verified=True),
+        Contractor(name="Profi Flislegger", location="Oslo", specialties="", verified=True),
+    ])
+    db.flush()
+    oslo_painter, _, _, tiler = db.query(Contractor).order_by(Contractor.id).all()
+    db.add(PricingData(service_type_id=painting.id, contractor_id=oslo_painter.id, min_price=90, max_price=140,
+                       region="Oslo", source="tilbud"))
+    # Tiling only known from a price row, not from the specialties text
+    db.add(PricingData(service_type_id=tiling.id, contractor_id=tiler.id, min_price=450, max_price=750,
+                       region="Oslo", source="tilbud"))
+    db.commit()
+
+def test_sync_and_ranking():
+    """Legacy text columns are normalised; matches are ranked by distance"""
+
+    print("🧪 Testing contractor directory")
+    print("=" * 40)
+
+    engine, db = _memory_session()
+    _seed(db)
+    summary = ContractorDirectory(db).sync_legacy_fields()
+    assert (summary["specialties"], summary["locations"]) == (4, 4)
+    assert ContractorDirectory(db).sync_legacy_fields()["specialties"] == 0
+
+    pricing_service = PricingService(db)
+    near_oslo = pricing_service.get_contractors_by_service("maling", region="0150")
+    print([(c["name"], c["distance_km"]) for c in near_oslo])
+
+    assert [c["name"] for c in near_oslo] == ["Oslo Malerfirma AS", "Bærum Maler"]
+    assert near_oslo[0]["price_range"] == "90.0-140.0 kr/m²" and near_oslo[0]["distance_km"] == 0.0
+    assert near_oslo[1]["price_range"] == "Kontakt for pris" and near_oslo[1]["postcode"] == "1340"
+
+    everywhere = pricing_service.get_contractors_by_service("maling", region="Oslo", max_distance_km=None)
+    assert [c["name"] for c in everywhere][-1] == "Bergen Maling"
+    assert pricing_service.get_contractors_by_service("maling", region="5003", limit=1)[0]["name"] == "Bergen Maling"
+
+    assert [c["name"] for c in pricing_service.get_contractors_by_service("flislegging_gulv")] == ["Profi Flislegger"]
+    assert pricing_service.get_contractors_by_service("finnes_ikke") == []
+    assert pricing_service.get_contractors_by_service("maling", region="Atlantis") == []
+    print("✅ Contractors are normalised and ranked nearest first")
+
+    db.close()
+
+def test_index_refreshes_on_change():
+    """The index is built by one query, served from memory and rebuilt after a commit touches it"""
+
+    engine, db = _memory_session()
+    _seed(db)
+    directory = ContractorDirectory(db)
+    directory.sync_legacy_fields()
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, stmt, *args: statements.append(stmt))
+    directory.find("maling", "Oslo")
+    directory.find("maling", "Bergen")
+    assert len(statements) == 1
+
+    drammen = Contractor(name="Drammen Maler", location="Drammen", verified=True)
+    db.add(drammen)
+    db.flush()
+    db.add(ContractorSpecialty(contractor_id=drammen.id, service_type_id=db.query(ServiceType).filter_by(name="maling").one().id))
+    db.add(ContractorLocation(contractor_id=drammen.id, region_code="3301", postcode="3015"))
+    db.commit()
+
+    assert "Drammen Maler" in [c["name"] for c in directory.find("maling", "3015")]
+    print("✅ Index rebuilt after the directory changed")
+
+    db.close()
+
+def test_new_contractor_price_is_matched():
+    """A contractor price added through PricingService is matched without a full sync"""
+
+    engine, db = _memory_session()
+    _seed(db)
+    ContractorDirectory(db).sync_legacy_fields()
+    pricing_service = PricingService(db)
+    assert "Profi Flislegger" not in [c["name"] for c in pricing_service.get_contractors_by_service("maling")]
+
+    db.add(Contractor(name="Ny Maler", location="", verified=True))
+    db.commit()
+    assert pricing_service.add_pricing_data("maling", "Profi Flislegger", 100, 160, region="Oslo")
+    assert pricing_service.add_pricing_data("maling", "Ny Maler", 110, 150, region="Bergen")
+    assert pricing_service.add_pricing_data("maling", "Ny Maler", 120, 170, region="Bergen")
+
+    near_oslo = {c["name"]: c for c in pricing_service.get_contractors_by_service("maling", region="Oslo")}
+    assert near_oslo["Profi Flislegger"]["price_range"] == "100.0-160.0 kr/m²"
+    near_bergen = {c["name"]: c for c in pricing_service.get_contractors_by_service("maling", region="Bergen")}
+    assert near_bergen["Ny Maler"]["price_range"] == "110.0-170.0 kr/m²"
+    assert db.query(ContractorLocation).filter_by(contractor_id=db.query(Contractor).filter_by(name="Ny Maler").one().id).count() == 1
+    assert ContractorDirectory(db).sync_legacy_fields()["specialties"] == 0
+    print("✅ New contractor prices are matched at once")
+
+    db.close()
+
+def test_matching_thousands_of_contractors():
+    """Matching stays instant with thousands of contractors"""
+
+    engine, db = _memory_session()
+    rng = random.Random(5)
+    services = [ServiceType(name=f"tjeneste_{i}", unit="m²") for i in range(50)]
+    db.add_all(services)
+    db.flush()
+    resolver = RegionService(db).resolver()
+    postcodes = [f"{n:04d}" for n in range(1, 10000, 7) if resolver.resolve(f"{n:04d}")]
+
+    contractors = [Contractor(name=f"Firma {i}", location="", verified=rng.random() < 0.5) for i in range(5000)]
+    db.add_all(contractors)
+    db.flush()
+    specialties, locations, prices = [], [], []
+    for contractor in contractors:
+        postcode = rng.choice(postcodes)
+        locations.append({"contractor_id": contractor.id, "region_code": resolver.resolve(postcode), "postcode": postcode})
+        for service in rng.sample(services, 3):
+            specialties.append({"contractor_id": contractor.id, "service_type_id": service.id})
+            prices.append({"contractor_id": contractor.id, "service_type_id": service.id, "min_price": 100,
+                           "max_price": 200, "region": "Oslo", "source": f"tilbud_{contractor.id}"})
+    db.execute(ContractorSpecialty.__table__.insert(), specialties)
+    db.execute(ContractorLocation.__table__.insert(), locations)
+    db.execute(PricingData.__table__.insert(), prices)
+    db.commit()
+
+    directory = ContractorDirectory(db)
+    directory.invalidate()
+    started = time.perf_counter()
+    directory.index()
+    built = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for postcode in postcodes[:100]:
+        matches = directory.find(f"tjeneste_{rng.randrange(50)}", postcode, limit=10)
+    per_match = (time.perf_counter() - started) / 100
+    print(f"Index over 5000 contractors built in {built * 1000:.0f} ms, {per_match * 1000:.2f} ms per match")
+
+    assert len(matches) <= 10
+    assert per_match < 0.02
+    db.close()
+
+if __name__ == "__main__":
+    test_sync_and_ranking()
+    test_index_refreshes_on_change()
+    test_new_contractor_price_is_matched()
+    test_matching_thousands_of_contractors()
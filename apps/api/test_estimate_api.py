@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Test the structured /api/estimate endpoint: priced line items from the calculators,
+request validation and cached responses
+"""
+
+import asyncio
+import time
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.models.pricing import Base
+from app.routers.estimate import create_estimate, EstimateRequest
+from app.services.pricing_service import PricingService
+from app.services.price_catalog_service import PriceCatalogService, CATALOG_DIR
+from app.services.region_service import RegionService
+from app.services.estimate_cache import estimate_cache
+
+def _load_catalog(db):
+    RegionService(db).load_regions()
+    for sheet in ("bathroom.yaml", "market.yaml", "elektriker.yaml", "kjokken.yaml", "vinduer_dorer.yaml", "gpt_research.yaml"):
+        PriceCatalogService(db).load_file(CATALOG_DIR / sheet)
+    PricingService(db).recalculate_market_rates()
+
+async def _memory_db():
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    db = AsyncSession(engine, expire_on_commit=False)
+    await db.run_sync(_load_catalog)
+    estimate_cache.clear()
+    return engine, db
+
+async def _estimates():
+    engine, db = await _memory_db()
+
+    bathroom = await create_estimate(EstimateRequest(project_type="bathroom", area=6), db=db)
+    assert bathroom["pricing_source"] == "database_package" and not bathroom["cached"]
+    assert bathroom["details"]["package_used"] == "bad_totalrenovering_8m2"
+    assert abs(bathroom["total_cost_inc_vat"] - bathroom["total_cost"] * 1.25) < 1e-6
+
+    kitchen = await create_estimate(EstimateRequest(project_type="kjøkken", quality="premium", region="5003"), db=db)
+    assert kitchen["project_type"] == "kitchen" and kitchen["details"]["quality"] == "premium"
+    assert abs(sum(item["total"] for item in kitchen["line_items"]) - kitchen["total_cost"]) < 1e-6
+
+    painting = await create_estimate(EstimateRequest(project_type="painting", area=25,
+                                                     options={"ceiling_painting": True}), db=db)
+    assert [item["service"] for item in painting["line_items"]][-1] == "rigg_og_drift"
+
+    windows = await create_estimate(EstimateRequest(project_type="windows", quantity=4), db=db)
+    assert windows["pricing_source"] == "database" and windows["line_items"][0]["quantity"] == 4
+    print(f"Bathroom {bathroom['total_cost']:,.0f}, kitchen {kitchen['total_cost']:,.0f}, "
+          f"painting {painting['total_cost']:,.0f}, windows {windows['total_cost']:,.0f} NOK")
+
+    for request, message in (
+        (EstimateRequest(project_type="garasje", area=20), "Unknown project_type"),
+        (EstimateRequest(project_type="bathroom"), "need an area"),
+        (EstimateRequest(project_type="windows", quantity=2, region="Atlantis"), "Unknown region"),
+        (EstimateRequest(project_type="kitchen", quality="gold"), "Unknown quality"),
+        (EstimateRequest(project_type="kitchen", options={"countertop_meters": True}), "countertop_meters"),
+        (EstimateRequest(project_type="kitchen", options={"countertop_meters": "3"}), "countertop_meters")
+    ):
+        try:
+            await create_estimate(request, db=db)
+            raise AssertionError(f"{request} should be rejected")
+        except HTTPException as e:
+            assert e.status_code == 400 and message in e.detail, e.detail
+
+    # Repeats are served from the cache
+    timings = []
+    for _ in range(50):
+        started = time.perf_counter()
+        repeat = await create_estimate(EstimateRequest(project_type="bathroom", area=6), db=db)
+        timings.append(time.perf_counter() - started)
+    assert repeat["cached"] and repeat["total_cost"] == bathroom["total_cost"]
+    median = sorted(timings)[len(timings) // 2]
+    print(f"Cached estimate: {median * 1000:.2f} ms median")
+    assert median < 0.01
+
+    await db.close()
+    await engine.dispose()
+
+def test_estimate_endpoint():
+    """Structured estimates are priced from the catalog, validated and cached"""
+
+    print("🧪 Testing /api/estimate")
+    print("=" * 40)
+    asyncio.run(_estimates())
+    print("✅ Structured estimates work")
+
+if __name__ == "__main__":
+    test_estimate_endpoint()
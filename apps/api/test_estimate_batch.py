@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Test /api/estimate/batch: one catalog query for the whole batch, isolated per-item
+errors, input order and identical results inline and on worker processes
+"""
+
+import asyncio
+import json
+import time
+from sqlalchemy import event
+
+from app.routers.estimate import create_estimate_batch, EstimateBatchRequest
+from app.services.estimate_service import EstimateService
+from app.services.estimate_cache import estimate_cache
+from test_estimate_api import _memory_db
+
+VALID = [
+    {"project_type": "bathroom", "area": 6},
+    {"project_type": "kjøkken", "quality": "premium", "region": "5003"},
+    {"project_type": "painting", "area": 25, "options": {"ceiling_painting": True}},
+    {"project_type": "windows", "quantity": 4, "region": "Bergen"},
+    {"project_type": "outlets", "quantity": 8},
+]
+INVALID = [
+    ({"project_type": "garasje", "area": 20}, "Unknown project_type"),
+    ({"project_type": "bathroom"}, "need an area"),
+    ({"project_type": "windows", "quantity": 2, "region": "Atlantis"}, "Unknown region"),
+    ({"project_type": "painting", "area": -3}, "greater than 0"),
+    ({"area": 10}, "project_type"),
+]
+
+def _items(count):
+    """Mixed batch: distinct areas so most items miss the cache, every 10th item invalid"""
+    items, expected_errors = [], {}
+    for i in range(count):
+        if i % 10 == 9:
+            item, message = INVALID[(i // 10) % len(INVALID)]
+            expected_errors[i] = message
+        else:
+            item = dict(VALID[i % len(VALID)])
+            if "area" in item:
+                item["area"] = item["area"] + i / 100
+        items.append(item)
+    return items, expected_errors
+
+async def _stream(items, db):
+    response = await create_estimate_batch(EstimateBatchRequest(items=items), db=db)
+    assert response.media_type == "application/x-ndjson"
+    body = "".join([chunk async for chunk in response.body_iterator])
+    return [json.loads(line) for line in body.splitlines()]
+
+async def _batch():
+    engine, db = await _memory_db()
+    items, expected_errors = _items(300)
+
+    statements = []
+    def count(conn, cursor, statement, *args):
+        statements.append(statement)
+    event.listen(engine.sync_engine, "before_cursor_execute", count)
+    started = time.perf_counter()
+    lines = await _stream(items, db)
+    elapsed = time.perf_counter() - started
+    event.remove(engine.sync_engine, "before_cursor_execute", count)
+
+    *results, summary = lines
+    assert summary["done"] and summary["items"] == 300 and summary["errors"] == len(expected_errors)
+    assert [line["index"] for line in results] == list(range(300))
+    for line in results:
+        if line["index"] in expected_errors:
+            assert line["status"] == "error" and expected_errors[line["index"]] in line["error"], line
+        else:
+            assert line["status"] == "ok" and line["estimate"]["total_cost"] > 0, line
+    assert results[1]["estimate"]["project_type"] == "kitchen"
+    assert results[3]["estimate"]["region"] == "Bergen"
+
+    prices = [s for s in statements if "UNION ALL" in s]
+    assert len(prices) == 1, f"{len(prices)} price queries for one batch"
+    print(f"300 items in {elapsed * 1000:.1f} ms with {len(statements)} statements "
+          f"({summary['errors']} rejected)")
+
+    # Second pass is served from the cache and matches the first
+    again = await _stream(items, db)
+    assert all(line["estimate"]["cached"] for line in again[:-1] if line.get("status") == "ok")
+    assert [line.get("estimate", {}).get("total_cost") for line in again[:-1]] == \
+        [line.get("estimate", {}).get("total_cost") for line in results]
+
+    # Too many items is rejected up front
+    try:
+        EstimateBatchRequest(items=[VALID[0]] * 1001)
+        raise AssertionError("oversized batch should be rejected")
+    except ValueError:
+        pass
+
+    estimate_cache.clear()
+    await db.close()
+    await engine.dispose()
+    return results
+
+async def _prepared(items):
+    engine, db = await _memory_db()
+    batch = await db.run_sync(lambda session: EstimateService(session).prepare_batch(items))
+    await db.close()
+    await engine.dispose()
+    return batch
+
+def test_estimate_batch():
+    """Batches are priced in one catalog pass with per-item errors, in input order"""
+
+    print("🧪 Testing /api/estimate/batch")
+    print("=" * 40)
+    asyncio.run(_batch())
+    print("✅ Batch estimates work")
+
+def test_estimate_batch_workers():
+    """Worker processes return exactly what the inline path returns"""
+
+    print("🧪 Testing batch estimates on worker processes")
+    print("=" * 40)
+    items, _ = _items(400)
+    batch = asyncio.run(_prepared(items))
+    inline = list(batch.run(workers=1))
+    started = time.perf_counter()
+    parallel = list(batch.run(workers=2))
+    print(f"400 items on 2 workers in {(time.perf_counter() - started) * 1000:.1f} ms")
+    assert [line.get("estimate", {}).get("total_cost") for line in parallel[:-1]] == \
+        [line.get("estimate", {}).get("total_cost") for line in inline[:-1]]
+    assert [line["index"] for line in parallel[:-1]] == list(range(400))
+    estimate_cache.clear()
+    print("✅ Worker processes match inline results")
+
+if __name__ == "__main__":
+    test_estimate_batch()
+    test_estimate_batch_workers()
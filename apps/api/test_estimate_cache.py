@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test the estimate cache: LRU bounds, normalised keys and invalidation when prices change
+"""
+
+import asyncio
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models.pricing import Base, PricingData
+from app.agents.enhanced_renovation_agent import EnhancedRenovationAgent
+from app.services.pricing_service import PricingService
+from app.services.price_catalog_service import PriceCatalogService, CATALOG_DIR
+from app.services.estimate_cache import EstimateCache, estimate_cache, area_bucket, freeze
+
+def _agent_with_catalog():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    PriceCatalogService(db).load_file(CATALOG_DIR / "bathroom.yaml")
+    PriceCatalogService(db).load_file(CATALOG_DIR / "market.yaml")
+    PricingService(db).recalculate_market_rates()
+
+    agent = EnhancedRenovationAgent()
+    agent.db.close()
+    agent.db = db
+    agent.pricing_service = PricingService(db)
+    estimate_cache.clear()
+    return engine, db, agent
+
+def test_lru_and_keys():
+    """Bounded LRU with copies in and out; keys normalise area and detail order"""
+
+    print("🧪 Testing estimate cache")
+    print("=" * 40)
+
+    cache = EstimateCache(max_entries=2)
+    cache.put("a", {"total_cost": 1, "items": [1]})
+    cache.put("b", {"total_cost": 2})
+    assert cache.get("a")["total_cost"] == 1  # a is now most recent
+    cache.put("c", {"total_cost": 3})
+    assert cache.get("b") is None and cache.stats()["evictions"] == 1
+
+    cached = cache.get("a")
+    cached["items"].append(2)
+    assert cache.get("a")["items"] == [1]
+
+    assert area_bucket(6.2) == 6.0 and area_bucket(6.3) == 6.5
+    assert area_bucket(45.4) == 45.0 and area_bucket(143) == 145.0
+    assert freeze({"b": 1, "a": [1, 2]}) == freeze({"a": [1, 2], "b": 1})
+    print("✅ LRU eviction and key normalisation work")
+
+def test_repeat_estimate_skips_database():
+    """A repeat bathroom estimate runs no SQL and no calculation"""
+
+    engine, db, agent = _agent_with_catalog()
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, stmt, *args: statements.append(stmt))
+
+    first = asyncio.run(agent._calculate_bathroom_project({"area": 6, "preferences": {"quality": "mid"}}, "Bad 6 kvm standard"))
+    first_statements = len(statements)
+    # 6.1 m² falls in the same area bucket
+    second = asyncio.run(agent._calculate_bathroom_project({"area": 6.1, "preferences": {"quality": "mid"}}, "bad 6 kvm"))
+    print(f"First estimate: {first_statements} statements, repeat: {len(statements) - first_statements}")
+
+    assert first["pricing_source"] == "database_package"
+    assert second == first
+    assert len(statements) == first_statements
+    assert estimate_cache.stats()["hits"] == 1
+
+    db.close()
+
+def test_price_change_invalidates():
+    """Recalculating market rates changes the catalog version, so the estimate is recomputed"""
+
+    engine, db, agent = _agent_with_catalog()
+    analysis = {"area": 8}
+    before = asyncio.run(agent._calculate_bathroom_project(analysis, "bad 8 kvm"))
+
+    db.query(PricingData).filter(PricingData.source == "bathroom_research_2025").update(
+        {PricingData.min_price: PricingData.min_price * 2, PricingData.max_price: PricingData.max_price * 2},
+        synchronize_session=False
+    )
+    db.commit()
+    PricingService(db).recalculate_market_rates()
+
+    after = asyncio.run(agent._calculate_bathroom_project(analysis, "bad 8 kvm"))
+    print(f"Before: {before['total_cost']:,.0f} NOK, after price change: {after['total_cost']:,.0f} NOK")
+
+    assert after["total_cost"] > before["total_cost"] * 1.5
+    print("✅ Price changes invalidate cached estimates")
+
+    db.close()
+
+if __name__ == "__main__":
+    test_lru_and_keys()
+    test_repeat_estimate_skips_database()
+    test_price_change_invalidates()
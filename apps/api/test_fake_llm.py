@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Test the fake OpenAI-compatible server: protocol, streaming, error injection, latency
+and cassette record/replay, with the AI services pointed at it by base URL
+"""
+
+import asyncio
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+from app.database import using_database
+from app.models.partner import Base as PartnerBase
+from app.models.conversation import Base as ConversationBase
+from app.models.pricing import Base as PricingBase
+from app.devtools.fake_llm import FakeLLMConfig, running_fake_llm, latency_sampler, cassette_key
+from app.services.ai_query_analyzer import AIQueryAnalyzer
+from app.services.intelligent_ai_service import IntelligentAIService, openai_client
+
+def test_services_against_fake_llm():
+    """The analyzer (httpx) and the intelligent AI service (openai SDK) both talk to the fake"""
+
+    print("🧪 Testing AI services against the fake LLM")
+    print("=" * 40)
+    reply = json.dumps({"follow_up_question": "Innvendig eller utvendig?", "complexity": "low"})
+    with running_fake_llm(FakeLLMConfig(latency="fixed:0.05", default_reply=reply)) as base_url:
+        analyzer = AIQueryAnalyzer(base_url=base_url)
+        analyzer.api_key = "fake-key"
+        started = time.perf_counter()
+        analysis = asyncio.run(analyzer.analyze_with_followup("male stue 45 kvm"))
+        assert analysis["fused"] and time.perf_counter() - started >= 0.05
+
+        service = IntelligentAIService(base_url=base_url)
+        service.client = openai_client("fake-key", base_url)
+        followup = asyncio.run(service.generate_intelligent_followup("male huset", project_type="maling"))
+        assert followup["success"] and followup["follow_up_question"] == "Innvendig eller utvendig?"
+
+        # Streaming, as the SDK consumes it
+        stream = service.client.chat.completions.create(
+            model="gpt-4o-mini", messages=[{"role": "user", "content": "hei"}], stream=True
+        )
+        assert "".join(chunk.choices[0].delta.content or "" for chunk in stream) == reply
+
+        stats = httpx.get(base_url.replace("/v1", "/stats")).json()
+        assert stats["requests"] == 3 and stats["synthesized"] == 3
+    print("✅ Services run offline against the fake")
+
+def test_error_injection_and_latency():
+    """Injected 429s carry Retry-After; seeded latency draws replay exactly"""
+
+    print("🧪 Testing error injection")
+    print("=" * 40)
+    config = FakeLLMConfig(error_rate=1.0, error_statuses=(429,), retry_after=7)
+    with running_fake_llm(config) as base_url:
+        response = httpx.post(f"{base_url}/chat/completions", json={"model": "m", "messages": []})
+        assert response.status_code == 429 and response.headers["retry-after"] == "7"
+
+    draws = [[round(sample(), 6) for _ in range(5)]
+             for sample in (latency_sampler("lognormal:0.4:0.5", random.Random(3)) for _ in range(2))]
+    assert draws[0] == draws[1] and len(set(draws[0])) == 5
+    print("✅ Errors and latency are injected reproducibly")
+
+def test_cassette_record_and_replay():
+    """Recorded completions replay by prompt hash, ignoring the per-minute timestamp line"""
+
+    print("🧪 Testing cassettes")
+    print("=" * 40)
+    request = {"model": "gpt-4o-mini", "temperature": 0.3, "messages": [
+        {"role": "user", "content": "Brukerens spørsmål: 'male huset'\nTidspunkt: 2026-01-01 10:00"}
+    ]}
+    with tempfile.TemporaryDirectory() as tmp:
+        cassette = str(Path(tmp) / "chat.json")
+        # Record from an "upstream" (another fake) ...
+        with running_fake_llm(FakeLLMConfig(default_reply='{"recorded": true}')) as upstream:
+            with running_fake_llm(FakeLLMConfig(cassette=cassette, record=True, upstream=upstream)) as base_url:
+                recorded = httpx.post(f"{base_url}/chat/completions", json=request).json()
+        assert recorded["choices"][0]["message"]["content"] == '{"recorded": true}'
+        assert cassette_key(request) in json.loads(Path(cassette).read_text())["responses"]
+
+        # ... and replay it later without one
+        later = {**request, "messages": [{**request["messages"][0],
+                                          "content": request["messages"][0]["content"].replace("10:00", "14:37")}]}
+        with running_fake_llm(FakeLLMConfig(cassette=cassette)) as base_url:
+            replayed = httpx.post(f"{base_url}/chat/completions", json=later).json()
+            stats = httpx.get(base_url.replace("/v1", "/stats")).json()
+        assert replayed["choices"][0]["message"]["content"] == '{"recorded": true}'
+        assert stats["replayed"] == 1 and stats["synthesized"] == 0
+    print("✅ Cassettes record and replay")
+
+def test_synthesized_turns_are_priceable():
+    """Schema misses are answered like a model would: a real estimate, or a clarification"""
+
+    print("🧪 Testing synthesized analyses")
+    print("=" * 40)
+    from app.agents.enhanced_renovation_agent import EnhancedRenovationAgent
+
+    async def turns(base_url):
+        analyzer = AIQueryAnalyzer(base_url=base_url)
+        analyzer.api_key = "fake-key"
+        estimate = await analyzer.analyze_with_followup("pusse opp bad 6 kvm")
+        clarification = await analyzer.analyze_with_followup("jeg vil pusse opp badet")
+        agent = EnhancedRenovationAgent()
+        try:
+            return estimate, clarification, await agent._calculate_full_project(estimate, "pusse opp bad 6 kvm")
+        finally:
+            agent.db.close()
+
+    # The agent's pricing runs on a fresh database with every table, outside the working tree
+    with tempfile.TemporaryDirectory(prefix="beregne-test-") as tmp, \
+            using_database(f"sqlite:///{tmp}/beregne.db") as engine, running_fake_llm(FakeLLMConfig()) as base_url:
+        for base in (PartnerBase, ConversationBase, PricingBase):
+            base.metadata.create_all(bind=engine)
+        estimate, clarification, result = asyncio.run(turns(base_url))
+    print(f"Estimate: {result.get('total_cost')} kr; clarification: {clarification['followup_message']}")
+
+    assert estimate["fused"] and estimate["type"] == "full_project_estimate"
+    assert estimate["project_type"] == "bad_komplett" and estimate["area"] == 6
+    assert "error" not in result and result["total_cost"] > 0
+    assert clarification["fused"] and clarification["type"] == "needs_clarification"
+    assert clarification["is_ambiguous"] and clarification["followup_message"]
+    print("✅ Synthesized turns reach the calculators")
+
+if __name__ == "__main__":
+    test_services_against_fake_llm()
+    test_error_injection_and_latency()
+    test_cassette_record_and_replay()
+    test_synthesized_turns_are_priceable()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Test the fused analysis turn: one LLM completion gives the analysis, follow-up questions
+and the conversational follow-up, and the orchestrator enforces the per-turn call budget
+"""
+
+import asyncio
+import json
+import tempfile
+from contextlib import contextmanager
+
+from app.database import using_database
+from app.models.partner import Base as PartnerBase
+from app.models.conversation import Base as ConversationBase
+from app.models.pricing import Base as PricingBase
+from app.orchestrator import AgentOrchestrator
+from app.services.ai_query_analyzer import AIQueryAnalyzer, FUSED_ANALYSIS_SCHEMA
+from app.services.llm_budget import llm_call_budget, spend_llm_call, llm_calls_remaining, LLMBudgetExceeded
+
+FUSED_REPLY = {
+    "type": "needs_clarification",
+    "project_type": "vinduer_dorer",
+    "area": None,
+    "quantity": 5,
+    "room_type": None,
+    "requirements": [],
+    "preferences": {"quality": None, "brands": []},
+    "missing_info": ["door_type", "interior_or_exterior"],
+    "is_ambiguous": True,
+    "confidence": 0.6,
+    "reasoning": "Dørtype mangler",
+    "followup_questions": ["Er det innerdører eller ytterdører?", "Skal karmene også byttes?"],
+    "followup_message": "Er det innerdører eller ytterdører du vil bytte?"
+}
+
+@contextmanager
+def _temp_database():
+    """The app's engines on a fresh SQLite file with every table, outside the working tree"""
+    with tempfile.TemporaryDirectory(prefix="beregne-test-") as tmp, \
+            using_database(f"sqlite:///{tmp}/beregne.db") as engine:
+        for base in (PartnerBase, ConversationBase, PricingBase):
+            base.metadata.create_all(bind=engine)
+        yield engine
+
+def _fake_completion(calls, reply):
+    async def chat_completion(purpose, messages, temperature, max_tokens, response_format=None):
+        spend_llm_call(purpose)
+        calls.append((purpose, response_format))
+        return json.dumps(reply)
+    return chat_completion
+
+def test_call_budget():
+    """The budget is scoped to a block and refuses calls beyond the limit"""
+
+    print("🧪 Testing LLM call budget")
+    print("=" * 40)
+    assert llm_calls_remaining() is None
+    spend_llm_call("outside a turn")  # not limited
+
+    with llm_call_budget(1) as budget:
+        spend_llm_call("analysis")
+        try:
+            spend_llm_call("followup")
+            raise AssertionError("second call should exceed the budget")
+        except LLMBudgetExceeded:
+            pass
+        assert budget.calls == ["analysis"] and llm_calls_remaining() == 0
+    assert llm_calls_remaining() is None
+
+    # Over budget the analyzer degrades to the regex analysis without a request
+    analyzer = AIQueryAnalyzer()
+    analyzer.api_key = "test-key"
+    calls = []
+    analyzer._chat_completion = _fake_completion(calls, FUSED_REPLY)
+    with llm_call_budget(0):
+        analysis = asyncio.run(analyzer.analyze_with_followup("bytte 5 dører"))
+        questions = asyncio.run(analyzer.generate_followup_questions("bytte 5 dører", analysis))
+    assert not calls and not analysis.get("fused")
+    assert questions == ["Skal du skifte innerdører eller ytterdører?"]
+    print("✅ Budget is enforced and over-budget calls fall back")
+
+def test_clarification_turn_is_one_call():
+    """An ambiguous turn through the orchestrator costs exactly one fused completion"""
+
+    print("🧪 Testing fused clarification turn")
+    print("=" * 40)
+    with _temp_database():
+        orchestrator = AgentOrchestrator()
+        agent = orchestrator.agents[0]
+        agent.ai_analyzer.api_key = "test-key"
+        calls = []
+        agent.ai_analyzer._chat_completion = _fake_completion(calls, FUSED_REPLY)
+
+        result = asyncio.run(orchestrator.route_query("bytte 5 dører", {"session_id": "fused-test"}))
+    print(f"Response: {result['response']}")
+
+    assert [purpose for purpose, _ in calls] == ["fused_analysis"]
+    assert calls[0][1]["json_schema"] is FUSED_ANALYSIS_SCHEMA
+    assert result["llm_calls"] == 1
+    assert result["requires_clarification"] and result["ai_powered"]
+    assert FUSED_REPLY["followup_message"] in result["response"]
+    print("✅ Clarification turn used one LLM call")
+
+def test_estimate_with_null_area():
+    """A schema-valid estimate without an area is priced at the default size, not a crash"""
+
+    print("🧪 Testing fused estimate without an area")
+    print("=" * 40)
+    reply = {
+        **FUSED_REPLY,
+        "type": "full_project_estimate",
+        "project_type": "bad_komplett",
+        "quantity": None,
+        "missing_info": [],
+        "is_ambiguous": False,
+        "confidence": 0.8,
+        "followup_questions": [],
+        "followup_message": ""
+    }
+    with _temp_database():
+        orchestrator = AgentOrchestrator()
+        agent = orchestrator.agents[0]
+        agent.ai_analyzer.api_key = "test-key"
+        agent.ai_analyzer._chat_completion = _fake_completion([], reply)
+
+        result = asyncio.run(orchestrator.route_query("totalrenovering av badet", {"session_id": "fused-null-area"}))
+    assert "error" not in result, result.get("error")
+    assert result["total_cost"] > 0
+    print(f"Priced at the default size: {result['total_cost']:,.0f} kr")
+    print("✅ Null area falls back to the default size")
+
+def test_fused_schema_is_strict():
+    """Strict structured output needs every property listed as required"""
+
+    schema = FUSED_ANALYSIS_SCHEMA["schema"]
+    assert set(schema["required"]) == set(schema["properties"]) == set(FUSED_REPLY)
+    preferences = schema["properties"]["preferences"]
+    assert set(preferences["required"]) == set(preferences["properties"])
+
+if __name__ == "__main__":
+    test_call_budget()
+    test_clarification_turn_is_one_call()
+    test_estimate_with_null_area()
+    test_fused_schema_is_strict()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test hedged query analysis: confident local answers skip the LLM, slow LLM answers are
+cut off at the deadline, and win rates / latency percentiles are recorded
+"""
+
+import asyncio
+import json
+import time
+
+from app.services.ai_query_analyzer import AIQueryAnalyzer
+from app.services.hedged_analysis import hedge_stats, percentile
+from test_fused_analysis import FUSED_REPLY
+
+def _analyzer(delay: float, calls: list) -> AIQueryAnalyzer:
+    analyzer = AIQueryAnalyzer()
+    analyzer.api_key = "test-key"
+
+    async def chat_completion(purpose, messages, temperature, max_tokens, response_format=None):
+        calls.append(purpose)
+        await asyncio.sleep(delay)
+        return json.dumps(FUSED_REPLY)
+    analyzer._chat_completion = chat_completion
+    return analyzer
+
+def test_hedged_outcomes():
+    """Local wins, LLM wins and deadline fallbacks are each taken when they should be"""
+
+    print("🧪 Testing hedged analysis")
+    print("=" * 40)
+    hedge_stats.clear()
+
+    calls = []
+    fast = _analyzer(0.01, calls)
+    local = asyncio.run(fast.analyze_hedged("pusse opp bad 6 kvm normal standard"))
+    assert local["hedge_outcome"] == "local" and local["area"] == 6.0
+    assert calls == [], "a confident local analysis must not call the LLM"
+
+    llm = asyncio.run(fast.analyze_hedged("bytte 5 dører"))
+    assert llm["hedge_outcome"] == "llm" and llm["followup_message"] == FUSED_REPLY["followup_message"]
+    assert calls == ["fused_analysis"]
+
+    slow = _analyzer(5.0, [])
+    started = time.perf_counter()
+    late = asyncio.run(slow.analyze_hedged("bytte 5 dører", deadline=0.05))
+    elapsed = time.perf_counter() - started
+    print(f"Slow upstream answered from local analysis after {elapsed * 1000:.0f} ms")
+    assert late["hedge_outcome"] == "deadline" and late["project_type"] == "vinduer_dorer"
+    assert elapsed < 0.5
+
+    stats = hedge_stats.stats()
+    assert stats["analyses"] == 3
+    assert {name: outcome["wins"] for name, outcome in stats["outcomes"].items()} == \
+        {"local": 1, "llm": 1, "llm_fallback": 0, "deadline": 1}
+    assert stats["outcomes"]["deadline"]["latency"]["p99_ms"] < 500
+    print(f"Latency p50 {stats['latency']['p50_ms']} ms, p99 {stats['latency']['p99_ms']} ms")
+    hedge_stats.clear()
+    print("✅ Hedged analysis bounds latency")
+
+def test_uncalibrated_local_analysis_waits_for_llm():
+    """The regex analysis' own confidence never answers early, and a small area with a
+    quality word is only read as a bathroom when no other project is named"""
+
+    print("🧪 Testing that only calibrated local analyses win the hedge")
+    print("=" * 40)
+    hedge_stats.clear()
+
+    expected = {
+        "male soverom 12 kvm enkel standard": ("painting_specific", "maling"),
+        "kjøkken 10 kvm høy standard": ("full_project_estimate", "kjøkken_detaljert"),
+        "male stue 45 kvm normal standard": ("painting_specific", "maling"),
+        "parkett 30 kvm normal": ("flooring_work", "gulvarbeider"),
+    }
+    for query, (analysis_type, project_type) in expected.items():
+        calls = []
+        analysis = asyncio.run(_analyzer(0.01, calls).analyze_hedged(query))
+        assert analysis["hedge_outcome"] == "llm", f"{query!r} was answered locally"
+        assert calls == ["fused_analysis"]
+
+        late = asyncio.run(_analyzer(5.0, []).analyze_hedged(query, deadline=0.01))
+        print(f"{query!r}: deadline fallback {late['type']}/{late['project_type']}")
+        assert late["hedge_outcome"] == "deadline"
+        assert (late["type"], late["project_type"]) == (analysis_type, project_type)
+
+    bare = AIQueryAnalyzer()._fallback_regex_analysis("6 kvm normal standard")
+    assert bare["project_type"] == "bad_komplett"
+    hedge_stats.clear()
+    print("✅ Uncalibrated local analyses wait for the LLM")
+
+def test_percentile():
+    """Nearest-rank percentiles"""
+
+    samples = [float(i) for i in range(1, 101)]
+    assert percentile(samples, 50) == 50.0
+    assert percentile(samples, 99) == 99.0
+    assert percentile([3.0], 90) == 3.0 and percentile([], 50) == 0.0
+
+if __name__ == "__main__":
+    test_hedged_outcomes()
+    test_uncalibrated_local_analysis_waits_for_llm()
+    test_percentile()
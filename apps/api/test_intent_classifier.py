@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Test the local intent classifier: training from the conversation log, artefact round
+trip, and short-circuiting the LLM for clear queries
+"""
+
+import asyncio
+import json
+import tempfile
+import time
+from pathlib import Path
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models.partner import Base
+from app.models.conversation import ConversationMessage, ConversationPattern
+from app.services.ai_query_analyzer import AIQueryAnalyzer
+from app.services.intent_classifier import (
+    IntentClassifier, training_examples, get_intent_classifier, SEED_EXAMPLES, INTENT_CONFIDENCE
+)
+from test_hedged_analysis import _analyzer
+
+def test_training_examples_from_history():
+    """Logged messages and learned patterns become labelled examples"""
+
+    print("🧪 Testing intent classifier training data")
+    print("=" * 40)
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    db.add_all([
+        ConversationMessage(session_id="s1", message_order=1, user_message="male gangen 15 kvm",
+                            project_type_detected="maling", led_to_pricing=True),
+        ConversationMessage(session_id="s1", message_order=2, user_message="hva med badet?",
+                            project_type_detected="bad_komplett", led_to_clarification=True),
+        ConversationMessage(session_id="s2", message_order=1, user_message="hei",
+                            project_type_detected=""),
+        ConversationPattern(pattern_name="gulv", project_type="gulvarbeider",
+                            sample_user_queries=json.dumps(["legge eikeparkett 30 kvm"])),
+    ])
+    db.commit()
+
+    examples = training_examples(db)
+    assert sorted(examples) == sorted([
+        ("male gangen 15 kvm", "maling", "painting_specific"),
+        ("hva med badet?", "bad_komplett", "needs_clarification"),
+        ("legge eikeparkett 30 kvm", "gulvarbeider", "flooring_work"),
+    ])
+    db.close()
+    print("✅ History is labelled for training")
+
+def test_train_save_load():
+    """A trained model survives the .npz round trip and separates the seed classes"""
+
+    classifier = IntentClassifier.train(SEED_EXAMPLES, dim=1 << 12, epochs=150)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "intent.npz"
+        classifier.save(path)
+        loaded = IntentClassifier.load(path)
+        print(f"Artefact: {path.stat().st_size / 1024:.1f} KiB")
+
+    for query, project_type, analysis_type in SEED_EXAMPLES[::5]:
+        prediction = loaded.predict(query)
+        assert prediction["project_type"][0] == project_type, (query, prediction)
+        assert prediction["type"][0] == analysis_type, (query, prediction)
+        assert abs(prediction["type"][1] - classifier.predict(query)["type"][1]) < 1e-2
+
+def test_shipped_classifier_skips_llm():
+    """Clear queries are answered locally; ambiguous ones still go to the LLM"""
+
+    print("🧪 Testing LLM short-circuit")
+    print("=" * 40)
+    classifier = get_intent_classifier()
+    assert classifier is not None, "artefacts/intent_classifier.npz is missing"
+
+    analyzer = AIQueryAnalyzer()
+    for query, analysis_type, project_type in (
+        ("male stue 45 kvm", "painting_specific", "maling"),
+        ("bytte 5 innerdører", "windows_doors_work", "vinduer_dorer"),
+        ("pusse opp bad 6 kvm", "full_project_estimate", "bad_komplett"),
+    ):
+        local = analyzer._local_analysis(query)
+        assert local["type"] == analysis_type and local["project_type"] == project_type, local
+        assert local["confidence"] >= INTENT_CONFIDENCE and not local["needs_clarification"]
+
+    # "pusse opp badet" has no area, so the bathroom estimate can't be made locally
+    assert analyzer._local_analysis("jeg vil pusse opp badet")["needs_clarification"]
+
+    calls = []
+    hedged = _analyzer(0.01, calls)
+    assert asyncio.run(hedged.analyze_hedged("bytte 5 innerdører"))["hedge_outcome"] == "local"
+    assert asyncio.run(hedged.analyze_hedged("bytte 5 dører"))["hedge_outcome"] == "llm"
+    assert calls == ["fused_analysis"]
+
+    timings = []
+    for _ in range(200):
+        started = time.perf_counter()
+        classifier.predict("male stue og gang 45 kvm")
+        timings.append(time.perf_counter() - started)
+    median = sorted(timings)[len(timings) // 2]
+    print(f"Classifier prediction: {median * 1e6:.0f} µs median")
+    assert median < 0.005
+    print("✅ Clear queries skip the LLM")
+
+if __name__ == "__main__":
+    test_training_examples_from_history()
+    test_train_save_load()
+    test_shipped_classifier_skips_llm()
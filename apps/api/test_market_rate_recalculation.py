@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Test market-rate recalculation: matches the old per-service computation on clean data,
+rejects outliers and weights by confidence and recency
+"""
+
+import random
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models.pricing import Base, ServiceType, PricingData, MarketRate
+from app.services.pricing_service import PricingService
+
+REGIONS = ["Oslo", "Bergen", "Trondheim"]
+
+# No outlier rejection or recency decay: the random seed data must match the old, unweighted computation
+UNWEIGHTED = {"mad_threshold": float("inf"), "half_life_days": float("inf")}
+
+def _memory_session():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    return engine, sessionmaker(bind=engine)()
+
+def _seed(db, services: int = 40):
+    rng = random.Random(7)
+    for i in range(services):
+        service = ServiceType(name=f"tjeneste_{i}", unit="m²")
+        db.add(service)
+        db.flush()
+        for region in REGIONS:
+            for n in range(rng.randint(0, 12)):
+                low = rng.choice([0, None, rng.uniform(100, 500)])
+                high = rng.choice([None, rng.uniform(500, 900)])
+                db.add(PricingData(service_type_id=service.id, region=region, min_price=low, max_price=high,
+                                   source=f"kilde_{n}", last_updated=datetime.utcnow() - timedelta(days=1)))
+    db.commit()
+
+def _expected(db):
+    """The previous per-service Python computation"""
+    expected = {}
+    for service in db.query(ServiceType):
+        for region in REGIONS:
+            rows = db.query(PricingData).filter_by(service_type_id=service.id, region=region).all()
+            mins = [p.min_price for p in rows if p.min_price]
+            maxs = [p.max_price for p in rows if p.max_price]
+            if not rows or not mins or not maxs:
+                continue
+            avg = (sum(mins) + sum(maxs)) / (len(mins) + len(maxs))
+            expected[(service.id, region)] = (min(mins), max(maxs), avg, len(rows))
+    return expected
+
+def _actual(db):
+    return {
+        (rate.service_type_id, rate.region): (rate.market_min, rate.market_max, rate.market_avg,
+                                              rate.sample_size)
+        for rate in db.query(MarketRate)
+    }
+
+def _assert_close(actual, expected):
+    assert actual.keys() == expected.keys()
+    for key, values in expected.items():
+        for got, want in zip(actual[key], values):
+            assert abs(got - want) < 1e-9, (key, actual[key], values)
+
+def test_all_regions_in_one_pass():
+    """One snapshot query and one upsert cover every service and region"""
+
+    print("🧪 Testing set-based market-rate recalculation")
+    print("=" * 40)
+
+    engine, db = _memory_session()
+    _seed(db)
+    pricing_service = PricingService(db)
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, stmt, *args: statements.append(stmt))
+    result = pricing_service.recalculate_market_rates(rebuild_resolutions=False, **UNWEIGHTED)
+    statement_count = len(statements)
+    print(f"Updated {result['rates_updated']} rates in {result['seconds']:.4f}s with {statement_count} statement(s)")
+
+    expected = _expected(db)
+    assert statement_count == 2
+    assert result["outliers_rejected"] == 0
+    _assert_close(_actual(db), expected)
+    for rate in db.query(MarketRate):
+        assert rate.p10_price <= rate.p50_price <= rate.p90_price
+        assert abs(rate.recommended_price - rate.p50_price * 1.1) < 1e-9
+        # Confidence follows the usable (weighted) observations, not the raw row count
+        assert rate.effective_sample_size <= rate.sample_size
+        assert abs(rate.confidence_score - min(0.9, rate.effective_sample_size / 10)) < 1e-9
+
+    # Re-running updates in place
+    pricing_service.recalculate_market_rates(**UNWEIGHTED)
+    assert db.query(MarketRate).count() == len(expected)
+
+    # The old single-region entry point still works
+    db.query(MarketRate).delete()
+    db.commit()
+    pricing_service.update_market_rates("Bergen")
+    assert {rate.region for rate in db.query(MarketRate)} == {"Bergen"}
+    print("✅ Rates match the per-service computation")
+
+    db.close()
+
+def test_incremental_only_touches_changed_pairs():
+    """Incremental mode recomputes only (service, region) pairs with newer pricing data"""
+
+    engine, db = _memory_session()
+    _seed(db)
+    pricing_service = PricingService(db)
+    pricing_service.recalculate_market_rates(**UNWEIGHTED)
+
+    changed = db.query(PricingData).filter(PricingData.region == "Oslo", PricingData.min_price > 0,
+                                           PricingData.max_price > 0).first()
+    changed.min_price = 1.0
+    changed.last_updated = datetime.utcnow()
+    db.commit()
+
+    result = pricing_service.recalculate_market_rates(incremental=True, **UNWEIGHTED)
+    print(f"Incremental run updated {result['rates_updated']} rate(s)")
+
+    assert result["rates_updated"] == 1
+    rate = db.query(MarketRate).filter_by(service_type_id=changed.service_type_id, region="Oslo").one()
+    assert rate.market_min == 1.0
+    _assert_close(_actual(db), _expected(db))
+
+    assert pricing_service.recalculate_market_rates(incremental=True)["rates_updated"] == 0
+    db.close()
+
+def test_unsupported_dialect_is_refused():
+    """Only PostgreSQL and SQLite get the ON CONFLICT upsert; other dialects raise"""
+
+    engine, db = _memory_session()
+    _seed(db)
+    engine.dialect.name = "mysql"
+    try:
+        PricingService(db).recalculate_market_rates()
+        raise AssertionError("SQLite upsert sent to a mysql dialect")
+    except ValueError as e:
+        assert "mysql" in str(e)
+    db.rollback()
+    assert db.query(MarketRate).count() == 0
+    db.close()
+
+def test_outliers_and_weights():
+    """A bad scrape row is rejected; confident, recent rows dominate the quantiles"""
+
+    engine, db = _memory_session()
+    service = ServiceType(name="maling_vegg", unit="m²")
+    db.add(service)
+    db.flush()
+
+    now = datetime.utcnow()
+    for n, (low, high) in enumerate([(100, 200), (110, 210), (95, 190), (105, 205)]):
+        db.add(PricingData(service_type_id=service.id, region="Oslo", min_price=low, max_price=high,
+                           source=f"kilde_{n}", confidence=0.9, last_updated=now))
+    db.add(PricingData(service_type_id=service.id, region="Oslo", min_price=10000, max_price=20000,
+                       source="feil_scrape", confidence=0.9, last_updated=now))
+    # Old, low-confidence data pulling the other way
+    db.add(PricingData(service_type_id=service.id, region="Bergen", min_price=100, max_price=200,
+                       source="fersk", confidence=0.9, last_updated=now))
+    db.add(PricingData(service_type_id=service.id, region="Bergen", min_price=300, max_price=400,
+                       source="gammel", confidence=0.2, last_updated=now - timedelta(days=3 * 365)))
+    db.commit()
+
+    result = PricingService(db).recalculate_market_rates()
+    oslo = db.query(MarketRate).filter_by(region="Oslo").one()
+    bergen = db.query(MarketRate).filter_by(region="Bergen").one()
+    print(f"Oslo: {oslo.market_min}-{oslo.market_max}, P50 {oslo.p50_price:.0f}; Bergen P50 {bergen.p50_price:.0f}")
+
+    assert result["outliers_rejected"] == 2
+    assert oslo.outliers_rejected == 2 and oslo.sample_size == 5
+    assert (oslo.market_min, oslo.market_max) == (95, 210)
+    assert 140 < oslo.p50_price < 160
+    assert bergen.p50_price < 200 and bergen.effective_sample_size < 1.1
+
+    db.close()
+
+def test_outliers_among_identical_rows():
+    """MAD is 0 when most rows agree; a bad scrape is still rejected, and no side is emptied"""
+    import numpy as np
+    from app.services.market_rate_engine import compute_rates
+
+    def rates(min_prices, max_prices):
+        rows = len(min_prices)
+        return compute_rates(np.zeros(rows, dtype=int), np.array(["Oslo"] * rows, dtype=object),
+                             np.array(min_prices, dtype=float), np.array(max_prices, dtype=float),
+                             np.full(rows, 0.9), np.zeros(rows))
+
+    (rate,) = rates([100] * 5 + [100000], [100] * 5 + [100000])
+    print(f"Identical rows + bad scrape: {rate['market_min']}-{rate['market_max']}, avg {rate['market_avg']:.0f}")
+    assert rate["outliers_rejected"] == 2
+    assert (rate["market_min"], rate["market_max"]) == (100, 100) and abs(rate["market_avg"] - 100) < 1e-6
+
+    # A near-identical row is not an outlier just because the MAD is 0
+    (rate,) = rates([100] * 5 + [105], [100] * 6)
+    assert rate["outliers_rejected"] == 0 and rate["market_min"] == 100
+
+    # The only min_price sits far from the max_prices, but the pair still gets a rate
+    (rate,) = rates([10] + [np.nan] * 5, [1000] * 6)
+    assert rate["outliers_rejected"] == 0
+    assert (rate["market_min"], rate["market_max"]) == (10, 1000)
+
+def test_engine_recomputes_large_catalog_in_milliseconds():
+    """The vectorised pass handles a large snapshot quickly"""
+    import numpy as np
+    from app.services.market_rate_engine import compute_rates
+
+    rng = np.random.default_rng(3)
+    rows = 100_000
+    service_type_ids = rng.integers(0, 2_000, rows)
+    regions = rng.choice(np.array(REGIONS, dtype=object), rows)
+    min_prices = rng.uniform(100, 500, rows)
+    max_prices = min_prices + rng.uniform(50, 400, rows)
+
+    started = time.perf_counter()
+    rates = compute_rates(service_type_ids, regions, min_prices, max_prices,
+                          rng.uniform(0.5, 1.0, rows), rng.uniform(0, 700, rows))
+    elapsed = time.perf_counter() - started
+    print(f"{rows} rows -> {len(rates)} rates in {elapsed * 1000:.0f} ms")
+
+    assert len(rates) == 6_000
+    assert elapsed < 2.0
+
+if __name__ == "__main__":
+    test_all_regions_in_one_pass()
+    test_incremental_only_touches_changed_pairs()
+    test_unsupported_dialect_is_refused()
+    test_outliers_and_weights()
+    test_outliers_among_identical_rows()
+    test_engine_recomputes_large_catalog_in_milliseconds()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Test the declarative price catalog loader (validation, set-based upserts, idempotency)
+"""
+
+import tempfile
+import time
+from pathlib import Path
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models.pricing import Base, ServiceType, PricingData
+from app.services.price_catalog_service import PriceCatalogService, CatalogError, catalog_sheets
+
+def _memory_session():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    return engine, sessionmaker(bind=engine)()
+
+def test_full_catalog_loads_fast_and_idempotently():
+    """All trade sheets load set-based, and reloading changes nothing"""
+
+    print("🧪 Testing full catalog load")
+    print("=" * 40)
+
+    engine, db = _memory_session()
+    catalog = PriceCatalogService(db)
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, stmt, *args: statements.append(stmt))
+
+    started = time.perf_counter()
+    results = catalog.load_catalog()
+    elapsed = time.perf_counter() - started
+    statement_count = len(statements)
+
+    prices = sum(result["prices"] for result in results)
+    print(f"Loaded {len(results)} sheets / {prices} prices in {elapsed:.3f}s with {statement_count} statements")
+
+    assert len(results) == len(catalog_sheets()) == 11
+    assert db.query(PricingData).count() == prices
+    assert elapsed < 1.0
+    # Service upsert + id lookup + price upsert per sheet, never per row
+    assert statement_count == 3 * len(results)
+
+    kitchen = db.query(ServiceType).filter_by(name="kjokken_riving_demontering").one()
+    row = db.query(PricingData).filter_by(service_type_id=kitchen.id).one()
+    assert (row.min_price, row.max_price, row.avg_price) == (5000, 10000, 7500)
+    assert (row.region, row.source, row.confidence) == ("Oslo", "kjokken_research_2025", 0.94)
+
+    catalog.load_catalog()
+    assert db.query(PricingData).count() == prices
+    print("✅ Catalog loads in one pass and reloads idempotently")
+
+    db.close()
+
+def test_sheet_changes_are_upserted():
+    """A changed price updates the existing row instead of adding one"""
+
+    engine, db = _memory_session()
+    catalog = PriceCatalogService(db)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sheet = Path(tmp) / "maling.csv"
+        sheet.write_text(
+            "service,description,unit,category,min_price,max_price,notes,region,source,confidence\n"
+            "maling_vegg,Maling av vegg,m²,maling,100,150,,Oslo,test_sheet,0.8\n"
+            "maling_vegg,Maling av vegg,m²,maling,90,130,,Bergen,test_sheet,0.8\n",
+            encoding="utf-8"
+        )
+        catalog.load_file(sheet)
+
+        sheet.write_text(
+            "service,description,unit,category,min_price,max_price,notes,region,source,confidence\n"
+            "maling_vegg,,m²,maling,120,180,Ny pris,Oslo,test_sheet,0.9\n",
+            encoding="utf-8"
+        )
+        result = catalog.load_file(sheet)
+
+    assert result["prices"] == 1
+    oslo = db.query(PricingData).filter_by(region="Oslo").one()
+    assert (oslo.min_price, oslo.max_price, oslo.confidence, oslo.notes) == (120, 180, 0.9, "Ny pris")
+    assert db.query(PricingData).count() == 2
+    # Blank description keeps the existing one
+    assert db.query(ServiceType).filter_by(name="maling_vegg").one().description == "Maling av vegg"
+
+    db.close()
+
+def test_invalid_sheet_is_rejected_without_writes():
+    """Validation reports every bad row and nothing is written"""
+
+    engine, db = _memory_session()
+    catalog = PriceCatalogService(db)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sheet = Path(tmp) / "bad.yaml"
+        sheet.write_text(
+            "source: test_sheet\n"
+            "region: Oslo\n"
+            "confidence: 0.9\n"
+            "services:\n"
+            "- {service: ok_service, unit: m², min_price: 10, max_price: 20}\n"
+            "- {service: reversed, unit: m², min_price: 30, max_price: 20}\n"
+            "- {service: no_unit, min_price: 10, max_price: 20}\n"
+            "- {service: ok_service, unit: m², min_price: 10, max_price: 20}\n",
+            encoding="utf-8"
+        )
+        try:
+            catalog.load_file(sheet)
+            assert False, "expected CatalogError"
+        except CatalogError as e:
+            print(f"Rejected: {e}")
+            assert len(e.errors) == 3
+
+    assert db.query(ServiceType).count() == 0
+    db.close()
+
+if __name__ == "__main__":
+    test_full_catalog_loads_fast_and_idempotently()
+    test_sheet_changes_are_upserted()
+    test_invalid_sheet_is_rejected_without_writes()
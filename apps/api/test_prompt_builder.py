@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Test token-budgeted prompt assembly: constant prefixes, and history / learned patterns
+trimmed to the budget
+"""
+
+import asyncio
+
+from app.services.ai_query_analyzer import AIQueryAnalyzer, FUSED_ANALYSIS_PROMPT, ANALYSIS_INSTRUCTIONS
+from app.services.intelligent_ai_service import IntelligentAIService
+from app.services.prompt_builder import (
+    PromptBuilder, PromptSection, count_tokens, fit_items, truncate_tokens, PROMPT_TOKEN_BUDGET
+)
+
+def _variable_tokens(prompt: PromptBuilder, messages) -> int:
+    assert messages[0]["content"] == prompt.system
+    return count_tokens(messages[1]["content"]) - count_tokens(prompt.instructions)
+
+def test_prompt_builder():
+    """Sections are trimmed whole, in priority order, to the budget"""
+
+    print("🧪 Testing prompt builder")
+    print("=" * 40)
+    items = [f"melding nummer {i} " + "x" * 40 for i in range(20)]
+    assert fit_items(items, 10 ** 6) == items
+    newest = fit_items(items, 60, keep_latest=True)
+    assert newest and newest == items[-len(newest):] and len(newest) < len(items)
+    assert fit_items(items, 60) == items[:len(newest)]
+    assert count_tokens(truncate_tokens("ord " * 1000, 50)) <= 50
+
+    prompt = PromptBuilder("system", "instruksjoner", budget=100)
+    history = [f"tur {i} " + "y" * 40 for i in range(20)]
+    messages = prompt.messages("spørsmål", PromptSection("Mønstre:", items[:2]), PromptSection("Historikk:", history, keep_latest=True))
+    user = messages[1]["content"]
+    assert user.startswith("instruksjoner\n\nMønstre:\n" + items[0]) and user.endswith("spørsmål")
+    assert history[-1] in user and history[0] not in user
+    assert _variable_tokens(prompt, messages) <= prompt.budget + 5  # block separators
+    print("✅ Sections fit the budget")
+
+def test_analysis_prompt_prefix():
+    """Every analysis request shares one prefix; only the context and query differ"""
+
+    print("🧪 Testing constant analysis prefix")
+    print("=" * 40)
+    analyzer = AIQueryAnalyzer()
+    first = analyzer._analysis_messages(FUSED_ANALYSIS_PROMPT, "male stue 45 kvm", "")
+    second = analyzer._analysis_messages(FUSED_ANALYSIS_PROMPT, "bytte 5 dører", "Project: bad | Budget: mid")
+    assert first[0] == second[0]
+    assert first[1]["content"].startswith(ANALYSIS_INSTRUCTIONS) and second[1]["content"].startswith(ANALYSIS_INSTRUCTIONS)
+    assert first[1]["content"].endswith('Query: "male stue 45 kvm"')
+    assert "Context:\nProject: bad" in second[1]["content"]
+
+    # A runaway session summary doesn't grow the prompt
+    huge = analyzer._analysis_messages(FUSED_ANALYSIS_PROMPT, "male stue 45 kvm", "Tidligere: " + "bad 5 kvm " * 2000)
+    assert _variable_tokens(FUSED_ANALYSIS_PROMPT, huge) <= PROMPT_TOKEN_BUDGET + 5
+
+    # A long query plus a long (but capped) context cuts the context instead of dropping
+    # it, and the project under discussion survives the cut
+    context = "Property: enebolig 180kvm | Preferences: " + ", ".join(f"rom{i}: flis" for i in range(85)) + \
+        " | Project: bad_komplett | Budget: mid"
+    query = "vi lurer på " + "mye forskjellig om oppussingen " * 34
+    cut = analyzer._analysis_messages(FUSED_ANALYSIS_PROMPT, query, context)[1]["content"]
+    assert "Context:\nProject: bad_komplett | Property: enebolig 180kvm | Preferences: rom0" in cut
+    assert count_tokens(cut) - count_tokens(FUSED_ANALYSIS_PROMPT.instructions) <= PROMPT_TOKEN_BUDGET + 5
+    assert fit_items(["a" * 400], 20, truncate=True) == [truncate_tokens("a" * 400, 19)]
+    print(f"Analysis prefix: {FUSED_ANALYSIS_PROMPT.prefix_tokens} tokens, per-turn part ≤ {PROMPT_TOKEN_BUDGET}")
+    print("✅ Analysis prompt prefix is constant")
+
+class _LearningService:
+    async def get_learned_pattern_examples(self, project_type):
+        return [f"When user says something like: mønster {i}\nGood follow-up questions: " + "spørsmål " * 30
+                for i in range(40)]
+
+def test_followup_prompt_budget():
+    """Learned patterns and long conversation history are trimmed to the budget"""
+
+    print("🧪 Testing follow-up prompt budget")
+    print("=" * 40)
+    service = IntelligentAIService()
+    sent = []
+
+    async def chat_completion(messages, temperature, max_tokens):
+        sent.append(messages)
+        return '{"follow_up_question": "Innvendig eller utvendig?"}'
+    service.client = object()
+    service._chat_completion = chat_completion
+
+    history = [{"role": "user" if i % 2 else "assistant", "content": f"tur {i}: " + "detaljer " * 20} for i in range(200)]
+    for query in ("male huset", "male stua"):
+        result = asyncio.run(service.generate_intelligent_followup(
+            query, project_type="maling", conversation_history=history,
+            missing_info=["area"], learning_service=_LearningService()
+        ))
+        assert result["success"]
+
+    prompt = service._followup_prompts["maling"]
+    assert sent[0][0] == sent[1][0] and "SPESIELT FOR MALING" in sent[0][0]["content"]
+    user = sent[0][1]["content"]
+    assert user.startswith("LEARNED PATTERNS FOR MALING:\nWhen user says something like: mønster 0")
+    assert "tur 199:" in user and "tur 0:" not in user
+    assert user.rstrip().endswith("Hva er det beste oppfølgingsspørsmålet for å hjelpe med prisestimering?")
+    assert _variable_tokens(prompt, sent[0]) <= PROMPT_TOKEN_BUDGET + 5
+    print("✅ Follow-up prompt stays within budget")
+
+if __name__ == "__main__":
+    test_prompt_builder()
+    test_analysis_prompt_prefix()
+    test_followup_prompt_budget()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Query-plan regression test: the hot query shapes must be served by an index.
+Runs the Alembic chain against a scratch SQLite file; set TEST_POSTGRES_URL to
+also check the plans on PostgreSQL.
+"""
+
+import os
+import tempfile
+from datetime import datetime
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, text
+
+API_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# (expected index, query) - the filters used by pricing_service, conversation
+# learning, session cleanup and the pattern lookups
+HOT_QUERIES = [
+    ("uq_market_rates_service_region",
+     "SELECT * FROM market_rates WHERE service_type_id = :service_type_id AND region = :region"),
+    ("ix_pricing_data_service_region",
+     "SELECT * FROM pricing_data WHERE service_type_id = :service_type_id AND region = :region"),
+    ("ix_pricing_data_service_contractor",
+     "SELECT * FROM pricing_data WHERE service_type_id = :service_type_id AND contractor_id = :contractor_id"),
+    ("ix_conversation_messages_session_order",
+     "SELECT * FROM conversation_messages WHERE session_id = :session_id ORDER BY message_order DESC LIMIT 1"),
+    ("ix_conversation_messages_created_at",
+     "SELECT * FROM conversation_messages WHERE created_at >= :since"),
+    ("ix_session_memory_last_activity",
+     "SELECT * FROM session_memory WHERE last_activity < :cutoff"),
+    ("ix_conversation_patterns_type_confidence_seen",
+     "SELECT * FROM conversation_patterns WHERE project_type = :project_type "
+     "AND confidence_score > :min_confidence AND times_seen >= :min_seen"),
+]
+
+PARAMS = {
+    "service_type_id": 1,
+    "region": "Oslo",
+    "contractor_id": 1,
+    "session_id": "session-1",
+    "since": datetime(2025, 1, 1),
+    "cutoff": datetime(2025, 1, 1),
+    "project_type": "bathroom",
+    "min_confidence": 0.5,
+    "min_seen": 3,
+}
+
+def _upgrade(url: str):
+    config = Config(os.path.join(API_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(API_DIR, "alembic"))
+    config.set_main_option("sqlalchemy.url", url)
+    command.upgrade(config, "head")
+
+def _plans(engine, explain_prefix: str, setup_sql: str = None):
+    plans = {}
+    with engine.connect() as conn:
+        if setup_sql:
+            conn.execute(text(setup_sql))
+        for index_name, sql in HOT_QUERIES:
+            rows = conn.execute(text(explain_prefix + sql), PARAMS).fetchall()
+            plans[index_name] = "\n".join(" ".join(str(col) for col in row) for row in rows)
+    return plans
+
+def _assert_indexes_used(plans):
+    for index_name, plan in plans.items():
+        print(f"{index_name}: {plan}")
+        assert index_name in plan, f"{index_name} not used:\n{plan}"
+
+def test_sqlite_hot_queries_use_indexes():
+    """EXPLAIN QUERY PLAN on a migrated SQLite database"""
+
+    print("🧪 Testing query plans on SQLite")
+    print("=" * 40)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'plans.db')}"
+        _upgrade(url)
+
+        engine = create_engine(url)
+        try:
+            _assert_indexes_used(_plans(engine, "EXPLAIN QUERY PLAN "))
+        finally:
+            engine.dispose()
+
+    print("✅ All hot queries use their composite index on SQLite")
+
+def test_postgres_hot_queries_use_indexes():
+    """EXPLAIN on PostgreSQL (only when TEST_POSTGRES_URL is set)"""
+    url = os.getenv("TEST_POSTGRES_URL")
+    if not url:
+        pytest.skip("TEST_POSTGRES_URL not set")
+
+    print("🧪 Testing query plans on PostgreSQL")
+    print("=" * 40)
+
+    _upgrade(url)
+
+    engine = create_engine(url)
+    try:
+        # Empty test tables would otherwise always be seq-scanned
+        _assert_indexes_used(_plans(engine, "EXPLAIN ", setup_sql="SET enable_seqscan = off"))
+    finally:
+        engine.dispose()
+
+    print("✅ All hot queries use their composite index on PostgreSQL")
+
+if __name__ == "__main__":
+    test_sqlite_hot_queries_use_indexes()
+    if os.getenv("TEST_POSTGRES_URL"):
+        test_postgres_hot_queries_use_indexes()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Test /api/analytics/conversations/recent: constant query count and keyset pagination
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.models.partner import Base
+from app.models.conversation import ConversationSession, ConversationMessage
+from app.routers.analytics import get_recent_conversations
+
+def _seed(db, sessions: int = 5, messages_per_session: int = 3):
+    start = datetime(2025, 6, 1, 12, 0, 0)
+    for i in range(sessions):
+        session_id = f"session-{i}"
+        db.add(ConversationSession(session_id=session_id, partner_id="househacker",
+                                   agent_used="conversational_renovation",
+                                   started_at=start + timedelta(minutes=i),
+                                   total_messages=messages_per_session))
+        for order in range(1, messages_per_session + 1):
+            db.add(ConversationMessage(session_id=session_id, message_order=order,
+                                       user_message=f"melding {order}",
+                                       agent_response="<div>" + "x" * 500 + "</div>"))
+    db.commit()
+
+def test_recent_conversations_paginates_without_n_plus_one():
+    """A page costs the same number of queries regardless of page size"""
+    
+    print("🧪 Testing recent conversations endpoint")
+    print("=" * 40)
+    asyncio.run(_check_pagination())
+
+async def _check_pagination():
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    db = AsyncSession(engine, expire_on_commit=False)
+    await db.run_sync(_seed)
+    db.expunge_all()
+    
+    statements = []
+    event.listen(engine.sync_engine, "before_cursor_execute", lambda conn, cursor, stmt, *args: statements.append(stmt))
+    
+    first_page = await get_recent_conversations(limit=3, db=db)
+    print(f"First page: {[c['session_id'] for c in first_page['conversations']]} ({len(statements)} queries)")
+    
+    assert [c["session_id"] for c in first_page["conversations"]] == ["session-4", "session-3", "session-2"]
+    assert len(statements) == 2
+    assert all("conversation_messages.agent_response AS" not in stmt for stmt in statements)
+    
+    message = first_page["conversations"][0]["messages"][0]
+    assert message["order"] == 1
+    assert message["agent_response"].endswith("...") and len(message["agent_response"]) == 103
+    
+    db.expunge_all()
+    second_page = await get_recent_conversations(limit=3, after=first_page["next_cursor"], db=db)
+    print(f"Second page: {[c['session_id'] for c in second_page['conversations']]}")
+    
+    assert [c["session_id"] for c in second_page["conversations"]] == ["session-1", "session-0"]
+    assert second_page["next_cursor"] is None
+    print("✅ Keyset pagination works with constant query count")
+    
+    await db.close()
+    await engine.dispose()
+
+if __name__ == "__main__":
+    test_recent_conversations_paginates_without_n_plus_one()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Test the regional price hierarchy: postcode lookup and the precomputed resolution table
+"""
+
+from datetime import datetime
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models.pricing import Base, ServiceType, PricingData, PriceResolution, Region
+from app.services.pricing_service import PricingService
+from app.services.region_service import RegionService, NATIONAL
+
+def _memory_session():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    return engine, sessionmaker(bind=engine)()
+
+def _seed(db):
+    """maling_vegg priced in Oslo and Bergen, flislegging only in Oslo"""
+    now = datetime.utcnow()
+    painting = ServiceType(name="maling_vegg", unit="m²")
+    tiling = ServiceType(name="flislegging", unit="m²")
+    db.add_all([painting, tiling])
+    db.flush()
+    for region, low, high in [("Oslo", 100, 200), ("Bergen", 90, 180)]:
+        db.add(PricingData(service_type_id=painting.id, region=region, min_price=low, max_price=high,
+                           source="test", confidence=0.9, last_updated=now))
+    db.add(PricingData(service_type_id=tiling.id, region="Oslo", min_price=1000, max_price=1400,
+                       source="test", confidence=0.9, last_updated=now))
+    db.commit()
+
+def test_postcode_lookup():
+    """Postcodes, addresses, names and aliases resolve in memory"""
+
+    print("🧪 Testing region resolver")
+    print("=" * 40)
+
+    engine, db = _memory_session()
+    summary = RegionService(db).load_regions()
+    resolver = RegionService(db).resolver()
+
+    assert summary["regions"] == db.query(Region).count() == 25
+    assert resolver.resolve("0150") == "03"
+    assert resolver.resolve("Storgata 1, 5003 Bergen") == "4601"
+    assert resolver.resolve("7010") == "5001"
+    assert resolver.resolve("9990") == "56"
+    assert resolver.resolve("bergen") == "4601"
+    assert resolver.resolve("Viken") == "32"
+    assert resolver.resolve("Atlantis") is None
+    # A named region wins over a postcode; an unmapped postcode falls back to the name
+    assert resolver.resolve("Oslo 2025") == "03"
+    assert resolver.resolve("Bergen 0000") == "4601"
+    assert resolver.resolve("Møre og Romsdal") == "15"
+    assert resolver.resolve("3201") == "39" and resolver.resolve("Bærum") == "3201"
+    assert resolver.chain("4601") == ["4601", "46", NATIONAL]
+
+    # Every 4-digit postcode except 0000 maps to a region
+    assert all(resolver.resolve(f"{postcode:04d}") for postcode in range(1, 10000))
+    print("✅ Every postcode resolves to a region")
+
+    db.close()
+
+def test_resolver_follows_catalog_version():
+    """Regions loaded elsewhere (another process) replace a resolver built before them"""
+    from app.services.estimate_cache import invalidate_catalog_version
+
+    engine, db = _memory_session()
+    assert RegionService(db).resolver().resolve("Bergen") is None
+
+    db.add_all([Region(code="NO", name="Norge", level="national"),
+                Region(code="4601", name="Bergen", level="municipality", parent_code="NO")])
+    db.commit()
+    # The catalog version TTL running out, as it would in the worker that didn't load them
+    invalidate_catalog_version()
+    assert RegionService(db).resolver().resolve("Bergen") == "4601"
+
+    db.close()
+
+def test_resolution_prefers_most_specific_rate():
+    """Own rate, then nearest ancestor, then index-adjusted national estimate"""
+
+    engine, db = _memory_session()
+    region_service = RegionService(db)
+    region_service.load_regions()
+    _seed(db)
+
+    result = PricingService(db).recalculate_market_rates()
+    regions = db.query(Region).count()
+    assert result["resolutions"] == 2 * regions == db.query(PriceResolution).count()
+
+    pricing_service = PricingService(db)
+    resolver = region_service.resolver()
+
+    bergen = pricing_service.get_service_price("maling_vegg", region="5003")["unit_price"]
+    assert bergen["resolved_from"] == "4601" and bergen["price_factor"] == 1.0
+    assert bergen["market_min"] == 90
+
+    # Askøy (5300) is in Vestland, which has no rate of its own - Bergen is a sibling, not
+    # an ancestor - so it gets the national estimate scaled by Vestland's index
+    vestland = pricing_service.get_service_price("maling_vegg", region="5300")["unit_price"]
+    assert vestland["resolved_from"] == "national_estimate"
+    national = (100 / resolver.price_index["03"] + 90 / resolver.price_index["4601"]) / 2
+    assert abs(vestland["market_min"] - national * resolver.price_index["46"]) < 1e-9
+
+    # Only Oslo has tiling: Trondheim gets the Oslo rate deflated to national and scaled up again
+    trondheim = pricing_service.get_service_price("flislegging", area=10, region="7010")
+    factor = resolver.price_index["5001"] / resolver.price_index["03"]
+    assert abs(trondheim["unit_price"]["market_min"] - 1000 * factor) < 1e-9
+    assert abs(trondheim["total_cost"]["min"] - 10000 * factor) < 1e-6
+    tiling_id = db.query(ServiceType).filter_by(name="flislegging").one().id
+    oslo = db.query(PriceResolution).filter_by(region_code="03", service_type_id=tiling_id).one()
+    assert trondheim["unit_price"]["confidence"] < oslo.confidence_score
+
+    # Unknown regions keep the old exact-match behaviour
+    assert "error" in pricing_service.get_service_price("maling_vegg", region="Atlantis")
+    assert pricing_service.get_service_price("finnes_ikke", region="0150") == {"error": "Service 'finnes_ikke' not found"}
+    print("✅ Rates resolve to the most specific region available")
+
+    db.close()
+
+def test_lookup_is_one_query():
+    """With the resolver cached, a priced lookup for any postcode is a single statement"""
+
+    engine, db = _memory_session()
+    RegionService(db).load_regions()
+    _seed(db)
+    pricing_service = PricingService(db)
+    pricing_service.recalculate_market_rates()
+    pricing_service.get_service_price("maling_vegg", region="0150")
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, stmt, *args: statements.append(stmt))
+    for postcode in ("0150", "4006", "9990"):
+        assert "error" not in pricing_service.get_service_price("maling_vegg", region=postcode)
+    print(f"3 lookups, {len(statements)} statements")
+
+    assert len(statements) == 3
+    db.close()
+
+if __name__ == "__main__":
+    test_postcode_lookup()
+    test_resolver_follows_catalog_version()
+    test_resolution_prefers_most_specific_rate()
+    test_lookup_is_one_query()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Test single-flight coalescing: concurrent identical LLM requests share one upstream call
+"""
+
+import asyncio
+
+from app.services.ai_query_analyzer import AIQueryAnalyzer
+from app.services.single_flight import SingleFlight, prompt_key, llm_single_flight
+
+async def _burst():
+    flight = SingleFlight()
+    calls = []
+
+    async def call(value):
+        calls.append(value)
+        await asyncio.sleep(0.05)
+        return {"value": value}
+
+    results = await asyncio.gather(*(flight.do("same", lambda: call(1)) for _ in range(50)),
+                                   flight.do("other", lambda: call(2)))
+    assert calls == [1, 2]
+    assert all(result == {"value": 1} for result in results[:50]) and results[50] == {"value": 2}
+    assert flight.stats()["upstream_calls"] == 2 and flight.stats()["coalesced_calls"] == 49
+    assert flight.in_flight() == 0
+
+    # Failures reach every waiter, and the next call starts fresh
+    async def failing():
+        calls.append("fail")
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream 500")
+    outcomes = await asyncio.gather(*(flight.do("bad", failing) for _ in range(5)), return_exceptions=True)
+    assert all(isinstance(outcome, RuntimeError) for outcome in outcomes) and calls.count("fail") == 1
+
+    # A cancelled waiter (hedge deadline) does not cancel the shared call for the others
+    leader = asyncio.ensure_future(flight.do("slow", lambda: call(3)))
+    follower = asyncio.ensure_future(flight.do("slow", lambda: call(3)))
+    await asyncio.sleep(0.01)
+    leader.cancel()
+    assert await follower == {"value": 3} and calls.count(3) == 1
+
+async def _analyzer_burst():
+    analyzer = AIQueryAnalyzer()
+    analyzer.api_key = "test-key"
+    upstream = []
+
+    async def post_chat(payload):
+        upstream.append(payload)
+        await asyncio.sleep(0.05)
+        return '{"type": "painting_specific"}'
+    analyzer._post_chat = post_chat
+
+    # The same widget example chip, sent by 30 users at once (spacing/case differ)
+    queries = ["Male stue 45 kvm", "male stue  45 kvm", " male stue 45 KVM"] * 10
+    results = await asyncio.gather(*(
+        analyzer._chat_completion("analysis", [{"role": "user", "content": query}], temperature=0.1, max_tokens=500)
+        for query in queries
+    ))
+    assert len(upstream) == 1 and set(results) == {'{"type": "painting_specific"}'}
+    print(f"{len(queries)} identical requests -> {len(upstream)} upstream call")
+
+def test_single_flight():
+    """Concurrent identical calls share one result, errors and all"""
+
+    print("🧪 Testing single-flight")
+    print("=" * 40)
+    asyncio.run(_burst())
+    assert prompt_key(messages=["Hei  der"]) == prompt_key(messages=["hei der "])
+    assert prompt_key(messages=["hei"], temperature=0.1) != prompt_key(messages=["hei"], temperature=0.3)
+    print("✅ Single-flight coalesces calls")
+
+def test_llm_burst_coalesced():
+    """A burst of identical analyzer prompts makes one OpenAI request"""
+
+    print("🧪 Testing coalesced LLM burst")
+    print("=" * 40)
+    llm_single_flight.clear_stats()
+    asyncio.run(_analyzer_burst())
+    assert llm_single_flight.stats()["coalesced_calls"] == 29
+    llm_single_flight.clear_stats()
+    print("✅ LLM burst coalesced")
+
+if __name__ == "__main__":
+    test_single_flight()
+    test_llm_burst_coalesced()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Test the SQL profiler: per-request statement counts from the sync and async engines,
+code path attribution, N+1 flagging and the debug response headers
+"""
+
+import asyncio
+import tempfile
+from pathlib import Path
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.models.partner import Base
+from app.services.session_memory_service import SessionMemoryService
+from app.services.sql_profiler import SQLProfiler, SQLProfilerMiddleware, normalize_statement
+
+def test_n_plus_one_attributed_to_code_path():
+    """A lookup repeated in a loop is flagged against the service method that issues it"""
+
+    print("🧪 Testing N+1 detection")
+    print("=" * 40)
+    assert normalize_statement("SELECT * FROM t WHERE id IN (?, ?, 7) AND name = 'x'") == \
+        "SELECT * FROM t WHERE id IN (...) AND name = ?"
+
+    profiler = SQLProfiler()
+    profiler.install()
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{Path(tmp) / 'profile.db'}")
+        try:
+            Base.metadata.create_all(bind=engine)
+            service = SessionMemoryService(db=Session(bind=engine))
+            profile, token = profiler.start_request()
+            for _ in range(6):
+                service.get_or_create_session("n-plus-one")
+            flagged = profiler.finish_request("POST /api/chat", profile, token)
+            service.close()
+        finally:
+            profiler.uninstall()
+            engine.dispose()
+
+    sites = {pattern["call_site"] for pattern in flagged}
+    assert "services/session_memory_service.py:get_or_create_session" in sites, sites
+    stats = profiler.stats()
+    assert stats["routes"]["POST /api/chat"]["statements_per_request"] == profile.statements >= 6
+    assert stats["routes"]["POST /api/chat"]["n_plus_one"] == len(flagged)
+    # create_all ran outside a request, so it only counts as background
+    assert stats["background"]["statements"] > 0
+    assert "services/session_memory_service.py:get_or_create_session" in {site["call_site"] for site in stats["call_sites"]}
+    print(f"✅ {len(flagged)} N+1 pattern(s) from {', '.join(sorted(sites))}")
+
+def test_middleware_headers_for_async_queries():
+    """Async engine statements land on the request and in the debug headers, per route template"""
+
+    print("🧪 Testing the profiling middleware")
+    print("=" * 40)
+    profiler = SQLProfiler()
+    profiler.install()
+
+    async def run():
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = create_async_engine(f"sqlite+aiosqlite:///{Path(tmp) / 'profile.db'}")
+            app = FastAPI()
+            app.add_middleware(SQLProfilerMiddleware, profiler=profiler, headers=True)
+
+            @app.get("/items/{item_id}")
+            async def item(item_id: int):
+                async with engine.connect() as conn:
+                    await conn.execute(text("SELECT 1"))
+                    await conn.execute(text("SELECT :id"), {"id": item_id})
+                return {"id": item_id}
+
+            try:
+                async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                    return [await client.get(f"/items/{item_id}") for item_id in (1, 2)]
+            finally:
+                await engine.dispose()
+
+    try:
+        responses = asyncio.run(run())
+    finally:
+        profiler.uninstall()
+
+    assert all(response.headers["x-sql-queries"] == "2" for response in responses)
+    assert float(responses[0].headers["x-sql-time-ms"]) > 0
+    assert responses[0].headers["x-sql-n-plus-one"] == "0"
+    route = profiler.stats()["routes"]["GET /items/{item_id}"]
+    assert route["requests"] == 2 and route["statements_per_request"] == 2
+    print("✅ Headers and per-route totals match")
+
+if __name__ == "__main__":
+    test_n_plus_one_attributed_to_code_path()
+    test_middleware_headers_for_async_queries()
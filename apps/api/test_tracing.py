@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test chat pipeline tracing: span trees across tasks, LLM usage and cache lookups on
+the turn, and the Prometheus exposition of the resulting histograms and counters
+"""
+
+import asyncio
+
+from app.services import metrics
+from app.services.tracing import (
+    InMemorySpanExporter, CHAT_SPAN, set_trace_attribute, record_llm_usage, record_cache_lookup
+)
+from app.services.tracing import tracer as app_tracer
+
+def test_span_tree_and_turn_attributes():
+    """Stages nest under the chat span, also from child tasks; usage and cache hits roll up"""
+
+    print("🧪 Testing span trees")
+    print("=" * 40)
+    exporter = InMemorySpanExporter()
+    app_tracer.add_exporter(exporter)
+
+    async def llm_call():
+        with app_tracer.span("llm.chat_completion", **{"gen_ai.request.model": "gpt-4o-mini"}):
+            await asyncio.sleep(0.01)
+            record_llm_usage("gpt-4o-mini", 600, 80)
+
+    async def turn():
+        with app_tracer.span(CHAT_SPAN, **{"chat.partner": "tracing-test"}) as root:
+            with app_tracer.span("agent.analysis"):
+                # Hedged analysis runs the LLM call in its own task
+                await asyncio.gather(asyncio.create_task(llm_call()), llm_call())
+                set_trace_attribute("chat.analysis_type", "painting_specific")
+            with app_tracer.span("agent.handler"):
+                record_cache_lookup("estimate", True)
+            root.set_attribute("chat.agent", "tracing_agent")
+        try:
+            with app_tracer.span("agent.handler"):
+                raise ValueError("boom")
+        except ValueError:
+            pass
+
+    before = metrics.llm_tokens.value(model="gpt-4o-mini", direction="input")
+    try:
+        asyncio.run(turn())
+    finally:
+        app_tracer.remove_exporter(exporter)
+
+    spans = {span.name: span for span in exporter.get_finished_spans()}
+    chat = spans[CHAT_SPAN]
+    llm_spans = [span for span in exporter.get_finished_spans() if span.name == "llm.chat_completion"]
+    assert len(llm_spans) == 2 and all(span.parent is spans["agent.analysis"] for span in llm_spans)
+    assert all(span.trace_id == chat.trace_id and len(span.trace_id) == 32 for span in llm_spans)
+    assert chat.attributes["chat.analysis_type"] == "painting_specific"
+    assert chat.attributes["chat.llm.input_tokens"] == 1200 and chat.attributes["cache.estimate.hit"] == 1
+    assert llm_spans[0].attributes["gen_ai.usage.output_tokens"] == 80 and llm_spans[0].duration > 0.005
+    failed = exporter.get_finished_spans()[-1]
+    assert failed.parent is None and failed.status == "ERROR" and failed.attributes["exception.type"] == "ValueError"
+    assert chat.to_dict()["parentSpanId"] == "" and spans["agent.analysis"].to_dict()["parentSpanId"] == chat.span_id
+
+    assert metrics.llm_tokens.value(model="gpt-4o-mini", direction="input") - before == 1200
+    assert metrics.chat_turn_seconds.count(agent="tracing_agent", analysis_type="painting_specific", partner="tracing-test") == 1
+    print("✅ One trace per turn, with usage and cache hits on the root")
+
+def test_prometheus_exposition():
+    """Cumulative buckets, escaped labels, capped series, served on /metrics"""
+
+    print("🧪 Testing the metrics exposition")
+    print("=" * 40)
+    histogram = metrics.Histogram("test_seconds", "Test latency", ("stage",), buckets=(0.1, 1.0), max_series=2)
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value, stage='say "hi"')
+    histogram.observe(0.2, stage="b")
+    histogram.observe(0.2, stage="c")  # over the series cap
+    lines = histogram.render()
+    assert 'test_seconds_bucket{stage="say \\"hi\\"",le="0.1"} 1' in lines
+    assert 'test_seconds_bucket{stage="say \\"hi\\"",le="1"} 2' in lines
+    assert 'test_seconds_bucket{stage="say \\"hi\\"",le="+Inf"} 3' in lines
+    assert 'test_seconds_count{stage="other"} 1' in lines and "# TYPE test_seconds histogram" in lines
+
+    from app.main import get_metrics
+    response = asyncio.run(get_metrics())
+    body = response.body.decode()
+    assert response.media_type.startswith("text/plain; version=0.0.4")
+    assert "# TYPE chat_turn_duration_seconds histogram" in body and "# TYPE cache_lookups_total counter" in body
+    print("✅ /metrics speaks the Prometheus text format")
+
+if __name__ == "__main__":
+    test_span_tree_and_turn_attributes()
+    test_prometheus_exposition()
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Test the OpenAI upstream guard: token buckets, concurrency cap, Retry-After backoff and
+the circuit breaker that sends requests straight to the local fallbacks
+"""
+
+import asyncio
+import time
+import openai
+from email.utils import format_datetime
+from datetime import datetime, timezone, timedelta
+
+import httpx
+
+from app.devtools.fake_llm import FakeLLMConfig, running_fake_llm
+from app.services.ai_query_analyzer import AIQueryAnalyzer
+from app.services.intelligent_ai_service import IntelligentAIService, openai_client
+from app.services.upstream_guard import (
+    UpstreamGuard, CircuitBreaker, TokenBucket, UpstreamError, CircuitOpenError, RateLimited,
+    parse_retry_after, upstream_guard, upstream_status, OPENAI_MAX_RETRIES
+)
+
+def _failing(statuses, calls, retry_after=None):
+    """send() that fails with the given statuses in turn, then succeeds"""
+    async def send():
+        calls.append(time.perf_counter())
+        if len(calls) <= len(statuses):
+            raise UpstreamError("boom", statuses[len(calls) - 1], retry_after)
+        return "ok"
+    return send
+
+async def _guarded():
+    # Short Retry-After: wait it out and retry
+    guard = UpstreamGuard("test", max_retry_wait=0.5)
+    calls = []
+    assert await guard.call(_failing([429], calls, retry_after=0.05)) == "ok"
+    assert len(calls) == 2 and calls[1] - calls[0] >= 0.045  # timers may fire a little early
+    assert guard.state()["retries"] == 1 and guard.breaker.state == "closed"
+
+    # Long Retry-After: don't wait, open the breaker for that long and fail fast
+    calls = []
+    try:
+        await guard.call(_failing([429], calls, retry_after=30))
+        raise AssertionError("long Retry-After should not be waited for")
+    except UpstreamError as e:
+        assert e.status == 429
+    assert guard.breaker.state == "open" and guard.state()["open_for_seconds"] > 25
+    started = time.perf_counter()
+    try:
+        await guard.call(_failing([], calls))
+        raise AssertionError("open breaker should reject")
+    except CircuitOpenError:
+        pass
+    assert len(calls) == 1 and time.perf_counter() - started < 0.01
+
+    # Repeated failures open it; after the reset timeout one probe closes it again
+    guard = UpstreamGuard("test", max_retries=0, breaker=CircuitBreaker(failure_threshold=3, reset_timeout=0.1))
+    for _ in range(3):
+        try:
+            await guard.call(_failing([503], []))
+        except UpstreamError:
+            pass
+    assert guard.breaker.state == "open"
+    await asyncio.sleep(0.12)
+    assert guard.breaker.state == "half_open"
+    assert await guard.call(_failing([], [])) == "ok"
+    assert guard.breaker.state == "closed" and guard.breaker.failures == 0
+
+    # A call let through while closed that ends without a verdict during half-open
+    # (cancelled) must not free the probe slot for a second probe
+    guard = UpstreamGuard("test", max_retries=0, breaker=CircuitBreaker(failure_threshold=1, reset_timeout=0.05))
+    release = asyncio.Event()
+    async def held():
+        await release.wait()
+        return "ok"
+    early = asyncio.create_task(guard.call(held))
+    await asyncio.sleep(0.01)
+    guard.breaker.record_failure()
+    await asyncio.sleep(0.06)
+    probe = asyncio.create_task(guard.call(held))
+    await asyncio.sleep(0.01)
+    early.cancel()
+    await asyncio.gather(early, return_exceptions=True)
+    try:
+        await asyncio.wait_for(guard.call(held), 0.1)
+        raise AssertionError("a second half-open probe was let through")
+    except CircuitOpenError:
+        pass
+    release.set()
+    assert await probe == "ok" and guard.breaker.state == "closed"
+
+    # Bad requests are not the upstream's fault
+    try:
+        await guard.call(_failing([400], []))
+    except UpstreamError as e:
+        assert not e.retryable
+    assert guard.breaker.failures == 0
+
+    # Concurrency cap
+    guard = UpstreamGuard("test", max_concurrency=2)
+    active, peak = [0], [0]
+    async def slow():
+        active[0] += 1
+        peak[0] = max(peak[0], active[0])
+        await asyncio.sleep(0.02)
+        active[0] -= 1
+        return "ok"
+    await asyncio.gather(*(guard.call(slow) for _ in range(6)))
+    assert peak[0] == 2
+
+    # RPM budget: a full minute's capacity, then a fail-fast instead of a long queue
+    guard = UpstreamGuard("test", rpm=60, max_queue_wait=0.1)
+    await asyncio.gather(*(guard.call(_failing([], [])) for _ in range(60)))
+    try:
+        await guard.call(_failing([], []))
+        raise AssertionError("rate budget should be exhausted")
+    except RateLimited:
+        pass
+
+def test_upstream_guard():
+    """Retry-After backoff, breaker transitions, concurrency cap and rate limits"""
+
+    print("🧪 Testing upstream guard")
+    print("=" * 40)
+    asyncio.run(_guarded())
+
+    bucket = TokenBucket(6000)  # 100 per second
+    assert bucket.reserve(6000, 0) == 0
+    assert abs(bucket.reserve(50, 1.0) - 0.5) < 0.05
+    assert bucket.reserve(1000, 1.0) is None
+
+    assert parse_retry_after("3") == 3.0 and parse_retry_after(None) is None
+    in_ten = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=10), usegmt=True)
+    assert 8 < parse_retry_after(in_ten) <= 10
+    print("✅ Upstream guard protects the LLM calls")
+
+def test_open_breaker_uses_local_fallback():
+    """With the breaker open the analyzer answers from the regex analysis without a request"""
+
+    print("🧪 Testing fallback on open breaker")
+    print("=" * 40)
+    guard = upstream_guard("gpt-4o-mini")
+    guard.breaker.record_failure(retry_after=30)
+    try:
+        analyzer = AIQueryAnalyzer()
+        analyzer.api_key = "test-key"
+        posted = []
+
+        async def post_chat(payload):
+            posted.append(payload)
+            return "{}"
+        analyzer._post_chat = post_chat
+
+        started = time.perf_counter()
+        analysis = asyncio.run(analyzer.analyze_with_followup("male stue 45 kvm"))
+        assert not posted and not analysis.get("fused") and analysis["area"] == 45.0
+        assert time.perf_counter() - started < 0.1
+
+        from app.main import health_check
+        health = asyncio.run(health_check())
+        assert health["status"] == "degraded"
+        assert health["upstream"]["gpt-4o-mini"]["breaker"] == "open"
+        assert upstream_status()["gpt-4o-mini"]["rejected"] >= 1
+    finally:
+        guard.breaker.record_success()
+    print("✅ Open breaker routes to the local fallback")
+
+def test_one_upstream_request_per_guarded_attempt():
+    """The SDK and httpx clients don't retry underneath the guard, and stalled calls time out"""
+
+    print("🧪 Testing upstream request counts")
+    print("=" * 40)
+    guard = upstream_guard("gpt-4o-mini")
+    guard.breaker.record_success()
+    config = FakeLLMConfig(error_rate=1.0, error_statuses=(503,), retry_after=None)
+    try:
+        with running_fake_llm(config) as base_url:
+            service = IntelligentAIService(base_url=base_url)
+            service.client = openai_client("fake-key", base_url)
+            analyzer = AIQueryAnalyzer(base_url=base_url)
+            analyzer.api_key = "fake-key"
+
+            calls = guard.state()["calls"]
+            followup = asyncio.run(service.generate_intelligent_followup("male huset", project_type="maling"))
+            analysis = asyncio.run(analyzer.analyze_with_followup("male stue 45 kvm"))
+            requests = httpx.get(base_url.replace("/v1", "/stats")).json()["requests"]
+        assert not followup["success"] and not analysis.get("fused")
+        assert requests == guard.state()["calls"] - calls == 2 * (1 + OPENAI_MAX_RETRIES), requests
+
+        # A stalled upstream fails after the client timeout, not the SDK's 10 minutes
+        with running_fake_llm(FakeLLMConfig(latency="fixed:2")) as base_url:
+            client = openai_client("fake-key", base_url, timeout=0.2)
+            started = time.perf_counter()
+            try:
+                client.chat.completions.create(model="gpt-4o-mini", messages=[{"role": "user", "content": "hei"}])
+                raise AssertionError("stalled request should time out")
+            except openai.APITimeoutError:
+                pass
+            assert time.perf_counter() - started < 1.5
+    finally:
+        guard.breaker.record_success()
+    print(f"✅ {requests} upstream requests for {requests} guarded attempts")
+
+if __name__ == "__main__":
+    test_upstream_guard()
+    test_open_breaker_uses_local_fallback()
+    test_one_upstream_request_per_guarded_attempt()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Train the local intent classifier from the logged conversation history (plus the
+hand-labelled seed queries) and write the artefact the API loads at startup
+"""
+
+import sys
+import time
+
+def train_intent_classifier(output: str = None):
+    """Train on conversation_messages / conversation_patterns and save the .npz artefact"""
+    try:
+        from app.database import SessionLocal, create_tables
+        from app.services.intent_classifier import (
+            IntentClassifier, training_examples, SEED_EXAMPLES, INTENT_MODEL_PATH
+        )
+
+        create_tables()
+        db = SessionLocal()
+        try:
+            logged = training_examples(db)
+        except Exception as e:
+            print(f"⚠️ Conversation history unavailable ({e}), training on seed queries only")
+            logged = []
+        finally:
+            db.close()
+
+        examples = SEED_EXAMPLES + logged
+        print(f"🧠 Training intent classifier on {len(examples)} queries ({len(logged)} from conversation history)...")
+        started = time.perf_counter()
+        classifier = IntentClassifier.train(examples)
+        path = output or INTENT_MODEL_PATH
+        classifier.save(path)
+
+        for head, (labels, _, _, temperature) in classifier.heads.items():
+            print(f"   {head}: {len(labels)} classes, temperature {temperature:.2f}")
+        print(f"✅ Saved {path} in {time.perf_counter() - started:.1f}s")
+        return True
+
+    except Exception as e:
+        print(f"❌ Training failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+if __name__ == "__main__":
+    output = sys.argv[1] if len(sys.argv) > 1 else None
+    sys.exit(0 if train_intent_classifier(output) else 1)
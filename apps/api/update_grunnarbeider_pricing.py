@@ -5,7 +5,7 @@ Update pricing database with comprehensive groundwork data from Oslo/Viken sprin
 
 from app.database import SessionLocal
 from app.services.pricing_service import PricingService
-from app.models.pricing import ServiceType, PricingData
+from app.services.price_catalog_service import PriceCatalogService, CATALOG_DIR
 
 def update_grunnarbeider_pricing():
     """Update with comprehensive groundwork pricing from Oslo/Viken 2025"""
@@ -17,192 +17,9 @@ def update_grunnarbeider_pricing():
         print("🏗️ Updating with groundwork pricing data (Oslo/Viken spring 2025)")
         print("=" * 70)
         
-        # Comprehensive groundwork data based on your research
-        grunnarbeider_data = [
-            # Basic excavation and earthwork
-            {
-                "service": "graving_generell_utgraving",
-                "description": "Graving – generell utgraving av tomt",
-                "unit": "m²",
-                "category": "graving",
-                "min_price": 1500,
-                "max_price": 3000,
-                "notes": "Standard utgraving av tomt, varierer med grunnforhold"
-            },
-            {
-                "service": "graving_ny_bolig_inkl_planering",
-                "description": "Graving for ny bolig/hytte (inkl. planering)",
-                "unit": "m²",
-                "category": "graving",
-                "min_price": 2500,
-                "max_price": 12000,
-                "notes": "Kompleks graving med planering, høy variasjon pga grunnforhold"
-            },
-            {
-                "service": "gravemaskin_med_forer",
-                "description": "Gravemaskin m/fører",
-                "unit": "time",
-                "category": "maskinleie",
-                "min_price": 1000,
-                "max_price": 2000,
-                "notes": "Timepris gravemaskin med operatør"
-            },
-            {
-                "service": "bortkjoring_masser",
-                "description": "Bortkjøring av masser",
-                "unit": "m³",
-                "category": "transport",
-                "min_price": 120,
-                "max_price": 180,
-                "notes": "1-1,5 kr/kg ≈ 120-180 kr/m³ jord"
-            },
-            
-            # Foundation and concrete work
-            {
-                "service": "grunnmur_betong_leca",
-                "description": "Grunnmur (betong/Leca)",
-                "unit": "m²",
-                "category": "grunnmur",
-                "min_price": 1500,
-                "max_price": 5000,
-                "notes": "Snitt ≈ 2500 kr/m² grunnflate"
-            },
-            {
-                "service": "plate_pa_mark",
-                "description": "Plate på mark (betongplate inkl. isolasjon & radonsperre)",
-                "unit": "m²",
-                "category": "betong",
-                "min_price": 1100,
-                "max_price": 2200,
-                "notes": "Komplett plate løsning med isolasjon"
-            },
-            {
-                "service": "drenering_rundt_grunnmur",
-                "description": "Drenering rundt grunnmur",
-                "unit": "lm",
-                "category": "drenering",
-                "min_price": 4500,
-                "max_price": 9000,
-                "notes": "Per løpemeter rundt bygning"
-            },
-            
-            # Rock blasting and removal
-            {
-                "service": "sprengning_fjell_store_volumer",
-                "description": "Sprengning av fjell (store volumer)",
-                "unit": "m³",
-                "category": "sprengning",
-                "min_price": 200,
-                "max_price": 300,
-                "notes": "Store volumer, effektiv sprengning"
-            },
-            {
-                "service": "sprengning_fjell_sma_kompliserte",
-                "description": "Sprengning av fjell (små/kompliserte jobber)",
-                "unit": "m³",
-                "category": "sprengning",
-                "min_price": 4000,
-                "max_price": 5000,
-                "notes": "Små/kompliserte jobber, høy enhetspris"
-            },
-            {
-                "service": "fjerning_sprengt_fjell",
-                "description": "Fjerning / bortkjøring sprengt fjell",
-                "unit": "m³",
-                "category": "transport",
-                "min_price": 100,
-                "max_price": 140,
-                "notes": "ca. 120 kr/m³ (opplasting + transport)"
-            },
-            
-            # Complementary services
-            {
-                "service": "radonsperre_i_plate",
-                "description": "Radonsperre i plate",
-                "unit": "m²",
-                "category": "isolasjon",
-                "min_price": 250,
-                "max_price": 350,
-                "notes": "Spesiell radonmembran under plate"
-            },
-            {
-                "service": "tele_frostsikring_under_sale",
-                "description": "Tele-/frostsikring under såle",
-                "unit": "m²",
-                "category": "isolasjon",
-                "min_price": 150,
-                "max_price": 300,
-                "notes": "Isolasjon mot teleløfting"
-            },
-            {
-                "service": "perimeter_isolasjon_grunnmur",
-                "description": "Perimeter-isolasjon grunnmur",
-                "unit": "lm",
-                "category": "isolasjon",
-                "min_price": 150,
-                "max_price": 250,
-                "notes": "Isolasjon langs grunnmur utvendig"
-            },
-            
-            # Package deals for common scenarios
-            {
-                "service": "komplett_grunnmur_pakke_120m2",
-                "description": "Komplett grunnmur 120m² (pakkeløsning)",
-                "unit": "pakke",
-                "category": "grunnmur_pakke",
-                "min_price": 280000,
-                "max_price": 420000,
-                "notes": "Graving + grunnmur + drenering for 120m² bolig"
-            },
-            {
-                "service": "komplett_plate_fundamentering_100m2",
-                "description": "Komplett plate fundamentering 100m² (pakkeløsning)",
-                "unit": "pakke",
-                "category": "betong_pakke",
-                "min_price": 180000,
-                "max_price": 300000,
-                "notes": "Graving + plate + isolasjon + radonsperre for 100m²"
-            }
-        ]
-        
-        print("📊 Adding comprehensive groundwork services and pricing:")
-        
-        # Add service types and pricing data
-        for data in grunnarbeider_data:
-            # Check if service type exists
-            service = db.query(ServiceType).filter(ServiceType.name == data["service"]).first()
-            if not service:
-                service = ServiceType(
-                    name=data["service"],
-                    description=data["description"],
-                    unit=data["unit"],
-                    category=data["category"]
-                )
-                db.add(service)
-                db.commit()
-                print(f"✅ Added service: {data['service']}")
-            
-            # Add pricing data
-            existing_pricing = db.query(PricingData).filter(
-                PricingData.service_type_id == service.id,
-                PricingData.source == "grunnarbeider_research_2025"
-            ).first()
-            
-            if not existing_pricing:
-                pricing_data = PricingData(
-                    service_type_id=service.id,
-                    min_price=data["min_price"],
-                    max_price=data["max_price"],
-                    avg_price=(data["min_price"] + data["max_price"]) / 2,
-                    region="Oslo",
-                    source="grunnarbeider_research_2025",
-                    confidence=0.90,  # High confidence from detailed market research
-                    notes=data["notes"]
-                )
-                db.add(pricing_data)
-                print(f"   💰 {data['min_price']:,.0f}-{data['max_price']:,.0f} NOK/{data['unit']} - {data['notes'][:50]}...")
-        
-        db.commit()
+        # Price sheet: catalog/grunnarbeider.yaml
+        result = PriceCatalogService(db).load_file(CATALOG_DIR / "grunnarbeider.yaml")
+        print(f"📊 Loaded {result['prices']} prices for {result['services']} services from {result['sheet']} ({result['seconds']:.3f}s)")
         
         # Update market rates
         pricing_service.update_market_rates("Oslo")
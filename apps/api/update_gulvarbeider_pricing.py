@@ -5,7 +5,7 @@ Update pricing database with comprehensive flooring data from Oslo/Viken spring
 
 from app.database import SessionLocal
 from app.services.pricing_service import PricingService
-from app.models.pricing import ServiceType, PricingData
+from app.services.price_catalog_service import PriceCatalogService, CATALOG_DIR
 
 def update_gulvarbeider_pricing():
     """Update with comprehensive flooring pricing from Oslo/Viken 2025"""
@@ -17,214 +17,9 @@ def update_gulvarbeider_pricing():
         print("🏠 Updating with flooring pricing data (Oslo/Viken spring 2025)")
         print("=" * 70)
         
-        # Comprehensive flooring data based on your research
-        gulvarbeider_data = [
-            # Parquet flooring
-            {
-                "service": "parkett_legging_rettmonster",
-                "description": "Legging av parkett (rettmønstret)",
-                "unit": "m²",
-                "category": "gulvlegging",
-                "min_price": 300,
-                "max_price": 500,
-                "notes": "Startpris 300 kr hos Ditt Tregulv; parkett generelt min. 400 kr på Mittanbud"
-            },
-            {
-                "service": "parkett_monstergulv_fiskebein",
-                "description": "Parkett – mønstergulv (fiskebein, stav)",
-                "unit": "m²",
-                "category": "gulvlegging",
-                "min_price": 800,
-                "max_price": 1000,
-                "notes": "≈ 900 kr veiledende pris fra Parketthuset (inkl. mva)"
-            },
-            
-            # Laminate flooring
-            {
-                "service": "laminat_legging_standard",
-                "description": "Legging av laminat",
-                "unit": "m²",
-                "category": "gulvlegging",
-                "min_price": 150,
-                "max_price": 400,
-                "notes": "Enkleste gulvtyper 150-200 kr; prisguide oppgir 100-500 kr"
-            },
-            
-            # Vinyl and specialty flooring
-            {
-                "service": "vinylgulv_vatrom_montering",
-                "description": "Vinylgulv (våtrom, inkl. montering)",
-                "unit": "m²",
-                "category": "gulvlegging",
-                "min_price": 700,
-                "max_price": 1200,
-                "notes": "Pris for GVK-sertifisert montør"
-            },
-            {
-                "service": "microsementgulv_komplett",
-                "description": "Microsementgulv",
-                "unit": "m²",
-                "category": "overflate",
-                "min_price": 1200,
-                "max_price": 1600,
-                "notes": "Komplett inkl. material og arbeid"
-            },
-            {
-                "service": "epoksygulv_bolig",
-                "description": "Epoksygulv (bolig)",
-                "unit": "m²",
-                "category": "overflate",
-                "min_price": 600,
-                "max_price": 900,
-                "notes": "Material 100-500 kr; ferdig lagt ca. 700 kr (m/avretting)"
-            },
-            
-            # Surface preparation and installation services
-            {
-                "service": "gulvavretting_flytsparkel",
-                "description": "Gulvavretting / flytsparkel",
-                "unit": "m²",
-                "category": "avretting",
-                "min_price": 300,
-                "max_price": 600,
-                "notes": "Selv-nivå 310 kr; 40 m²-eksempel ≈ 600 kr/m²"
-            },
-            {
-                "service": "varmekabler_installasjon_gulv",
-                "description": "Installasjon av varmekabler",
-                "unit": "m²",
-                "category": "varme",
-                "min_price": 900,
-                "max_price": 1250,
-                "notes": "Gjennomsnitt 2025-priser inkl. elektriker"
-            },
-            {
-                "service": "gulvsliping_etterbehandling",
-                "description": "Gulvsliping + etterbehandling",
-                "unit": "m²",
-                "category": "overflate",
-                "min_price": 250,
-                "max_price": 500,
-                "notes": "Prisguide 150-300 kr + behandling; bransjeeksempler 250-500 kr"
-            },
-            
-            # Demolition and preparation
-            {
-                "service": "riving_gammelt_gulv",
-                "description": "Riving/demontering av gammelt gulv",
-                "unit": "m²",
-                "category": "riving",
-                "min_price": 170,
-                "max_price": 200,
-                "notes": "Fjerning av parkett, tregulv el. tilsvarende"
-            },
-            {
-                "service": "betong_sand_screed",
-                "description": "Betong-/sand-screed (plate på gulv)",
-                "unit": "m²",
-                "category": "avretting",
-                "min_price": 520,
-                "max_price": 590,
-                "notes": "0-100 mm tykk sement-sand avretting"
-            },
-            {
-                "service": "isolering_undergulv_trinnlyd",
-                "description": "Isolering undergulv / trinnlyd",
-                "unit": "m²",
-                "category": "isolasjon",
-                "min_price": 550,
-                "max_price": 650,
-                "notes": "≈ 600 kr snitt fra Boligfiks prosjektdatabase"
-            },
-            
-            # Package deals for common scenarios
-            {
-                "service": "komplett_parkett_30m2_pakke",
-                "description": "Komplett parkett 30m² (inkl. avretting)",
-                "unit": "pakke",
-                "category": "gulv_pakke",
-                "min_price": 18000,
-                "max_price": 24000,
-                "notes": "Avretting + parkett + finish for 30m² rom"
-            },
-            {
-                "service": "komplett_laminat_50m2_pakke",
-                "description": "Komplett laminat 50m² (inkl. underlag)",
-                "unit": "pakke",
-                "category": "gulv_pakke",
-                "min_price": 12000,
-                "max_price": 18000,
-                "notes": "Riving + underlag + laminat for 50m² hus"
-            },
-            {
-                "service": "komplett_bad_vinylgulv_8m2",
-                "description": "Komplett bad vinylgulv 8m² (våtrom)",
-                "unit": "pakke",
-                "category": "gulv_pakke",
-                "min_price": 7000,
-                "max_price": 11000,
-                "notes": "Avretting + GVK-sertifisert vinyl for 8m² bad"
-            },
-            
-            # DIY alternatives for comparison
-            {
-                "service": "epoksygulv_diy_kit",
-                "description": "Epoksygulv (DIY-variant)",
-                "unit": "m²",
-                "category": "diy_gulv",
-                "min_price": 200,
-                "max_price": 400,
-                "notes": "DIY-kit for selvmontering, ekskl. arbeid"
-            },
-            {
-                "service": "microsement_diy_kit", 
-                "description": "Microsement (DIY-variant)",
-                "unit": "m²",
-                "category": "diy_gulv",
-                "min_price": 300,
-                "max_price": 500,
-                "notes": "DIY-kit for selvmontering, ekskl. arbeid"
-            }
-        ]
-        
-        print("📊 Adding comprehensive flooring services and pricing:")
-        
-        # Add service types and pricing data
-        for data in gulvarbeider_data:
-            # Check if service type exists
-            service = db.query(ServiceType).filter(ServiceType.name == data["service"]).first()
-            if not service:
-                service = ServiceType(
-                    name=data["service"],
-                    description=data["description"],
-                    unit=data["unit"],
-                    category=data["category"]
-                )
-                db.add(service)
-                db.commit()
-                print(f"✅ Added service: {data['service']}")
-            
-            # Add pricing data
-            existing_pricing = db.query(PricingData).filter(
-                PricingData.service_type_id == service.id,
-                PricingData.source == "gulvarbeider_research_2025"
-            ).first()
-            
-            if not existing_pricing:
-                pricing_data = PricingData(
-                    service_type_id=service.id,
-                    min_price=data["min_price"],
-                    max_price=data["max_price"],
-                    avg_price=(data["min_price"] + data["max_price"]) / 2,
-                    region="Oslo",
-                    source="gulvarbeider_research_2025",
-                    confidence=0.92,  # High confidence from detailed market research
-                    notes=data["notes"]
-                )
-                db.add(pricing_data)
-                print(f"   💰 {data['min_price']:,.0f}-{data['max_price']:,.0f} NOK/{data['unit']} - {data['notes'][:50]}...")
-        
-        db.commit()
+        # Price sheet: catalog/gulvarbeider.yaml
+        result = PriceCatalogService(db).load_file(CATALOG_DIR / "gulvarbeider.yaml")
+        print(f"📊 Loaded {result['prices']} prices for {result['services']} services from {result['sheet']} ({result['seconds']:.3f}s)")
         
         # Update market rates
         pricing_service.update_market_rates("Oslo")
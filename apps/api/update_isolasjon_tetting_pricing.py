@@ -5,7 +5,7 @@ Update pricing database with comprehensive isolasjon og tetting data from Oslo/V
 
 from app.database import SessionLocal
 from app.services.pricing_service import PricingService
-from app.models.pricing import ServiceType, PricingData
+from app.services.price_catalog_service import PriceCatalogService, CATALOG_DIR
 
 def update_isolasjon_tetting_pricing():
     """Update with comprehensive isolasjon og tetting pricing from Oslo/Viken 2025"""
@@ -17,218 +17,9 @@ def update_isolasjon_tetting_pricing():
         print("🏠 Updating with isolasjon og tetting pricing data (Oslo/Viken spring 2025)")
         print("=" * 75)
         
-        # Comprehensive isolasjon og tetting data based on your research
-        isolasjon_tetting_data = [
-            # Blown insulation
-            {
-                "service": "blaseisolasjon_loft_20cm",
-                "description": "Blåseisolasjon (loft) 20cm tykkelse",
-                "unit": "m²",
-                "category": "blaseisolasjon",
-                "min_price": 150,
-                "max_price": 200,
-                "notes": "Innblåsing av mineralull/trefiberisolasjon på kaldloft. 20cm eksempel: 15k for 100m² (150 kr/m²)"
-            },
-            {
-                "service": "blaseisolasjon_loft_30cm",
-                "description": "Blåseisolasjon (loft) 30cm tykkelse",
-                "unit": "m²",
-                "category": "blaseisolasjon",
-                "min_price": 225,
-                "max_price": 300,
-                "notes": "Tykkere lag øker prisen proporsjonalt. 30cm = 1.5x av 20cm pris"
-            },
-            {
-                "service": "blaseisolasjon_loft_40cm",
-                "description": "Blåseisolasjon (loft) 40cm tykkelse", 
-                "unit": "m²",
-                "category": "blaseisolasjon",
-                "min_price": 300,
-                "max_price": 400,
-                "notes": "Maksimal tykkelse for best energieffekt. 40cm = 2x av 20cm grunnpris"
-            },
-            
-            # Vapor barrier
-            {
-                "service": "dampsperre_montering",
-                "description": "Dampsperre (plast) - montering",
-                "unit": "m²",
-                "category": "dampsperre",
-                "min_price": 50,
-                "max_price": 100,
-                "notes": "Montering av PE-dampsperre på varm side av isolasjon. Krever nøyaktig utførelse og taping"
-            },
-            
-            # Thermal bridge breaking
-            {
-                "service": "kuldebrobrytere_balkong",
-                "description": "Kuldebrobrytere (termisk brudd balkong)",
-                "unit": "stk",
-                "category": "kuldebrobrytere",
-                "min_price": 5000,
-                "max_price": 15000,
-                "notes": "Isolerte balkongfester (Isokorb o.l.). Kostbare spesialelementer, pris avhenger av dimensjon"
-            },
-            {
-                "service": "kuldebrobrytere_sma_punkter",
-                "description": "Kuldebrobrytere (små punkter)",
-                "unit": "job",
-                "category": "kuldebrobrytere",
-                "min_price": 2000,
-                "max_price": 5000,
-                "notes": "Isolasjonsbrikker, ekspanderende skum i småpunkter. Beskjeden materialkostnad"
-            },
-            
-            # Wall insulation
-            {
-                "service": "vegg_isolasjon_10cm_innvendig",
-                "description": "Veggisolasjon 10cm innvendig",
-                "unit": "m²",
-                "category": "veggisolasjon",
-                "min_price": 400,
-                "max_price": 700,
-                "notes": "Innvendig isolasjon av yttervegger. Inkluderer dampsperre og ny gips"
-            },
-            {
-                "service": "vegg_isolasjon_15cm_innvendig",
-                "description": "Veggisolasjon 15cm innvendig",
-                "unit": "m²",
-                "category": "veggisolasjon",
-                "min_price": 500,
-                "max_price": 850,
-                "notes": "Tykkere isolasjon gir bedre energieffekt men tar mer innvendig plass"
-            },
-            
-            # Air sealing and draft proofing
-            {
-                "service": "lufttetting_generell",
-                "description": "Lufttetting generell (fuging vinduer/dører)",
-                "unit": "time",
-                "category": "lufttetting",
-                "min_price": 600,
-                "max_price": 800,
-                "notes": "Timepris for tetting av luftlekkasjer. Fuging rundt vinduer, dører, gjennomføringer"
-            },
-            {
-                "service": "lufttetting_komplett_hus",
-                "description": "Lufttetting komplett hus",
-                "unit": "job",
-                "category": "lufttetting",
-                "min_price": 15000,
-                "max_price": 35000,
-                "notes": "Komplett lufttetting av enebolig. Inkluderer blower door test og systematisk tetting"
-            },
-            
-            # Foundation insulation
-            {
-                "service": "grunnmur_isolasjon_utvendig",
-                "description": "Grunnmur isolasjon utvendig (perimeter)",
-                "unit": "m²",
-                "category": "grunnmur_isolasjon",
-                "min_price": 300,
-                "max_price": 500,
-                "notes": "Isolasjon av grunnmur utvendig. Krever graving og vanntetting"
-            },
-            {
-                "service": "kjeller_isolasjon_innvendig",
-                "description": "Kjeller isolasjon innvendig",
-                "unit": "m²",
-                "category": "kjeller_isolasjon",
-                "min_price": 250,
-                "max_price": 450,
-                "notes": "Innvendig isolasjon av kjellervegger. Enklere tilkomst enn utvendig"
-            },
-            
-            # Specialized insulation
-            {
-                "service": "lyddemping_vegg",
-                "description": "Lyddemping vegg (spesial isolasjon)",
-                "unit": "m²",
-                "category": "lydisolasjon",
-                "min_price": 400,
-                "max_price": 800,
-                "notes": "Spesial lydisolasjon mellom rom. Krever kvalitetsmaterialer og nøyaktig utførelse"
-            },
-            {
-                "service": "brannisolasjon",
-                "description": "Brannisolasjon (spesial)",
-                "unit": "m²",
-                "category": "brannisolasjon",
-                "min_price": 300,
-                "max_price": 600,
-                "notes": "Brannisolasjon rundt ildsted, skorstein eller andre varmekilder"
-            },
-            
-            # Package deals
-            {
-                "service": "komplett_loft_isolasjon_100m2",
-                "description": "Komplett loft isolasjon 100m² (pakkeløsning)",
-                "unit": "pakke",
-                "category": "isolasjon_pakke",
-                "min_price": 25000,
-                "max_price": 40000,
-                "notes": "Komplett løsning: blåseisolasjon 30cm + dampsperre + eventuell lufttetting"
-            },
-            {
-                "service": "komplett_energioppgradering_hus",
-                "description": "Komplett energioppgradering hus (pakkeløsning)",
-                "unit": "pakke",
-                "category": "energioppgradering",
-                "min_price": 150000,
-                "max_price": 300000,
-                "notes": "Total energioppgradering: loft, vegger, kjeller, lufttetting. Kvalifiserer for Enova-støtte"
-            },
-            
-            # Hourly rates for insulation work
-            {
-                "service": "isolator_timepris",
-                "description": "Isolatør timepris",
-                "unit": "time",
-                "category": "timearbeid",
-                "min_price": 550,
-                "max_price": 750,
-                "notes": "Spesialist på isolasjonsarbeid. Noe lavere enn tømrer/elektriker"
-            }
-        ]
-        
-        print("📊 Adding comprehensive isolasjon og tetting services and pricing:")
-        
-        # Add service types and pricing data
-        for data in isolasjon_tetting_data:
-            # Check if service type exists
-            service = db.query(ServiceType).filter(ServiceType.name == data["service"]).first()
-            if not service:
-                service = ServiceType(
-                    name=data["service"],
-                    description=data["description"],
-                    unit=data["unit"],
-                    category=data["category"]
-                )
-                db.add(service)
-                db.commit()
-                print(f"✅ Added service: {data['service']}")
-            
-            # Add pricing data
-            existing_pricing = db.query(PricingData).filter(
-                PricingData.service_type_id == service.id,
-                PricingData.source == "isolasjon_tetting_research_2025"
-            ).first()
-            
-            if not existing_pricing:
-                pricing_data = PricingData(
-                    service_type_id=service.id,
-                    min_price=data["min_price"],
-                    max_price=data["max_price"],
-                    avg_price=(data["min_price"] + data["max_price"]) / 2,
-                    region="Oslo",
-                    source="isolasjon_tetting_research_2025",
-                    confidence=0.89,  # High confidence from detailed market research
-                    notes=data["notes"]
-                )
-                db.add(pricing_data)
-                print(f"   💰 {data['min_price']:,.0f}-{data['max_price']:,.0f} NOK/{data['unit']} - {data['notes'][:50]}...")
-        
-        db.commit()
+        # Price sheet: catalog/isolasjon_tetting.yaml
+        result = PriceCatalogService(db).load_file(CATALOG_DIR / "isolasjon_tetting.yaml")
+        print(f"📊 Loaded {result['prices']} prices for {result['services']} services from {result['sheet']} ({result['seconds']:.3f}s)")
         
         # Update market rates
         pricing_service.update_market_rates("Oslo")
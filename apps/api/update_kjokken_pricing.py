@@ -5,7 +5,7 @@ Update pricing database with comprehensive kjøkken data from Oslo/Viken spring
 
 from app.database import SessionLocal
 from app.services.pricing_service import PricingService
-from app.models.pricing import ServiceType, PricingData
+from app.services.price_catalog_service import PriceCatalogService, CATALOG_DIR
 
 def update_kjokken_pricing():
     """Update with comprehensive kjøkken pricing from Oslo/Viken 2025"""
@@ -17,223 +17,9 @@ def update_kjokken_pricing():
         print("🍳 Updating with kjøkken pricing data (Oslo/Viken spring 2025)")
         print("=" * 65)
         
-        # Comprehensive kjøkken data based on your research
-        kjokken_data = [
-            # Demolition and installation
-            {
-                "service": "kjokken_riving_demontering",
-                "description": "Riving av gammelt kjøkken (demontering)",
-                "unit": "job",
-                "category": "kjokken_riving",
-                "min_price": 5000,
-                "max_price": 10000,
-                "notes": "Demontering av kjøkkeninnredning og bortkjøring. Typisk 1 dags jobb for to mann inkl. container"
-            },
-            {
-                "service": "kjokken_montering_nytt",
-                "description": "Montering av nytt kjøkken (skap og innredning)",
-                "unit": "job",
-                "category": "kjokken_montering",
-                "min_price": 15000,
-                "max_price": 35000,
-                "notes": "Fagmessig montering av kjøkkeninnredning. Mindre kjøkken 15-20k, stort kjøkken ca. 35k arbeid"
-            },
-            {
-                "service": "kjokken_montering_komplett_inkl_hvitevarer",
-                "description": "Komplett kjøkkenmontering inkl. hvitevarer",
-                "unit": "job",
-                "category": "kjokken_montering",
-                "min_price": 35000,
-                "max_price": 70000,
-                "notes": "Montering av kjøkken + tilkobling av hvitevarer. Fastpris ~50k nevnt for komplette kjøkken"
-            },
-            
-            # Countertops
-            {
-                "service": "benkeplate_laminat",
-                "description": "Benkeplate - laminat (rimelig)",
-                "unit": "lm",
-                "category": "benkeplate",
-                "min_price": 500,
-                "max_price": 1000,
-                "notes": "Laminatbenkplate på mål og montert. Materiale fra ~200 kr/m + skjæring/montering = 500-1000 kr/m"
-            },
-            {
-                "service": "benkeplate_kompaktlaminat",
-                "description": "Benkeplate - kompaktlaminat (premium laminat)",
-                "unit": "lm",
-                "category": "benkeplate",
-                "min_price": 1500,
-                "max_price": 2500,
-                "notes": "Hard høytrykkslaminat/kompaktlaminat. Materiale fra ~2000 kr/m + bearbeiding"
-            },
-            {
-                "service": "benkeplate_stein_kompositt",
-                "description": "Benkeplate - stein/kompositt (premium)",
-                "unit": "lm",
-                "category": "benkeplate",
-                "min_price": 3000,
-                "max_price": 6000,
-                "notes": "Granitt ~3k/m, kvarts ~4k/m, keramikk opp til 6k/m. Inkluderer bearbeiding og montering"
-            },
-            
-            # Kitchen types and packages
-            {
-                "service": "kjokken_ikea_komplett",
-                "description": "IKEA kjøkken komplett (skap + hvitevarer)",
-                "unit": "job",
-                "category": "kjokken_pakke",
-                "min_price": 80000,
-                "max_price": 120000,
-                "notes": "IKEA-kjøkken inkl. hvitevarer. Typisk 80-100k i innkjøp, opp mot 120k for større løsninger"
-            },
-            {
-                "service": "kjokken_midt_segment",
-                "description": "Kjøkken midt-segment (Sigdal, HTH e.l.)",
-                "unit": "job",
-                "category": "kjokken_pakke",
-                "min_price": 150000,
-                "max_price": 250000,
-                "notes": "Midtsegment kjøkkenløsninger. Bedre kvalitet enn IKEA, men ikke skreddersydd"
-            },
-            {
-                "service": "kjokken_skreddersydd_snekker",
-                "description": "Kjøkken skreddersydd/snekker",
-                "unit": "job",
-                "category": "kjokken_pakke",
-                "min_price": 200000,
-                "max_price": 500000,
-                "notes": "Skreddersydd løsning fra snekker. Høy kvalitet, unike løsninger. Stort prissspenn"
-            },
-            
-            # Additional services
-            {
-                "service": "kjokken_elektriker_arbeid",
-                "description": "Elektriker arbeid kjøkken (omlegging kurser)",
-                "unit": "job",
-                "category": "kjokken_elektrisk",
-                "min_price": 8000,
-                "max_price": 15000,
-                "notes": "Omlegging av elektriske kurser for nytt kjøkken. Typisk 8-15k avhengig av kompleksitet"
-            },
-            {
-                "service": "kjokken_rorlegger_arbeid",
-                "description": "Rørlegger arbeid kjøkken (vann/avløp)",
-                "unit": "job",
-                "category": "kjokken_ror",
-                "min_price": 8000,
-                "max_price": 15000,
-                "notes": "Omlegging av vann/avløp for nytt kjøkken. Typisk 8-15k hver for rørlegger og elektriker"
-            },
-            {
-                "service": "kjokken_flislegging_sprøytesone",
-                "description": "Flislegging sprøytesone kjøkken",
-                "unit": "m²",
-                "category": "kjokken_fliser",
-                "min_price": 800,
-                "max_price": 1200,
-                "notes": "Flislegging bak benk og komfyr. Pris per m² inklusive materialer og arbeid"
-            },
-            
-            # Appliances (hvitevarer)
-            {
-                "service": "hvitevarer_basic_pakke",
-                "description": "Hvitevarer basic pakke (komfyr, kjøleskap, oppvaskmaskin)",
-                "unit": "pakke",
-                "category": "hvitevarer",
-                "min_price": 25000,
-                "max_price": 45000,
-                "notes": "Grunnleggende hvitevarer. Komfyr, kjøleskap, oppvaskmaskin i rimelig kvalitet"
-            },
-            {
-                "service": "hvitevarer_premium_pakke",
-                "description": "Hvitevarer premium pakke (innbygging, kvalitetsmerker)",
-                "unit": "pakke",
-                "category": "hvitevarer",
-                "min_price": 60000,
-                "max_price": 120000,
-                "notes": "Premium hvitevarer med innbygging. Siemens, Miele, ASKO etc. Stor prisvariation"
-            },
-            
-            # Specialized kitchen work
-            {
-                "service": "kjokkenoy_montering",
-                "description": "Kjøkkenøy montering",
-                "unit": "stk",
-                "category": "kjokkenoy",
-                "min_price": 15000,
-                "max_price": 40000,
-                "notes": "Kjøkkenøy med skap og benkeplate. Pris avhenger av størrelse og utstyr"
-            },
-            {
-                "service": "vinskap_montering",
-                "description": "Vinskap/spesialskap montering",
-                "unit": "stk",
-                "category": "spesialskap",
-                "min_price": 8000,
-                "max_price": 20000,
-                "notes": "Innebygd vinskap eller andre spesialskap. Høy-ende tilbehør for kjøkken"
-            },
-            
-            # Complete kitchen renovation packages
-            {
-                "service": "komplett_kjokken_renovering_enkel",
-                "description": "Komplett kjøkken renovering (enkel)",
-                "unit": "pakke",
-                "category": "kjokken_komplett",
-                "min_price": 150000,
-                "max_price": 250000,
-                "notes": "Alt fra riving til ferdig. IKEA-nivå + elektriker/rørlegger + montering. ~75k minimum nevnt"
-            },
-            {
-                "service": "komplett_kjokken_renovering_premium",
-                "description": "Komplett kjøkken renovering (premium)",
-                "unit": "pakke",
-                "category": "kjokken_komplett",
-                "min_price": 300000,
-                "max_price": 600000,
-                "notes": "Total fornyelse med premium materialer og skreddersøm. 200-300k+ kan forventes"
-            }
-        ]
-        
-        print("📊 Adding comprehensive kjøkken services and pricing:")
-        
-        # Add service types and pricing data
-        for data in kjokken_data:
-            # Check if service type exists
-            service = db.query(ServiceType).filter(ServiceType.name == data["service"]).first()
-            if not service:
-                service = ServiceType(
-                    name=data["service"],
-                    description=data["description"],
-                    unit=data["unit"],
-                    category=data["category"]
-                )
-                db.add(service)
-                db.commit()
-                print(f"✅ Added service: {data['service']}")
-            
-            # Add pricing data
-            existing_pricing = db.query(PricingData).filter(
-                PricingData.service_type_id == service.id,
-                PricingData.source == "kjokken_research_2025"
-            ).first()
-            
-            if not existing_pricing:
-                pricing_data = PricingData(
-                    service_type_id=service.id,
-                    min_price=data["min_price"],
-                    max_price=data["max_price"],
-                    avg_price=(data["min_price"] + data["max_price"]) / 2,
-                    region="Oslo",
-                    source="kjokken_research_2025",
-                    confidence=0.94,  # Very high confidence from detailed market research
-                    notes=data["notes"]
-                )
-                db.add(pricing_data)
-                print(f"   💰 {data['min_price']:,.0f}-{data['max_price']:,.0f} NOK/{data['unit']} - {data['notes'][:50]}...")
-        
-        db.commit()
+        # Price sheet: catalog/kjokken.yaml
+        result = PriceCatalogService(db).load_file(CATALOG_DIR / "kjokken.yaml")
+        print(f"📊 Loaded {result['prices']} prices for {result['services']} services from {result['sheet']} ({result['seconds']:.3f}s)")
         
         # Update market rates
         pricing_service.update_market_rates("Oslo")
@@ -5,7 +5,7 @@ Update pricing database with real market data from competitors
 
 from app.database import SessionLocal
 from app.services.pricing_service import PricingService
-from app.models.pricing import ServiceType, PricingData
+from app.services.price_catalog_service import PriceCatalogService, CATALOG_DIR
 
 def update_market_pricing():
     """Update with real market pricing from competitors"""
@@ -17,101 +17,9 @@ def update_market_pricing():
         print("🔄 Updating pricing database with real market data...")
         print("=" * 50)
         
-        # Market pricing from competitor analysis
-        market_updates = [
-            # Combo services (most common)
-            {
-                "service": "skjotesparkling_og_maling",
-                "description": "Skjøtesparkling og maling av gipsvegger (nybygd hus)",
-                "unit": "m²",
-                "category": "kombinert",
-                "min_price": 200,
-                "max_price": 250,
-                "source": "market_competitor_analysis"
-            },
-            {
-                "service": "helsparkling_og_maling", 
-                "description": "Helsparkling og maling av gipsvegger (nybygd hus)",
-                "unit": "m²",
-                "category": "kombinert",
-                "min_price": 250,
-                "max_price": 300,
-                "source": "market_competitor_analysis"
-            },
-            {
-                "service": "maling_panel",
-                "description": "Maling av veggpanel/takpanel",
-                "unit": "m²", 
-                "category": "overflatebehandling",
-                "min_price": 120,
-                "max_price": 180,
-                "source": "market_competitor_analysis"
-            },
-            
-            # Room-based pricing examples
-            {
-                "service": "rom_maling_en_farge",
-                "description": "Male rom vegger og tak samme farge (opp til 7m² gulv)",
-                "unit": "rom",
-                "category": "rom_basert",
-                "min_price": 6000,
-                "max_price": 8000,
-                "source": "market_competitor_analysis"
-            },
-            {
-                "service": "rom_maling_to_farger",
-                "description": "Male rom vegger og tak forskjellige farger (opp til 7m² gulv)",
-                "unit": "rom",
-                "category": "rom_basert", 
-                "min_price": 8000,
-                "max_price": 10000,
-                "source": "market_competitor_analysis"
-            },
-            {
-                "service": "rom_sparkling_og_maling",
-                "description": "Sparkling (skjøter) og maling av rom (opp til 7m² gulv)",
-                "unit": "rom",
-                "category": "rom_basert",
-                "min_price": 16000,
-                "max_price": 20000,
-                "source": "market_competitor_analysis"
-            }
-        ]
-        
-        # Add new service types if they don't exist
-        for update in market_updates:
-            service = db.query(ServiceType).filter(ServiceType.name == update["service"]).first()
-            if not service:
-                service = ServiceType(
-                    name=update["service"],
-                    description=update["description"],
-                    unit=update["unit"],
-                    category=update["category"]
-                )
-                db.add(service)
-                db.commit()
-                print(f"✅ Added new service type: {update['service']}")
-            
-            # Add pricing data
-            existing_pricing = db.query(PricingData).filter(
-                PricingData.service_type_id == service.id,
-                PricingData.source == update["source"]
-            ).first()
-            
-            if not existing_pricing:
-                pricing_data = PricingData(
-                    service_type_id=service.id,
-                    min_price=update["min_price"],
-                    max_price=update["max_price"],
-                    avg_price=(update["min_price"] + update["max_price"]) / 2,
-                    region="Oslo",
-                    source=update["source"],
-                    confidence=0.9  # High confidence from competitor analysis
-                )
-                db.add(pricing_data)
-                print(f"✅ Added pricing for {update['service']}: {update['min_price']}-{update['max_price']} NOK/{update['unit']}")
-        
-        db.commit()
+        # Price sheet: catalog/market.yaml
+        result = PriceCatalogService(db).load_file(CATALOG_DIR / "market.yaml")
+        print(f"📊 Loaded {result['prices']} prices for {result['services']} services from {result['sheet']} ({result['seconds']:.3f}s)")
         
         # Update market rates
         pricing_service.update_market_rates("Oslo")
@@ -5,7 +5,7 @@ Update pricing database with comprehensive tak og ytterkledning data from Oslo/V
 
 from app.database import SessionLocal
 from app.services.pricing_service import PricingService
-from app.models.pricing import ServiceType, PricingData
+from app.services.price_catalog_service import PriceCatalogService, CATALOG_DIR
 
 def update_tak_ytterkledning_pricing():
     """Update with comprehensive tak og ytterkledning pricing from Oslo/Viken 2025"""
@@ -17,207 +17,9 @@ def update_tak_ytterkledning_pricing():
         print("🏠 Updating with tak og ytterkledning pricing data (Oslo/Viken spring 2025)")
         print("=" * 75)
         
-        # Comprehensive tak og ytterkledning data based on your research
-        tak_ytterkledning_data = [
-            # Roof work
-            {
-                "service": "takomlegging_nytt_tak_komplett",
-                "description": "Takomlegging (nytt tak) inkl. tekking og beslag",
-                "unit": "m²",
-                "category": "tak",
-                "min_price": 1360,
-                "max_price": 2800,
-                "notes": "Komplett omlegging av yttertak inkl. riving, undertak, tekking, lekter, takrenner. Snitt ~2300 kr/m²"
-            },
-            {
-                "service": "takrenner_nedlop_nye",
-                "description": "Takrenner og nedløp (nye)",
-                "unit": "lm",
-                "category": "takrenner",
-                "min_price": 200,
-                "max_price": 500,
-                "notes": "Plast i nedre prissjikt (~200 kr/m), metall som sink/stål mot øvre sjikt (~400-500 kr/m)"
-            },
-            
-            # External insulation and cladding
-            {
-                "service": "etterisolering_utvendig_ny_kledning",
-                "description": "Etterisolering utvendig (vegg) inkl. ny kledning",
-                "unit": "m²",
-                "category": "etterisolering",
-                "min_price": 1600,
-                "max_price": 3200,
-                "notes": "Utvendig etterisolering med bytte av kledning. Typisk 2000-4000 kr/m² inkl. mva (1600-3200 eks. mva)"
-            },
-            {
-                "service": "utvendig_kledning_trepanel_utskifting",
-                "description": "Utvendig kledning (trepanel) - utskifting",
-                "unit": "m²",
-                "category": "kledning",
-                "min_price": 1200,
-                "max_price": 2800,
-                "notes": "Fjerning og ny kledning på vegg. Typisk 1500-3500 kr/m² inkl. mva for trepanel, snitt ~2000 kr/m²"
-            },
-            
-            # Roof materials by type
-            {
-                "service": "takstein_legging",
-                "description": "Takstein legging (betong/tegl)",
-                "unit": "m²",
-                "category": "taklegging",
-                "min_price": 400,
-                "max_price": 800,
-                "notes": "Kun legging av takstein. Betongtakstein rimeligere enn tegl. Komplekse takformer øker prisen"
-            },
-            {
-                "service": "takshingel_papp_legging",
-                "description": "Takshingel/papp legging",
-                "unit": "m²",
-                "category": "taklegging", 
-                "min_price": 200,
-                "max_price": 400,
-                "notes": "Rimeligste takmateriale. Inkluderer undertak og legging. Kortere levetid enn takstein"
-            },
-            {
-                "service": "skifer_legging_premium",
-                "description": "Skifer legging (premium)",
-                "unit": "m²",
-                "category": "taklegging",
-                "min_price": 800,
-                "max_price": 1500,
-                "notes": "Naturskifer eller skiferlook. Dyreste takløsning, men svært lang levetid og estetikk"
-            },
-            
-            # Insulation work
-            {
-                "service": "isolasjon_5_10cm_utvendig",
-                "description": "Isolasjon 5-10cm utvendig",
-                "unit": "m²",
-                "category": "isolasjon",
-                "min_price": 300,
-                "max_price": 600,
-                "notes": "5-10 cm isolasjon med vindsperre og lekter. Del av etterisolering, men kan prises separat"
-            },
-            {
-                "service": "vindsperre_montering",
-                "description": "Vindsperre montering",
-                "unit": "m²",
-                "category": "isolasjon",
-                "min_price": 50,
-                "max_price": 100,
-                "notes": "Montering av vindsperre/vindtett membran på yttervegger"
-            },
-            
-            # Scaffolding and access
-            {
-                "service": "stillas_utleie_takarbeid",
-                "description": "Stillas utleie for takarbeid",
-                "unit": "m²",
-                "category": "stillas",
-                "min_price": 150,
-                "max_price": 300,
-                "notes": "Stillas for takarbeider. Pris per m² takflate per måned. Høyde og kompleksitet påvirker pris"
-            },
-            
-            # Cladding types
-            {
-                "service": "kledning_gran_furu_standard",
-                "description": "Kledning gran/furu standard",
-                "unit": "m²",
-                "category": "kledning",
-                "min_price": 800,
-                "max_price": 1500,
-                "notes": "Standard trekledning i gran/furu. Rimeligste alternativ. Krever regelmessig vedlikehold"
-            },
-            {
-                "service": "kledning_eksklusive_tresorter",
-                "description": "Kledning eksklusive tresorter (eik, seder)",
-                "unit": "m²",
-                "category": "kledning",
-                "min_price": 2500,
-                "max_price": 3500,
-                "notes": "Eik, sedertre, eller andre eksklusive tresorter. Lang levetid, minimal vedlikehold"
-            },
-            
-            # Package deals
-            {
-                "service": "komplett_tak_120m2_pakke",
-                "description": "Komplett tak 120m² (pakkeløsning)",
-                "unit": "pakke",
-                "category": "tak_pakke",
-                "min_price": 200000,
-                "max_price": 350000,
-                "notes": "Komplett takomlegging for typisk enebolig. Inkluderer riving, undertak, tekking, renner"
-            },
-            {
-                "service": "komplett_etterisolering_100m2_pakke",
-                "description": "Komplett etterisolering 100m² vegg (pakkeløsning)",
-                "unit": "pakke",
-                "category": "isolering_pakke",
-                "min_price": 180000,
-                "max_price": 320000,
-                "notes": "Komplett etterisolering av yttervegger inkl. ny kledning for 100m² veggflate"
-            },
-            
-            # Specialized roof work
-            {
-                "service": "takvindu_velux_montering",
-                "description": "Takvindu (Velux) montering",
-                "unit": "stk",
-                "category": "takvindu",
-                "min_price": 15000,
-                "max_price": 35000,
-                "notes": "Takvindu inkl. montering. Standard Velux 20-50k inkl. montering. Størrelse og type påvirker pris"
-            },
-            {
-                "service": "takovergang_gesims_arbeid",
-                "description": "Takovergang/gesims arbeid",
-                "unit": "lm",
-                "category": "takdetaljer",
-                "min_price": 300,
-                "max_price": 600,
-                "notes": "Spesialarbeid på takovergang, gesims og vindskier. Krever høy presisjon"
-            }
-        ]
-        
-        print("📊 Adding comprehensive tak og ytterkledning services and pricing:")
-        
-        # Add service types and pricing data
-        for data in tak_ytterkledning_data:
-            # Check if service type exists
-            service = db.query(ServiceType).filter(ServiceType.name == data["service"]).first()
-            if not service:
-                service = ServiceType(
-                    name=data["service"],
-                    description=data["description"],
-                    unit=data["unit"],
-                    category=data["category"]
-                )
-                db.add(service)
-                db.commit()
-                print(f"✅ Added service: {data['service']}")
-            
-            # Add pricing data
-            existing_pricing = db.query(PricingData).filter(
-                PricingData.service_type_id == service.id,
-                PricingData.source == "tak_ytterkledning_research_2025"
-            ).first()
-            
-            if not existing_pricing:
-                pricing_data = PricingData(
-                    service_type_id=service.id,
-                    min_price=data["min_price"],
-                    max_price=data["max_price"],
-                    avg_price=(data["min_price"] + data["max_price"]) / 2,
-                    region="Oslo",
-                    source="tak_ytterkledning_research_2025",
-                    confidence=0.91,  # High confidence from detailed market research
-                    notes=data["notes"]
-                )
-                db.add(pricing_data)
-                print(f"   💰 {data['min_price']:,.0f}-{data['max_price']:,.0f} NOK/{data['unit']} - {data['notes'][:50]}...")
-        
-        db.commit()
+        # Price sheet: catalog/tak_ytterkledning.yaml
+        result = PriceCatalogService(db).load_file(CATALOG_DIR / "tak_ytterkledning.yaml")
+        print(f"📊 Loaded {result['prices']} prices for {result['services']} services from {result['sheet']} ({result['seconds']:.3f}s)")
         
         # Update market rates
         pricing_service.update_market_rates("Oslo")
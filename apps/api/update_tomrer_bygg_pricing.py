@@ -5,7 +5,7 @@ Update pricing database with comprehensive tømrer/bygg data from Oslo/Viken spr
 
 from app.database import SessionLocal
 from app.services.pricing_service import PricingService
-from app.models.pricing import ServiceType, PricingData
+from app.services.price_catalog_service import PriceCatalogService, CATALOG_DIR
 
 def update_tomrer_bygg_pricing():
     """Update with comprehensive tømrer/bygg pricing from Oslo/Viken 2025"""
@@ -17,184 +17,9 @@ def update_tomrer_bygg_pricing():
         print("🔨 Updating with tømrer/bygg pricing data (Oslo/Viken spring 2025)")
         print("=" * 70)
         
-        # Comprehensive tømrer/bygg data based on your research
-        tomrer_bygg_data = [
-            # Lettvegg and partition walls
-            {
-                "service": "lettvegg_skillevegg_med_dor",
-                "description": "Lett skillevegg inkl. isolasjon og dør",
-                "unit": "m²",
-                "category": "lettvegg",
-                "min_price": 3000,
-                "max_price": 5000,
-                "notes": "Pris inkl. materialer (stendere, gipsplater, isolasjon) og arbeid. 30-50k for typisk lettvegg med dør"
-            },
-            
-            # Ceiling work
-            {
-                "service": "nedforet_himling_gips",
-                "description": "Nedforet himling (gips)",
-                "unit": "m²",
-                "category": "himling",
-                "min_price": 500,
-                "max_price": 900,
-                "notes": "Montering av nedforet tak med gips. Sparkling og maling kommer i tillegg. Komplekse vinkler øker prisen"
-            },
-            
-            # Door installation
-            {
-                "service": "innerdor_montering",
-                "description": "Innsetting av innerdør (montering i ferdig veggåpning)",
-                "unit": "stk",
-                "category": "dor_montering",
-                "min_price": 500,
-                "max_price": 1500,
-                "notes": "Kun arbeidskostnad for å montere innerdør (1-2 timers jobb). Dørblad/karm kostnader kommer i tillegg"
-            },
-            {
-                "service": "innerdor_komplett",
-                "description": "Innerdør (standard) komplett",
-                "unit": "stk",
-                "category": "dor_komplett",
-                "min_price": 2000,
-                "max_price": 4000,
-                "notes": "Dørblad med karm 1000-2000 kr + montering 500-1500 kr. Standard hvit fyllingsdør ferdig montert"
-            },
-            
-            # Window trim and molding
-            {
-                "service": "vindusforinger_lister",
-                "description": "Vindusforinger og lister (innvendig karm/gerikt)",
-                "unit": "stk",
-                "category": "vindusarbeid",
-                "min_price": 1500,
-                "max_price": 3000,
-                "notes": "Komplett foring av vindu innvendig med karmlister. Inkluderer materialer og arbeid"
-            },
-            
-            # Structural changes
-            {
-                "service": "barende_konstruksjon_endring",
-                "description": "Endring av bærende konstruksjon (utsparing i bærende vegg)",
-                "unit": "job",
-                "category": "konstruksjon",
-                "min_price": 50000,
-                "max_price": 150000,
-                "notes": "Innebærer beregning og montering av drager/stålbjelke. Krever statiker og søknad. Pris øker med spennvidde"
-            },
-            
-            # General carpentry hourly rate
-            {
-                "service": "tomrer_timepris",
-                "description": "Tømrer timepris",
-                "unit": "time",
-                "category": "timearbeid",
-                "min_price": 600,
-                "max_price": 850,
-                "notes": "Standard timepris for tømrerarbeid. Spesialiserte oppgaver eller Oslo sentrum kan være høyere"
-            },
-            
-            # Gypsum board installation
-            {
-                "service": "gipsplater_montering_vegger",
-                "description": "Montering av gipsplater (vegger)",
-                "unit": "m²",
-                "category": "gipsarbeid",
-                "min_price": 500,
-                "max_price": 700,
-                "notes": "Oppsetting av gips på vegg inkl. stender/lekt hvis nødvendig. Materialer inkludert"
-            },
-            
-            # Molding and trim work
-            {
-                "service": "listverk_gulv_tak",
-                "description": "Listverk (montering) - gulv-/taklister",
-                "unit": "lm",
-                "category": "listverk",
-                "min_price": 60,
-                "max_price": 100,
-                "notes": "Utskifting eller ny montering av lister. Enkle glatte lister ca. 60-80 kr/m, kompleks hjørneskjæring øker prisen"
-            },
-            
-            # Package deals for typical projects
-            {
-                "service": "komplett_lettvegg_4m_med_dor",
-                "description": "Komplett lettvegg 4m med dør (pakkeløsning)",
-                "unit": "pakke",
-                "category": "lettvegg_pakke",
-                "min_price": 25000,
-                "max_price": 40000,
-                "notes": "4 meter lettvegg (2.5m høy) med standard innerdør, inkl. alle materialer og arbeid"
-            },
-            {
-                "service": "komplett_himling_25m2",
-                "description": "Komplett nedforet himling 25m² (pakkeløsning)",
-                "unit": "pakke",
-                "category": "himling_pakke",
-                "min_price": 18000,
-                "max_price": 28000,
-                "notes": "Nedforet himling med gips for 25m² rom, inkl. sparkling men ekskl. maling"
-            },
-            
-            # Specialized carpentry work
-            {
-                "service": "tregulv_montering",
-                "description": "Tregulv montering (massivtre)",
-                "unit": "m²",
-                "category": "gulvarbeid",
-                "min_price": 300,
-                "max_price": 600,
-                "notes": "Montering av massivt tregulv. Pris for arbeid, materialer kommer i tillegg. Komplekse mønstre øker prisen"
-            },
-            {
-                "service": "innredning_skreddersydd",
-                "description": "Innredning skreddersydd (bokhyller, skap)",
-                "unit": "lm",
-                "category": "innredning",
-                "min_price": 2000,
-                "max_price": 4000,
-                "notes": "Skreddersydde bokhyller eller skap. Pris per løpemeter ferdig montert. Avhenger av materialer og kompleksitet"
-            }
-        ]
-        
-        print("📊 Adding comprehensive tømrer/bygg services and pricing:")
-        
-        # Add service types and pricing data
-        for data in tomrer_bygg_data:
-            # Check if service type exists
-            service = db.query(ServiceType).filter(ServiceType.name == data["service"]).first()
-            if not service:
-                service = ServiceType(
-                    name=data["service"],
-                    description=data["description"],
-                    unit=data["unit"],
-                    category=data["category"]
-                )
-                db.add(service)
-                db.commit()
-                print(f"✅ Added service: {data['service']}")
-            
-            # Add pricing data
-            existing_pricing = db.query(PricingData).filter(
-                PricingData.service_type_id == service.id,
-                PricingData.source == "tomrer_bygg_research_2025"
-            ).first()
-            
-            if not existing_pricing:
-                pricing_data = PricingData(
-                    service_type_id=service.id,
-                    min_price=data["min_price"],
-                    max_price=data["max_price"],
-                    avg_price=(data["min_price"] + data["max_price"]) / 2,
-                    region="Oslo",
-                    source="tomrer_bygg_research_2025",
-                    confidence=0.93,  # High confidence from detailed market research
-                    notes=data["notes"]
-                )
-                db.add(pricing_data)
-                print(f"   💰 {data['min_price']:,.0f}-{data['max_price']:,.0f} NOK/{data['unit']} - {data['notes'][:50]}...")
-        
-        db.commit()
+        # Price sheet: catalog/tomrer_bygg.yaml
+        result = PriceCatalogService(db).load_file(CATALOG_DIR / "tomrer_bygg.yaml")
+        print(f"📊 Loaded {result['prices']} prices for {result['services']} services from {result['sheet']} ({result['seconds']:.3f}s)")
         
         # Update market rates
         pricing_service.update_market_rates("Oslo")
@@ -5,7 +5,7 @@ Update pricing database with comprehensive vinduer og dører data from Oslo/Vike
 
 from app.database import SessionLocal
 from app.services.pricing_service import PricingService
-from app.models.pricing import ServiceType, PricingData
+from app.services.price_catalog_service import PriceCatalogService, CATALOG_DIR
 
 def update_vinduer_dorer_pricing():
     """Update with comprehensive vinduer og dører pricing from Oslo/Viken 2025"""
@@ -17,214 +17,9 @@ def update_vinduer_dorer_pricing():
         print("🏠 Updating with vinduer og dører pricing data (Oslo/Viken spring 2025)")
         print("=" * 75)
         
-        # Comprehensive vinduer og dører data based on your research
-        vinduer_dorer_data = [
-            # Standard windows
-            {
-                "service": "vindu_standard_komplett",
-                "description": "Bytte vindu (standard) komplett (vindu + montering)",
-                "unit": "stk",
-                "category": "vinduer",
-                "min_price": 7000,
-                "max_price": 12000,
-                "notes": "Standard vindu 120x120cm inkl. montering. PVC 3-5k + trevindu 5-8k + montering 2-4k = ~10k total"
-            },
-            {
-                "service": "vindu_hoy_kvalitet_komplett",
-                "description": "Vinduer - høyere kvalitet (3-lags, alu-bekledd)",
-                "unit": "stk",
-                "category": "vinduer",
-                "min_price": 10000,
-                "max_price": 18000,
-                "notes": "Trecovinduer med 3-lags glass og alubekleding. 8.3-11.3k for 2-lags PVC, opp mot 15k for 3-lags tre/alu"
-            },
-            {
-                "service": "vindu_montasje_kun",
-                "description": "Vindu montering (kun arbeid)",
-                "unit": "stk",
-                "category": "vindumontasje",
-                "min_price": 2000,
-                "max_price": 4000,
-                "notes": "Kun montering av vindu. Varierer etter størrelse, type og tilkomst (etasjer)"
-            },
-            
-            # Window materials only
-            {
-                "service": "vindu_pvc_2_lags",
-                "description": "PVC vindu 2-lags glass (kun materiale)",
-                "unit": "stk",
-                "category": "vindu_materiale",
-                "min_price": 3000,
-                "max_price": 5000,
-                "notes": "Standard 2-lags PVC-vindu materiale. Størrelse 120x120cm typisk"
-            },
-            {
-                "service": "vindu_tre_2_lags",
-                "description": "Trevindu 2-lags glass (kun materiale)",
-                "unit": "stk",
-                "category": "vindu_materiale",
-                "min_price": 5000,
-                "max_price": 8000,
-                "notes": "Trevindu 2-lags glass. Krever mer vedlikehold enn PVC"
-            },
-            {
-                "service": "vindu_tre_alu_3_lags",
-                "description": "Tre/alu vindu 3-lags glass (kun materiale)",
-                "unit": "stk",
-                "category": "vindu_materiale",
-                "min_price": 8000,
-                "max_price": 12000,
-                "notes": "Premium trevindu med alubekleding og 3-lags energiglass"
-            },
-            
-            # Specialty windows
-            {
-                "service": "takvindu_stort",
-                "description": "Takvindu stort (Velux e.l.)",
-                "unit": "stk",
-                "category": "takvindu",
-                "min_price": 20000,
-                "max_price": 50000,
-                "notes": "Store vindusflater, spesialglass eller takvinduer. Velux typisk 20-50k inkl. montering"
-            },
-            {
-                "service": "panoramavindu_stor_flate",
-                "description": "Panoramavindu/stor vindusflate",
-                "unit": "stk",
-                "category": "vinduer",
-                "min_price": 25000,
-                "max_price": 60000,
-                "notes": "Store vindusflater, panoramavinduer. Pris øker med størrelse og glasskvalitet"
-            },
-            
-            # Exterior doors
-            {
-                "service": "ytterdor_enkel_komplett",
-                "description": "Ytterdør (ny, enkel type) komplett",
-                "unit": "stk",
-                "category": "ytterdor",
-                "min_price": 6000,
-                "max_price": 16000,
-                "notes": "Vanlig ytterdør med karm 5k+ og montering 2.5-4k. Komplett 8-20k inkl. mva (6.4-16k eks. mva)"
-            },
-            {
-                "service": "ytterdor_sikkerhet_premium",
-                "description": "Ytterdør sikkerhet/premium",
-                "unit": "stk",
-                "category": "ytterdor",
-                "min_price": 20000,
-                "max_price": 40000,
-                "notes": "Sikkerhetsdør, dobbeltdør med glassfelt. Betydelig dyrere enn standard"
-            },
-            {
-                "service": "ytterdor_montasje_kun",
-                "description": "Ytterdør montering (kun arbeid)",
-                "unit": "stk",
-                "category": "dor_montasje",
-                "min_price": 2500,
-                "max_price": 4000,
-                "notes": "Kun montering av ytterdør. Kompleks montering pga. tetting og justering"
-            },
-            
-            # Interior doors
-            {
-                "service": "innerdor_standard_komplett",
-                "description": "Innerdør (standard) komplett",
-                "unit": "stk",
-                "category": "innerdor",
-                "min_price": 2000,
-                "max_price": 4000,
-                "notes": "Dørblad med karm 1-2k + montering 0.5-1.5k. Standard hvit fyllingsdør ferdig montert"
-            },
-            {
-                "service": "innerdor_massiv_premium",
-                "description": "Innerdør massiv/lydisolerende",
-                "unit": "stk",
-                "category": "innerdor",
-                "min_price": 3500,
-                "max_price": 7000,
-                "notes": "Massive lydisolerende dører. Dyrere materialer og ofte tyngre montering"
-            },
-            {
-                "service": "innerdor_montasje_kun",
-                "description": "Innerdør montering (kun arbeid)",
-                "unit": "stk",
-                "category": "dor_montasje",
-                "min_price": 500,
-                "max_price": 1500,
-                "notes": "Kun arbeidskostnad for montering. 1-2 timers jobb per dør"
-            },
-            
-            # Specialized glass
-            {
-                "service": "spesialglass_stoy_sikkerhet",
-                "description": "Spesialglass (støy/sikkerhet)",
-                "unit": "m²",
-                "category": "spesialglass",
-                "min_price": 1500,
-                "max_price": 3000,
-                "notes": "Støydempende eller sikkerhetsglass. Betydelig dyrere enn standard glass"
-            },
-            
-            # Package deals
-            {
-                "service": "komplett_vindusutskifting_hus",
-                "description": "Komplett vindusutskifting hus (12 vinduer)",
-                "unit": "pakke",
-                "category": "vindu_pakke",
-                "min_price": 120000,
-                "max_price": 200000,
-                "notes": "Komplett utskifting av vinduer i enebolig. 12 vinduer x 10k = 120k, opp mot 200k for premium"
-            },
-            {
-                "service": "komplett_dor_utskifting_hus",
-                "description": "Komplett dør utskifting hus (1 ytter + 6 inner)",
-                "unit": "pakke",
-                "category": "dor_pakke",
-                "min_price": 25000,
-                "max_price": 45000,
-                "notes": "1 ytterdør + 6 innerdører. Pakkerabatt på montering ved flere dører samtidig"
-            }
-        ]
-        
-        print("📊 Adding comprehensive vinduer og dører services and pricing:")
-        
-        # Add service types and pricing data
-        for data in vinduer_dorer_data:
-            # Check if service type exists
-            service = db.query(ServiceType).filter(ServiceType.name == data["service"]).first()
-            if not service:
-                service = ServiceType(
-                    name=data["service"],
-                    description=data["description"],
-                    unit=data["unit"],
-                    category=data["category"]
-                )
-                db.add(service)
-                db.commit()
-                print(f"✅ Added service: {data['service']}")
-            
-            # Add pricing data
-            existing_pricing = db.query(PricingData).filter(
-                PricingData.service_type_id == service.id,
-                PricingData.source == "vinduer_dorer_research_2025"
-            ).first()
-            
-            if not existing_pricing:
-                pricing_data = PricingData(
-                    service_type_id=service.id,
-                    min_price=data["min_price"],
-                    max_price=data["max_price"],
-                    avg_price=(data["min_price"] + data["max_price"]) / 2,
-                    region="Oslo",
-                    source="vinduer_dorer_research_2025",
-                    confidence=0.92,  # High confidence from detailed market research
-                    notes=data["notes"]
-                )
-                db.add(pricing_data)
-                print(f"   💰 {data['min_price']:,.0f}-{data['max_price']:,.0f} NOK/{data['unit']} - {data['notes'][:50]}...")
-        
-        db.commit()
+        # Price sheet: catalog/vinduer_dorer.yaml
+        result = PriceCatalogService(db).load_file(CATALOG_DIR / "vinduer_dorer.yaml")
+        print(f"📊 Loaded {result['prices']} prices for {result['services']} services from {result['sheet']} ({result['seconds']:.3f}s)")
         
         # Update market rates
         pricing_service.update_market_rates("Oslo")